@@ -0,0 +1,231 @@
+import logging
+
+from rest_framework import status, permissions, serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import calcFootprints
+from ..factorSets import get_active_factors
+from ..loadGreenhouseData import load_standardized_data
+from ..models import GreenhouseData
+from ..referenceCatalog import get_catalog
+from ..resultValues import to_stored_decimal
+from ..serializers import ListOfTuples, Tuple
+from ..standardizeUnits import standardize_units
+from ..utils import generic_error_message, input_error_message
+
+logger = logging.getLogger(__name__)
+
+# maximal number of scenarios of one request
+MAX_SCENARIOS = 100
+# errors of standardize_units() for options or units, that it can not convert
+UNIT_ERRORS = (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError)
+
+
+class CalculateScenarios(APIView):
+    """API endpoint for calculating the footprints of variations of a stored greenhouse data set.
+
+    The stored data set is not changed. Every scenario replaces some fields of the data set, all scenarios are
+    calculated together in one batch.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def post(self, request, format=None):
+        """Calculates the footprints of the stored data set and of every scenario.
+
+        Args:
+            request: user object and json:
+                {
+                    datasetId: <dataset-id>,
+                    scenarios: [
+                        {
+                            label: <name of the scenario>,
+                            overrides: {
+                                <field name>: <value in the format of create-dataset, e.g. "[(3,1000,2)]">,
+                                ...
+                            }
+                        },
+                        ...
+                    ]
+                }
+
+        Returns:
+            json: {
+                    datasetId: <dataset-id>,
+                    factorVersion: <version of the factor set>,
+                    base: {
+                        konstruktion_co2: <construction co2 value>,
+                        ...
+                    },
+                    (the values have the precision of the stored results, see resultValues.to_stored_decimal())
+                    scenarios: [
+                        {
+                            label: <name of the scenario>,
+                            results: {<same structure as base>} or error: <error message>
+                            (a scenario with invalid overrides has the error 'Input error' and
+                            fields: {<field name>: [<error message>, ...], ...})
+                        },
+                        ...
+                    ]
+                }
+        """
+
+        user_id = self.request.user.id
+        if user_id is None:
+            logger.info("CalculateScenarios: invalid user")
+            return Response({'Error': 'No valid user', 'Message': generic_error_message},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        dataset_id = request.data.get('datasetId')
+        scenarios = request.data.get('scenarios')
+        if not isinstance(scenarios, list) or not scenarios:
+            logger.info("CalculateScenarios: scenarios missing")
+            return Response({'Error': 'scenarios has to be a non-empty list', 'Message': input_error_message},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(scenarios) > MAX_SCENARIOS:
+            logger.info("CalculateScenarios: too many scenarios")
+            return Response({'Error': f'At most {MAX_SCENARIOS} scenarios are allowed',
+                             'Message': input_error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+        greenhouse_data = GreenhouseData.objects.filter(id=dataset_id, greenhouse__user_id=user_id).first() \
+            if str(dataset_id).isdigit() else None
+        if greenhouse_data is None:
+            logger.info("CalculateScenarios: data set not found")
+            return Response({'Error': 'Not found', 'Message': 'This user has no data set with this id'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # an invalid scenario is reported in its entry of the response, the other scenarios are still calculated
+        base_data = load_standardized_data([greenhouse_data.id])[greenhouse_data.id]
+        labels = []
+        input_errors = dict()
+        scenario_overrides = []
+        for index, scenario in enumerate(scenarios):
+            label = scenario.get('label', str(index + 1)) if isinstance(scenario, dict) else str(index + 1)
+            labels.append(label)
+            overrides = scenario.get('overrides') if isinstance(scenario, dict) else None
+            try:
+                if not isinstance(overrides, dict):
+                    raise serializers.ValidationError({'overrides': ['overrides has to be an object']})
+                scenario_overrides.append(standardize_overrides(base_data, overrides))
+            except serializers.ValidationError as e:
+                logger.info("CalculateScenarios: format error in scenario %s: %s", index, e.detail)
+                input_errors[index] = e.detail
+
+        factors = get_active_factors()
+        try:
+            results, calculation_errors = calcFootprints.calc_footprints_scenarios(base_data, scenario_overrides,
+                                                                                   factors)
+        except Exception as e:
+            logger.info("CalculateScenarios: footprint calculation error: %r", e)
+            return Response({'Error': 'Calculation error', 'Message': generic_error_message},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if calculation_errors[0] is not None:
+            logger.info("CalculateScenarios: calculation error of the stored data set: %s", calculation_errors[0])
+            return Response({'Error': 'Calculation error', 'Message': generic_error_message},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # the values are returned like the stored results of the other footprint endpoints
+        columns = {name: [float(to_stored_decimal(value)) for value in values.tolist()]
+                   for name, values in results.items()}
+        scenario_list = []
+        row = 0
+        for index, label in enumerate(labels):
+            if index in input_errors:
+                scenario_list.append({'label': label, 'error': 'Input error', 'fields': input_errors[index]})
+                continue
+            # the valid scenarios follow the stored data set in the rows of the results
+            row += 1
+            if calculation_errors[row] is not None:
+                scenario_list.append({'label': label, 'error': calculation_errors[row]})
+            else:
+                scenario_list.append({'label': label,
+                                      'results': {name: values[row] for name, values in columns.items()}})
+
+        response_data = {
+            'datasetId': greenhouse_data.id,
+            'factorVersion': factors.version,
+            'base': {name: values[0] for name, values in columns.items()},
+            'scenarios': scenario_list,
+        }
+        logger.debug("CalculateScenarios: request success")
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+def standardize_overrides(base_data, overrides):
+    """Validates the overridden fields of a scenario and standardizes their units.
+
+    Args:
+        base_data: standardized data of the stored data set
+        overrides: dictionary of field name -> value in the input format of create-dataset
+
+    Returns:
+        dictionary: field name -> standardized value of the overridden fields
+
+    Raises:
+        serializers.ValidationError: if a field is unknown or its value is invalid
+    """
+
+    catalog = get_catalog()
+    measurements = {name for _, name in catalog.measurements()}
+    option_groups = {name for _, name in catalog.option_groups()}
+
+    scenario_data = {name: list(value) if isinstance(value, list) else value for name, value in base_data.items()}
+    errors = dict()
+    for name, value in overrides.items():
+        try:
+            if name in measurements:
+                scenario_data[name] = Tuple().run_validation(value)
+            elif name in option_groups:
+                selections = ListOfTuples().run_validation(value)
+                option_group_id = catalog.option_group_id(name)
+                for selection in selections:
+                    if selection[0] != 0 and _option_group_of(catalog, selection[0]) != option_group_id:
+                        raise serializers.ValidationError(f'Option {selection[0]} does not belong to {name}')
+                scenario_data[name] = selections
+            else:
+                raise serializers.ValidationError('Unknown field')
+        except serializers.ValidationError as e:
+            errors[name] = e.detail
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    # the stored data is already standardized, so only the overridden fields are changed here
+    try:
+        standardize_units(scenario_data)
+    except UNIT_ERRORS:
+        raise serializers.ValidationError(_unit_errors(base_data, scenario_data, overrides))
+    return {name: scenario_data[name] for name in overrides}
+
+
+def _unit_errors(base_data, scenario_data, overrides):
+    """Returns the errors of the overridden fields, whose units can not be standardized.
+
+    Every overridden field is standardized on its own with the stored data set. If the fields only fail together, the
+    error is reported for all of them.
+
+    Returns:
+        dictionary: field name -> list of error messages
+    """
+
+    errors = dict()
+    for name in overrides:
+        field_data = {field: list(value) if isinstance(value, list) else value for field, value in base_data.items()}
+        field_data[name] = scenario_data[name]
+        try:
+            standardize_units(field_data)
+        except (KeyError, IndexError) as e:
+            errors[name] = [f'Unknown option or unit: {e}']
+        except UNIT_ERRORS:
+            errors[name] = ['The unit of this value can not be converted']
+    return errors or {name: ['The units can not be standardized'] for name in overrides}
+
+
+def _option_group_of(catalog, option_id):
+    """Returns the id of the option group of an option or None for unknown options."""
+    try:
+        return catalog.option_group_id_of_option(option_id)
+    except KeyError:
+        return None
@@ -1,16 +1,28 @@
+import logging
+
+from django.db import transaction
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .helper.stringValidation import contains_script_tag
-from .. import calcFootprints
+from .. import calcFootprints, footprintCache
+from ..factorSets import get_active_factors
+from ..loadGreenhouseData import build_measure_values
 from ..dataValidation import validate_mandatory_fields
 from ..models import GreenhouseData, Measurements, Measures, Selections, \
-    OptionGroups, Greenhouses, Calculations, Results, MeasurementUnits
+    OptionGroups, Greenhouses, Calculations, Results
+from ..cohortRollups import update_cohort_rollups_on_commit
+from ..footprintDistributions import update_footprint_distributions_on_commit
+from ..performerRankings import update_performer_rankings
+from ..resultValues import build_result_values
+from ..responseCache import invalidate_user_responses
 from ..serializers import InputDataSerializer
 from ..standardizeUnits import standardize_units
 from ..utils import generic_error_message, input_error_message
 
+logger = logging.getLogger(__name__)
+
 
 class CreateGreenhouseData(APIView):
     """API endpoint for calculating the footprints and storing them with the greenhouse data into the database.
@@ -57,132 +69,146 @@ class CreateGreenhouseData(APIView):
 
         user_id = self.request.user.id
         if user_id is None:
-            print("CreateGreenhouseData: invalid user")
+            logger.info("CreateGreenhouseData: invalid user")
             return Response({'Error': 'No valid user', 'Message': generic_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
 
         # check if all data in the request body fits the format
         serializer = self.serializer_class(data=request.data)
         if not serializer.is_valid():
-            print("CreateGreenhouseData: format error")
-            print(serializer.errors)
+            logger.info("CreateGreenhouseData: format error: %s", serializer.errors)
             return Response({"Error": serializer.errors, "Message": input_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
         if contains_script_tag(serializer.data.get('greenhouse_name')):
-            print("CreateGreenhouseData: illegal greenhouse_name")
+            logger.info("CreateGreenhouseData: illegal greenhouse_name")
             return Response({'Error': 'Input Validation Error',
                              'Message': 'Die Zeichen '<' und '>' sind nicht erlaubt!'},
                             status=status.HTTP_400_BAD_REQUEST)
-        print("CreateGreenhouseData: format valid")
+        logger.debug("CreateGreenhouseData: format valid")
 
         # validate that every required field has been filled out with not a default value
         valid_mandatory_fields, mandatory_error_message = validate_mandatory_fields(data=serializer.data)
         if valid_mandatory_fields is False:
-            print("CreateGreenhouseData: mandatory error!")
+            logger.info("CreateGreenhouseData: mandatory error!")
             return Response({'Error': 'Mandatory error', 'Message': mandatory_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
-        print("CreateGreenhouseData: mandatory valid")
-
-        # standardize the units of the data for footprint calculation
-        standardized_data = standardize_units(serializer.data)
-
-        # check if this is a data set for an existing greenhouse or if a new greenhouse should be created
-        greenhouse = Greenhouses.objects.filter(
-            user_id=user_id,
-            greenhouse_name=standardized_data.get('greenhouse_name')
-        )
-        new_greenhouse = len(greenhouse) == 0
-        if new_greenhouse:
-            # create a new greenhouse:
-            greenhouse = Greenhouses(
-                user_id=user_id,
-                greenhouse_name=standardized_data.get('greenhouse_name')
-            )
-            greenhouse.save()
-
-            greenhouse_data = GreenhouseData(
-                greenhouse_id=greenhouse.id,
-                date=serializer.data.get('date')
-            )
-            greenhouse_data.save()
+        logger.debug("CreateGreenhouseData: mandatory valid")
+
+        # a repeated submission of the same data is taken from the cache, otherwise the units of the data are
+        # standardized for footprint calculation
+        factors = get_active_factors()
+        cache_key = footprintCache.input_key(serializer.data, factors)
+        cached = footprintCache.get_cached_footprints(cache_key, serializer.data)
+        if cached is not None:
+            logger.debug("CreateGreenhouseData: cache hit")
+            standardized_data, calculation_result = cached
         else:
-            # use existing greenhouse
-            greenhouse = greenhouse[0]
+            standardized_data = standardize_units(serializer.data)
+            calculation_result = None
 
-            greenhouse_data = GreenhouseData(
-                greenhouse_id=greenhouse.id,
-                date=serializer.data.get('date')
-            )
-            greenhouse_data.save()
-
-        # calculate footprints and save them in Results table in db
+        # calculate the footprints before anything is written, so a calculation error does not leave any rows behind
         try:
-            calculation_result = calcFootprints.calc_footprints(standardized_data)
-            calculation_variables = Calculations.objects.in_bulk(
-                field_name='calculation_name')
-            for variable, value in calculation_result.items():
-                Results(
-                    greenhouse_data=greenhouse_data,
-                    result_value=value,
-                    calculation_id=calculation_variables[variable].id,
-                ).save()
-            print("CreateGreenhouseData: footprint calculations success")
+            if calculation_result is None:
+                calculation_result = calcFootprints.calc_footprints(standardized_data, factors)
+                footprintCache.set_cached_footprints(cache_key, standardized_data, calculation_result)
+            logger.debug("CreateGreenhouseData: footprint calculations success")
         except Exception as e:
-            print(type(e))
-            if new_greenhouse:
-                Greenhouses.objects.filter(id=greenhouse.id).delete()
-            else:
-                GreenhouseData.objects.filter(id=greenhouse_data.id).delete()
-            print("CreateGreenhouseData: footprint calculation error")
+            logger.info("CreateGreenhouseData: footprint calculation error: %r", e)
             return Response({'Error': 'Calculation error', 'Message': generic_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # save input data in Measures and Selection tables in db
+        # save the greenhouse data with its results, measures and selections in one transaction, every table is
+        # written with one statement
         try:
-            # retrieve 'Measurements' table as dict to map measurement_name to
-            # measurement_id
-            measurements = Measurements.objects.in_bulk(
-                field_name='measurement_name')  # transform table to a dict
-            options = OptionGroups.objects.in_bulk(
-                field_name='option_group_name')
-
-            for name, value in standardized_data.items():
-                if name in measurements:
-                    # metric (continuous) data (=> numbers)
-                    Measures(
-                        greenhouse_data=greenhouse_data,
-                        measurement_id=measurements[name].id,
-                        measure_value=value[0],
-                        measure_unit=MeasurementUnits.objects.get(id=value[1])
-                    ).save()
-                elif name in options:
-                    # categorical data (e.g. through dropdowns)
-                    for elem in value:
-                        # check if a selection_value is declared
-                        selection_value = None
-                        selection_value2 = None
-                        selection_unit = None
-                        if len(elem) == 3:
-                            selection_value = elem[1]
-                            selection_unit = elem[2]
-                        if len(elem) == 4:
-                            selection_value = elem[1]
-                            selection_unit = elem[2]
-                            selection_value2 = elem[3]
-                        Selections(
-                            greenhouse_data=greenhouse_data,
-                            option_id=elem[0],
-                            selection_value=selection_value,
-                            selection_unit_id=selection_unit,
-                            selection_value2=selection_value2
-                        ).save()
-            print("CreateGreenhouseData: save greenhouse data success")
+            with transaction.atomic():
+                greenhouse_data = self.save_greenhouse_data(user_id, serializer.data.get('date'), standardized_data,
+                                                            calculation_result, factors)
+                update_performer_rankings([greenhouse_data.id])
+                update_footprint_distributions_on_commit([greenhouse_data.id])
+                update_cohort_rollups_on_commit([greenhouse_data.id])
+                invalidate_user_responses(user_id)
+            logger.debug("CreateGreenhouseData: save greenhouse data success")
             return Response(request.data, status=status.HTTP_201_CREATED)
         except Exception as e:
-            if new_greenhouse:
-                Greenhouses.objects.filter(id=greenhouse.id).delete()
-            else:
-                GreenhouseData.objects.filter(id=greenhouse_data.id).delete()
-            print("CreateGreenhouseData: save greenhouse data error")
-            print(e)
+            logger.warning("CreateGreenhouseData: save greenhouse data error: %r", e)
             return Response({'Message': generic_error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def save_greenhouse_data(user_id, date, standardized_data, calculation_result, factors):
+        """Saves a new data set with its results, measures and selections, inside of a transaction.
+
+        The data set is added to the greenhouse of the user with the greenhouse_name of the data, a new greenhouse is
+        created if there is none.
+
+        Args:
+            user_id: id of the user
+            date: date of the data set
+            standardized_data: data set with standardized units
+            calculation_result: dictionary calculation_name -> result value
+            factors: factor set of the results
+
+        Returns:
+            GreenhouseData: the saved data set
+        """
+
+        greenhouse_name = standardized_data.get('greenhouse_name')
+        greenhouse = Greenhouses.objects.filter(user_id=user_id, greenhouse_name=greenhouse_name).first()
+        if greenhouse is None:
+            greenhouse = Greenhouses.objects.create(user_id=user_id, greenhouse_name=greenhouse_name)
+
+        # retrieve 'Measurements', 'OptionGroups' and 'Calculations' tables as dicts to map the names to their ids
+        measurements = Measurements.objects.in_bulk(field_name='measurement_name')
+        options = OptionGroups.objects.in_bulk(field_name='option_group_name')
+        calculation_variables = Calculations.objects.in_bulk(field_name='calculation_name')
+
+        measure_values = build_measure_values(standardized_data, measurements)
+        greenhouse_data = GreenhouseData.objects.create(
+            greenhouse=greenhouse,
+            date=date,
+            measure_values=measure_values,
+            result_values=build_result_values(calculation_result, measure_values, factors.version)
+        )
+
+        Results.objects.bulk_create([
+            Results(
+                greenhouse_data=greenhouse_data,
+                result_value=value,
+                calculation_id=calculation_variables[variable].id,
+                factor_version=factors.version,
+            ) for variable, value in calculation_result.items()])
+
+        measures = []
+        selections = []
+        for name, value in standardized_data.items():
+            if name in measurements:
+                # metric (continuous) data (=> numbers)
+                measures.append(Measures(
+                    greenhouse_data=greenhouse_data,
+                    measurement_id=measurements[name].id,
+                    measure_value=value[0],
+                    measure_unit_id=value[1]
+                ))
+            elif name in options:
+                # categorical data (e.g. through dropdowns)
+                for elem in value:
+                    # check if a selection_value is declared
+                    selection_value = None
+                    selection_value2 = None
+                    selection_unit = None
+                    if len(elem) == 3:
+                        selection_value = elem[1]
+                        selection_unit = elem[2]
+                    if len(elem) == 4:
+                        selection_value = elem[1]
+                        selection_unit = elem[2]
+                        selection_value2 = elem[3]
+                    selections.append(Selections(
+                        greenhouse_data=greenhouse_data,
+                        option_id=elem[0],
+                        selection_value=selection_value,
+                        selection_unit_id=selection_unit,
+                        selection_value2=selection_value2
+                    ))
+        Measures.objects.bulk_create(measures)
+        Selections.objects.bulk_create(selections)
+        return greenhouse_data
@@ -1,10 +1,50 @@
+import logging
+
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .helper.prepearePlotData import calc_total_and_normalized_data, \
-    is_productiontype_biologic, calc_fruit_size_data, add_best_and_worst_performer
-from ..models import GreenhouseData, Measurements, Greenhouses, Calculations
+from .helper.uncertaintyData import get_uncertainty_options, calc_uncertainty_data
+from .helper.prepearePlotData import calc_total_and_normalized_data, calc_fruit_size_data, \
+    add_best_and_worst_performer
+from ..footprintQuery import load_footprint_data
+from ..models import Greenhouses
+from ..responseCache import cached_response
+
+logger = logging.getLogger(__name__)
+
+# the names of the fields in the Calculations table that are being send to the front end
+CO2_CALCULATION_NAMES = [
+    "konstruktion_co2",
+    "energieschirm_co2",
+    "bodenabdeckung_co2",
+    "produktionssystem_co2",
+    "heizsystem_co2",
+    "zusaetzliches_heizsystem_co2",
+    "energietraeger_co2",
+    "strom_co2",
+    "brunnenwasser_co2",
+    "regenwasser_co2",
+    "stadtwasser_co2",
+    "oberflaechenwasser_co2",
+    "co2_zudosierung_co2",
+    "duengemittel_co2",
+    "psm_co2",
+    "pflanzenbehaelter_co2",
+    "substrat_co2",
+    "jungpflanzen_substrat_co2",
+    "jungpflanzen_transport_co2",
+    "schnuere_co2",
+    "klipse_co2",
+    "rispenbuegel_co2",
+    "bewaesserung_co2",
+    "verpackung_co2",
+    "sonstige_verbrauchsmaterialien_co2",
+]
+# the normalized footprints, whose best and worst performers are compared with the data sets of the user
+CO2_PERFORMER_CALCULATIONS = ["co2_footprint_norm_kg", "co2_footprint_norm_m2"]
+# the results, for which the uncertainty bands are returned
+CO2_UNCERTAINTY_NAMES = CO2_CALCULATION_NAMES + ["co2_footprint", "co2_footprint_norm_kg", "co2_footprint_norm_m2"]
 
 
 class GetCalculatedCO2Footprint(APIView):
@@ -15,6 +55,7 @@ class GetCalculatedCO2Footprint(APIView):
         permissions.IsAuthenticated,
     ]
 
+    @cached_response("get-co2-footprint", contains_performers=True)
     def get(self, request, format=None):
         """Returns the calculated co2 footprints for every data set of every greenhouse of a user.
 
@@ -70,137 +111,129 @@ class GetCalculatedCO2Footprint(APIView):
                             ...
                         ],
                         fruitsizem2: [<same structure as fruitsizekg>],
+                        uncertainty: [
+                            {
+                                greenhouse_name: <name of greenhouse>,
+                                greenhouse_datasets: [
+                                    {
+                                        label: <date>,
+                                        konstruktion_co2: {p5: <5th percentile>, p50: <median>, p95: <95th percentile>},
+                                        ...
+                                    },
+                                    ...
+                                ]
+                            },
+                            ...
+                        ], (only with the query parameter uncertainty=true)
+                        uncertainty_draws: <number of Monte Carlo draws>
                 ]
         """
 
-        total_response_data = []
-        normalizedkg_response_data = []
-        normalizedm2_response_data = []
-        fruitsizekg_response_data = []
-        fruitsizem2_response_data = []
-        response_data = dict()
-
         user_id = self.request.user.id
         if user_id is None:
-            print("GetCalculatedCO2Footprint: invalid user")
+            logger.info("GetCalculatedCO2Footprint: invalid user")
             return Response({'Error': 'No valid user', 'Message': ""},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # the names of the fields in the Calculations table that are being send to the front end
-        co2_calculation_names = [
-            "konstruktion_co2",
-            "energieschirm_co2",
-            "bodenabdeckung_co2",
-            "produktionssystem_co2",
-            "heizsystem_co2",
-            "zusaetzliches_heizsystem_co2",
-            "energietraeger_co2",
-            "strom_co2",
-            "brunnenwasser_co2",
-            "regenwasser_co2",
-            "stadtwasser_co2",
-            "oberflaechenwasser_co2",
-            "co2_zudosierung_co2",
-            "duengemittel_co2",
-            "psm_co2",
-            "pflanzenbehaelter_co2",
-            "substrat_co2",
-            "jungpflanzen_substrat_co2",
-            "jungpflanzen_transport_co2",
-            "schnuere_co2",
-            "klipse_co2",
-            "rispenbuegel_co2",
-            "bewaesserung_co2",
-            "verpackung_co2",
-            "sonstige_verbrauchsmaterialien_co2",
-        ]
-
-        # retrieve all calculations and the specific calculation_ids for the requested co2_calculation_names
-        calculations = Calculations.objects.in_bulk(
-            field_name='calculation_name')
-        calculation_ids = [calculations[name] for name in co2_calculation_names]
-
-        all_measurements = Measurements.objects.all()
-
-        greenhouses = Greenhouses.objects.filter(user_id=user_id)
-        if not greenhouses.exists():
-            print("GetCalculatedCO2Footprint: no greenhouse for user")
+        try:
+            uncertainty_options = get_uncertainty_options(request.query_params)
+        except ValueError:
+            logger.info("GetCalculatedCO2Footprint: invalid uncertainty parameters")
+            return Response({'Error': 'Invalid uncertainty parameters', 'Message': ""},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        greenhouses = list(Greenhouses.objects.filter(user_id=user_id).order_by('id'))
+        if not greenhouses:
+            logger.info("GetCalculatedCO2Footprint: no greenhouse for user")
             return Response({'Error': 'Not found', 'Message': 'This user has no greenhouse'},
                         status=status.HTTP_400_BAD_REQUEST)
 
+        # load the results of all data sets of the user and the performers with a fixed number of queries
+        footprint_data = load_footprint_data(greenhouses, CO2_PERFORMER_CALCULATIONS)
+        response = self.footprint_response(footprint_data)
+        if response.status_code == status.HTTP_200_OK and uncertainty_options is not None:
+            response.data["uncertainty"], response.data["uncertainty_draws"] = calc_uncertainty_data(
+                [(greenhouse, footprint_data.datasets(greenhouse)) for greenhouse in footprint_data.greenhouses],
+                CO2_UNCERTAINTY_NAMES,
+                uncertainty_options)
+        return response
+
+    @staticmethod
+    def footprint_response(footprint_data):
+        """Maps the co2 footprints of the loaded data sets of a user into the json structure of get().
+
+        Args:
+            footprint_data: the loaded data of the user, see footprintQuery.load_footprint_data()
+
+        Returns:
+            Response: the co2 footprints without the uncertainty bands or an error
+        """
+
+        total_response_data = []
+        normalizedkg_response_data = []
+        normalizedm2_response_data = []
+        fruitsizekg_response_data = []
+        fruitsizem2_response_data = []
+        response_data = dict()
+
         # iterate through every greenhouse of the user, retrieve the calculation results
         # and store them in a defined dictionary/list structure
-        for greenhouse in greenhouses:
+        for greenhouse in footprint_data.greenhouses:
 
             total_greenhouse_dict = dict()
             normalizedkg_greenhouse_dict = dict()
             normalizedm2_greenhouse_dict = dict()
             fruitsizekg_greenhouse_dict = dict()
             fruitsizem2_greenhouse_dict = dict()
-            benchmarkkg_greenhouse_dict = dict()
-            benchmarkm2_greenhouse_dict = dict()
-            optimization_greenhouse_dict = dict()
             total_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
             normalizedkg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
             normalizedm2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
             fruitsizekg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
             fruitsizem2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-            benchmarkkg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-            benchmarkm2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-            optimization_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
 
-            greenhouse_data = GreenhouseData.objects.filter(
-                greenhouse_id=greenhouse.id)
+            greenhouse_data = footprint_data.datasets(greenhouse)
 
-            if not greenhouse_data.exists():
-                print("getCalculatedCO2Footprint: greenhouse without greenhouse data")
+            if not greenhouse_data:
+                logger.info("getCalculatedCO2Footprint: greenhouse without greenhouse data")
                 return Response({'Error': 'Not found', 'Message': 'A greenhouse has no greenhouse data'},
                                 status=status.HTTP_400_BAD_REQUEST)
 
             # retrieve the result_values for every data set of a greenhouse and store them in the total_data_set_list
             try:
-                if len(greenhouse_data) != 0:
-                    recent_dataset = greenhouse_data[len(greenhouse_data) - 1]
-                    recent_dataset_is_biologic = is_productiontype_biologic(recent_dataset)
-
-                    total_data_set_list, normalizedkg_data_set_list, normalizedm2_data_set_list = \
-                        calc_total_and_normalized_data(
-                            greenhouse_data, all_measurements, calculation_ids, co2_calculation_names)
-
-                    calculation_name_kg = "co2_footprint_norm_kg"
-                    calculation_name_m2 = "co2_footprint_norm_m2"
-
-                    # retrieve the best and worst performer and add them to the greenhouse_dicts
-                    normalizedkg_greenhouse_dict, normalizedm2_greenhouse_dict = add_best_and_worst_performer(
-                        recent_dataset_is_biologic,
-                        calculation_name_kg,
-                        calculation_name_m2,
-                        calculation_ids,
-                        co2_calculation_names,
-                        all_measurements,
-                        normalizedkg_greenhouse_dict,
-                        normalizedm2_greenhouse_dict,
-                        normalizedkg_data_set_list,
-                        normalizedm2_data_set_list,
-                    )
-
-                    total_greenhouse_dict['greenhouse_datasets'] = total_data_set_list
-                    total_response_data.append(total_greenhouse_dict)
-
-                    normalizedkg_response_data.append(normalizedkg_greenhouse_dict)
-                    normalizedm2_response_data.append(normalizedm2_greenhouse_dict)
-
-                    fruitsizekg_data_set_list, fruitsizem2_data_set_list = calc_fruit_size_data(recent_dataset,
-                                                                                                all_measurements,
-                                                                                                calculation_ids,
-                                                                                                co2_calculation_names)
-                    fruitsizekg_greenhouse_dict['greenhouse_datasets'] = fruitsizekg_data_set_list
-                    fruitsizem2_greenhouse_dict['greenhouse_datasets'] = fruitsizem2_data_set_list
-                    fruitsizekg_response_data.append(fruitsizekg_greenhouse_dict)
-                    fruitsizem2_response_data.append(fruitsizem2_greenhouse_dict)
-
-            except IndexError:
-                print("getCalculatedCO2Footprint: greenhouse without greenhouse data")
+                recent_dataset = footprint_data.recent_dataset(greenhouse)
+
+                total_data_set_list, normalizedkg_data_set_list, normalizedm2_data_set_list = \
+                    calc_total_and_normalized_data(footprint_data, greenhouse_data, CO2_CALCULATION_NAMES)
+
+                # retrieve the best and worst performer and add them to the greenhouse_dicts
+                normalizedkg_greenhouse_dict, normalizedm2_greenhouse_dict = add_best_and_worst_performer(
+                    footprint_data,
+                    footprint_data.production_type(recent_dataset),
+                    CO2_PERFORMER_CALCULATIONS[0],
+                    CO2_PERFORMER_CALCULATIONS[1],
+                    CO2_CALCULATION_NAMES,
+                    normalizedkg_greenhouse_dict,
+                    normalizedm2_greenhouse_dict,
+                    normalizedkg_data_set_list,
+                    normalizedm2_data_set_list,
+                )
+
+                total_greenhouse_dict['greenhouse_datasets'] = total_data_set_list
+                total_response_data.append(total_greenhouse_dict)
+
+                normalizedkg_response_data.append(normalizedkg_greenhouse_dict)
+                normalizedm2_response_data.append(normalizedm2_greenhouse_dict)
+
+                fruitsizekg_data_set_list, fruitsizem2_data_set_list = calc_fruit_size_data(footprint_data,
+                                                                                            recent_dataset,
+                                                                                            CO2_CALCULATION_NAMES)
+                fruitsizekg_greenhouse_dict['greenhouse_datasets'] = fruitsizekg_data_set_list
+                fruitsizem2_greenhouse_dict['greenhouse_datasets'] = fruitsizem2_data_set_list
+                fruitsizekg_response_data.append(fruitsizekg_greenhouse_dict)
+                fruitsizem2_response_data.append(fruitsizem2_greenhouse_dict)
+
+            except (IndexError, KeyError):
+                logger.info("getCalculatedCO2Footprint: greenhouse without greenhouse data")
                 return Response({'Error': 'Not found', 'Message': 'No data for given parameters found'},
                                 status=status.HTTP_400_BAD_REQUEST)
 
@@ -209,5 +242,5 @@ class GetCalculatedCO2Footprint(APIView):
         response_data["normalizedm2"] = normalizedm2_response_data
         response_data["fruitsizekg"] = fruitsizekg_response_data
         response_data["fruitsizem2"] = fruitsizem2_response_data
-        print("getCalculatedCO2Footprint: request success")
+        logger.debug("getCalculatedCO2Footprint: request success")
         return Response(response_data, status=status.HTTP_200_OK)
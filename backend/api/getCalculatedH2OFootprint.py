@@ -1,11 +1,60 @@
+import logging
+
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .helper.prepearePlotData import calc_fruit_size_data, add_best_and_worst_performer, find_performer_dataset, \
-    calc_total_and_normalized_data, is_productiontype_biologic, get_harvest
-from ..models import GreenhouseData, Measurements, Measures, Selections, \
-    Options, Greenhouses, Calculations, Results, OptionGroups
+from .helper.uncertaintyData import get_uncertainty_options, calc_uncertainty_data
+from .helper.prepearePlotData import calc_fruit_size_data, add_best_and_worst_performer, \
+    calc_total_and_normalized_data
+from ..footprintQuery import load_footprint_data
+from ..models import Greenhouses
+from ..responseCache import cached_response
+
+logger = logging.getLogger(__name__)
+
+# the names of the fields in the Calculations table that are being send to the front end
+H2O_CALCULATION_NAMES = [
+    "konstruktion_h2o",
+    "energieschirm_h2o",
+    "bodenabdeckung_h2o",
+    "produktionssystem_h2o",
+    "bewaesserung_h2o",
+    "heizsystem_h2o",
+    "zusaetzliches_heizsystem_h2o",
+    "energietraeger_h2o",
+    "strom_h2o",
+    "brunnenwasser_h2o",
+    "regenwasser_h2o",
+    "stadtwasser_h2o",
+    "oberflaechenwasser_h2o",
+    "co2_zudosierung_h2o",
+    "duengemittel_h2o",
+    "psm_h2o",
+    "pflanzenbehaelter_h2o",
+    "substrat_h2o",
+    "jungpflanzen_substrat_h2o",
+    "jungpflanzen_transport_h2o",
+    "schnuere_h2o",
+    "klipse_h2o",
+    "rispenbuegel_h2o",
+    "verpackung_h2o",
+    "sonstige_verbrauchsmaterialien_h2o",
+]
+# the results of the direct water usage
+DIRECT_H2O_CALCULATION_NAMES = [
+    "brunnenwasser_h2o",
+    "regenwasser_h2o",
+    "stadtwasser_h2o",
+    "oberflaechenwasser_h2o",
+]
+# the normalized footprints, whose best and worst performers are compared with the data sets of the user
+H2O_PERFORMER_CALCULATIONS = ["h2o_footprint_norm_kg", "h2o_footprint_norm_m2",
+                              "direct_h2o_footprint_norm_kg", "direct_h2o_footprint_norm_m2"]
+# the results, for which the uncertainty bands are returned
+H2O_UNCERTAINTY_NAMES = H2O_CALCULATION_NAMES + ["h2o_footprint", "h2o_footprint_norm_kg", "h2o_footprint_norm_m2",
+                                                 "direct_h2o_footprint", "direct_h2o_footprint_norm_kg",
+                                                 "direct_h2o_footprint_norm_m2"]
 
 
 class GetCalculatedH2OFootprint(APIView):
@@ -16,6 +65,7 @@ class GetCalculatedH2OFootprint(APIView):
         permissions.IsAuthenticated,
     ]
 
+    @cached_response("get-h2o-footprint", contains_performers=True)
     def get(self, request, format=None):
         """Returns the calculated h2o footprints for every data set of every greenhouse of a user.
 
@@ -88,9 +138,62 @@ class GetCalculatedH2OFootprint(APIView):
                             ...
                         ],
                         directm2: [<same structure as directkg>],
+                        uncertainty: [
+                            {
+                                greenhouse_name: <name of greenhouse>,
+                                greenhouse_datasets: [
+                                    {
+                                        label: <date>,
+                                        konstruktion_h2o: {p5: <5th percentile>, p50: <median>, p95: <95th percentile>},
+                                        ...
+                                    },
+                                    ...
+                                ]
+                            },
+                            ...
+                        ], (only with the query parameter uncertainty=true)
+                        uncertainty_draws: <number of Monte Carlo draws>
                 ]
         """
 
+        user_id = self.request.user.id
+        if user_id is None:
+            return Response({'Error': 'No valid user'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            uncertainty_options = get_uncertainty_options(request.query_params)
+        except ValueError:
+            logger.info("GetCalculatedH2OFootprint: invalid uncertainty parameters")
+            return Response({'Error': 'Invalid uncertainty parameters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        greenhouses = list(Greenhouses.objects.filter(user_id=user_id).order_by('id'))
+        if not greenhouses:
+            return Response({'Error': 'User has no greenhouse'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+        # load the results of all data sets of the user and the performers with a fixed number of queries
+        footprint_data = load_footprint_data(greenhouses, H2O_PERFORMER_CALCULATIONS)
+        response = self.footprint_response(footprint_data)
+        if response.status_code == status.HTTP_200_OK and uncertainty_options is not None:
+            response.data["uncertainty"], response.data["uncertainty_draws"] = calc_uncertainty_data(
+                [(greenhouse, footprint_data.datasets(greenhouse)) for greenhouse in footprint_data.greenhouses],
+                H2O_UNCERTAINTY_NAMES,
+                uncertainty_options)
+        return response
+
+    @staticmethod
+    def footprint_response(footprint_data):
+        """Maps the h2o footprints of the loaded data sets of a user into the json structure of get().
+
+        Args:
+            footprint_data: the loaded data of the user, see footprintQuery.load_footprint_data()
+
+        Returns:
+            Response: the h2o footprints without the uncertainty bands or an error
+        """
+
         total_response_data = []
         normalizedkg_response_data = []
         normalizedm2_response_data = []
@@ -100,211 +203,116 @@ class GetCalculatedH2OFootprint(APIView):
         directm2_response_data = []
         response_data = dict()
 
-        user_id = self.request.user.id
-        if user_id is None:
-            return Response({'Error': 'No valid user'},
-                        status=status.HTTP_400_BAD_REQUEST)
-
-        h2o_calculation_names = [
-            "konstruktion_h2o",
-            "energieschirm_h2o",
-            "bodenabdeckung_h2o",
-            "produktionssystem_h2o",
-            "bewaesserung_h2o",
-            "heizsystem_h2o",
-            "zusaetzliches_heizsystem_h2o",
-            "energietraeger_h2o",
-            "strom_h2o",
-            "brunnenwasser_h2o",
-            "regenwasser_h2o",
-            "stadtwasser_h2o",
-            "oberflaechenwasser_h2o",
-            "co2_zudosierung_h2o",
-            "duengemittel_h2o",
-            "psm_h2o",
-            "pflanzenbehaelter_h2o",
-            "substrat_h2o",
-            "jungpflanzen_substrat_h2o",
-            "jungpflanzen_transport_h2o",
-            "schnuere_h2o",
-            "klipse_h2o",
-            "rispenbuegel_h2o",
-            "verpackung_h2o",
-            "sonstige_verbrauchsmaterialien_h2o",
-        ]
-
-        # retrieve all calculations and the specific calculation_ids for the requested calculation_names
-        calculations = Calculations.objects.in_bulk(
-            field_name='calculation_name')
-        calculation_ids = [calculations[name] for name in h2o_calculation_names]
-
-        all_measurements = Measurements.objects.all()
-
-        greenhouses = Greenhouses.objects.filter(user_id=user_id)
-        if not greenhouses.exists():
-            return Response({'Error': 'User has no greenhouse'},
-                        status=status.HTTP_400_BAD_REQUEST)
+        calculation_name_kg, calculation_name_m2, direct_h2o_calculation_name_kg, direct_h2o_calculation_name_m2 = \
+            H2O_PERFORMER_CALCULATIONS
 
         # iterate through every greenhouse of the user, retrieve the calculation results
         # and store them in a defined dictionary/list structure
-        for greenhouse in greenhouses:
+        for greenhouse in footprint_data.greenhouses:
 
-            greenhouse_data = GreenhouseData.objects.filter(
-                greenhouse_id=greenhouse.id)
+            greenhouse_data = footprint_data.datasets(greenhouse)
 
-            if not greenhouse_data.exists():
-                print("getCalculatedH2OFootprint: greenhouse without greenhouse data")
+            if not greenhouse_data:
+                logger.info("getCalculatedH2OFootprint: greenhouse without greenhouse data")
                 return Response({'Error': 'A greenhouse has no greenhouse data'},
                                 status=status.HTTP_400_BAD_REQUEST)
             # retrieve the result_values for every data set of a greenhouse and store them in the total_data_set_list
             try:
-                if len(greenhouse_data) != 0:
-
-                    recent_dataset = greenhouse_data[len(greenhouse_data) - 1]
-                    recent_dataset_is_biologic = is_productiontype_biologic(recent_dataset)
-                    # check if recent dataset doesn't have water footprint
-                    water_data_optiongroup = OptionGroups.objects.filter(option_group_name="WasserVerbrauch")
-                    if water_data_optiongroup.exists():
-                        water_data_option = Options.objects.filter(option_group=water_data_optiongroup[0].id).filter(
-                            option_value="ja")
-                        if water_data_option.exists():
-                            is_water_data = Selections.objects.filter(greenhouse_data=recent_dataset.id).filter(
-                                option=water_data_option[0].id)
-                            if not is_water_data.exists():
-                                # should jump to the next iteration of the greenhouse for loop,
-                                # so that the current greenhouse doesn't appear in the h2o footprint
-                                print("getCalculatedH2OFootprint: recent data set has no h2o footprint")
-                                continue
-
-                    total_greenhouse_dict = dict()
-                    normalizedkg_greenhouse_dict = dict()
-                    normalizedm2_greenhouse_dict = dict()
-                    fruitsizekg_greenhouse_dict = dict()
-                    fruitsizem2_greenhouse_dict = dict()
-                    directkg_greenhouse_dict = dict()
-                    directm2_greenhouse_dict = dict()
-                    optimization_greenhouse_dict = dict()
-                    total_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    normalizedkg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    normalizedm2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    fruitsizekg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    fruitsizem2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    directkg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    directm2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-                    optimization_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
-
-                    # calculate the plot data for the 3 plots total, normalizedkg and normalizedm2:
-                    total_data_set_list, normalizedkg_data_set_list, normalizedm2_data_set_list = \
-                        calc_total_and_normalized_data(
-                            greenhouse_data, all_measurements, calculation_ids, h2o_calculation_names)
-
-                    # calculate the normalized plot data for the direct water usage
-                    direct_h2o_calculation_names = [
-                        "brunnenwasser_h2o",
-                        "regenwasser_h2o",
-                        "stadtwasser_h2o",
-                        "oberflaechenwasser_h2o",
-                    ]
-                    direct_h2o_calculation_ids = [calculations[name] for name in direct_h2o_calculation_names]
-                    _, direct_h2o_kg_data_set_list, direct_h2o_m2_data_set_list = calc_total_and_normalized_data(
-                        greenhouse_data, all_measurements, direct_h2o_calculation_ids, direct_h2o_calculation_names)
-
-                    # find the best performer for the direct water usage
-                    direct_h2o_calculation_name_kg = "direct_h2o_footprint_norm_kg"
-                    direct_h2o_calculation_name_m2 = "direct_h2o_footprint_norm_m2"
-                    direct_h2o_best_performer_kg = find_performer_dataset(recent_dataset_is_biologic,
-                                                                          direct_h2o_calculation_name_kg, True)
-                    direct_h2o_best_performer_m2 = find_performer_dataset(recent_dataset_is_biologic,
-                                                                          direct_h2o_calculation_name_m2, True)
-
-                    if direct_h2o_best_performer_kg is not None and direct_h2o_best_performer_m2 is not None:
-                        best_performer_directkg_dict = dict()
-                        best_performer_directm2_dict = dict()
-                        best_performer_directkg_dict['label'] = "Best Performer"
-                        best_performer_directm2_dict['label'] = "Best Performer"
-                        directkg_greenhouse_dict['best_performer_date'] = direct_h2o_best_performer_kg[0].date
-                        directm2_greenhouse_dict['best_performer_date'] = direct_h2o_best_performer_m2[0].date
-                        if recent_dataset_is_biologic:
-                            directkg_greenhouse_dict['performer_productiontype'] = "Biologisch"
-                            directm2_greenhouse_dict['performer_productiontype'] = "Biologisch"
-                        else:
-                            directkg_greenhouse_dict['performer_productiontype'] = "Konventionell"
-                            directm2_greenhouse_dict['performer_productiontype'] = "Konventionell"
-
-                        snack_harvest, cocktail_harvest, rispen_harvest, fleisch_harvest = get_harvest(
-                            direct_h2o_best_performer_kg[0].id,
-                            all_measurements)
-                        total_harvest = snack_harvest + cocktail_harvest + rispen_harvest + fleisch_harvest
-
-                        gh_size_id = Measurements.objects.get(measurement_name="GWHFlaeche")
-                        gh_size = Measures.objects \
-                            .get(greenhouse_data_id=direct_h2o_best_performer_m2[0].id,
-                                 measurement_id=gh_size_id
-                                 ).measure_value
-
-                        for i, calculation_id in enumerate(direct_h2o_calculation_ids):
-                            value_kg = Results.objects \
-                                .filter(greenhouse_data_id=direct_h2o_best_performer_kg[0].id,
-                                        calculation_id=calculation_id) \
-                                .values('result_value')[0]['result_value']
-
-                            value_m2 = Results.objects \
-                                .filter(greenhouse_data_id=direct_h2o_best_performer_m2[0].id,
-                                        calculation_id=calculation_id) \
-                                .values('result_value')[0]['result_value']
-
-                            best_performer_directkg_dict[direct_h2o_calculation_names[i]] = \
-                                round(value_kg / total_harvest, 2)
-                            best_performer_directm2_dict[direct_h2o_calculation_names[i]] = round(value_m2 / gh_size, 2)
-
-                        direct_h2o_kg_data_set_list.append(best_performer_directkg_dict)
-                        direct_h2o_m2_data_set_list.append(best_performer_directm2_dict)
-                    else:
-                        print("getCalculatedH2OFootprint: no best performer for direct water-usage found")
-
-                    calculation_name_kg = "h2o_footprint_norm_kg"
-                    calculation_name_m2 = "h2o_footprint_norm_m2"
-
-                    # retrieve the best and worst performer and add them to the greenhouse_dicts
-                    normalizedkg_greenhouse_dict, normalizedm2_greenhouse_dict = add_best_and_worst_performer(
-                        recent_dataset_is_biologic,
-                        calculation_name_kg,
-                        calculation_name_m2,
-                        calculation_ids,
-                        h2o_calculation_names,
-                        all_measurements,
-                        normalizedkg_greenhouse_dict,
-                        normalizedm2_greenhouse_dict,
-                        normalizedkg_data_set_list,
-                        normalizedm2_data_set_list,
-                    )
-
-                    total_greenhouse_dict['greenhouse_datasets'] = total_data_set_list
-                    total_response_data.append(total_greenhouse_dict)
-                    normalizedkg_response_data.append(normalizedkg_greenhouse_dict)
-                    normalizedm2_response_data.append(normalizedm2_greenhouse_dict)
-
-                    directkg_greenhouse_dict['greenhouse_datasets'] = direct_h2o_kg_data_set_list
-                    directm2_greenhouse_dict['greenhouse_datasets'] = direct_h2o_m2_data_set_list
-                    directkg_response_data.append(directkg_greenhouse_dict)
-                    directm2_response_data.append(directm2_greenhouse_dict)
-
-                    fruitsizekg_data_set_list, fruitsizem2_data_set_list = calc_fruit_size_data(recent_dataset,
-                                                                                                all_measurements,
-                                                                                                calculation_ids,
-                                                                                                h2o_calculation_names)
-                    fruitsizekg_greenhouse_dict['greenhouse_datasets'] = fruitsizekg_data_set_list
-                    fruitsizem2_greenhouse_dict['greenhouse_datasets'] = fruitsizem2_data_set_list
-                    fruitsizekg_response_data.append(fruitsizekg_greenhouse_dict)
-                    fruitsizem2_response_data.append(fruitsizem2_greenhouse_dict)
-
-            except IndexError:
-                print("getCalculatedH2OFootprint: data couldn't be generated")
+                recent_dataset = footprint_data.recent_dataset(greenhouse)
+                production_type = footprint_data.production_type(recent_dataset)
+                # check if recent dataset doesn't have water footprint
+                if not footprint_data.has_water_usage(recent_dataset):
+                    # should jump to the next iteration of the greenhouse for loop,
+                    # so that the current greenhouse doesn't appear in the h2o footprint
+                    logger.info("getCalculatedH2OFootprint: recent data set has no h2o footprint")
+                    continue
+
+                total_greenhouse_dict = dict()
+                normalizedkg_greenhouse_dict = dict()
+                normalizedm2_greenhouse_dict = dict()
+                fruitsizekg_greenhouse_dict = dict()
+                fruitsizem2_greenhouse_dict = dict()
+                directkg_greenhouse_dict = dict()
+                directm2_greenhouse_dict = dict()
+                total_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+                normalizedkg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+                normalizedm2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+                fruitsizekg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+                fruitsizem2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+                directkg_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+                directm2_greenhouse_dict['greenhouse_name'] = greenhouse.greenhouse_name
+
+                # calculate the plot data for the 3 plots total, normalizedkg and normalizedm2:
+                total_data_set_list, normalizedkg_data_set_list, normalizedm2_data_set_list = \
+                    calc_total_and_normalized_data(footprint_data, greenhouse_data, H2O_CALCULATION_NAMES)
+
+                _, direct_h2o_kg_data_set_list, direct_h2o_m2_data_set_list = calc_total_and_normalized_data(
+                    footprint_data, greenhouse_data, DIRECT_H2O_CALCULATION_NAMES)
+
+                # find the best performer for the direct water usage
+                direct_h2o_best_performer_kg = footprint_data.performer(production_type,
+                                                                        direct_h2o_calculation_name_kg, True)
+                direct_h2o_best_performer_m2 = footprint_data.performer(production_type,
+                                                                        direct_h2o_calculation_name_m2, True)
+
+                if direct_h2o_best_performer_kg is not None and direct_h2o_best_performer_m2 is not None:
+                    best_performer_directkg_dict = dict()
+                    best_performer_directm2_dict = dict()
+                    best_performer_directkg_dict['label'] = "Best Performer"
+                    best_performer_directm2_dict['label'] = "Best Performer"
+                    directkg_greenhouse_dict['best_performer_date'] = direct_h2o_best_performer_kg.date
+                    directm2_greenhouse_dict['best_performer_date'] = direct_h2o_best_performer_m2.date
+                    directkg_greenhouse_dict['performer_productiontype'] = production_type
+                    directm2_greenhouse_dict['performer_productiontype'] = production_type
+
+                    best_performer_directkg_dict.update(footprint_data.results(
+                        direct_h2o_best_performer_kg.id, "normalizedkg", DIRECT_H2O_CALCULATION_NAMES))
+                    best_performer_directm2_dict.update(footprint_data.results(
+                        direct_h2o_best_performer_m2.id, "normalizedm2", DIRECT_H2O_CALCULATION_NAMES))
+
+                    direct_h2o_kg_data_set_list.append(best_performer_directkg_dict)
+                    direct_h2o_m2_data_set_list.append(best_performer_directm2_dict)
+                else:
+                    logger.info("getCalculatedH2OFootprint: no best performer for direct water-usage found")
+
+                # retrieve the best and worst performer and add them to the greenhouse_dicts
+                normalizedkg_greenhouse_dict, normalizedm2_greenhouse_dict = add_best_and_worst_performer(
+                    footprint_data,
+                    production_type,
+                    calculation_name_kg,
+                    calculation_name_m2,
+                    H2O_CALCULATION_NAMES,
+                    normalizedkg_greenhouse_dict,
+                    normalizedm2_greenhouse_dict,
+                    normalizedkg_data_set_list,
+                    normalizedm2_data_set_list,
+                )
+
+                total_greenhouse_dict['greenhouse_datasets'] = total_data_set_list
+                total_response_data.append(total_greenhouse_dict)
+                normalizedkg_response_data.append(normalizedkg_greenhouse_dict)
+                normalizedm2_response_data.append(normalizedm2_greenhouse_dict)
+
+                directkg_greenhouse_dict['greenhouse_datasets'] = direct_h2o_kg_data_set_list
+                directm2_greenhouse_dict['greenhouse_datasets'] = direct_h2o_m2_data_set_list
+                directkg_response_data.append(directkg_greenhouse_dict)
+                directm2_response_data.append(directm2_greenhouse_dict)
+
+                fruitsizekg_data_set_list, fruitsizem2_data_set_list = calc_fruit_size_data(footprint_data,
+                                                                                            recent_dataset,
+                                                                                            H2O_CALCULATION_NAMES)
+                fruitsizekg_greenhouse_dict['greenhouse_datasets'] = fruitsizekg_data_set_list
+                fruitsizem2_greenhouse_dict['greenhouse_datasets'] = fruitsizem2_data_set_list
+                fruitsizekg_response_data.append(fruitsizekg_greenhouse_dict)
+                fruitsizem2_response_data.append(fruitsizem2_greenhouse_dict)
+
+            except (IndexError, KeyError):
+                logger.info("getCalculatedH2OFootprint: data couldn't be generated")
                 return Response({'Error': 'Data could not be generated'},
                                 status=status.HTTP_400_BAD_REQUEST)
 
         if not total_response_data:
-            print("GetCalculatedH2OFootprint: no greenhouse for user")
+            logger.info("GetCalculatedH2OFootprint: no greenhouse for user")
             return Response({'Error': 'Not found', 'Message': 'This user has no greenhouse'},
                         status=status.HTTP_204_NO_CONTENT)
         response_data["total"] = total_response_data
@@ -314,8 +322,5 @@ class GetCalculatedH2OFootprint(APIView):
         response_data["fruitsizem2"] = fruitsizem2_response_data
         response_data["directkg"] = directkg_response_data
         response_data["directm2"] = directm2_response_data
-        print("getCalculatedH2OFootprint: request success")
+        logger.debug("getCalculatedH2OFootprint: request success")
         return Response(response_data, status=status.HTTP_200_OK)
-
-
-
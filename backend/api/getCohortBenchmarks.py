@@ -0,0 +1,107 @@
+import logging
+
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..cohortRollups import COHORT_DIMENSIONS, ROLLUP_CALCULATIONS, load_rollups, rollup_statistics
+from ..footprintDistributions import NORMALIZATIONS
+from ..models import GreenhouseData, Greenhouses
+
+logger = logging.getLogger(__name__)
+
+
+class GetCohortBenchmarks(APIView):
+    """API endpoint for retrieving the statistics of the normalized footprints of the peers of a user's data sets.
+
+    Peers are all data sets of the same Land, Region, greenhouse type (GWHArt) or fruit class, see cohortRollups.py.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def get(self, request, format=None):
+        """Returns the statistics of every cohort of the data sets of a user and the values of these data sets.
+
+        Args:
+            request : user object
+
+        Returns:
+            json:
+                {
+                    cohorts: {
+                        <dimension, e.g. Land>: {
+                            <cohort, e.g. Germany>: {
+                                normalizedkg: {
+                                    <calculation name>: {count: <number of data sets>, mean: <mean>,
+                                                         std: <standard deviation>, min: <minimum>, max: <maximum>},
+                                    ...
+                                },
+                                normalizedm2: {...}
+                            }
+                        }
+                    },
+                    greenhouses: [
+                        {
+                            greenhouse_name: <greenhouse_name>,
+                            greenhouse_datasets: [
+                                {
+                                    datasetId: <dataset-id>,
+                                    label: <date>,
+                                    cohorts: {<dimension>: [<cohort>, ...], ...},
+                                    normalizedkg: {<calculation name>: <value>, ...},
+                                    normalizedm2: {...}
+                                }
+                            ]
+                        }
+                    ]
+                }
+        """
+        user_id = self.request.user.id
+        if user_id is None:
+            logger.info("GetCohortBenchmarks: invalid user")
+            return Response({'Bad Request': 'No valid user!'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        greenhouses = list(Greenhouses.objects.filter(user_id=user_id).order_by('id'))
+        if not greenhouses:
+            logger.info("GetCohortBenchmarks: no greenhouse for user")
+            return Response({'No Content': 'No greenhouse exists for this user'},
+                            status=status.HTTP_204_NO_CONTENT)
+        datasets = list(GreenhouseData.objects.filter(greenhouse__in=greenhouses).order_by('greenhouse_id', 'id')
+                        .values_list('greenhouse_id', 'id', 'date', 'cohort_values'))
+        if not datasets:
+            logger.info("GetCohortBenchmarks: no data set for user")
+            return Response({'No Content': 'No data set exists for a greenhouse of this user'},
+                            status=status.HTTP_204_NO_CONTENT)
+
+        cohorts = {(dimension, cohort) for _, _, _, values in datasets if values is not None
+                   for dimension, cohort in values["cohorts"]}
+        rows = load_rollups(cohorts)
+        cohort_data = dict()
+        for dimension, cohort in sorted(cohorts):
+            cohort_dict = dict()
+            for normalization in NORMALIZATIONS:
+                cohort_dict[normalization] = {
+                    calculation_name: rollup_statistics(rows[(dimension, cohort, calculation_name, normalization)])
+                    for calculation_name in ROLLUP_CALCULATIONS
+                    if (dimension, cohort, calculation_name, normalization) in rows}
+            cohort_data.setdefault(dimension, dict())[cohort] = cohort_dict
+
+        greenhouse_datasets = {greenhouse.id: [] for greenhouse in greenhouses}
+        for greenhouse_id, dataset_id, date, values in datasets:
+            dataset_dict = {"datasetId": dataset_id, "label": date,
+                            "cohorts": {dimension: [] for dimension in COHORT_DIMENSIONS}}
+            for dimension, cohort in (values["cohorts"] if values is not None else []):
+                dataset_dict["cohorts"][dimension].append(cohort)
+            for normalization in NORMALIZATIONS:
+                dataset_dict[normalization] = values[normalization] if values is not None else dict()
+            greenhouse_datasets[greenhouse_id].append(dataset_dict)
+
+        response_data = {
+            "cohorts": cohort_data,
+            "greenhouses": [{"greenhouse_name": greenhouse.greenhouse_name,
+                             "greenhouse_datasets": greenhouse_datasets[greenhouse.id]}
+                            for greenhouse in greenhouses if greenhouse_datasets[greenhouse.id]],
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
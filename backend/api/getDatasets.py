@@ -1,9 +1,27 @@
+import base64
+import binascii
+import logging
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import status, permissions
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import GreenhouseData, Measurements, Measures, Selections, \
-    OptionGroups, Options, Greenhouses
+from ..loadGreenhouseData import load_measure_values_from_measures
+from ..models import GreenhouseData, Selections, Greenhouses
+from ..referenceCatalog import get_catalog
+from ..responseCache import cached_response
+
+logger = logging.getLogger(__name__)
+
+# number of data sets that are loaded at once in the streaming mode
+STREAM_CHUNK_SIZE = 100
+# maximum number of data sets of a page
+MAX_PAGE_SIZE = 500
+# fields of a data set that are not measurements or option groups
+META_FIELDS = ("greenhouse_data_id", "greenhouse_name", "date")
 
 
 class GetDatasets(APIView):
@@ -14,11 +32,24 @@ class GetDatasets(APIView):
         permissions.IsAuthenticated,
     ]
 
+    @cached_response("get-datasets")
     def get(self, request, format=None):
         """Returns all data sets for every greenhouse from a user.
 
-        This endpoint iterates through the Measures and Selections tables and retrieves all data.
-        It maps the data into a suitable structure to be parsed into json format and sends it.
+        This endpoint retrieves the data sets of the user with their measures and selections with a fixed number of
+        queries and maps the data into a suitable structure to be parsed into json format and sends it.
+
+        Query parameters:
+            fields: comma separated names of the fields of a data set that are returned, e.g.
+                fields=greenhouse_data_id,greenhouse_name,date. Measures and selections are only loaded if a
+                measurement or an option group is requested. All fields are returned by default.
+            datasetId: only the data set with this id is returned
+            limit, cursor: return one page of at most limit (<= MAX_PAGE_SIZE) data sets in the order of greenhouse
+                and data set id, starting after the cursor of the previous page. The json is wrapped into
+                {next: <cursor of the next page or null>, results: <json>}.
+            stream: with stream=true the json is streamed: the data sets are loaded in chunks of STREAM_CHUNK_SIZE and
+                every data set is sent as soon as it has been serialized, so the memory of a request does not grow
+                with the number of data sets of the user. It can not be combined with limit and cursor.
 
         Args:
             request: user object
@@ -41,114 +72,276 @@ class GetDatasets(APIView):
 
         user_id = self.request.user.id
         if user_id is None:
-            print("GetDatasets: invalid user")
+            logger.info("GetDatasets: invalid user")
             return Response({'Error': 'No valid user'},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # retrieve all measurement_ids and measurement_names
-        all_measurements = Measurements.objects.all()
-        measurement_ids = [all_measurements.values('id')[i]['id'] for i in range(len(all_measurements))]
-        measurement_names = [all_measurements.values('measurement_name')[i]['measurement_name'] for i in
-                             range(len(all_measurements))]
-
-        all_options = Options.objects.all()
-        all_optiongroups = OptionGroups.objects.all()
-        greenhouses = Greenhouses.objects.filter(user_id=user_id)
+        catalog = get_catalog()
+        query_params = request.query_params
+        stream = query_params.get('stream', '').lower() in ('1', 'true')
+        paginated = 'limit' in query_params or 'cursor' in query_params
+        try:
+            fields = self.parse_fields(query_params.get('fields'), catalog)
+            limit = self.parse_limit(query_params.get('limit')) if paginated else None
+            cursor = self.parse_cursor(query_params.get('cursor')) if query_params.get('cursor') else None
+            dataset_id = self.parse_int(query_params['datasetId'], 'datasetId') if 'datasetId' in query_params \
+                else None
+            if stream and paginated:
+                raise ValueError("stream can not be combined with limit and cursor")
+        except ValueError as e:
+            logger.info("GetDatasets: invalid query parameters: %s", e)
+            return Response({'Error': 'Invalid query parameters: ' + str(e)},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-        response_data = []
-        if not greenhouses.exists():
-            print("GetDatasets: no greenhouse for user")
+        greenhouses = list(Greenhouses.objects.filter(user_id=user_id).order_by('id'))
+        if not greenhouses:
+            logger.info("GetDatasets: no greenhouse for user")
             return Response({'Error': 'No greenhouse exists for this user'},
                             status=status.HTTP_204_NO_CONTENT)
+        if Greenhouses.objects.filter(id__in=[greenhouse.id for greenhouse in greenhouses],
+                                      greenhousedata__isnull=True).exists():
+            logger.info("GetDatasets: no data set for greenhouse")
+            return Response({'Error': 'No data set exists for a greenhouse of this user'},
+                            status=status.HTTP_204_NO_CONTENT)
 
-        # iterate through every greenhouse, retrieve all the data for it and save it in the correct
-        # dictionary/list structure
-        for greenhouse in greenhouses:
-            # retrieve all data sets for one greenhouse
-            temp_greenhouse_dict = dict()
-            temp_greenhouse_dict["greenhouse_specs"] = f"[{greenhouse.id},{greenhouse.greenhouse_name}]"
-            greenhouse_datasets = GreenhouseData.objects.filter(greenhouse_id=greenhouse.id)
-            temp_data_set_list = []
-            if not greenhouse_datasets.exists():
-                print("GetDatasets: no data set for greenhouse")
-                return Response({'Error': 'No data set exists for a greenhouse of this user'},
-                                status=status.HTTP_204_NO_CONTENT)
-
-            for greenhouse_dataset in greenhouse_datasets:
-                # iterate through the data set, retrieve all measures and selections and save them
-                # in the correct json structure
-
-                # create a dictionary to store all the data for one data set of one greenhouse in it
-                temp_data_set_dict = dict()
-
-                # add the greenhouse_name and date to the dict manually, because it isn't saved in measurements
-                temp_data_set_dict["greenhouse_data_id"] = f"[{greenhouse_dataset.id}]"
-                temp_data_set_dict["greenhouse_name"] = f"[{greenhouse.greenhouse_name}]"
-                temp_data_set_dict["date"] = f"[{greenhouse_dataset.date}]"
-
-                # retrieve all measures for a specific data set and save them into
-                # the temp_data_dict under the key 'measures'
-                for i, measurement_id in enumerate(measurement_ids):
-                    # retrieve the measure value for a specific measurement
-                    measure = Measures.objects \
-                        .filter(greenhouse_data_id=greenhouse_dataset.id,
-                                measurement_id=measurement_id)[0]
-                    temp_data_set_dict[measurement_names[i]] = \
-                        f"[{measure.measure_value},{measure.measure_unit.id}]"
-
-                # retrieve all selections for a specific data set and save them into the temp_data_dict
-                # under the key 'selections'
-                selections = Selections.objects.filter(greenhouse_data_id=greenhouse_dataset.id)
-                try:
-                    # iterate through every option group and save all selected options in temp_option_list
-                    for option_group in all_optiongroups:
-                        # create a list to store all selected options for one option group of one data set
-                        option_group_tuple = "[["
-                        options = all_options.filter(option_group_id=option_group.id)
-
-                        # iterate through every option of one option group and save the name and value
-                        # in temp_option_dict
-                        for i, option in enumerate(options):
-
-                            # retrieve the selection for the current option
-                            selection = selections.filter(option_id=option.id)
-
-                            # if the user has selected the option for the option group then it is saved into the
-                            # temp_option_dict
-                            if selection.exists():
-
-                                selection = selection[0]
-
-                                # add a comma between every tuple in the list
-                                if option_group_tuple != "[[":
-                                    option_group_tuple = option_group_tuple + ",["
-
-                                if selection.selection_value is not None and selection.selection_unit_id is not None:
-                                    option_group_tuple = option_group_tuple + f"{selection.option_id},{selection.selection_value},{selection.selection_unit_id}"
-
-                                    if selection.selection_value2 is not None:
-                                        option_group_tuple = option_group_tuple + "," + str(selection.selection_value2)
-
-                                else:
-                                    option_group_tuple = option_group_tuple + str(selection.option_id)
-
-                                option_group_tuple = option_group_tuple + "]"
-
-                        if option_group_tuple == "[[":
-                            option_group_tuple = option_group_tuple + "null]"
-
-                        option_group_tuple = option_group_tuple + "]"
-                        temp_data_set_dict[option_group.option_group_name] = option_group_tuple
-
-                except IndexError:
-                    print("GetDatasets: no data found")
-                    return Response({'Error': 'No data for given parameters found'},
-                                    status=status.HTTP_204_NO_CONTENT)
-
-                # add all data sets for one greenhouse to the temp_data_set_list
-                temp_data_set_list.append(temp_data_set_dict)
-            temp_greenhouse_dict["greenhouse_datasets"] = temp_data_set_list
-            response_data.append(temp_greenhouse_dict)
-
-        print("GetDatasets: request success")
+        datasets = GreenhouseData.objects.filter(greenhouse__in=greenhouses).order_by('greenhouse_id', 'id')
+        if dataset_id is not None:
+            datasets = datasets.filter(id=dataset_id)
+        if cursor is not None:
+            datasets = datasets.filter(Q(greenhouse_id__gt=cursor[0]) | Q(greenhouse_id=cursor[0], id__gt=cursor[1]))
+        # the status of a streamed response is sent before the data sets are loaded, so it is checked here
+        if stream and dataset_id is not None and not datasets.exists():
+            logger.info("GetDatasets: no data found")
+            return Response({'Error': 'No data for given parameters found'},
+                            status=status.HTTP_204_NO_CONTENT)
+
+        if stream:
+            logger.debug("GetDatasets: streaming request")
+            return StreamingHttpResponse(self.stream_datasets(catalog, greenhouses, datasets, fields),
+                                         content_type='application/json')
+
+        # retrieve the data sets with their measures and selections with one query each
+        datasets = self.load_datasets(datasets[:limit + 1] if limit is not None else datasets, catalog, fields)
+        next_cursor = None
+        if limit is not None and len(datasets) > limit:
+            datasets = datasets[:limit]
+            next_cursor = self.encode_cursor(datasets[-1]['greenhouse_id'], datasets[-1]['id'])
+        if dataset_id is not None and not datasets:
+            logger.info("GetDatasets: no data found")
+            return Response({'Error': 'No data for given parameters found'},
+                            status=status.HTTP_204_NO_CONTENT)
+
+        # save the data sets of every greenhouse in the correct dictionary/list structure
+        response_data = []
+        greenhouses_by_id = {greenhouse.id: greenhouse for greenhouse in greenhouses}
+        for dataset in datasets:
+            greenhouse = greenhouses_by_id[dataset['greenhouse_id']]
+            if not response_data or response_data[-1][0] != greenhouse.id:
+                response_data.append((greenhouse.id, {
+                    "greenhouse_specs": f"[{greenhouse.id},{greenhouse.greenhouse_name}]",
+                    "greenhouse_datasets": [],
+                }))
+            response_data[-1][1]["greenhouse_datasets"].append(
+                self.build_dataset_dict(catalog, greenhouse, dataset, fields))
+        response_data = [temp_greenhouse_dict for _, temp_greenhouse_dict in response_data]
+
+        logger.debug("GetDatasets: request success")
+        if limit is not None:
+            return Response({"next": next_cursor, "results": response_data}, status=status.HTTP_200_OK)
         return Response(response_data, status=status.HTTP_200_OK)
+
+    def stream_datasets(self, catalog, greenhouses, datasets, fields):
+        """Generates the json of get() in parts, one part per data set.
+
+        Args:
+            catalog: reference catalog
+            greenhouses: the greenhouses of the user
+            datasets: query of the returned data sets, ordered by greenhouse and id
+            fields: names of the returned fields or None for all fields
+
+        Yields:
+            bytes: the next part of the json
+        """
+
+        renderer = JSONRenderer()
+        yield b"["
+        first_greenhouse = True
+        for greenhouse in greenhouses:
+            last_id = 0
+            first_dataset = True
+            while True:
+                chunk = self.load_datasets(datasets.filter(greenhouse=greenhouse, id__gt=last_id)[:STREAM_CHUNK_SIZE],
+                                           catalog, fields)
+                if not chunk:
+                    break
+                if first_dataset:
+                    yield (b"" if first_greenhouse else b",") + b'{"greenhouse_specs":' + \
+                        renderer.render(f"[{greenhouse.id},{greenhouse.greenhouse_name}]") + b',"greenhouse_datasets":['
+                    first_greenhouse = False
+                for dataset in chunk:
+                    yield (b"" if first_dataset else b",") + \
+                        renderer.render(self.build_dataset_dict(catalog, greenhouse, dataset, fields))
+                    first_dataset = False
+                if len(chunk) < STREAM_CHUNK_SIZE:
+                    break
+                last_id = chunk[-1]['id']
+            if not first_dataset:
+                yield b"]}"
+        yield b"]"
+        logger.debug("GetDatasets: streaming success")
+
+    @staticmethod
+    def load_datasets(datasets, catalog, fields):
+        """Loads data sets with the measures and selections of the requested fields with one query each.
+
+        Args:
+            datasets: query of the data sets
+            catalog: reference catalog
+            fields: names of the returned fields or None for all fields
+
+        Returns:
+            list: one dictionary per data set: {id: <id>, greenhouse_id: <greenhouse_id>, date: <date>,
+                measure_values: <measure values, see loadGreenhouseData.build_measure_values()>,
+                selections: <dictionary option_id -> (selection_value, selection_unit_id, selection_value2) of the
+                first selection of the option>}, measure_values and selections are empty if they are not requested
+        """
+
+        load_measures = fields is None or any(name in fields for _, name in catalog.measurements())
+        load_selections = fields is None or any(name in fields for _, name in catalog.option_groups())
+        columns = ['id', 'greenhouse_id', 'date'] + (['measure_values'] if load_measures else [])
+        datasets = list(datasets.values(*columns))
+        for dataset in datasets:
+            dataset.setdefault('measure_values', dict())
+            dataset['selections'] = dict()
+
+        missing = {dataset['id']: dataset for dataset in datasets if dataset['measure_values'] is None}
+        if missing:
+            # data sets that have not been backfilled yet, see the command backfill_measure_values
+            for dataset_id, measure_values in load_measure_values_from_measures(list(missing)).items():
+                missing[dataset_id]['measure_values'] = measure_values
+        if load_selections and datasets:
+            datasets_by_id = {dataset['id']: dataset for dataset in datasets}
+            for dataset_id, option_id, selection_value, selection_unit_id, selection_value2 in Selections.objects \
+                    .filter(greenhouse_data_id__in=datasets_by_id.keys()).order_by('id') \
+                    .values_list('greenhouse_data_id', 'option_id', 'selection_value', 'selection_unit_id',
+                                 'selection_value2'):
+                # only the first selection of an option is returned
+                datasets_by_id[dataset_id]['selections'].setdefault(
+                    option_id, (selection_value, selection_unit_id, selection_value2))
+        return datasets
+
+    @staticmethod
+    def build_dataset_dict(catalog, greenhouse, dataset, fields):
+        """Maps one data set into the json structure of get().
+
+        The measurements, option groups and options are taken from the in-memory reference catalog, in ascending id
+        order.
+
+        Args:
+            catalog: reference catalog
+            greenhouse: greenhouse of the data set
+            dataset: data set as returned by load_datasets()
+            fields: names of the returned fields or None for all fields
+
+        Returns:
+            dictionary: the data set
+        """
+
+        def requested(name):
+            return fields is None or name in fields
+
+        # create a dictionary to store all the data for one data set of one greenhouse in it
+        temp_data_set_dict = dict()
+
+        # add the greenhouse_name and date to the dict manually, because it isn't saved in measurements
+        if requested("greenhouse_data_id"):
+            temp_data_set_dict["greenhouse_data_id"] = f"[{dataset['id']}]"
+        if requested("greenhouse_name"):
+            temp_data_set_dict["greenhouse_name"] = f"[{greenhouse.greenhouse_name}]"
+        if requested("date"):
+            temp_data_set_dict["date"] = f"[{dataset['date']}]"
+
+        # add the measures of the data set
+        for measurement_id, measurement_name in catalog.measurements():
+            if requested(measurement_name):
+                measure_value, measure_unit_id = dataset['measure_values'][str(measurement_id)]
+                temp_data_set_dict[measurement_name] = f"[{measure_value},{measure_unit_id}]"
+
+        # add the selected options of every option group of the data set
+        for option_group_id, option_group_name in catalog.option_groups():
+            if not requested(option_group_name):
+                continue
+            selected = []
+            for option_id in catalog.option_ids_of_group(option_group_id):
+                selection = dataset['selections'].get(option_id)
+                if selection is None:
+                    continue
+                selection_value, selection_unit_id, selection_value2 = selection
+                if selection_value is not None and selection_unit_id is not None:
+                    selection_tuple = f"{option_id},{selection_value},{selection_unit_id}"
+                    if selection_value2 is not None:
+                        selection_tuple = selection_tuple + "," + str(selection_value2)
+                else:
+                    selection_tuple = str(option_id)
+                selected.append("[" + selection_tuple + "]")
+            temp_data_set_dict[option_group_name] = "[" + (",".join(selected) or "[null]") + "]"
+        return temp_data_set_dict
+
+    @staticmethod
+    def parse_fields(value, catalog):
+        """Returns the set of the requested fields or None for all fields.
+
+        Raises:
+            ValueError: if a field is unknown
+        """
+        if not value:
+            return None
+        fields = {name.strip() for name in value.split(',') if name.strip()}
+        known = set(META_FIELDS) | {name for _, name in catalog.measurements()} | \
+            {name for _, name in catalog.option_groups()}
+        unknown = fields - known
+        if unknown:
+            raise ValueError("unknown fields " + ",".join(sorted(unknown)))
+        return fields
+
+    @staticmethod
+    def parse_limit(value):
+        """Returns the page size, MAX_PAGE_SIZE by default.
+
+        Raises:
+            ValueError: if the page size is not a number between 1 and MAX_PAGE_SIZE
+        """
+        limit = GetDatasets.parse_int(value, 'limit') if value else MAX_PAGE_SIZE
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit has to be between 1 and {MAX_PAGE_SIZE}")
+        return limit
+
+    @staticmethod
+    def parse_int(value, name):
+        """Returns the integer value of a query parameter.
+
+        Raises:
+            ValueError: if the value is not an integer
+        """
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} has to be an integer")
+
+    @staticmethod
+    def encode_cursor(greenhouse_id, dataset_id):
+        """Returns the opaque cursor of the page after a data set."""
+        return base64.urlsafe_b64encode(f"{greenhouse_id},{dataset_id}".encode()).decode()
+
+    @staticmethod
+    def parse_cursor(value):
+        """Returns (greenhouse_id, dataset_id) of a cursor of encode_cursor().
+
+        Raises:
+            ValueError: if the cursor is not valid
+        """
+        try:
+            greenhouse_id, dataset_id = base64.urlsafe_b64decode(value.encode()).decode().split(',')
+            return int(greenhouse_id), int(dataset_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError("invalid cursor")
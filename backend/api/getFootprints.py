@@ -0,0 +1,117 @@
+import logging
+
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .getCalculatedCO2Footprint import GetCalculatedCO2Footprint, CO2_PERFORMER_CALCULATIONS, CO2_UNCERTAINTY_NAMES
+from .getCalculatedH2OFootprint import GetCalculatedH2OFootprint, H2O_PERFORMER_CALCULATIONS, H2O_UNCERTAINTY_NAMES
+from .helper.uncertaintyData import get_uncertainty_options, calc_uncertainty_data
+from ..footprintQuery import load_footprint_data
+from ..models import Greenhouses
+from ..responseCache import cached_response
+
+logger = logging.getLogger(__name__)
+
+# kind -> (endpoint of the footprint, performer calculations, results of the uncertainty bands)
+FOOTPRINT_KINDS = {
+    "co2": (GetCalculatedCO2Footprint, CO2_PERFORMER_CALCULATIONS, CO2_UNCERTAINTY_NAMES),
+    "h2o": (GetCalculatedH2OFootprint, H2O_PERFORMER_CALCULATIONS, H2O_UNCERTAINTY_NAMES),
+}
+
+
+class GetFootprints(APIView):
+    """API endpoint for retrieving the co2 and the h2o footprint in one request.
+
+    The data sets, measures and performers of the user are loaded once and shared by all requested footprints, see
+    footprintQuery.py.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    @cached_response("get-footprints", contains_performers=True)
+    def get(self, request, format=None):
+        """Returns the footprints of the kinds in the query parameter kinds for every data set of a user.
+
+        Query parameters:
+            kinds: comma separated kinds of the footprints, "co2" and/or "h2o" (default: co2,h2o)
+            uncertainty, draws, seed: see get-co2-footprint, the bands of all kinds are calculated in one Monte Carlo
+                simulation
+
+        Args:
+            request: user object
+
+        Returns:
+            json: {
+                    co2: <json of get-co2-footprint>,
+                    h2o: <json of get-h2o-footprint or null, if no greenhouse has a h2o footprint>
+                }
+        """
+
+        user_id = self.request.user.id
+        if user_id is None:
+            logger.info("GetFootprints: invalid user")
+            return Response({'Error': 'No valid user', 'Message': ""},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = [kind.strip().lower() for kind in request.query_params.get('kinds', 'co2,h2o').split(',')
+                 if kind.strip()]
+        if not kinds or any(kind not in FOOTPRINT_KINDS for kind in kinds):
+            logger.info("GetFootprints: invalid kinds")
+            return Response({'Error': 'Invalid kinds', 'Message': "kinds has to contain " +
+                             " and/or ".join(FOOTPRINT_KINDS)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        kinds = list(dict.fromkeys(kinds))
+
+        try:
+            uncertainty_options = get_uncertainty_options(request.query_params)
+        except ValueError:
+            logger.info("GetFootprints: invalid uncertainty parameters")
+            return Response({'Error': 'Invalid uncertainty parameters', 'Message': ""},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        greenhouses = list(Greenhouses.objects.filter(user_id=user_id).order_by('id'))
+        if not greenhouses:
+            logger.info("GetFootprints: no greenhouse for user")
+            return Response({'Error': 'Not found', 'Message': 'This user has no greenhouse'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # load the results of all data sets of the user and the performers of all kinds once
+        footprint_data = load_footprint_data(greenhouses, [calculation_name for kind in kinds
+                                                           for calculation_name in FOOTPRINT_KINDS[kind][1]])
+
+        response_data = dict()
+        for kind in kinds:
+            response = FOOTPRINT_KINDS[kind][0].footprint_response(footprint_data)
+            if response.status_code == status.HTTP_204_NO_CONTENT:
+                response_data[kind] = None
+            elif response.status_code != status.HTTP_200_OK:
+                return response
+            else:
+                response_data[kind] = response.data
+
+        uncertainty_kinds = [kind for kind in kinds if response_data[kind] is not None]
+        if uncertainty_options is not None and uncertainty_kinds:
+            calculation_names = list(dict.fromkeys(calculation_name for kind in uncertainty_kinds
+                                                   for calculation_name in FOOTPRINT_KINDS[kind][2]))
+            uncertainty_data, draws = calc_uncertainty_data(
+                [(greenhouse, footprint_data.datasets(greenhouse)) for greenhouse in footprint_data.greenhouses],
+                calculation_names,
+                uncertainty_options)
+            for kind in uncertainty_kinds:
+                response_data[kind]["uncertainty"] = self.select_bands(uncertainty_data, FOOTPRINT_KINDS[kind][2])
+                response_data[kind]["uncertainty_draws"] = draws
+
+        logger.debug("GetFootprints: request success")
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def select_bands(uncertainty_data, calculation_names):
+        """Returns the uncertainty bands of some results, see uncertaintyData.calc_uncertainty_data()."""
+        return [{'greenhouse_name': greenhouse_dict['greenhouse_name'],
+                 'greenhouse_datasets': [{'label': dataset_dict['label'],
+                                          **{name: dataset_dict[name] for name in calculation_names}}
+                                         for dataset_dict in greenhouse_dict['greenhouse_datasets']]}
+                for greenhouse_dict in uncertainty_data]
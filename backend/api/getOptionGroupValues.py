@@ -1,9 +1,13 @@
+import logging
+
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ..models import OptionGroups, Options
 
+logger = logging.getLogger(__name__)
+
 
 class GetOptionGroupValues(APIView):
     """API endpoint for retrieving the options for every option group.
@@ -52,7 +56,7 @@ class GetOptionGroupValues(APIView):
                     options.append(option)
                 response_data[option_group.option_group_name.replace(" ", "")] = options
         else:
-            print("GetOptionGroupValues: couldn't retrieve options")
+            logger.info("GetOptionGroupValues: couldn't retrieve options")
             return Response({"Bad Request": "No data in database"},
                             status=status.HTTP_204_NO_CONTENT)
 
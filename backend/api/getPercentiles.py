@@ -0,0 +1,127 @@
+import logging
+
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..footprintDistributions import DISTRIBUTION_CALCULATIONS, NORMALIZATIONS, load_distributions
+from ..models import GreenhouseData, Greenhouses
+from ..quantileSketch import RELATIVE_ACCURACY
+
+logger = logging.getLogger(__name__)
+
+# quantiles of the distributions that are returned, key -> q
+QUANTILES = {"p25": 0.25, "median": 0.5, "p75": 0.75}
+
+
+class GetPercentiles(APIView):
+    """API endpoint for retrieving the position of the data sets of a user within the distributions of the normalized
+    footprints over all data sets of the same production type.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def get(self, request, format=None):
+        """Returns the quartiles of the distributions and the percentile ranks of every data set of a user.
+
+        The distributions are approximated by quantile sketches, see footprintDistributions.py. The quartiles and the
+        percentile ranks have a relative error of at most relativeAccuracy. A low percentile rank means that the
+        footprint of the data set is lower than the footprints of most data sets of the same production type.
+        Data sets without a production type have no percentile ranks, the percentile rank is None while the
+        distribution of a value does not exist (see rebuild_footprint_distributions).
+
+        Args:
+            request : user object
+
+        Returns:
+            json:
+                {
+                    relativeAccuracy: <relative accuracy>,
+                    distributions: {
+                        <production type>: {
+                            normalizedkg: {
+                                <calculation name>: {count: <number of data sets>, p25: <value>, median: <value>,
+                                                     p75: <value>},
+                                ...
+                            },
+                            normalizedm2: {...}
+                        }
+                    },
+                    greenhouses: [
+                        {
+                            greenhouse_name: <greenhouse_name>,
+                            greenhouse_datasets: [
+                                {
+                                    datasetId: <dataset-id>,
+                                    label: <date>,
+                                    productionType: <production type>,
+                                    normalizedkg: {
+                                        <calculation name>: {value: <value>, percentile: <percentile rank 0..100>},
+                                        ...
+                                    },
+                                    normalizedm2: {...}
+                                }
+                            ]
+                        }
+                    ]
+                }
+        """
+        user_id = self.request.user.id
+        if user_id is None:
+            logger.info("GetPercentiles: invalid user")
+            return Response({'Bad Request': 'No valid user!'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        greenhouses = list(Greenhouses.objects.filter(user_id=user_id).order_by('id'))
+        if not greenhouses:
+            logger.info("GetPercentiles: no greenhouse for user")
+            return Response({'No Content': 'No greenhouse exists for this user'},
+                            status=status.HTTP_204_NO_CONTENT)
+        datasets = list(GreenhouseData.objects.filter(greenhouse__in=greenhouses).order_by('greenhouse_id', 'id')
+                        .values_list('greenhouse_id', 'id', 'date', 'distribution_values'))
+        if not datasets:
+            logger.info("GetPercentiles: no data set for user")
+            return Response({'No Content': 'No data set exists for a greenhouse of this user'},
+                            status=status.HTTP_204_NO_CONTENT)
+
+        production_types = {values["production_type"] for _, _, _, values in datasets if values is not None}
+        sketches = load_distributions(production_types)
+        distributions = dict()
+        for production_type in sorted(production_types):
+            distributions[production_type] = dict()
+            for normalization in NORMALIZATIONS:
+                summaries = dict()
+                for calculation_name in DISTRIBUTION_CALCULATIONS:
+                    sketch = sketches.get((production_type, calculation_name, normalization))
+                    if sketch is None or sketch.count == 0:
+                        continue
+                    summaries[calculation_name] = {"count": sketch.count}
+                    for key, q in QUANTILES.items():
+                        summaries[calculation_name][key] = round(sketch.quantile(q), 2)
+                distributions[production_type][normalization] = summaries
+
+        greenhouse_datasets = {greenhouse.id: [] for greenhouse in greenhouses}
+        for greenhouse_id, dataset_id, date, values in datasets:
+            dataset_dict = {"datasetId": dataset_id, "label": date,
+                            "productionType": values["production_type"] if values is not None else None}
+            for normalization in NORMALIZATIONS:
+                dataset_dict[normalization] = dict()
+                if values is None:
+                    continue
+                for calculation_name, value in values[normalization].items():
+                    # the sketch is missing until rebuild_footprint_distributions has created it
+                    sketch = sketches.get((values["production_type"], calculation_name, normalization))
+                    rank = sketch.rank(value) if sketch is not None else None
+                    dataset_dict[normalization][calculation_name] = {
+                        "value": value, "percentile": round(100 * rank, 1) if rank is not None else None}
+            greenhouse_datasets[greenhouse_id].append(dataset_dict)
+
+        response_data = {
+            "relativeAccuracy": RELATIVE_ACCURACY,
+            "distributions": distributions,
+            "greenhouses": [{"greenhouse_name": greenhouse.greenhouse_name,
+                             "greenhouse_datasets": greenhouse_datasets[greenhouse.id]}
+                            for greenhouse in greenhouses if greenhouse_datasets[greenhouse.id]],
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
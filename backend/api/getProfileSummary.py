@@ -1,8 +1,15 @@
+import logging
+from decimal import Decimal
+
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from backend.models import GreenhouseData, Greenhouses, Calculations, Results
+from backend.models import GreenhouseData, Greenhouses
+from backend.responseCache import cached_response
+from backend.resultValues import load_result_values, result_dict
+
+logger = logging.getLogger(__name__)
 
 
 class GetDatasetSummary(APIView):
@@ -16,6 +23,7 @@ class GetDatasetSummary(APIView):
         permissions.IsAuthenticated,
     ]
 
+    @cached_response("get-dataset-summary")
     def get(self, request, format=None):
         """Returns a summary of all data sets of a user in the correct json format.
 
@@ -46,12 +54,9 @@ class GetDatasetSummary(APIView):
         """
         user_id = self.request.user.id
         if user_id is None:
-            print("GetProfileSummary: invalid user")
+            logger.info("GetProfileSummary: invalid user")
             return Response({'Bad Request': 'No valid user!'},
                             status=status.HTTP_400_BAD_REQUEST)
-        co2_footprint_id = Calculations.objects.get(calculation_name="co2_footprint")
-        h2o_footprint_id = Calculations.objects.get(calculation_name="h2o_footprint")
-
         # retrieve all greenhouses of a specific user
         greenhouses = Greenhouses.objects.filter(user_id=user_id)
         response_data = []
@@ -67,24 +72,24 @@ class GetDatasetSummary(APIView):
                     greenhouse_data = dict()
                     greenhouse_data["greenhouse_name"] = greenhouse.greenhouse_name
                     greenhouse_data_list = []
+                    result_values = load_result_values([dataset.id for dataset in greenhouse_datasets])
                     for dataset in greenhouse_datasets:
+                        footprints = result_dict(result_values[dataset.id], "total", ["co2_footprint", "h2o_footprint"])
                         dataset_dict = dict()
                         dataset_dict["greenhouseId"] = greenhouse.id
                         dataset_dict["datasetId"] = dataset.id
                         dataset_dict["label"] = dataset.date
-                        dataset_dict["co2Footprint"] = round(Results.objects.get(
-                            calculation_id=co2_footprint_id, greenhouse_data_id=dataset.id).result_value, 0)
-                        dataset_dict["h2oFootprint"] = round(Results.objects.get(
-                            calculation_id=h2o_footprint_id, greenhouse_data_id=dataset.id).result_value, 0)
+                        dataset_dict["co2Footprint"] = round(Decimal(str(footprints["co2_footprint"])), 0)
+                        dataset_dict["h2oFootprint"] = round(Decimal(str(footprints["h2o_footprint"])), 0)
                         greenhouse_data_list.append(dataset_dict)
                     greenhouse_data["data"] = greenhouse_data_list
                 else:
-                    print("GetProfileSummary: no data set for greenhouse")
+                    logger.info("GetProfileSummary: no data set for greenhouse")
                     return Response({'No Content': 'No data set exists for a greenhouse of this user'},
                                     status=status.HTTP_204_NO_CONTENT)
                 response_data.append(greenhouse_data)
             return Response(response_data, status=status.HTTP_200_OK)
         else:
-            print("GetProfileSummary: no greenhouse for user")
+            logger.info("GetProfileSummary: no greenhouse for user")
             return Response({'No Content': 'No greenhouse exists for this user'},
                             status=status.HTTP_204_NO_CONTENT)
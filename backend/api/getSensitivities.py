@@ -0,0 +1,92 @@
+import logging
+
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import calcFootprints
+from ..factorSets import get_active_factors
+from ..loadGreenhouseData import load_standardized_data
+from ..models import GreenhouseData
+from ..utils import generic_error_message
+
+logger = logging.getLogger(__name__)
+
+
+class GetSensitivities(APIView):
+    """API endpoint for retrieving how sensitive the footprints of a stored greenhouse data set are to its inputs.
+
+    This tells a grower which inputs matter most for the footprints of a data set.
+    """
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def get(self, request, format=None):
+        """Returns the partial derivatives of the footprint totals with respect to every numeric input of a data set.
+
+        Args:
+            request: user object, the query parameter datasetId contains the id of the data set
+
+        Returns:
+            json: {
+                    datasetId: <dataset-id>,
+                    factorVersion: <version of the factor set>,
+                    footprints: {
+                        co2_footprint: <unrounded co2 footprint>,
+                        ...
+                    },
+                    sensitivities: [
+                        {
+                            field: <measurement or option group>,
+                            option: <selected option or null for measurements>,
+                            parameter: <"value" or "value2">,
+                            value: <value of the input>,
+                            derivatives: {
+                                co2_footprint: <change of the co2 footprint per unit of the input>,
+                                ...
+                            },
+                            elasticities: {
+                                co2_footprint: <relative change of the co2 footprint per relative change>,
+                                ...
+                            },
+                            limits: [<totals without a derivative, because a limit of the calculation lies at the
+                                      value, e.g. the lifetime of a material>]
+                        },
+                        ...
+                    ]
+                }
+        """
+
+        user_id = self.request.user.id
+        if user_id is None:
+            logger.info("GetSensitivities: invalid user")
+            return Response({'Error': 'No valid user', 'Message': generic_error_message},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        dataset_id = request.query_params.get('datasetId', '')
+        greenhouse_data = GreenhouseData.objects.filter(id=dataset_id, greenhouse__user_id=user_id).first() \
+            if dataset_id.isdigit() else None
+        if greenhouse_data is None:
+            logger.info("GetSensitivities: data set not found")
+            return Response({'Error': 'Not found', 'Message': 'This user has no data set with this id'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        factors = get_active_factors()
+        data = load_standardized_data([greenhouse_data.id])[greenhouse_data.id]
+        try:
+            totals, sensitivities = calcFootprints.calc_sensitivities(data, factors)
+        except (KeyError, ValueError) as e:
+            logger.info("GetSensitivities: footprint calculation error: %r", e)
+            return Response({'Error': 'Calculation error', 'Message': generic_error_message},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        response_data = {
+            'datasetId': greenhouse_data.id,
+            'factorVersion': factors.version,
+            'footprints': totals,
+            'sensitivities': sensitivities,
+        }
+        logger.debug("GetSensitivities: request success")
+        return Response(response_data, status=status.HTTP_200_OK)
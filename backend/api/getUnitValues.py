@@ -1,9 +1,13 @@
+import logging
+
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ..models import Measurements, OptionGroups, Options, MeasurementUnits, OptionUnits
 
+logger = logging.getLogger(__name__)
+
 
 class GetUnitValues(APIView):
     """API endpoint for retrieving the unit values.
@@ -91,7 +95,7 @@ class GetUnitValues(APIView):
                         selections[option_group.option_group_name.replace(" ", "")] = option_group_dict
             response_data["selections"] = selections
         else:
-            print("GetUnitValues: couldn't retrieve units")
+            logger.info("GetUnitValues: couldn't retrieve units")
             return Response({"Bad Request,l": "No data in database"},
                             status=status.HTTP_204_NO_CONTENT)
 
@@ -0,0 +1,84 @@
+from django.conf import settings
+
+from backend import calcFootprints
+from backend.loadGreenhouseData import load_standardized_data
+
+
+def get_uncertainty_options(query_params):
+    """Reads the options of the uncertainty bands from the query parameters of a footprint request.
+
+    The query parameter uncertainty=true requests the bands, draws and seed optionally set the number of Monte Carlo
+    draws (at most FOOTPRINT_UNCERTAINTY_MAX_DRAWS) and the seed of the random number generator.
+
+    Args:
+        query_params: query parameters of the request
+
+    Returns:
+        options: (draws, seed) or None, if no uncertainty bands are requested
+
+    Raises:
+        ValueError: if draws or seed are not valid
+    """
+
+    if query_params.get('uncertainty', '').lower() not in ('1', 'true'):
+        return None
+    draws = int(query_params.get('draws', getattr(settings, 'FOOTPRINT_UNCERTAINTY_DRAWS', 2000)))
+    seed = int(query_params.get('seed', 0))
+    if not 1 <= draws <= getattr(settings, 'FOOTPRINT_UNCERTAINTY_MAX_DRAWS', 10000) or seed < 0:
+        raise ValueError('draws or seed out of range')
+    return draws, seed
+
+
+def calc_uncertainty_data(greenhouse_datasets, calculation_names, options):
+    """Calculates the uncertainty bands of all data sets of the greenhouses of a user.
+
+    All data sets are calculated together in one Monte Carlo simulation, that stops after
+    FOOTPRINT_UNCERTAINTY_TIME_BUDGET seconds.
+
+    Args:
+        greenhouse_datasets: list of (greenhouse, data sets of the greenhouse)
+        calculation_names: names of the results, for which the bands are returned
+        options: (draws, seed) as returned by get_uncertainty_options()
+
+    Returns:
+        uncertainty_data: [
+                            {
+                                greenhouse_name: <name of greenhouse>,
+                                greenhouse_datasets: [
+                                    {
+                                        label: <date>,
+                                        konstruktion_co2: {p5: <5th percentile>, p50: <median>, p95: <95th percentile>},
+                                        ...
+                                    },
+                                    ...
+                                ]
+                            },
+                            ...
+                        ]
+        draws: number of draws that have been calculated
+    """
+
+    draws, seed = options
+    dataset_ids = [dataset.id for _, datasets in greenhouse_datasets for dataset in datasets]
+    standardized_data = load_standardized_data(dataset_ids)
+    bands, draws = calcFootprints.calc_uncertainty_bands(
+        [standardized_data[dataset_id] for dataset_id in dataset_ids],
+        draws,
+        getattr(settings, 'FOOTPRINT_FACTOR_DEVIATION', 0.1),
+        getattr(settings, 'FOOTPRINT_INPUT_DEVIATION', 0.05),
+        seed,
+        getattr(settings, 'FOOTPRINT_UNCERTAINTY_TIME_BUDGET', 1.0),
+    )
+
+    uncertainty_data = []
+    index = 0
+    for greenhouse, datasets in greenhouse_datasets:
+        dataset_list = []
+        for dataset in datasets:
+            dataset_dict = {'label': dataset.date}
+            for name in calculation_names:
+                dataset_dict[name] = bands[name][index]
+            dataset_list.append(dataset_dict)
+            index += 1
+        uncertainty_data.append({'greenhouse_name': greenhouse.greenhouse_name, 'greenhouse_datasets': dataset_list})
+    return uncertainty_data, draws
@@ -1,15 +1,30 @@
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.backends.utils import format_number
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .. import calcFootprints
+from .. import calcFootprints, footprintCache
+from ..factorSets import get_active_factors
 from ..dataValidation import validate_mandatory_fields
+from ..loadGreenhouseData import build_measure_values, build_standardized_data
 from ..models import GreenhouseData, Measurements, Measures, Selections, \
-    OptionGroups, Greenhouses, Calculations, Results, MeasurementUnits
+    OptionGroups, Greenhouses, Calculations, Results
+from ..cohortRollups import update_cohort_rollups_on_commit
+from ..footprintDistributions import update_footprint_distributions_on_commit
+from ..performerRankings import is_performer, update_performer_rankings
+from ..referenceCatalog import get_catalog
+from ..resultValues import build_result_values, to_stored_decimal
+from ..responseCache import invalidate_performer_responses, invalidate_user_responses
 from ..serializers import InputDataSerializer
 from ..standardizeUnits import standardize_units
 from ..utils import generic_error_message, input_error_message
 
+logger = logging.getLogger(__name__)
+
 
 class UpdateGreenhouseData(APIView):
     """This API endpoint updates an existing greenhouse data set.
@@ -43,123 +58,258 @@ class UpdateGreenhouseData(APIView):
 
         user_id = self.request.user.id
         if user_id is None:
-            print("UpdateGreenhouseData: invalid user")
+            logger.info("UpdateGreenhouseData: invalid user")
             return Response({'Error': 'No valid user!', 'Message': generic_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
 
         serializer = self.serializer_class(data=request.data)
         if not serializer.is_valid():
-            print("UpdateGreenhouseData: format error")
-            print(serializer.errors)
+            logger.info("UpdateGreenhouseData: format error: %s", serializer.errors)
             return Response({"Error": serializer.errors, "Message": input_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        print("UpdateGreenhouseData: format valid")
+        logger.debug("UpdateGreenhouseData: format valid")
         # validate that every required field has been filled out with not a default value
         valid_mandatory_fields, mandatory_error_message = validate_mandatory_fields(data=serializer.data)
         if valid_mandatory_fields is False:
-            print("UpdateGreenhouseData: mandatory error")
+            logger.info("UpdateGreenhouseData: mandatory error")
             return Response({'Error': 'Mandatory error!', 'Message': mandatory_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
-        print("UpdateGreenhouseData: mandatory valid")
+        logger.debug("UpdateGreenhouseData: mandatory valid")
 
-        # standardize the units of the data for footprint calculation
-        standardized_data = standardize_units(serializer.data)
+        # a repeated submission of the same data is taken from the cache, otherwise the units of the data are
+        # standardized for footprint calculation
+        factors = get_active_factors()
+        cache_key = footprintCache.input_key(serializer.data, factors)
+        cached = footprintCache.get_cached_footprints(cache_key, serializer.data)
+        if cached is not None:
+            logger.debug("UpdateGreenhouseData: cache hit")
+            standardized_data, calculation_result = cached
+        else:
+            standardized_data = standardize_units(serializer.data)
+            calculation_result = None
 
         # retrieve the data set ID from the header
         dataset_id = request.headers.get("Datasetid")
         if dataset_id is None:
-            print("UpdateGreenhouseData: data set ID missing")
+            logger.info("UpdateGreenhouseData: data set ID missing")
             return Response({'Error': 'Datasetid is missing in header!', 'Message': generic_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
 
         greenhouse_data = GreenhouseData.objects.filter(id=dataset_id)[0]
         greenhouse = Greenhouses.objects.filter(id=greenhouse_data.greenhouse_id)[0]
         if greenhouse.user_id != user_id:
-            print("UpdateGreenhouseData: ID match error")
+            logger.info("UpdateGreenhouseData: ID match error")
             return Response({'Error': 'DatasetId does not match to UserId!', 'Message': generic_error_message},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        greenhouse_data.date = serializer.data.get('date')
-        greenhouse_data.save()
-        # calculate footprints and save them in Results table in db
+        # load the current state of the data set once and write only the changes, all inside of one transaction in
+        # which the data set is locked, so concurrent updates of it are applied one after the other
         try:
-            calculation_result = calcFootprints.calc_footprints(standardized_data)
-            calculation_variables = Calculations.objects.in_bulk(
-                field_name='calculation_name')
-            print(calculation_result.items())
-            print("##########################")
-            print(calculation_variables)
-            for variable, value in calculation_result.items():
-                result = Results.objects.get(
-                    greenhouse_data=greenhouse_data, calculation_id=calculation_variables[variable].id)
-                if result is not None:
-                    # the old value can be simply overwritten, since the amount of result values per data set is always
-                    # the same
-                    print("update: result=" + str(variable) + " value=" + str(value))
-                    result.result_value = round(value, 2)
-                    result.save()
-                else:
-                    print("UpdateGreenhouseData: footprint calculations success")
-                    return Response({'Error': 'Calculation error; No Result Value!',
-                                     'Message': generic_error_message}, status=status.HTTP_400_BAD_REQUEST)
-            print("UpdateGreenhouseData: footprint calculations success")
-        except Exception as e:
-            print("UpdateGreenhouseData: calculation error")
-            print(type(e))
-            return Response({'Error': 'Calculation error!', 'Message': generic_error_message},
-                            status=status.HTTP_400_BAD_REQUEST)
+            with transaction.atomic():
+                greenhouse_data = GreenhouseData.objects.select_for_update().get(id=greenhouse_data.id)
+                calculation_variables = Calculations.objects.in_bulk(field_name='calculation_name')
+                calculation_names = {calculation.id: name for name, calculation in calculation_variables.items()}
+                stored_results = {calculation_names[result.calculation_id]: result
+                                  for result in Results.objects.filter(greenhouse_data=greenhouse_data)}
+                stored_measures = {measure.measurement_id: measure
+                                   for measure in Measures.objects.filter(greenhouse_data=greenhouse_data)}
+                stored_selections = list(Selections.objects.filter(greenhouse_data=greenhouse_data).order_by('id'))
 
-        # save input data in Measures and Selection tables in db
-        try:
-            # retrieve 'Measurements' table as dict to map measurement_name to measurement_id
-            measurements = Measurements.objects.in_bulk(
-                field_name='measurement_name')  # transform table to a dict
-            options = OptionGroups.objects.in_bulk(
-                field_name='option_group_name')
-            # retrieve the current selections of the data set, because they need to be deleted
-            old_selections = Selections.objects.filter(greenhouse_data=greenhouse_data)
-            new_selections = []
-            for name, value in standardized_data.items():
-                if name in measurements:
-                    # metric (continuous) data (=> numbers)
-                    measure = Measures.objects.get(greenhouse_data=greenhouse_data, measurement_id=measurements[name].id,)
-                    measure.measure_value = value[0]
-                    measure.measure_unit = MeasurementUnits.objects.get(id=value[1])
-                    measure.save()
-                elif name in options:
-                    # categorical data (e.g. through dropdowns)
-                    for elem in value:
-                        # check if a value is declared
-                        selection_value = None
-                        selection_value2 = None
-                        selection_unit = None
-                        if len(elem) == 3:
-                            selection_value = elem[1]
-                            selection_unit = elem[2]
-                        if len(elem) == 4:
-                            selection_value = elem[1]
-                            selection_unit = elem[2]
-                            selection_value2 = elem[3]
-                        new_selections.append(
-                            Selections(
-                                greenhouse_data=greenhouse_data,
-                                option_id=elem[0],
-                                selection_value=selection_value,
-                                selection_unit_id=selection_unit,
-                                selection_value2=selection_value2
-                            )
-                        )
-            # delete all old selections
-            for old_selection in old_selections:
-                old_selection.delete()
-            # save the new selections
-            for new_selection in new_selections:
-                new_selection.save()
-            print("UpdateGreenhouseData: save success")
+                if calculation_result is None:
+                    try:
+                        # only the results of the same factor set are reused, all other categories are calculated again
+                        previous_results = {name: float(result.result_value) for name, result in stored_results.items()
+                                            if result.factor_version == factors.version}
+                        # the Measures and Selections still contain the data of the stored results
+                        previous_data = build_standardized_data(
+                            {str(measurement_id): [str(measure.measure_value), measure.measure_unit_id]
+                             for measurement_id, measure in stored_measures.items()},
+                            [(selection.option_id, selection.selection_value, selection.selection_unit_id,
+                              selection.selection_value2) for selection in stored_selections])
+                        calculation_result, recalculated = calcFootprints.calc_footprints_incremental(
+                            previous_data, standardized_data, previous_results, factors)
+                        footprintCache.set_cached_footprints(cache_key, standardized_data, calculation_result)
+                        logger.debug("UpdateGreenhouseData: recalculated categories: %s", recalculated)
+                    except Exception as e:
+                        logger.info("UpdateGreenhouseData: calculation error: %r", e)
+                        return Response({'Error': 'Calculation error!', 'Message': generic_error_message},
+                                        status=status.HTTP_400_BAD_REQUEST)
+                logger.debug("UpdateGreenhouseData: footprint calculations success")
+
+                # retrieve 'Measurements' and 'OptionGroups' tables as dicts to map the names to their ids
+                measurements = Measurements.objects.in_bulk(field_name='measurement_name')
+                options = OptionGroups.objects.in_bulk(field_name='option_group_name')
+
+                result_values = self.save_results(greenhouse_data, calculation_result, stored_results,
+                                                  calculation_variables, factors)
+                measure_values = build_measure_values(standardized_data, measurements)
+                self.save_measures(greenhouse_data, measure_values, stored_measures)
+                selections_changed = self.save_selections(greenhouse_data, standardized_data, stored_selections,
+                                                          options)
+
+                changed_fields = []
+                date = GreenhouseData._meta.get_field('date').to_python(serializer.data.get('date'))
+                if greenhouse_data.date != date:
+                    greenhouse_data.date = date
+                    changed_fields.append('date')
+                if greenhouse_data.measure_values != measure_values:
+                    greenhouse_data.measure_values = measure_values
+                    changed_fields.append('measure_values')
+                result_values = build_result_values(result_values, measure_values, factors.version)
+                if greenhouse_data.result_values != result_values:
+                    greenhouse_data.result_values = result_values
+                    changed_fields.append('result_values')
+                if changed_fields:
+                    greenhouse_data.save(update_fields=changed_fields)
+
+                # the rankings, distributions and rollups only depend on the result values and the selections
+                if 'result_values' in changed_fields or selections_changed:
+                    update_performer_rankings([greenhouse_data.id])
+                    update_footprint_distributions_on_commit([greenhouse_data.id])
+                    update_cohort_rollups_on_commit([greenhouse_data.id])
+                elif 'date' in changed_fields and is_performer(greenhouse_data.id):
+                    # the other users see the date of a performer
+                    invalidate_performer_responses()
+                invalidate_user_responses(user_id)
+            logger.debug("UpdateGreenhouseData: save success")
             return Response(request.data, status=status.HTTP_201_CREATED)
         except Exception as e:
-            print("UpdateGreenhouseData: save error")
-            print(type(e))
-            print("Save error: Invalid input data")
+            logger.warning("UpdateGreenhouseData: save error: %r", e)
             return Response({'Message': generic_error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def save_results(greenhouse_data, calculation_result, stored_results, calculation_variables, factors):
+        """Writes the changed results of a data set.
+
+        Args:
+            greenhouse_data: the locked data set
+            calculation_result: dictionary calculation_name -> calculated value
+            stored_results: dictionary calculation_name -> stored Results row
+            calculation_variables: dictionary calculation_name -> Calculations
+            factors: factor set of the calculation
+
+        Returns:
+            dictionary: calculation_name -> result value as it is stored, see resultValues.to_stored_decimal()
+        """
+
+        result_values = dict()
+        changed_results = []
+        new_results = []
+        for variable, value in calculation_result.items():
+            value = to_stored_decimal(value)
+            result_values[variable] = value
+            result = stored_results.get(variable)
+            if result is None:
+                # e.g. the result of a calculation that has been added after the data set has been stored
+                logger.debug("UpdateGreenhouseData: create result=%s value=%s", variable, value)
+                new_results.append(Results(greenhouse_data=greenhouse_data, result_value=value,
+                                           calculation=calculation_variables[variable],
+                                           factor_version=factors.version))
+            elif result.result_value != value or result.factor_version != factors.version:
+                logger.debug("UpdateGreenhouseData: update result=%s value=%s", variable, value)
+                result.result_value = value
+                result.factor_version = factors.version
+                changed_results.append(result)
+        Results.objects.bulk_update(changed_results, ['result_value', 'factor_version'])
+        # a result that recalculate_footprints has created in the meantime is kept, like it keeps the ones of updates
+        Results.objects.bulk_create(new_results, ignore_conflicts=True)
+        return result_values
+
+    @staticmethod
+    def save_measures(greenhouse_data, measure_values, stored_measures):
+        """Writes the changed measures of a data set.
+
+        Args:
+            greenhouse_data: the locked data set
+            measure_values: new measure values of the data set, see build_measure_values()
+            stored_measures: dictionary measurement_id -> stored Measures row
+        """
+
+        changed_measures = []
+        new_measures = []
+        for measurement_id, (measure_value, measure_unit_id) in measure_values.items():
+            measure = stored_measures.get(int(measurement_id))
+            if measure is None:
+                # a measure of a measurement that has been added after the data set has been stored
+                new_measures.append(Measures(greenhouse_data=greenhouse_data, measurement_id=int(measurement_id),
+                                             measure_value=measure_value, measure_unit_id=measure_unit_id))
+            elif measure.measure_value != Decimal(measure_value) or measure.measure_unit_id != measure_unit_id:
+                measure.measure_value = measure_value
+                measure.measure_unit_id = measure_unit_id
+                changed_measures.append(measure)
+        Measures.objects.bulk_update(changed_measures, ['measure_value', 'measure_unit'])
+        Measures.objects.bulk_create(new_measures)
+
+    @staticmethod
+    def save_selections(greenhouse_data, standardized_data, stored_selections, options):
+        """Replaces the selections of every option group of a data set, whose selections have changed.
+
+        The selections of an option group keep the order of the input, so an option group is only kept, if its stored
+        selections are equal to the new ones in the same order.
+
+        Args:
+            greenhouse_data: the locked data set
+            standardized_data: new standardized data of the data set
+            stored_selections: stored Selections rows of the data set in the order in which they have been stored
+            options: dictionary option_group_name -> OptionGroups
+
+        Returns:
+            boolean: true, if any selection has been changed
+        """
+
+        catalog = get_catalog()
+        value_field = Selections._meta.get_field('selection_value')
+
+        def stored_decimal(value):
+            if value is None:
+                return None
+            return Decimal(format_number(value_field.to_python(value), value_field.max_digits,
+                                         value_field.decimal_places))
+
+        def key(selection):
+            return (selection.option_id, stored_decimal(selection.selection_value), selection.selection_unit_id,
+                    stored_decimal(selection.selection_value2))
+
+        # the selections per option group, the default option does not belong to any option group
+        stored_groups = dict()
+        for selection in stored_selections:
+            stored_groups.setdefault(catalog.option_group_id_of_option(selection.option_id), []).append(selection)
+        new_groups = dict()
+        for name, value in standardized_data.items():
+            if name not in options:
+                continue
+            for elem in value:
+                # check if a value is declared
+                selection_value = None
+                selection_value2 = None
+                selection_unit = None
+                if len(elem) == 3:
+                    selection_value = elem[1]
+                    selection_unit = elem[2]
+                if len(elem) == 4:
+                    selection_value = elem[1]
+                    selection_unit = elem[2]
+                    selection_value2 = elem[3]
+                new_groups.setdefault(catalog.option_group_id_of_option(elem[0]), []).append(
+                    Selections(
+                        greenhouse_data=greenhouse_data,
+                        option_id=elem[0],
+                        selection_value=selection_value,
+                        selection_unit_id=selection_unit,
+                        selection_value2=selection_value2
+                    )
+                )
+
+        deleted_selections = []
+        new_selections = []
+        for option_group_id in stored_groups.keys() | new_groups.keys():
+            stored = stored_groups.get(option_group_id, [])
+            new = new_groups.get(option_group_id, [])
+            if [key(selection) for selection in stored] != [key(selection) for selection in new]:
+                deleted_selections.extend(selection.id for selection in stored)
+                new_selections.extend(new)
+        if deleted_selections:
+            Selections.objects.filter(id__in=deleted_selections).delete()
+        Selections.objects.bulk_create(new_selections)
+        return bool(deleted_selections or new_selections)
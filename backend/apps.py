@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class BackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend'
+
+    def ready(self):
+        # register the signal receivers that keep the in-memory reference catalog, the performer rankings,
+        # the footprint distributions, the cohort rollups and the response cache up to date
+        from . import referenceCatalog  # noqa: F401
+        from . import performerRankings  # noqa: F401
+        from . import footprintDistributions  # noqa: F401
+        from . import cohortRollups  # noqa: F401
+        from . import responseCache  # noqa: F401
@@ -0,0 +1,370 @@
+"""
+    This file maintains the statistics of the normalized results over all data sets of a cohort in the CohortRollups
+    table. A cohort is a group of comparable data sets:
+        Land, Region, GWHArt: all data sets with the same selected option, e.g. all data sets of the Land "Germany"
+        Fruchtklasse: all data sets that grow a fruit class, e.g. all data sets with "ja" for "10-30Gramm(Snack)"
+    A data set belongs to one cohort per dimension and to one cohort per grown fruit class. There is one CohortRollups row
+    per cohort, result in ROLLUP_CALCULATIONS and normalization, that holds count, sum, sum of squares, minimum and
+    maximum, so mean and standard deviation of a cohort are read from one row.
+
+    The counted cohorts and values of a data set are kept in GreenhouseData.cohort_values, so that they can be removed
+    again:
+        update_cohort_rollups() is called whenever results of data sets have been stored, after the transaction that
+            has stored them has committed. It removes the counted values of the data sets from their old cohorts and
+            adds their current values to their current cohorts.
+        Before a data set is deleted, its counted values are removed (pre_delete signal).
+    Count, sum and sum of squares are exact decimals. If the minimum or the maximum of a row is removed, the row is
+    marked as stale and they are searched again on the next read. The command rebuild_cohort_rollups builds all rows
+    from scratch.
+
+"""
+import functools
+import logging
+import operator
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .footprintDistributions import DISTRIBUTION_CALCULATIONS, NORMALIZATIONS
+from .models import Calculations, CohortRollups, GreenhouseData, Selections
+from .referenceCatalog import get_catalog
+from .resultValues import load_result_values, RESULT_LAYOUT
+
+logger = logging.getLogger(__name__)
+
+# dimensions whose cohorts are the options of the option group with the same name
+OPTION_DIMENSIONS = ("Land", "Region", "GWHArt")
+FRUIT_CLASS_DIMENSION = "Fruchtklasse"
+COHORT_DIMENSIONS = OPTION_DIMENSIONS + (FRUIT_CLASS_DIMENSION,)
+# fruit class -> option group, a data set grows the fruit class if FRUIT_CLASS_SELECTED is selected
+FRUIT_CLASSES = {
+    "Snack": "10-30Gramm(Snack)",
+    "Cocktail": "30-100Gramm(Cocktail)",
+    "Rispen": "100-150Gramm(Rispen)",
+    "Fleisch": ">150Gramm(Fleisch)",
+}
+FRUIT_CLASS_SELECTED = "ja"
+
+ROLLUP_CALCULATIONS = DISTRIBUTION_CALCULATIONS
+
+
+def cohort_options():
+    """Returns the options that put a data set into a cohort.
+
+    Returns:
+        dictionary: option_id -> (dimension, cohort)
+    """
+
+    catalog = get_catalog()
+    options = dict()
+    for dimension in OPTION_DIMENSIONS:
+        for option_id in catalog.option_ids_of_group(catalog.option_group_id(dimension)):
+            options[option_id] = (dimension, catalog.option_value(option_id))
+    for fruit_class, option_group_name in FRUIT_CLASSES.items():
+        options[catalog.option_id(option_group_name, FRUIT_CLASS_SELECTED)] = (FRUIT_CLASS_DIMENSION, fruit_class)
+    return options
+
+
+def load_cohorts(greenhouse_data_ids):
+    """Loads the cohorts of multiple greenhouse data sets with one query.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> sorted list of [dimension, cohort], data sets without cohorts are left out
+    """
+
+    options = cohort_options()
+    cohorts = dict()
+    for greenhouse_data_id, option_id in Selections.objects \
+            .filter(greenhouse_data_id__in=greenhouse_data_ids, option_id__in=options) \
+            .values_list('greenhouse_data_id', 'option_id'):
+        cohorts.setdefault(greenhouse_data_id, set()).add(options[option_id])
+    return {greenhouse_data_id: sorted([dimension, cohort] for dimension, cohort in data_set_cohorts)
+            for greenhouse_data_id, data_set_cohorts in cohorts.items()}
+
+
+def build_cohort_values(cohorts, result_values):
+    """Builds the value of GreenhouseData.cohort_values for a data set.
+
+    Args:
+        cohorts: list of [dimension, cohort] of the data set
+        result_values: result values of the data set, see resultValues.py
+
+    Returns:
+        dictionary: {"cohorts": <cohorts>, "normalizedkg": {<calculation_name>: <value>, ...}, "normalizedm2": {...}}
+            or None, if the data set is not counted. Missing values are left out.
+    """
+
+    if not cohorts or result_values is None:
+        return None
+    cohort_values = {"cohorts": cohorts}
+    for normalization in NORMALIZATIONS:
+        values = dict(zip(RESULT_LAYOUT, result_values[normalization]))
+        cohort_values[normalization] = {name: values[name] for name in ROLLUP_CALCULATIONS
+                                        if values.get(name) is not None}
+    return cohort_values
+
+
+def rollup_keys(cohort_values):
+    """Returns the keys (dimension, cohort, calculation_name, normalization) of the rows a data set is counted in."""
+    return {(dimension, cohort, name, normalization)
+            for dimension, cohort in cohort_values["cohorts"]
+            for normalization in NORMALIZATIONS for name in cohort_values[normalization]}
+
+
+def count_cohort_values(rows, cohort_values, count):
+    """Adds (count=1) or removes (count=-1) the values of a data set to or from the rows of its cohorts.
+
+    Args:
+        rows: dictionary (dimension, cohort, calculation_name, normalization) -> CohortRollups row
+        cohort_values: counted values of the data set, see build_cohort_values()
+        count: 1 or -1
+    """
+
+    for key in rollup_keys(cohort_values):
+        _count_value(rows[key], key, cohort_values[key[3]][key[2]], count)
+
+
+def _count_value(row, key, value, count):
+    """Adds (count=1) or removes (count=-1) one value of the data set to or from the row of key."""
+    value = Decimal(str(value))
+    if row.count + count < 0:
+        logger.warning("cohortRollups: %s of %s is not in the cohort %s, run rebuild_cohort_rollups",
+                       key[3], key[2], key[1])
+        return
+    row.count += count
+    row.sum += count * value
+    row.sum_of_squares += count * value * value
+    if row.count == 0:
+        row.sum = row.sum_of_squares = Decimal(0)
+        row.min_value = row.max_value = None
+        row.stale = False
+    elif count > 0:
+        if not row.stale:
+            row.min_value = value if row.min_value is None else min(row.min_value, value)
+            row.max_value = value if row.max_value is None else max(row.max_value, value)
+    elif value == row.min_value or value == row.max_value:
+        row.stale = True
+
+
+def lock_rollups(keys):
+    """Locks the CohortRollups rows of some keys inside of a transaction, missing rows are created.
+
+    The rows are always locked before the data sets, so that the changes of the counted values of a data set are
+    serialized with the changes of the rows.
+
+    Args:
+        keys: (dimension, cohort, calculation_name, normalization) of the rows
+
+    Returns:
+        dictionary: (dimension, cohort, calculation_name, normalization) -> CohortRollups row, it can contain additional
+            rows
+    """
+
+    if not keys:
+        return dict()
+    calculations = Calculations.objects.in_bulk(ROLLUP_CALCULATIONS, field_name='calculation_name')
+    CohortRollups.objects.bulk_create(
+        [CohortRollups(dimension=dimension, cohort=cohort, calculation=calculations[name], normalization=normalization)
+         for dimension, cohort, name, normalization in keys], ignore_conflicts=True)
+    # only the rows of the cohorts of the keys are locked, not the joined calculations
+    cohorts = functools.reduce(operator.or_, (Q(dimension=dimension, cohort=cohort)
+                                              for dimension, cohort in {key[:2] for key in keys}))
+    return {(row.dimension, row.cohort, row.calculation.calculation_name, row.normalization): row
+            for row in CohortRollups.objects.select_for_update(of=('self',)).select_related('calculation')
+            .filter(cohorts, calculation__calculation_name__in={key[2] for key in keys},
+                    normalization__in={key[3] for key in keys}).order_by('id')}
+
+
+def save_rollups(rows):
+    """Writes the changed CohortRollups rows."""
+    CohortRollups.objects.bulk_update(rows, ['count', 'sum', 'sum_of_squares', 'min_value', 'max_value', 'stale'],
+                                      batch_size=500)
+
+
+def _load_cohort_values(greenhouse_data_ids, lock=False):
+    """Loads the counted and the current cohort values of some data sets.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+        lock (boolean): true, if the data sets are locked
+
+    Returns:
+        dictionary: greenhouse_data_id -> (counted cohort values, current cohort values), only the data sets whose
+            counted values are not the current ones
+    """
+
+    datasets = GreenhouseData.objects.filter(id__in=greenhouse_data_ids)
+    if lock:
+        datasets = datasets.select_for_update()
+    counted_values = dict(datasets.values_list('id', 'cohort_values'))
+    cohorts = load_cohorts(greenhouse_data_ids)
+    result_values = load_result_values(greenhouse_data_ids)
+    values = {greenhouse_data_id: (counted_values[greenhouse_data_id],
+                                   build_cohort_values(cohorts.get(greenhouse_data_id),
+                                                       result_values.get(greenhouse_data_id)))
+              for greenhouse_data_id in counted_values}
+    return {greenhouse_data_id: change for greenhouse_data_id, change in values.items() if change[0] != change[1]}
+
+
+def _counted_values(cohort_values):
+    """Returns the counted values of a data set per row: (dimension, cohort, calculation_name, normalization) -> value."""
+    if cohort_values is None:
+        return dict()
+    return {key: cohort_values[key[3]][key[2]] for key in rollup_keys(cohort_values)}
+
+
+def update_cohort_rollups(greenhouse_data_ids):
+    """Updates the cohort rollups with the stored results and selections of some data sets.
+
+    It has to be called outside of a transaction that has locked the data sets, see update_cohort_rollups_on_commit().
+    Only the rows of the cohorts the data sets belong and belonged to are locked and only the rows whose counted value
+    has changed are written.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows, whose results or selections have changed
+    """
+
+    while True:
+        changes = _load_cohort_values(greenhouse_data_ids)
+        if not changes:
+            return
+        # every row the data sets are or will be counted in is locked, so a concurrent change of the data sets always
+        # waits for at least one of the locked rows
+        keys = {key for change in changes.values() for values in change if values is not None
+                for key in rollup_keys(values)}
+        with transaction.atomic():
+            rows = lock_rollups(keys)
+            # the values are read again after the rows have been locked, they may have changed in the meantime
+            changes = _load_cohort_values(greenhouse_data_ids, lock=True)
+            if any(key not in rows for change in changes.values() for values in change if values is not None
+                   for key in rollup_keys(values)):
+                continue
+            changed_keys = set()
+            for old_values, new_values in changes.values():
+                old_counted = _counted_values(old_values)
+                new_counted = _counted_values(new_values)
+                for key in old_counted.keys() | new_counted.keys():
+                    if old_counted.get(key) == new_counted.get(key):
+                        continue
+                    if key in old_counted:
+                        _count_value(rows[key], key, old_counted[key], -1)
+                    if key in new_counted:
+                        _count_value(rows[key], key, new_counted[key], 1)
+                    changed_keys.add(key)
+            save_rollups([rows[key] for key in changed_keys])
+            GreenhouseData.objects.bulk_update(
+                [GreenhouseData(id=greenhouse_data_id, cohort_values=new_values)
+                 for greenhouse_data_id, (_, new_values) in changes.items()], ['cohort_values'], batch_size=500)
+            return
+
+
+def update_cohort_rollups_on_commit(greenhouse_data_ids):
+    """Updates the cohort rollups with some data sets, when the current transaction commits.
+
+    The data sets have been locked by the current transaction, so the rollups can not be updated inside of it. An error
+    does not undo the committed data sets, it is logged and the rollups are corrected by rebuild_cohort_rollups.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows, whose results or selections have changed
+    """
+
+    def update():
+        try:
+            update_cohort_rollups(greenhouse_data_ids)
+        except Exception as e:
+            logger.warning("cohortRollups: update of %s failed, run rebuild_cohort_rollups: %r", greenhouse_data_ids, e)
+
+    transaction.on_commit(update)
+
+
+def load_rollups(cohorts):
+    """Loads the rows of some cohorts, the minimum and maximum of stale rows are searched again.
+
+    Args:
+        cohorts: (dimension, cohort) of the cohorts
+
+    Returns:
+        dictionary: (dimension, cohort, calculation_name, normalization) -> CohortRollups row
+    """
+
+    cohorts = set(cohorts)
+    if not cohorts:
+        return dict()
+    rows = {(row.dimension, row.cohort, row.calculation.calculation_name, row.normalization): row
+            for row in CohortRollups.objects.select_related('calculation')
+            .filter(dimension__in={cohort[0] for cohort in cohorts}, cohort__in={cohort[1] for cohort in cohorts})
+            if (row.dimension, row.cohort) in cohorts}
+    stale = {key for key, row in rows.items() if row.stale}
+    if stale:
+        with transaction.atomic():
+            locked = lock_rollups(stale)
+            _search_min_max([locked[key] for key in stale])
+            save_rollups([locked[key] for key in stale])
+        rows.update({key: locked[key] for key in stale})
+    return rows
+
+
+def _search_min_max(rows):
+    """Searches the minimum and the maximum of locked stale rows in the counted values of the data sets."""
+    options = {cohort: option_id for option_id, cohort in cohort_options().items()}
+    for dimension, cohort in {(row.dimension, row.cohort) for row in rows}:
+        cohort_rows = [row for row in rows if (row.dimension, row.cohort) == (dimension, cohort)]
+        greenhouse_data_ids = Selections.objects.filter(option_id=options.get((dimension, cohort))) \
+            .values_list('greenhouse_data_id', flat=True)
+        values = {(row.calculation.calculation_name, row.normalization): [] for row in cohort_rows}
+        for cohort_values in GreenhouseData.objects.filter(id__in=greenhouse_data_ids, cohort_values__isnull=False) \
+                .values_list('cohort_values', flat=True):
+            if [dimension, cohort] not in cohort_values["cohorts"]:
+                continue
+            for (name, normalization), value_list in values.items():
+                if name in cohort_values[normalization]:
+                    value_list.append(Decimal(str(cohort_values[normalization][name])))
+        for row in cohort_rows:
+            value_list = values[(row.calculation.calculation_name, row.normalization)]
+            row.min_value = min(value_list, default=None)
+            row.max_value = max(value_list, default=None)
+            row.stale = False
+
+
+def rollup_statistics(row):
+    """Returns count, mean, standard deviation, minimum and maximum of a CohortRollups row.
+
+    Returns:
+        dictionary: {"count": <count>, "mean": <mean>, "std": <population standard deviation>, "min": <minimum>,
+            "max": <maximum>}, the values are rounded to 2 decimal places and None for an empty cohort
+    """
+
+    if row.count == 0:
+        return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+    mean = row.sum / row.count
+    variance = max(row.sum_of_squares / row.count - mean * mean, Decimal(0))
+    return {"count": row.count, "mean": round(mean, 2), "std": round(variance.sqrt(), 2),
+            "min": round(row.min_value, 2), "max": round(row.max_value, 2)}
+
+
+@receiver(pre_delete, sender=GreenhouseData)
+def remove_cohort_values_on_delete(sender, instance, **kwargs):
+    """Signal receiver that removes the counted values of a data set from the cohort rollups, before it is deleted."""
+    if instance.cohort_values is None:
+        return
+    while True:
+        counted_values = GreenhouseData.objects.filter(id=instance.id) \
+            .values_list('cohort_values', flat=True).first()
+        if counted_values is None:
+            return
+        with transaction.atomic():
+            keys = rollup_keys(counted_values)
+            rows = lock_rollups(keys)
+            # the counted values may have changed since they have been read, a change locks the same rows
+            if GreenhouseData.objects.filter(id=instance.id) \
+                    .values_list('cohort_values', flat=True).first() != counted_values:
+                continue
+            count_cohort_values(rows, counted_values, -1)
+            save_rollups([rows[key] for key in keys])
+            return
@@ -1,6 +1,7 @@
 co2_equivalents = {
     "beton":  0.1707,
     "stahl": 1.5641297,
+    "stahl_doppelfolie": 1.5641297,
     "aluminium": 14.365981,
     "stehwand_glas": 1.1,
     "stehwand_stegplatte": 1,
@@ -9,6 +10,7 @@ co2_equivalents = {
     "bedachung_stegplatte": 1,
     "bedachung_folie": 2.78897,
     "lpde": 2.78897,
+    "lpde_doppelfolie": 2.78897,
     "energieschirm": 2.67,
     "energieschirm_aluminisiert": 4.5168,
     "bodenabdeckung_bodenfolie": 2.67,
@@ -116,6 +118,7 @@ co2_equivalents = {
 h2o_equivalents = {
     "beton": 1.517,
     "stahl": 3,
+    "stahl_doppelfolie": 1.5641297,
     "aluminium": 6.795,
     "stehwand_glas": 45.175,
     "stehwand_stegplatte": 8.049,
@@ -124,6 +127,7 @@ h2o_equivalents = {
     "bedachung_stegplatte": 8.049,
     "bedachung_folie": 2.771,
     "lpde": 2.771,
+    "lpde_doppelfolie": 2.78897,
     "energieschirm": 47.337,
     "energieschirm_aluminisiert": 27.066,
     "bodenabdeckung_bodenfolie": 0,
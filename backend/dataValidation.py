@@ -2,9 +2,14 @@
     This file contains a function that validates the input data.
 
 """
-from backend.models import Measurements, Options, OptionGroups
+import logging
+
+from backend.models import Measurements, OptionGroups
+from backend.referenceCatalog import get_catalog
 from backend.utils import default_value, default_option, generic_error_message, input_error_message
 
+logger = logging.getLogger(__name__)
+
 
 def validate_mandatory_fields(data):
     """Function that checks if every mandatory input field has been filled out. Fields that depend on a conditional
@@ -24,8 +29,7 @@ def validate_mandatory_fields(data):
     mandatory_optiongroups = OptionGroups.objects.in_bulk(
         field_name='option_group_name')
 
-    all_options = Options.objects.all(
-    )
+    catalog = get_catalog()
 
     # 1st element is option that makes the following fields mandatory
     # 2nd element are measurements that depend on conditional field
@@ -62,7 +66,7 @@ def validate_mandatory_fields(data):
         optiongroups = values[3]
         # retrieve the selected option id for the current optiongroup
         selected_option_id = data[optiongroup][0][0]
-        selected_option_value = all_options.filter(id=selected_option_id)[0].option_value
+        selected_option_value = catalog.option_value(selected_option_id)
         # compare the value with the conditional rule to see if the fields that depend on the optiongroup are mandatory
         optiongroup_required = False
         for condition in conditions:
@@ -81,7 +85,7 @@ def validate_mandatory_fields(data):
                     try:
                         del mandatory_optiongroups[not_required_optiongroup]
                     except KeyError:
-                        print("Optiongroup " + str(not_required_optiongroup) + " has already been deleted or doesn't exist")
+                        logger.warning("Optiongroup %s has already been deleted or doesn't exist", not_required_optiongroup)
                         return False, generic_error_message
 
     # this place is for manually deleting always optional fields out of the mandatory lists
@@ -101,24 +105,24 @@ def validate_mandatory_fields(data):
     # check if any element in the mandatory_measurements list has a default value
     for name, value in mandatory_measurements.items():
         if data[value.measurement_name] == default_value:
-            print("Error: Mandatory measurement field " + value.measurement_name + " has default value!")
+            logger.info("Mandatory measurement field %s has default value!", value.measurement_name)
             return False, input_error_message
 
     # check if any element in the mandatory_optiongroups list has a default value
     for name, value in mandatory_optiongroups.items():
         if data[value.option_group_name] == default_option:
-            print("Error: Mandatory option group " + value.option_group_name + " has default value!")
+            logger.info("Mandatory option group %s has default value!", value.option_group_name)
             return False, input_error_message
 
     # check if at least one fruitclass has been selected
     fruit_class_fields = ["10-30Gramm(Snack)", "30-100Gramm(Cocktail)", "100-150Gramm(Rispen)", ">150Gramm(Fleisch)"]
     fruit_class_selected = False
     for fruit_class in fruit_class_fields:
-        if all_options.get(id=data[fruit_class][0][0]).option_value == "ja":
+        if catalog.option_value(data[fruit_class][0][0]) == "ja":
             fruit_class_selected = True
 
     if not fruit_class_selected:
-        print("Error: No fruit class has been selected")
+        logger.info("No fruit class has been selected")
         return False, "Es wurde keine Fruchtklasse ausgewählt. Bitte wählen Sie mindestens eine Fruchtklasse aus."
 
     return True, ""
@@ -0,0 +1,97 @@
+"""
+    This file provides the versioned factor sets (co2 and h2o equivalents) of the footprint calculation.
+
+    The equivalents in data/equivalents.py are the builtin factor set. Its version is derived from its content, so that
+    results of different states of the file can be told apart. Further versions are stored in the FactorSets table. The
+    active factor set is the FactorSets row with active=True or the builtin set, if no row is active.
+
+    Every version is compiled once per process into a FactorTable, the scalar and the batch calculation both use it.
+    The active version is looked up again after FACTOR_SET_TTL seconds (default 60), so that a factor set activated by
+    another process is picked up, and immediately when the FactorSets table is changed through the ORM.
+
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .data.equivalents import co2_equivalents, h2o_equivalents
+from .footprintKernel import FactorTable
+from .models import FactorSets
+
+BUILTIN_VERSION_PREFIX = "builtin-"
+
+
+def _load_builtin_factors():
+    """Returns the FactorTable of data/equivalents.py, its version contains the fingerprint of the equivalents."""
+    fingerprint = FactorTable(co2_equivalents, h2o_equivalents).fingerprint
+    return FactorTable(co2_equivalents, h2o_equivalents, BUILTIN_VERSION_PREFIX + fingerprint[:12])
+
+
+builtin_factors = _load_builtin_factors()
+
+_factor_tables = {builtin_factors.version: builtin_factors}
+_active_version = None
+_active_version_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_factors(version):
+    """Returns the factor set of a version.
+
+    Args:
+        version: version of the factor set
+
+    Returns:
+        FactorTable: the compiled factor set
+
+    Raises:
+        FactorSets.DoesNotExist: if there is no factor set with this version
+    """
+
+    factors = _factor_tables.get(version)
+    if factors is None:
+        factor_set = FactorSets.objects.get(version=version)
+        factors = FactorTable(factor_set.co2_equivalents, factor_set.h2o_equivalents, factor_set.version)
+        with _lock:
+            _factor_tables[version] = factors
+    return factors
+
+
+def get_active_factors():
+    """Returns the factor set that is used for new footprint calculations.
+
+    Returns:
+        FactorTable: the active factor set or the builtin factor set, if no factor set is active
+    """
+    global _active_version, _active_version_loaded_at
+
+    # the version is read once, invalidate_factor_sets() may reset the global at any time
+    ttl = getattr(settings, 'FACTOR_SET_TTL', 60)
+    with _lock:
+        version = _active_version
+        loaded_at = _active_version_loaded_at
+    if version is None or (ttl is not None and time.monotonic() - loaded_at >= ttl):
+        active_set = FactorSets.objects.filter(active=True).order_by('-date_created').values_list('version', flat=True)
+        with _lock:
+            version = _active_version = active_set.first() or builtin_factors.version
+            _active_version_loaded_at = time.monotonic()
+    return get_factors(version)
+
+
+def invalidate_factor_sets():
+    """Drops the compiled factor sets of the current process, except the builtin one."""
+    global _active_version
+
+    with _lock:
+        _active_version = None
+        _factor_tables.clear()
+        _factor_tables[builtin_factors.version] = builtin_factors
+
+
+@receiver([post_save, post_delete], sender=FactorSets)
+def invalidate_factor_sets_on_change(sender, **kwargs):
+    """Signal receiver that invalidates the factor sets, whenever the FactorSets table is changed through the ORM."""
+    invalidate_factor_sets()
@@ -0,0 +1,270 @@
+"""
+    This file contains analyses of the footprint calculation, that evaluate many variations of one resolved record (see
+    footprintKernel.py) as a single batch of the vectorized calculation (footprintBatch.py).
+
+    sensitivities(): partial derivatives of the footprint totals with respect to every numeric input, calculated with
+        central finite differences. Every input adds two perturbed records to the batch.
+    uncertainty_bands(): percentiles of every result under uncertain equivalents and inputs, calculated with a Monte
+        Carlo simulation. The records are compiled once and repeated for the draws, the draws only multiply the
+        compiled columns and the factor matrix with random noise.
+
+"""
+import math
+import time
+
+import numpy as np
+
+from .footprintBatch import FactorMatrix, compile_records, evaluate
+from .instrumentation import span
+
+TOTALS = ("co2_footprint", "co2_footprint_norm_kg", "co2_footprint_norm_m2",
+          "h2o_footprint", "h2o_footprint_norm_kg", "h2o_footprint_norm_m2",
+          "direct_h2o_footprint", "direct_h2o_footprint_norm_kg", "direct_h2o_footprint_norm_m2")
+
+# step of the finite differences relative to the value of the input
+RELATIVE_STEP = 1e-4
+# relative difference of the forward and backward difference, above which a total is not smooth at the value
+SMOOTHNESS_TOLERANCE = 1e-3
+
+# percentiles of the uncertainty bands
+PERCENTILES = (5, 50, 95)
+# number of rows that are evaluated at once by uncertainty_bands()
+MONTE_CARLO_CHUNK_ROWS = 5000
+# share of the time budget of uncertainty_bands() that is kept for the percentiles after the last draw
+PERCENTILE_BUDGET_SHARE = 0.1
+
+# positions of the numeric values in a resolved selection (option_value, value, unit_name, value2)
+_SELECTION_VALUES = {1: "value", 3: "value2"}
+
+
+def numeric_inputs(record):
+    """Returns the numeric inputs of a resolved record, that have a value other than 0.
+
+    Inputs with the value 0 are not filled in or not used by the greenhouse, so they are left out.
+
+    Args:
+        record: resolved greenhouse dataset
+
+    Returns:
+        list: (field name, selection index or None, position in the tuple, option value or None, value) of every input
+    """
+
+    inputs = []
+    for name, value in record.items():
+        if isinstance(value, tuple):
+            # measurement (value, unit_id)
+            if _is_number(value[0]) and value[0] != 0:
+                inputs.append((name, None, 0, None, float(value[0])))
+        elif isinstance(value, list):
+            for index, selection in enumerate(value):
+                for position in _SELECTION_VALUES:
+                    if len(selection) > position and _is_number(selection[position]) and selection[position] != 0:
+                        inputs.append((name, index, position, selection[0], float(selection[position])))
+    return inputs
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def perturbed_record(record, name, index, position, value):
+    """Returns a copy of a resolved record, in which one numeric input has another value.
+
+    Args:
+        record: resolved greenhouse dataset
+        name: name of the field
+        index: index of the selection in an option group or None for a measurement
+        position: position of the value in the tuple
+        value: new value
+
+    Returns:
+        dictionary: the changed record, the unchanged fields are shared with record
+    """
+
+    record = dict(record)
+    if index is None:
+        record[name] = (value,) + tuple(record[name][1:])
+    else:
+        selections = list(record[name])
+        selection = list(selections[index])
+        selection[position] = value
+        selections[index] = tuple(selection)
+        record[name] = selections
+    return record
+
+
+def sensitivities(record, factors):
+    """Calculates the partial derivatives of the footprint totals with respect to every numeric input of a record.
+
+    The derivatives are calculated with central differences of the unrounded results. If one of the two perturbed
+    records can not be calculated, a one-sided difference is used. If the forward and the backward difference do not
+    match, a limit of the calculation lies at the value (e.g. the lifetime of a material), so there is no derivative.
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: FactorTable or footprintBatch.FactorMatrix with the co2 and h2o equivalents
+
+    Returns:
+        totals: dictionary of total name -> unrounded value of the record
+        inputs: list of dictionaries with the keys field, option, parameter, value, derivatives, elasticities and
+            limits. The elasticity is the relative change of a total per relative change of the input. limits contains
+            the totals without a derivative, because a limit of the calculation lies at the value. The inputs are
+            sorted by their largest elasticity of the co2 and h2o footprint.
+
+    Raises:
+        ValueError: if the record itself can not be calculated
+    """
+
+    inputs = numeric_inputs(record)
+    records = [record]
+    for name, index, position, _, value in inputs:
+        step = abs(value) * RELATIVE_STEP
+        records.append(perturbed_record(record, name, index, position, value + step))
+        records.append(perturbed_record(record, name, index, position, value - step))
+
+    with span("sensitivity"):
+        results, errors = evaluate(compile_records(records), factors, round_results=False)
+    if errors[0] is not None:
+        raise ValueError(errors[0])
+
+    columns = {name: results[name].tolist() for name in TOTALS}
+    totals = {name: values[0] for name, values in columns.items()}
+    analysed_inputs = []
+    for i, (name, index, position, option, value) in enumerate(inputs):
+        step = abs(value) * RELATIVE_STEP
+        plus, minus = 2 * i + 1, 2 * i + 2
+        derivatives = dict()
+        elasticities = dict()
+        limits = []
+        for total, values in columns.items():
+            if errors[plus] is None and errors[minus] is None:
+                forward = (values[plus] - values[0]) / step
+                backward = (values[0] - values[minus]) / step
+                # the absolute part of the tolerance covers the rounding errors of the floats
+                tolerance = SMOOTHNESS_TOLERANCE * max(abs(forward), abs(backward)) + \
+                    1e-9 * max(1.0, abs(values[0])) / step
+                if abs(forward - backward) > tolerance:
+                    limits.append(total)
+                    derivative = math.nan
+                else:
+                    derivative = (values[plus] - values[minus]) / (2 * step)
+            elif errors[plus] is None:
+                derivative = (values[plus] - values[0]) / step
+            elif errors[minus] is None:
+                derivative = (values[0] - values[minus]) / step
+            else:
+                derivative = math.nan
+            derivatives[total] = derivative if math.isfinite(derivative) else None
+            elasticity = derivative * value / values[0] if values[0] else math.nan
+            elasticities[total] = elasticity if math.isfinite(elasticity) else None
+        analysed_inputs.append({
+            "field": name,
+            "option": option,
+            "parameter": "value" if index is None else _SELECTION_VALUES[position],
+            "value": value,
+            "derivatives": derivatives,
+            "elasticities": elasticities,
+            "limits": limits,
+        })
+
+    analysed_inputs.sort(key=lambda analysed: -max(abs(analysed["elasticities"][total] or 0)
+                                                   for total in ("co2_footprint", "h2o_footprint")))
+    return totals, analysed_inputs
+
+
+def _lognormal_noise(rng, shape, relative_deviation):
+    """Returns multiplicative noise with mean 1 and the given relative standard deviation."""
+    sigma = math.sqrt(math.log1p(relative_deviation ** 2))
+    return rng.lognormal(-sigma ** 2 / 2, sigma, shape)
+
+
+def uncertainty_bands(records, factors, draws, factor_deviation, input_deviation, seed=0, time_budget=None):
+    """Calculates uncertainty bands of all results of resolved records with a Monte Carlo simulation.
+
+    Every draw multiplies every co2 and h2o equivalent and every numeric input with lognormal noise of mean 1. The
+    equivalents of a draw are the same for all records, the inputs are drawn for every record independently. Draws, in
+    which a record can not be calculated, are left out of its percentiles.
+
+    Args:
+        records: list of resolved greenhouse datasets
+        factors: FactorTable or footprintBatch.FactorMatrix (with one row) with the co2 and h2o equivalents
+        draws: number of draws
+        factor_deviation: relative standard deviation of the equivalents
+        input_deviation: relative standard deviation of the numeric inputs
+        seed: seed of the random number generator, the same seed returns the same bands
+        time_budget: seconds the calculation may take, None for no limit. No further draws are started, if the next
+            chunk of draws and the percentiles would exceed it, but the first chunk is always calculated.
+
+    Returns:
+        bands: dictionary of result name -> list with a dictionary {"p5": .., "p50": .., "p95": ..} for every record or
+            None, if the record could not be calculated in any draw
+        draws: number of draws that have been calculated, less than the requested draws if the time budget has run out
+    """
+
+    started = time.perf_counter()
+    if not isinstance(factors, FactorMatrix):
+        factors = FactorMatrix.from_table(factors)
+    rng = np.random.default_rng(seed)
+    batch = compile_records(records)
+    size = batch.size
+    chunk_draws = max(1, MONTE_CARLO_CHUNK_ROWS // max(size, 1))
+
+    chunks = []
+    done = 0
+    with span("monte_carlo"):
+        while done < draws:
+            count = min(chunk_draws, draws - done)
+            draw_batch = batch.repeat(count)
+            for column in draw_batch.values.values():
+                column *= _lognormal_noise(rng, column.shape, input_deviation)
+            for entries in draw_batch.entries.values():
+                entries.values *= _lognormal_noise(rng, entries.values.shape, input_deviation)
+                entries.values2 *= _lognormal_noise(rng, entries.values2.shape, input_deviation)
+            # one row of equivalents per draw, repeated for the records of the draw
+            draw_factors = FactorMatrix(
+                factors.names,
+                np.repeat(factors.co2[:, :-1] * _lognormal_noise(rng, (count, len(factors.names)), factor_deviation),
+                          size, axis=0),
+                np.repeat(factors.h2o[:, :-1] * _lognormal_noise(rng, (count, len(factors.names)), factor_deviation),
+                          size, axis=0),
+                factors.version)
+            results, _ = evaluate(draw_batch, draw_factors, round_results=False)
+            chunks.append({name: values.reshape(count, size) for name, values in results.items()})
+            done += count
+
+            elapsed = time.perf_counter() - started
+            next_chunk = elapsed / done * min(chunk_draws, draws - done)
+            if time_budget is not None and elapsed + next_chunk > time_budget * (1 - PERCENTILE_BUDGET_SHARE):
+                break
+
+    names = list(chunks[0]) if chunks else []
+    with span("percentiles"):
+        # all results are sorted at once, NaN of the draws with errors is sorted to the end of every column
+        values = np.stack([np.concatenate([chunk[name] for chunk in chunks]) for name in names], axis=1)
+        percentiles = _nan_percentiles(values, PERCENTILES).tolist()
+    bands = dict()
+    for j, name in enumerate(names):
+        bands[name] = [None if math.isnan(percentiles[0][j][i]) else
+                       {"p%d" % percentile: row[j][i] for percentile, row in zip(PERCENTILES, percentiles)}
+                       for i in range(size)]
+    return bands, done
+
+
+def _nan_percentiles(values, percentiles):
+    """Returns the percentiles along the first axis without NaN values, with the linear interpolation of np.percentile.
+
+    This is faster than np.nanpercentile, because all columns are sorted at once. Columns without a valid value are
+    NaN.
+    """
+    values = np.sort(values, axis=0)
+    valid = np.count_nonzero(~np.isnan(values), axis=0)
+    result = []
+    for percentile in percentiles:
+        position = percentile / 100 * np.maximum(valid - 1, 0)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, np.maximum(valid - 1, 0))
+        fraction = position - lower
+        low = np.take_along_axis(values, lower[None], axis=0)[0]
+        high = np.take_along_axis(values, upper[None], axis=0)[0]
+        result.append(np.where(valid > 0, low + (high - low) * fraction, np.nan))
+    return np.array(result)
@@ -0,0 +1,956 @@
+"""
+    This file contains a vectorized version of the footprint calculation, that evaluates many datasets at once.
+
+    The calculation is split into two steps:
+        compile_records(): turns N resolved records (see footprintKernel.py) into NumPy column arrays. Measurements become
+            one float column each, single selections one column of option codes and option groups with multiple
+            selections a flat list of entries (row, option, value, unit, value2).
+        evaluate(): runs the calculation on the compiled columns. The branches of the scalar calculation become lookups
+            in coefficient tables and masks, so there is no Python loop over the datasets.
+
+    A compiled batch can be evaluated many times, e.g. with different factor sets. Factors are passed as a FactorMatrix
+    with one row (the same factors for all datasets) or N rows (own factors for every dataset).
+
+    The arithmetic follows footprintKernel.py operation by operation, so both return the same values. Datasets, for which
+    the scalar calculation would raise an error, get an error message and NaN results instead.
+
+"""
+import math
+
+import numpy as np
+
+from .footprintKernel import CATEGORIES, FactorTable
+
+CO2_RESULTS = tuple(category + "_co2" for category in CATEGORIES)
+H2O_RESULTS = tuple(category + "_h2o" for category in CATEGORIES)
+RESULT_NAMES = CO2_RESULTS + ("co2_footprint", "co2_footprint_norm_kg", "co2_footprint_norm_m2") + \
+               H2O_RESULTS + ("h2o_footprint", "h2o_footprint_norm_kg", "h2o_footprint_norm_m2",
+                              "direct_h2o_footprint", "direct_h2o_footprint_norm_kg", "direct_h2o_footprint_norm_m2")
+
+# coefficient tables: option_value -> (coefficients..., factor name)
+_WALL_MATERIALS = {
+    "Einfachglas": (0.664, 15, "stehwand_glas"),
+    "Doppelglas": (1.328, 15, "stehwand_glas"),
+    "Doppelstegplatte": (0.17, 10, "bedachung_stegplatte"),
+    "Dreifachstegplatte": (0.27, 10, "stehwand_stegplatte"),
+    "Einfachfolie": (0.0374, 5, "stehwand_folie"),
+    "Doppelfolie": (0.0748, 5, "stehwand_folie"),
+}
+_ROOF_MATERIALS = {
+    "Einfachglas": (0.664, 15, "bedachung_glas"),
+    "Doppelglas": (1.328, 15, "bedachung_glas"),
+    "Doppelstegplatte": (0.17, 10, "bedachung_stegplatte"),
+    "Dreifachstegplatte": (0.27, 10, "bedachung_stegplatte"),
+    "Einfachfolie": (0.0374, 5, "bedachung_folie"),
+    "Doppelfolie": (0.0748, 5, "bedachung_folie"),
+}
+_ENERGY_SCREENS = {
+    "einfach": (0.05, "energieschirm"),
+    "doppelt": (0.1, "energieschirm"),
+    "einfach, aluminisiert": (0.05, "energieschirm_aluminisiert"),
+    "doppelt, aluminisiert": (0.1, "energieschirm_aluminisiert"),
+}
+_GROUND_COVERS = {
+    "Bodenfolie": (0.01, 10, "bodenabdeckung_bodenfolie"),
+    "Bodengewebe": (0.02, 10, "bodenabdeckung_bodengewebe"),
+    "Beton": (2.52, 20, "bodenabdeckung_beton"),
+}
+_IRRIGATIONS = {
+    "Tropfschlaeuche": ("bewaesserung_tropfschlaeuche",),
+    "Bodensprinkler": ("bewaesserung_bodensprinkler",),
+    "Handschlauch": ("bewaesserung_handschlauch",),
+}
+_HEATING_SYSTEMS = {
+    "Transportsystem": (0,),
+    "Rohrheizung (hoch, niedrig, etc.)": (0,),
+    "Konvektionsheizung": (1,),
+    "Deckenlufterhitzer": (2,),
+    "Keines": (2,),
+}
+_ADDITIONAL_HEATING_SYSTEMS = {
+    "Transportsystem": (0, 20),
+    "Rohrheizung (hoch, niedrig, etc.)": (0, 20),
+    "Konvektionsheizung": (1, 15),
+    "Vegetationsheizung": (3, 15),
+}
+_ENERGY_SOURCES = {
+    "Erdgas": ("erdgas",),
+    "Biogas": ("biogas",),
+    "Heizoel": ("heizoel",),
+    "Steinkohle": ("steinkohle",),
+    "Braunkohle": ("braunkohle",),
+    "Hackschnitzel": ("hackschnitzel",),
+    "Geothermie(oberflaechennah)": ("geothermie",),
+    "Tiefengeothermie": ("tiefengeothermie",),
+    "BHKW Erdgas": ("erdgas",),
+    "BHKW Biomethan": ("biomethan",),
+}
+# (slot, factor name), the slots are in the order in which the scalar calculation sums up the electric power
+_POWER_SOURCES = {
+    "Deutscher Strommix": (0, "deutscher_strommix"),
+    "Oekostrom (Durschnitt Deutschland)": (1, "oekostrom"),
+    "Photovoltaik": (2, "photovoltaik"),
+    "Windenergie (Land)": (3, "windenergie_land"),
+    "Windenergie (See)": (4, "windenergie_see"),
+    "Wasserkraft": (5, "wasserkraft"),
+    "Tiefengeothermie": (6, "tiefengeothermie"),
+    "BHKW Erdgas": (7, "erdgas"),
+    "BHKW Biomethan": (8, "biomethan"),
+    "Diesel": (9, "diesel"),
+}
+_POWER_SLOTS = ("deutscher_strommix", "oekostrom", "photovoltaik", "windenergie_land", "windenergie_see",
+                "wasserkraft", "tiefengeothermie", "erdgas", "biomethan", "diesel")
+_WATER_SOURCES = {
+    "Brunnenwasser": (0, "brunnenwasser"),
+    "Regenwasser": (1, "regenwasser"),
+    "Stadtwasser": (2, "stadtwasser"),
+    "Oberflaechenwasser": (3, "oberflaechenwasser"),
+}
+_CO2_SOURCES = {
+    "technisches CO2": ("technisches_co2",),
+    "direkte Gasverbrennung": ("direkte_gasverbrennung",),
+    "eigenes BHKW": ("eigenes_bhkw",),
+}
+_SIMPLE_FERTILIZERS = {
+    "A/B Bag: Standardduengung": ("standardduengung",),
+    "Vinasse": ("vinasse",),
+    "Pferdemist": ("pferdemist",),
+    "Kompost": ("kompost",),
+    "Hornmehl, -griess, -spaene": ("hornmehl",),
+    "Blutmehl": ("blutmehl",),
+    "Mist": ("mist",),
+    "Gruenduengung": ("gruenduengung",),
+    "Knochenmehl": ("knochenmehl",),
+    "Pflanzkali": ("pflanzkali",),
+    "org. Vollduenger": ("vollduenger",),
+}
+_DETAILED_FERTILIZERS = {
+    "Ammoniumnitrat": ("ammoniumnitrat",),
+    "Kaliumnitrat (Kalisalpeter)": ("kaliumnitrat",),
+    "Calciumnitrat fluessig (Kalksalpeter)": ("calciumnitrat_fluessing",),
+    "Calciumnitrat fest": ("calciumnitrat_fest",),
+    "Kaliumchlorid, KCL, muriate of potash": ("kaliumchlorid",),
+    "Kaliumsulfat": ("kaliumsulfat",),
+    "Monokaliumphosphat (Flory6)": ("monokaliumphosphat",),
+    "Borax": ("borax",),
+    "Eisen DDTPA 3%": ("eisen_ddtpa",),
+    "Eisen EDDHA 6 %": ("eisen_eddha",),
+    "25 % Cu Kupfersulfat": ("kupfersulfat_25",),
+    "32 % Mn Mangansulfat": ("mangansulfat_32",),
+    "Natriummolybdat": ("natriummolybdat",),
+    "Zinksulfat": ("zinksulfat",),
+    "Chlorbleichlauge": ("chlorbleichlauge",),
+    "Bittersalz": ("bittersalz",),
+    "Phosphorsaeure 75%": ("phosphorsaeure",),
+    "Salpetersaeure 65%": ("salpetersaeure_65",),
+    "Salpetersaeure 38%": ("salpetersaeure_38",),
+    "Kalksalpeter": ("kalksalpeter",),
+    "Magnesiumnitrat": ("magnesiumnitrat",),
+    "Magnesiumsulfat": ("magnesiumsulfat",),
+    "Kalisilikat": ("kalisilikat",),
+    "Mangansulfat": ("mangansulfat",),
+    "Kupfersulfat": ("kupfersulfat",),
+    "Ammoniummolybdat": ("ammoniummolybdat",),
+}
+_SUBSTRATES = {
+    "Standardsubstrat": ("standardsubstrat",),
+    "Kokos": ("kokos",),
+    "Steinwolle": ("steinwolle",),
+    "Perlite": ("perlite",),
+    "Nachhaltiges Substrat": ("nachhaltiges_substrat",),
+}
+# (multiplier, divisor, factor name)
+_CORD_MATERIALS = {
+    "Kunststoff": (1, 1000, "schnuere_kunststoff"),
+    "Jute": (3, 900, "schnuere_jute"),
+    "Sisal": (3, 900, "schnuere_sisal"),
+    "Zellulose": (3, 900, "schnuere_zellulose"),
+    "andere Nachhaltige/abbaubare Option": (3, 900, "schnuere_nachhaltige_option"),
+    "Bambusstab": (0.32, 1, "schnuere_bambusstab"),
+    "Edelstahl": (0.62, 1, "schnuere_edelstahl"),
+}
+_CLIP_MATERIALS = {
+    "Kunststoff": (0.0005, "klipse_kunststoff"),
+    "Metall": (0.0008, "klipse_metall"),
+    "Nachhaltige / kompostierbare Option": (0.0008, "klipse_nachhaltige_option"),
+}
+_PANICLE_HANGER_MATERIALS = {
+    "Kunststoff": (0.0008, "rispenbuegel_kunststoff"),
+    "Metall": (0.001, "rispenbuegel_metall"),
+    "Nachhaltige / kompostierbare Option": (0.001, "rispenbuegel_nachhaltige_option"),
+}
+_PACKAGING_MATERIALS = {
+    "Karton": ("verpackung_karton",),
+    "Plastik": ("verpackung_plastik",),
+}
+_OTHER_CONSUMABLES = {
+    "Folie": ("verbrauchsmaterialien_folie",),
+    "Eisen": ("verbrauchsmaterialien_eisen",),
+    "Alluminium": ("verbrauchsmaterialien_alluminium",),
+    "Kunststoff": ("verbrauchsmaterialien_kunststoff",),
+    "Holz": ("verbrauchsmaterialien_holz",),
+    "Pappe": ("verbrauchsmaterialien_pappe",),
+}
+
+
+# FactorMatrix of every FactorTable that has been converted in this process, see FactorMatrix.from_table()
+_compiled_tables = dict()
+
+
+class FactorMatrix:
+    """This class holds co2 and h2o equivalents as dense matrices with one column per factor.
+
+    The matrices have either one row (the same factors for every dataset) or one row per dataset. An additional last
+    column contains NaN and is used for factor names, that are not part of the set.
+    """
+
+    def __init__(self, names, co2, h2o, version="builtin"):
+        """Creates the matrices.
+
+        Args:
+            names: factor names in the order of the columns
+            co2: array of shape (rows, len(names)) with the co2 equivalents
+            h2o: array of shape (rows, len(names)) with the h2o equivalents
+            version: name of the factor set
+        """
+        self.names = tuple(names)
+        self.version = version
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self.co2 = self._with_missing_column(co2)
+        self.h2o = self._with_missing_column(h2o)
+
+    def _with_missing_column(self, matrix):
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+        return np.hstack([matrix, np.full((matrix.shape[0], 1), np.nan)])
+
+    @classmethod
+    def from_table(cls, factors):
+        """Creates a matrix with one row from the vectors of a FactorTable.
+
+        Every factor set is only converted once per process, further calls return the same matrix.
+
+        Args:
+            factors: FactorTable
+
+        Returns:
+            FactorMatrix: the dense version of the factor table
+        """
+        key = (factors.version, factors.fingerprint)
+        matrix = _compiled_tables.get(key)
+        if matrix is None:
+            matrix = cls(factors.names, [factors.co2.values], [factors.h2o.values], factors.version)
+            _compiled_tables[key] = matrix
+        return matrix
+
+    @property
+    def rows(self):
+        return self.co2.shape[0]
+
+    def index(self, name):
+        """Returns the column of a factor or the NaN column, if the factor is not part of the set."""
+        return self._index.get(name, len(self.names))
+
+    def column(self, kind, name):
+        """Returns the factor for every dataset as array of shape (rows,), which broadcasts against (N,)."""
+        return getattr(self, kind)[:, self.index(name)]
+
+    def gather(self, kind, rows, columns):
+        """Returns the factors of the given columns for the given datasets.
+
+        Args:
+            kind: "co2" or "h2o"
+            rows: dataset index of every element
+            columns: factor column of every element
+
+        Returns:
+            array: one factor per element
+        """
+        matrix = getattr(self, kind)
+        return matrix[rows if matrix.shape[0] > 1 else 0, columns]
+
+
+class _Entries:
+    """The selections of one option group with (possibly) multiple selections per dataset, in input order."""
+
+    def __init__(self, rows, options, values, units, values2):
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.options = np.asarray(options, dtype=np.intp)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.units = np.asarray(units, dtype=np.intp)
+        self.values2 = np.asarray(values2, dtype=np.float64)
+
+
+class CompiledBatch:
+    """This class holds the column arrays of N resolved records.
+
+    Option values and unit names are encoded as integer codes of one vocabulary. The code -1 means "nothing selected".
+    """
+
+    def __init__(self, size, vocabulary, values, units, first, entries, errors):
+        self.size = size
+        self.vocabulary = vocabulary
+        self.values = values
+        self.units = units
+        self.first = first
+        self.entries = entries
+        self.errors = errors
+
+    def code(self, option_value):
+        """Returns the code of an option value or unit name. Unknown values get -2, which matches no dataset."""
+        return self.vocabulary.get(option_value, -2)
+
+    def measurement(self, name):
+        """Returns the values of a measurement. Missing measurements are NaN."""
+        column = self.values.get(name)
+        return column if column is not None else np.full(self.size, np.nan)
+
+    def is_default(self, name):
+        """Returns for every dataset, whether the measurement has the default value (0.0, 0)."""
+        return (self.measurement(name) == 0) & (self.units.get(name, np.full(self.size, -1)) == 0)
+
+    def selection(self, option_group_name):
+        """Returns the codes of the (first) selected option of an option group."""
+        column = self.first.get(option_group_name)
+        return column if column is not None else np.full(self.size, -1, dtype=np.intp)
+
+    def selected(self, option_group_name, option_value):
+        """Returns for every dataset, whether the (first) selected option is the given option."""
+        return self.selection(option_group_name) == self.code(option_value)
+
+    def entries_of(self, option_group_name):
+        """Returns all selections of an option group."""
+        entries = self.entries.get(option_group_name)
+        return entries if entries is not None else _Entries([], [], [], [], [])
+
+    def repeat(self, count):
+        """Returns a batch with count copies of the datasets, copy k of dataset i becomes the dataset k * size + i.
+
+        The column arrays of the new batch are not shared with this batch, so they can be changed in place.
+        """
+        offsets = np.arange(count, dtype=np.intp)[:, None] * self.size
+        entries = dict()
+        for name, entry in self.entries.items():
+            entries[name] = _Entries((entry.rows[None, :] + offsets).ravel(), np.tile(entry.options, count),
+                                     np.tile(entry.values, count), np.tile(entry.units, count),
+                                     np.tile(entry.values2, count))
+        return CompiledBatch(
+            self.size * count, self.vocabulary,
+            {name: np.tile(column, count) for name, column in self.values.items()},
+            {name: np.tile(column, count) for name, column in self.units.items()},
+            {name: np.tile(column, count) for name, column in self.first.items()},
+            entries,
+            list(self.errors) * count)
+
+    def table(self, mapping, width):
+        """Turns a coefficient table into arrays that are indexed by option code.
+
+        Args:
+            mapping: dictionary option_value -> tuple of coefficients
+            width: length of the coefficient tuples
+
+        Returns:
+            known: bool array, whether a code is part of the table
+            columns: one object array per tuple position
+        """
+        size = len(self.vocabulary) + 1  # the additional last slot is hit by code -1
+        known = np.zeros(size, dtype=bool)
+        columns = [np.zeros(size, dtype=object) for _ in range(width)]
+        for option_value, coefficients in mapping.items():
+            code = self.vocabulary.get(option_value)
+            if code is None:
+                continue
+            known[code] = True
+            for column, coefficient in zip(columns, coefficients):
+                column[code] = coefficient
+        return known, columns
+
+
+def compile_records(records):
+    """Compiles resolved records into column arrays.
+
+    Args:
+        records: list of resolved greenhouse datasets
+
+    Returns:
+        CompiledBatch: the column arrays of all records
+    """
+
+    size = len(records)
+    vocabulary = dict()
+    values = dict()
+    units = dict()
+    first = dict()
+    entries = dict()
+    errors = [None] * size
+
+    def encode(option_value):
+        return vocabulary.setdefault(option_value, len(vocabulary))
+
+    for i, record in enumerate(records):
+        try:
+            for name, value in record.items():
+                if isinstance(value, list):
+                    column = first.get(name)
+                    if column is None:
+                        column = first[name] = [-1] * size
+                        entries[name] = ([], [], [], [], [])
+                    rows, options, entry_values, entry_units, entry_values2 = entries[name]
+                    for selection in value:
+                        rows.append(i)
+                        options.append(encode(selection[0]))
+                        entry_values.append(selection[1] if len(selection) > 1 and selection[1] is not None else np.nan)
+                        entry_units.append(encode(selection[2]) if len(selection) > 2 else -1)
+                        entry_values2.append(selection[3] if len(selection) > 3 and selection[3] is not None else np.nan)
+                    if value:
+                        column[i] = vocabulary[value[0][0]]
+                elif isinstance(value, tuple):
+                    column = values.get(name)
+                    if column is None:
+                        column = values[name] = [np.nan] * size
+                        units[name] = [-1] * size
+                    column[i] = value[0]
+                    units[name][i] = value[1] if value[1] is not None else -1
+        except (IndexError, TypeError, ValueError) as e:
+            errors[i] = "Invalid dataset: " + str(e)
+
+    return CompiledBatch(
+        size, vocabulary,
+        {name: np.array(column, dtype=np.float64) for name, column in values.items()},
+        {name: np.array(column, dtype=np.int64) for name, column in units.items()},
+        {name: np.array(column, dtype=np.intp) for name, column in first.items()},
+        {name: _Entries(*lists) for name, lists in entries.items()},
+        errors)
+
+
+def _round(values, digits=2):
+    """Rounds like the built-in round(), which rounds the exact decimal value of a float.
+
+    np.round() scales the values first and can therefore round values, that are very close to a tie, into the other
+    direction. Those few values are rounded with round() instead.
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    with np.errstate(invalid="ignore"):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-9 * np.maximum(1, np.abs(scaled))
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), digits)
+    return rounded
+
+
+def _sum(columns):
+    """Sums up the columns one after another, like the built-in sum() does for scalars."""
+    total = 0
+    for column in columns:
+        total = total + column
+    return total
+
+
+def _entry_sum(size, rows, terms):
+    """Adds up the terms of all entries per dataset in input order."""
+    total = np.zeros(size)
+    np.add.at(total, rows, terms)
+    return total
+
+
+def evaluate(batch, factors, round_results=True):
+    """Calculates the co2 and h2o footprints for all datasets of a compiled batch.
+
+    Args:
+        batch: CompiledBatch
+        factors: FactorTable or FactorMatrix with one or batch.size rows
+        round_results: if False, the categories and normalized footprints are not rounded to 2 decimal places
+
+    Returns:
+        results: dictionary of result name -> array with one value per dataset (NaN for datasets with errors)
+        errors: list with an error message or None for every dataset
+    """
+
+    if isinstance(factors, FactorTable):
+        factors = FactorMatrix.from_table(factors)
+    n = batch.size
+    errors = list(batch.errors)
+
+    def fail(mask, message):
+        for i in np.flatnonzero(mask):
+            if errors[i] is None:
+                errors[i] = message
+
+    def factor(kind, name):
+        return factors.column(kind, name)
+
+    def table(mapping, width):
+        # factor names become factor columns, options without an entry use the NaN column
+        known, columns = batch.table(mapping, width)
+        for i, column in enumerate(columns):
+            # decided by the mapping, since a small batch may select none of the options with a factor
+            if any(isinstance(coefficients[i], str) for coefficients in mapping.values()):
+                columns[i] = np.array([factors.index(value) if isinstance(value, str) else len(factors.names)
+                                       for value in column], dtype=np.intp)
+        return known, columns
+
+    def lookup(option_group_name, mapping, width):
+        # coefficients of the selected option of every dataset
+        known, columns = table(mapping, width)
+        codes = batch.selection(option_group_name)
+        return known[codes], [column[codes] for column in columns]
+
+    def entry_lookup(entries, mapping, width):
+        # coefficients of the option of every entry
+        known, columns = table(mapping, width)
+        return known[entries.options], [column[entries.options] for column in columns]
+
+    def gathered(kind, rows, columns):
+        return factors.gather(kind, rows, columns)
+
+    def m(name):
+        return batch.measurement(name)
+
+    with np.errstate(all="ignore"):
+        all_rows = np.arange(n)
+
+        # helping values
+        kultur_beginn, kultur_ende = m("KulturBeginn"), m("KulturEnde")
+        culture_length = np.where(kultur_ende > kultur_beginn, np.round(kultur_ende - kultur_beginn, 0),
+                                  (52 - np.round(kultur_beginn, 0)) + np.round(kultur_ende, 0))
+        nebenkultur_beginn, nebenkultur_ende = m("NebenkulturBeginn"), m("NebenkulturEnde")
+        side_culture_length = np.where(
+            nebenkultur_ende > nebenkultur_beginn, np.round(nebenkultur_ende - nebenkultur_beginn, 0),
+            np.where(nebenkultur_beginn != 0, (52 - np.round(nebenkultur_beginn, 0)) + np.round(nebenkultur_ende, 0), 0))
+        culture_length_usage = culture_length / (culture_length + side_culture_length)
+
+        lighting_used = batch.selected("Zusatzbelichtung", "ja") & batch.selected("Belichtungsstrom", "nein")
+        energyconsumption_lighting = np.where(
+            lighting_used,
+            np.where(m("Belichtung:Stromverbrauch") > 0, m("Belichtung:Stromverbrauch"),
+                     m("Belichtung:AnzahlLampen") * m("Belichtung:AnschlussleistungProLampe") *
+                     m("Belichtung:LaufzeitProJahr") / 1000),
+            0)
+        stromherkunft = batch.entries_of("Stromherkunft")
+        energyconsumption_company = _entry_sum(n, stromherkunft.rows, stromherkunft.values)
+
+        gh_size = np.where(m("GWHFlaeche") > 0, m("GWHFlaeche"), m("Laenge") * m("Breite"))
+        culture_size = np.where(m("Nutzflaeche") > 0, m("Nutzflaeche"), gh_size - (m("Vorwegbreite") * m("Breite")))
+
+        venlo = batch.selected("GWHArt", "Venlo")
+        deutsche_norm = batch.selected("GWHArt", "Deutsche Norm")
+        folientunnel = batch.selected("GWHArt", "Folientunnel")
+        fail(~(venlo | deutsche_norm | folientunnel), 'No valid option for gwhArt has been selected')
+        laenge, breite = m("Laenge"), m("Breite")
+        stehwandhoehe, scheibenlaenge, kappenbreite = m("Stehwandhoehe"), m("Scheibenlaenge"), m("Kappenbreite")
+        hull_size_wall = np.where(
+            venlo,
+            (laenge + breite) * 2 * stehwandhoehe + ((((np.sqrt(np.abs((scheibenlaenge ** 2) - (kappenbreite / 2) ** 2))) *
+                                                      kappenbreite) / 2) * (breite / kappenbreite)),
+            np.where(deutsche_norm, laenge * breite * stehwandhoehe, 0))
+        hull_size_roof = np.where(venlo, scheibenlaenge * laenge * (breite / kappenbreite * 2),
+                                  np.where(deutsche_norm, scheibenlaenge * laenge * 2, 0))
+        hull_size_total = np.where(folientunnel, breite * math.pi / 2 * laenge, hull_size_wall + hull_size_roof)
+
+        row_count = m("SnackReihenanzahl") + m("CocktailReihenanzahl") + m("RispenReihenanzahl") + m("FleischReihenanzahl")
+        row_length = laenge - m("Vorwegbreite")
+        row_length_total = row_length * row_count
+        walk_length_total = (row_count - 1) * row_length
+
+        def fruit_count(option_group_name, prefix):
+            return np.where(batch.selected(option_group_name, "ja"),
+                            m(prefix + "Reihenanzahl") * row_length / m(prefix + "PflanzenabstandInDerReihe"), 0)
+
+        snack_count = fruit_count("10-30Gramm(Snack)", "Snack")
+        cocktail_count = fruit_count("30-100Gramm(Cocktail)", "Cocktail")
+        rispen_count = fruit_count("100-150Gramm(Rispen)", "Rispen")
+        fleisch_count = fruit_count(">150Gramm(Fleisch)", "Fleisch")
+        plant_count_total = snack_count + cocktail_count + rispen_count + fleisch_count
+        snack_shoots_count = snack_count * m("SnackTriebzahl")
+        cocktail_shoots_count = cocktail_count * m("CocktailTriebzahl")
+        rispen_shoots_count = rispen_count * m("RispenTriebzahl")
+        fleisch_shoots_count = fleisch_count * m("FleischTriebzahl")
+        shoots_count_total = snack_shoots_count + cocktail_shoots_count + rispen_shoots_count + fleisch_shoots_count
+        cord_length_total = m("SchnuereRankhilfen:Laenge") * shoots_count_total
+        clips_count_total = m("Klipse:AnzahlProTrieb") * shoots_count_total
+        panicle_hanger_count_total = rispen_shoots_count * m("Rispenbuegel:AnzahlProTrieb") + \
+            fleisch_shoots_count * m("Rispenbuegel:AnzahlProTrieb")
+        total_harvest = m("SnackErtragJahr") + m("CocktailErtragJahr") + m("RispenErtragJahr") + m("FleischErtragJahr")
+
+        energietraeger = batch.entries_of("Energietraeger")
+        bhkw_entries = (energietraeger.options == batch.code("BHKW Erdgas")) | \
+                       (energietraeger.options == batch.code("BHKW Biomethan"))
+        bhkw_usage = np.zeros(n, dtype=bool)
+        bhkw_usage[energietraeger.rows[bhkw_entries]] = True
+
+        results = dict()
+        u = culture_length_usage
+
+        # greenhouse construction
+        stehwandmaterial_known, (stehwand_coefficient, stehwand_age, stehwand_factor) = \
+            lookup("Stehwandmaterial", _WALL_MATERIALS, 3)
+        bedachung_known, (bedachung_coefficient, bedachung_age, bedachung_factor) = \
+            lookup("Bedachungsmaterial", _ROOF_MATERIALS, 3)
+        stehwand_coefficient, bedachung_coefficient = stehwand_coefficient.astype(float), bedachung_coefficient.astype(float)
+        alter_stehwand, alter_bedachung, gwh_alter = m("AlterStehwandmaterial"), m("AlterBedachungsmaterial"), m("GWHAlter")
+        venlo_or_norm = venlo | deutsche_norm
+        fail(venlo_or_norm & ~stehwandmaterial_known, 'No valid option for Stehwandmaterial has been selected')
+        fail(venlo_or_norm & ~bedachung_known, 'No valid option for Bedachungsmaterial has been selected')
+        einfachfolie = batch.selected("Bedachungsmaterial", "Einfachfolie")
+
+        frame_used = venlo_or_norm & (gwh_alter <= 20)
+        beton = gh_size * np.where(venlo, 2.52032, 2.52) * u
+        stahl = gh_size * 0.55 * u
+        aluminium = gh_size * np.where(venlo, 0.125, 0.015) * u
+        stehwand = hull_size_wall * stehwand_coefficient * u
+        stehwand_used = venlo_or_norm & stehwandmaterial_known & (alter_stehwand <= stehwand_age.astype(float))
+        bedachung = hull_size_wall * bedachung_coefficient * u
+        bedachung_used = venlo_or_norm & bedachung_known & (alter_bedachung <= bedachung_age.astype(float))
+        tunnel_foil_used = folientunnel & (alter_bedachung <= 5)
+        lpde = hull_size_total * np.where(einfachfolie, 0.06, 0.14) * u
+        tunnel_steel_used = folientunnel & np.where(einfachfolie, gwh_alter <= 20, alter_bedachung <= 5)
+        tunnel_steel = gh_size * np.where(einfachfolie, 0.13, 0.195) * u
+
+        for kind in ("co2", "h2o"):
+            beton_result = np.where(frame_used, beton * factor(kind, "beton"), 0)
+            stahl_result = np.where(frame_used, stahl * factor(kind, "stahl"), 0)
+            stahl_result = np.where(tunnel_steel_used, tunnel_steel * np.where(
+                einfachfolie, factor(kind, "stahl"), factor(kind, "stahl_doppelfolie")), stahl_result)
+            aluminium_result = np.where(frame_used, aluminium * factor(kind, "aluminium"), 0)
+            lpde_result = np.where(tunnel_foil_used, lpde * np.where(
+                einfachfolie, factor(kind, "lpde"), factor(kind, "lpde_doppelfolie")), 0)
+            stehwand_result = np.where(stehwand_used, stehwand * gathered(kind, all_rows, stehwand_factor), 0)
+            bedachung_result = np.where(bedachung_used, bedachung * gathered(kind, all_rows, bedachung_factor), 0)
+            results["konstruktion_" + kind] = beton_result + stahl_result + aluminium_result + lpde_result + \
+                stehwand_result + bedachung_result
+
+        # energy screen
+        energieschirm_used = (m("AlterEnergieschirm") <= 10) & batch.selected("Energieschirm", "ja")
+        energieschirm_known, (energieschirm_coefficient, energieschirm_factor) = \
+            lookup("EnergieschirmTyp", _ENERGY_SCREENS, 2)
+        fail(energieschirm_used & ~energieschirm_known, 'No valid option for Energieschirm has been selected')
+        energieschirm = gh_size * energieschirm_coefficient.astype(float) * u
+        energieschirm_used = energieschirm_used & energieschirm_known
+        for kind in ("co2", "h2o"):
+            results["energieschirm_" + kind] = np.where(
+                energieschirm_used, energieschirm * gathered(kind, all_rows, energieschirm_factor), 0)
+
+        # ground cover
+        bodenabdeckung = batch.entries_of("Bodenabdeckung")
+        bodenabdeckung_known, (bodenabdeckung_coefficient, bodenabdeckung_age, bodenabdeckung_factor) = \
+            entry_lookup(bodenabdeckung, _GROUND_COVERS, 3)
+        fail(np.isin(all_rows, bodenabdeckung.rows[~bodenabdeckung_known]),
+             'No valid option for Bodenabdeckung has been selected')
+        bodenabdeckung_used = bodenabdeckung_known & (bodenabdeckung.values <= bodenabdeckung_age.astype(float))
+        rows = bodenabdeckung.rows[bodenabdeckung_used]
+        amount = culture_size[rows] * bodenabdeckung_coefficient[bodenabdeckung_used].astype(float)
+        for kind in ("co2", "h2o"):
+            results["bodenabdeckung_" + kind] = _entry_sum(
+                n, rows, amount * gathered(kind, rows, bodenabdeckung_factor[bodenabdeckung_used]))
+
+        # production system
+        produktionssystem_checked = (m("AlterProduktionssystem") <= 15) & \
+            ~(batch.selected("Produktionssystem", "Boden") | batch.selected("Produktionstyp", "Biologisch"))
+        hydroponik = batch.selected("Produktionssystem", "Hydroponik offen") | \
+            batch.selected("Produktionssystem", "Hydroponik geschlossen")
+        fail(produktionssystem_checked & ~hydroponik, 'No valid option for Produktionssystem has been selected')
+        produktionssystem = row_length_total * 2 * 0.133333333
+        for kind in ("co2", "h2o"):
+            results["produktionssystem_" + kind] = np.where(
+                produktionssystem_checked & hydroponik,
+                produktionssystem * factor(kind, "produktionssystem_hydroponik"), 0)
+
+        # heating system
+        heizsystem_checked = m("AlterHeizsystem") <= 20
+        heizsystem_known, (heizsystem_formula,) = lookup("Heizsystem", _HEATING_SYSTEMS, 1)
+        fail(heizsystem_checked & ~heizsystem_known, 'No valid option for Heizsystem has been selected')
+        pipe_heating = walk_length_total * 0.135 * 2.7 * u
+        convection_heating = laenge * 0.8 * 2 * 7 * 0.466666667 * u
+        heizsystem = np.where(heizsystem_formula == 0, pipe_heating,
+                              np.where(heizsystem_formula == 1, convection_heating, 0)).astype(float)
+        heizsystem_used = heizsystem_checked & heizsystem_known & (heizsystem_formula != 2)
+
+        zusaetzliches_heizsystem_checked = batch.selected("ZusaetzlichesHeizsystem", "ja")
+        zusaetzliches_heizsystem_known, (zusaetzliches_heizsystem_formula, zusaetzliches_heizsystem_age) = \
+            lookup("ZusaetzlichesHeizsystemTyp", _ADDITIONAL_HEATING_SYSTEMS, 2)
+        fail(zusaetzliches_heizsystem_checked & ~zusaetzliches_heizsystem_known &
+             ~batch.selected("Heizsystem", "Deckenlufterhitzer"),
+             'No valid option for ZusaetzlichesHeizsystem has been selected')
+        zusaetzliches_heizsystem = np.where(
+            zusaetzliches_heizsystem_formula == 0, pipe_heating,
+            np.where(zusaetzliches_heizsystem_formula == 1, convection_heating,
+                     row_length_total * 2 * 0.133333333 * u)).astype(float)
+        zusaetzliches_heizsystem_used = zusaetzliches_heizsystem_checked & zusaetzliches_heizsystem_known & \
+            (m("AlterZusaetzlichesHeizsystem") <= zusaetzliches_heizsystem_age.astype(float))
+        for kind in ("co2", "h2o"):
+            results["heizsystem_" + kind] = np.where(heizsystem_used, heizsystem * factor(kind, "heizsystem"), 0)
+            results["zusaetzliches_heizsystem_" + kind] = np.where(
+                zusaetzliches_heizsystem_used, zusaetzliches_heizsystem * factor(kind, "heizsystem"), 0)
+
+        # irrigation
+        bewaesserung_known, (bewaesserung_factor,) = lookup("Bewaesserungsart", _IRRIGATIONS, 1)
+        fail(~bewaesserung_known, 'No valid option for Bewaesserungsart has been selected')
+        bewaesserung = np.where(
+            batch.selected("Bewaesserungsart", "Tropfschlaeuche"), ((row_length_total + breite) * 1.36 / 100) / 10,
+            np.where(batch.selected("Bewaesserungsart", "Bodensprinkler"), ((row_length_total / 3 + breite) * 4 / 30) / 15,
+                     (np.sqrt(np.abs(gh_size * 2.5)) * 4 / 30) / 15))
+        for kind in ("co2", "h2o"):
+            results["bewaesserung_" + kind] = np.where(
+                bewaesserung_known, bewaesserung * gathered(kind, all_rows, bewaesserung_factor), 0)
+
+        # heat energy
+        fail(np.isin(all_rows, energietraeger.rows[energietraeger.units != batch.code("kWh")]),
+             'Energietraeger value unit has not been converted to kWh!')
+        energietraeger_known, (energietraeger_factor,) = entry_lookup(energietraeger, _ENERGY_SOURCES, 1)
+        fail(np.isin(all_rows, energietraeger.rows[~energietraeger_known]),
+             'No valid option for Energietraeger has been selected')
+        waermeteilung = np.where(batch.selected("Waermeversorgung", "ja"), m("GWHFlaeche") / m("WaermeteilungFlaeche"), 1)
+        for kind in ("co2", "h2o"):
+            energietraeger_result = _entry_sum(
+                n, energietraeger.rows, energietraeger.values * gathered(kind, energietraeger.rows, energietraeger_factor))
+            results["energietraeger_" + kind] = np.where(batch.selected("Waermeversorgung", "ja"),
+                                                         energietraeger_result * waermeteilung, energietraeger_result)
+
+        # electric power, every power source is assigned and not added up, so the last selection of a source counts
+        fail(np.isin(all_rows, stromherkunft.rows[stromherkunft.units != batch.code("kWh")]),
+             'Stromherkunft value unit has not been converted to kWh!')
+        stromherkunft_known, (stromherkunft_slot, _) = entry_lookup(stromherkunft, _POWER_SOURCES, 2)
+        fail(np.isin(all_rows, stromherkunft.rows[~stromherkunft_known]),
+             'No valid option for Stromherkunft has been selected')
+        slots = len(_POWER_SLOTS)
+        strom_rows = stromherkunft.rows[stromherkunft_known]
+        strom_slots = stromherkunft_slot[stromherkunft_known].astype(np.intp)
+        keys = (strom_rows * slots + strom_slots)[::-1]
+        _, last = np.unique(keys, return_index=True)
+        last = len(keys) - 1 - last
+        strom_menge = np.zeros((n, slots))
+        strom_menge[strom_rows[last], strom_slots[last]] = stromherkunft.values[stromherkunft_known][last]
+        strom_present = np.zeros((n, slots), dtype=bool)
+        strom_present[strom_rows[last], strom_slots[last]] = True
+
+        tiefengeothermie_heat = np.zeros(n, dtype=bool)
+        tiefengeothermie_heat[energietraeger.rows[energietraeger.options == batch.code("Tiefengeothermie")]] = True
+        for kind in ("co2", "h2o"):
+            strom = 0
+            for slot, name in enumerate(_POWER_SLOTS):
+                strom_factor = factor(kind, name)
+                menge = strom_menge[:, slot]
+                source = np.where(strom_present[:, slot], menge * u * strom_factor, 0)
+                anteil = np.where(strom_present[:, slot], menge / energyconsumption_company, 0)
+                source = np.where(lighting_used, source + (energyconsumption_lighting * anteil * strom_factor), source)
+                if name == "tiefengeothermie":
+                    source = np.where(tiefengeothermie_heat, 0, source)
+                elif name in ("erdgas", "biomethan"):
+                    source = np.where(bhkw_usage, 0, source)
+                strom = strom + source
+            results["strom_" + kind] = strom
+
+        # direct water usage
+        vorlaufmenge = batch.entries_of("VorlaufmengeAnteile")
+        wasser_used = batch.selected("WasserVerbrauch", "ja")
+        vorlaufmenge_checked = wasser_used[vorlaufmenge.rows]
+        fail(np.isin(all_rows, vorlaufmenge.rows[vorlaufmenge_checked & (vorlaufmenge.units != batch.code("Liter"))]),
+             'VorlaufmengeAnteile value unit has not been converted to Liter!')
+        vorlaufmenge_known, (vorlaufmenge_slot, vorlaufmenge_factor) = entry_lookup(vorlaufmenge, _WATER_SOURCES, 2)
+        fail(np.isin(all_rows, vorlaufmenge.rows[vorlaufmenge_checked & ~vorlaufmenge_known]),
+             'No valid option for VorlaufmengeAnteile has been selected')
+        vorlaufmenge_used = vorlaufmenge_checked & vorlaufmenge_known
+        rows = vorlaufmenge.rows[vorlaufmenge_used]
+        menge = vorlaufmenge.values[vorlaufmenge_used]
+        menge = menge - m("Restwasser")[rows] * menge / m("VorlaufmengeGesamt")[rows]
+        menge = np.where(menge < 0, 0, menge)
+        water_slots = vorlaufmenge_slot[vorlaufmenge_used]
+        water_factors = vorlaufmenge_factor[vorlaufmenge_used]
+        for kind in ("co2", "h2o"):
+            terms = menge * gathered(kind, rows, water_factors)
+            for option_value, (slot, name) in _WATER_SOURCES.items():
+                in_slot = water_slots == slot
+                results[name + "_" + kind] = _entry_sum(n, rows[in_slot], terms[in_slot])
+
+        # added co2
+        co2_herkunft = batch.entries_of("CO2-Herkunft")
+        fail(np.isin(all_rows, co2_herkunft.rows[co2_herkunft.units != batch.code("kg")]),
+             'CO2-Herkunft value unit has not been converted to kg!')
+        co2_herkunft_known, (co2_herkunft_factor,) = entry_lookup(co2_herkunft, _CO2_SOURCES, 1)
+        fail(np.isin(all_rows, co2_herkunft.rows[~co2_herkunft_known]),
+             'No valid option for CO2-Herkunft has been selected')
+        for kind in ("co2", "h2o"):
+            results["co2_zudosierung_" + kind] = _entry_sum(
+                n, co2_herkunft.rows, co2_herkunft.values * gathered(kind, co2_herkunft.rows, co2_herkunft_factor))
+
+        # fertilizer
+        einfach = batch.entries_of("Duengemittel:VereinfachteAngabe")
+        einfach_known, (einfach_factor,) = entry_lookup(einfach, _SIMPLE_FERTILIZERS, 1)
+        fail(np.isin(all_rows, einfach.rows[~einfach_known]),
+             'No valid option for Duengemittel:VereinfachteAngabe has been selected')
+        detailliert = batch.entries_of("Duengemittel:DetaillierteAngabe")
+        detailliert_known, (detailliert_factor,) = entry_lookup(detailliert, _DETAILED_FERTILIZERS, 1)
+        fail(np.isin(all_rows, detailliert.rows[~detailliert_known]),
+             'No valid option for Duengemittel:DetaillierteAngabe has been selected')
+        for kind in ("co2", "h2o"):
+            einfach_result = _entry_sum(n, einfach.rows, einfach.values * gathered(kind, einfach.rows, einfach_factor))
+            detailliert_result = _entry_sum(
+                n, detailliert.rows, detailliert.values * gathered(kind, detailliert.rows, detailliert_factor))
+            results["duengemittel_" + kind] = detailliert_result + einfach_result
+
+        # crop protection
+        fungizide = (m("FungizideKg") + m("FungizideLiter"))
+        insektizide = (m("InsektizideKg") + m("InsektizideLiter"))
+        for kind in ("co2", "h2o"):
+            results["psm_" + kind] = fungizide * factor(kind, "fungizide") + insektizide * factor(kind, "insektizide")
+
+        # plant bags and substrate
+        growbags_used = batch.selected("GrowbagsKuebel", "Growbags")
+        kuebel_used = batch.selected("GrowbagsKuebel", "Andere Kulturgefaesse (Topf, Kuebel)")
+        nichts = batch.selected("GrowbagsKuebel", "nichts")
+        fail(~(growbags_used | kuebel_used | nichts), 'No valid option for GrowbagsKuebel has been selected')
+        kuebel_nutzdauer = np.where(m("Kuebel:Alter") <= 0, 1, m("Kuebel:Alter"))
+        growbags = ((row_length_total * 0.2 * 2 + row_length_total * 0.11 * 2 + row_length_total / 1 * 2 * (0.15 * 0.11)) *
+                    0.186)
+        kuebel_calc = (0.03 * m("Kuebel:VolumenProTopf") - 0.0214)
+        kuebel_calc = np.where(kuebel_calc <= 0, 0.01, kuebel_calc)
+        kuebel = (kuebel_calc * plant_count_total) / m("Kuebel:JungpflanzenProTopf") / kuebel_nutzdauer
+        for kind in ("co2", "h2o"):
+            results["pflanzenbehaelter_" + kind] = np.where(
+                growbags_used, growbags * factor(kind, "growbags"),
+                np.where(kuebel_used, kuebel * factor(kind, "andere_kulturgefaesse"), 0))
+
+        volumen = np.where(growbags_used, row_length_total * 2 * 0.11,
+                           np.where(kuebel_used, m("Kuebel:VolumenProTopf") / m("Kuebel:JungpflanzenProTopf") *
+                                    plant_count_total, 0))
+        substrat = batch.entries_of("Substrat")
+        substrat_checked = ~nichts[substrat.rows]
+        substrat_known, (substrat_factor,) = entry_lookup(substrat, _SUBSTRATES, 1)
+        fail(np.isin(all_rows, substrat.rows[substrat_checked & ~substrat_known]),
+             'No valid option for Substrat has been selected')
+        substrat_used = substrat_checked & substrat_known
+        rows = substrat.rows[substrat_used]
+        for kind in ("co2", "h2o"):
+            results["substrat_" + kind] = _entry_sum(
+                n, rows, (volumen[rows] * gathered(kind, rows, substrat_factor[substrat_used])) /
+                substrat.values[substrat_used])
+
+        # young plants
+        jungpflanzen_known, (jungpflanzen_factor,) = lookup("Jungpflanzen:Substrat", _SUBSTRATES, 1)
+        fail(~jungpflanzen_known, 'No valid option for Jungpflanzen:Substrat has been selected')
+        jungpflanzen_volumen = (0.1 * 0.1 * 0.1) * plant_count_total
+        transport_used = ~batch.is_default("Jungpflanzen:Distanz")
+        young_plants_transport = plant_count_total / 1056 * 0.5 * m("Jungpflanzen:Distanz")
+        for kind in ("co2", "h2o"):
+            results["jungpflanzen_substrat_" + kind] = np.where(
+                jungpflanzen_known, jungpflanzen_volumen * gathered(kind, all_rows, jungpflanzen_factor), 0)
+        results["jungpflanzen_transport_co2"] = np.where(
+            transport_used, young_plants_transport * factor("co2", "transport"), 0)
+        # for h2o it is a constant value
+        results["jungpflanzen_transport_h2o"] = np.where(transport_used, factor("h2o", "transport"), 0)
+
+        # cords
+        schnur_used = batch.selected("Schnur", "ja")
+        fail(~(schnur_used | batch.selected("Schnur", "nein")), 'No valid option for Schnur has been selected')
+        schnur_known, (schnur_multiplier, schnur_divisor, schnur_factor) = \
+            lookup("SchnuereRankhilfen:Material", _CORD_MATERIALS, 3)
+        fail(schnur_used & ~schnur_known, 'No valid option for SchnuereRankhilfen:Material has been selected')
+        schnur_nutzdauer = np.where(batch.is_default("SchnuereRankhilfen:Wiederverwendung"), 1,
+                                    m("SchnuereRankhilfen:Wiederverwendung"))
+        schnuere = (cord_length_total * schnur_multiplier.astype(float) / schnur_divisor.astype(float)) / schnur_nutzdauer
+        schnur_used = schnur_used & schnur_known
+
+        # clips
+        klipse_used = batch.selected("Klipse", "ja")
+        fail(~(klipse_used | batch.selected("Klipse", "nein")), 'No valid option for Klipse has been selected')
+        klipse_known, (klipse_coefficient, klipse_factor) = lookup("Klipse:Material", _CLIP_MATERIALS, 2)
+        fail(klipse_used & ~klipse_known, 'No valid option for Klipse:Material has been selected')
+        klipse_nutzdauer = np.where(batch.is_default("Klipse:Wiederverwendung"), 1, m("Klipse:Wiederverwendung"))
+        klipse = (clips_count_total * klipse_coefficient.astype(float)) / klipse_nutzdauer
+        klipse_used = klipse_used & klipse_known
+
+        # panicle hangers
+        rispenbuegel_used = batch.selected("Rispenbuegel", "ja")
+        fail(~(rispenbuegel_used | batch.selected("Rispenbuegel", "nein")),
+             'No valid option for Rispenbuegel has been selected')
+        rispenbuegel_known, (rispenbuegel_coefficient, rispenbuegel_factor) = \
+            lookup("Rispenbuegel:Material", _PANICLE_HANGER_MATERIALS, 2)
+        fail(rispenbuegel_used & ~rispenbuegel_known, 'No valid option for Rispenbuegel:Material has been selected')
+        rispenbuegel = (panicle_hanger_count_total * rispenbuegel_coefficient.astype(float)) / \
+            m("Rispenbuegel:Wiederverwendung")
+        rispenbuegel_used = rispenbuegel_used & rispenbuegel_known
+
+        for kind in ("co2", "h2o"):
+            results["schnuere_" + kind] = np.where(schnur_used, schnuere * gathered(kind, all_rows, schnur_factor), 0)
+            results["klipse_" + kind] = np.where(klipse_used, klipse * gathered(kind, all_rows, klipse_factor), 0)
+            results["rispenbuegel_" + kind] = np.where(
+                rispenbuegel_used, rispenbuegel * gathered(kind, all_rows, rispenbuegel_factor), 0)
+
+        # packaging
+        verpackung = batch.entries_of("Verpackungsmaterial")
+        verpackung_known, (verpackung_factor,) = entry_lookup(verpackung, _PACKAGING_MATERIALS, 1)
+        fail(np.isin(all_rows, verpackung.rows[~verpackung_known]),
+             'No valid option for Verpackungsmaterial has been selected')
+        mehrwegsteigen_used = ~batch.is_default("Verpackungsmaterial:AnzahlMehrwegsteigen")
+        for kind in ("co2", "h2o"):
+            verpackung_result = _entry_sum(
+                n, verpackung.rows, verpackung.values * gathered(kind, verpackung.rows, verpackung_factor))
+            results["verpackung_" + kind] = np.where(
+                mehrwegsteigen_used,
+                verpackung_result + (m("Verpackungsmaterial:AnzahlMehrwegsteigen") / 50 *
+                                     factor(kind, "verpackung_mehrwegsteigen")),
+                verpackung_result)
+
+        # other consumables
+        sonstige = batch.entries_of("SonstigeVerbrauchsmaterialien")
+        sonstige_known, (sonstige_factor,) = entry_lookup(sonstige, _OTHER_CONSUMABLES, 1)
+        fail(np.isin(all_rows, sonstige.rows[~sonstige_known]),
+             'No valid option for SonstigeVerbrauchsmaterialien has been selected')
+        sonstige_nutzdauer = np.where(sonstige.values2 == 0, 1, sonstige.values2)
+        for kind in ("co2", "h2o"):
+            results["sonstige_verbrauchsmaterialien_" + kind] = _entry_sum(
+                n, sonstige.rows, sonstige.values * gathered(kind, sonstige.rows, sonstige_factor) / sonstige_nutzdauer)
+
+        # totals
+        round_to_2 = _round if round_results else (lambda values: values)
+        for kind, names in (("co2", CO2_RESULTS), ("h2o", H2O_RESULTS)):
+            for name in names:
+                results[name] = round_to_2(np.broadcast_to(np.asarray(results[name], dtype=np.float64), (n,)).copy())
+            footprint = _sum(results[name] for name in names)
+            results[kind + "_footprint"] = footprint
+            results[kind + "_footprint_norm_kg"] = round_to_2(footprint / total_harvest)
+            results[kind + "_footprint_norm_m2"] = round_to_2(footprint / gh_size)
+        direct_h2o_footprint = results["regenwasser_h2o"] + results["brunnenwasser_h2o"] + \
+            results["stadtwasser_h2o"] + results["oberflaechenwasser_h2o"]
+        results["direct_h2o_footprint"] = direct_h2o_footprint
+        results["direct_h2o_footprint_norm_kg"] = direct_h2o_footprint / total_harvest
+        results["direct_h2o_footprint_norm_m2"] = direct_h2o_footprint / gh_size
+
+        # the scalar calculation raises an error for every division by zero
+        finite = np.ones(n, dtype=bool)
+        for name in RESULT_NAMES:
+            finite &= np.isfinite(results[name])
+        fail(~finite, 'Division by zero in the footprint calculation')
+
+    failed = np.array([error is not None for error in errors], dtype=bool)
+    for name in RESULT_NAMES:
+        results[name] = np.where(failed, np.nan, results[name])
+    return {name: results[name] for name in RESULT_NAMES}, errors
+
+
+def evaluate_records(records, factors, round_results=True):
+    """Compiles and evaluates resolved records in one step. This function can be sent to worker processes.
+
+    Args:
+        records: list of resolved greenhouse datasets
+        factors: FactorTable or FactorMatrix
+        round_results: if False, the categories and normalized footprints are not rounded
+
+    Returns:
+        results and errors, see evaluate()
+    """
+    return evaluate(compile_records(records), factors, round_results)
+
+
+def result_rows(results, errors):
+    """Turns the result arrays of evaluate() into one dictionary per dataset, like calc_footprints() returns it.
+
+    Args:
+        results: dictionary of result name -> array
+        errors: list of error messages
+
+    Returns:
+        list: dictionary of result name -> float for every dataset, None for datasets with errors
+    """
+    columns = {name: values.tolist() for name, values in results.items()}
+    return [None if error is not None else {name: values[i] for name, values in columns.items()}
+            for i, error in enumerate(errors)]
@@ -0,0 +1,157 @@
+"""
+    This file contains a cache for the footprint calculation.
+
+    Users often submit the same greenhouse data set again (e.g. after a validation error of another field or when an
+    unchanged data set is saved). The cache maps the input data of the serializer to the standardized data and the
+    calculated footprints, so that a repeated submission neither standardizes the units nor calculates again.
+
+    There are two tiers:
+        - an LRU cache in the memory of every process, its size is set by FOOTPRINT_CACHE_SIZE (default 256, 0
+          disables it)
+        - optionally a cache that is shared by all processes, FOOTPRINT_CACHE_ALIAS names an entry of the CACHES
+          setting (e.g. a DatabaseCache) and FOOTPRINT_CACHE_TIMEOUT sets the lifetime of its entries in seconds
+
+    The key is a hash of the input data, the active factor set and the reference tables, so changing any of them never
+    returns outdated results.
+
+"""
+import copy
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .factorSets import get_active_factors
+from .referenceCatalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
+# has to be increased whenever the calculation or the standardization is changed, otherwise the shared cache returns
+# results of the old code
+CACHE_FORMAT = 1
+
+# fields of the input data that do not influence the calculation
+IGNORED_FIELDS = ('greenhouse_name', 'date')
+
+
+class FootprintCache:
+    """This class is a thread-safe LRU cache with a fixed number of entries."""
+
+    def __init__(self, max_size):
+        """Creates an empty cache.
+
+        Args:
+            max_size: maximum number of entries, 0 disables the cache
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the entry of the key or None and marks the entry as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """Stores an entry and removes the least recently used entries, if the cache is full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = FootprintCache(getattr(settings, 'FOOTPRINT_CACHE_SIZE', 256))
+
+
+def _shared_cache():
+    """Returns the shared cache or None, if FOOTPRINT_CACHE_ALIAS is not set."""
+    alias = getattr(settings, 'FOOTPRINT_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def input_key(data, factors=None):
+    """Calculates the cache key of the input data of a greenhouse data set.
+
+    Args:
+        data: input data as returned by the serializer, before standardize_units() has been applied
+        factors: FactorTable with the co2 and h2o equivalents, defaults to the active factor set
+
+    Returns:
+        string: hash of the input data, the equivalents and the reference tables
+    """
+
+    factors = factors or get_active_factors()
+    inputs = {name: value for name, value in data.items() if name not in IGNORED_FIELDS}
+    content = json.dumps([CACHE_FORMAT, factors.version, factors.fingerprint, get_catalog().fingerprint, inputs],
+                         sort_keys=True, separators=(',', ':'), default=str)
+    return 'footprints:' + hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_cached_footprints(key, data):
+    """Returns the standardized data and the footprints of a key.
+
+    Args:
+        key: cache key of the input data, see input_key()
+        data: input data the key has been calculated for
+
+    Returns:
+        (standardized_data, calculation_result) or None, if the key is not cached
+    """
+
+    entry = local_cache.get(key)
+    if entry is None:
+        shared_cache = _shared_cache()
+        if shared_cache is not None:
+            try:
+                entry = shared_cache.get(key)
+            except Exception as e:
+                # the shared cache is only an optimization, the calculation still works without it
+                logger.warning("FootprintCache: shared cache error: %r", e)
+            if entry is not None:
+                local_cache.set(key, entry)
+    if entry is None:
+        return None
+
+    # the entries are shared by all requests, therefore every request gets its own copy
+    standardized_inputs, calculation_result = copy.deepcopy(entry)
+    standardized_data = {name: data[name] for name in IGNORED_FIELDS if name in data}
+    standardized_data.update(standardized_inputs)
+    return standardized_data, calculation_result
+
+
+def set_cached_footprints(key, standardized_data, calculation_result):
+    """Stores the standardized data and the footprints of a key in both tiers.
+
+    Args:
+        key: cache key of the input data, see input_key()
+        standardized_data: input data after standardize_units() has been applied
+        calculation_result: footprints calculated from the standardized data
+    """
+
+    standardized_inputs = {name: value for name, value in standardized_data.items() if name not in IGNORED_FIELDS}
+    entry = copy.deepcopy((standardized_inputs, dict(calculation_result)))
+    local_cache.set(key, entry)
+    shared_cache = _shared_cache()
+    if shared_cache is not None:
+        try:
+            shared_cache.set(key, entry, getattr(settings, 'FOOTPRINT_CACHE_TIMEOUT', 24 * 60 * 60))
+        except Exception as e:
+            logger.warning("FootprintCache: shared cache error: %r", e)
+
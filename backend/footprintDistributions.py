@@ -0,0 +1,277 @@
+"""
+    This file maintains the distributions of the normalized results over all data sets of a production type in the
+    FootprintDistributions table. There is one quantile sketch (see quantileSketch.py) per production type, result in
+    DISTRIBUTION_CALCULATIONS and normalization.
+
+    A data set is counted with the normalized values of its GreenhouseData.result_values (see resultValues.py). The
+    counted values are kept in GreenhouseData.distribution_values, so that they can be removed again:
+        update_footprint_distributions() is called whenever results of data sets have been stored, after the
+            transaction that has stored them has committed. It removes the counted values of the data sets from the
+            sketches and adds their current values.
+        Before a data set is deleted, its counted values are removed (pre_delete signal).
+    Data sets without a production type are not counted. The command rebuild_footprint_distributions builds all
+    sketches from scratch, e.g. for the data sets that have been stored before the distributions have been added.
+
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .footprintBatch import CO2_RESULTS, H2O_RESULTS
+from .models import Calculations, FootprintDistributions, GreenhouseData
+from .performerRankings import load_production_types, PRODUCTION_TYPES
+from .quantileSketch import QuantileSketch
+from .resultValues import load_result_values, RESULT_LAYOUT
+
+logger = logging.getLogger(__name__)
+
+DISTRIBUTION_CALCULATIONS = CO2_RESULTS + ("co2_footprint",) + H2O_RESULTS + ("h2o_footprint", "direct_h2o_footprint")
+NORMALIZATIONS = ("normalizedkg", "normalizedm2")
+
+
+def build_distribution_values(production_type, result_values):
+    """Builds the value of GreenhouseData.distribution_values for a data set.
+
+    Args:
+        production_type: option value of the production type of the data set or None
+        result_values: result values of the data set, see resultValues.py
+
+    Returns:
+        dictionary: {"production_type": <production type>, "normalizedkg": {<calculation_name>: <value>, ...},
+            "normalizedm2": {...}} or None, if the data set is not counted. Missing values are left out.
+    """
+
+    if production_type is None or result_values is None:
+        return None
+    distribution_values = {"production_type": production_type}
+    for normalization in NORMALIZATIONS:
+        values = dict(zip(RESULT_LAYOUT, result_values[normalization]))
+        distribution_values[normalization] = {name: values[name] for name in DISTRIBUTION_CALCULATIONS
+                                              if values.get(name) is not None}
+    return distribution_values
+
+
+def count_distribution_values(sketches, distribution_values, count):
+    """Adds (count=1) or removes (count=-1) the values of a data set to or from the sketches.
+
+    Args:
+        sketches: dictionary (production_type, calculation_name, normalization) -> QuantileSketch
+        distribution_values: counted values of the data set, see build_distribution_values()
+        count: 1 or -1
+    """
+
+    for key, value in distribution_keys(distribution_values).items():
+        _count_value(sketches[key], key, value, count)
+
+
+def distribution_keys(distribution_values):
+    """Returns the counted values of a data set per sketch.
+
+    Args:
+        distribution_values: counted values of the data set, see build_distribution_values(), or None
+
+    Returns:
+        dictionary: (production_type, calculation_name, normalization) -> value
+    """
+
+    if distribution_values is None:
+        return dict()
+    production_type = distribution_values["production_type"]
+    return {(production_type, name, normalization): value
+            for normalization in NORMALIZATIONS for name, value in distribution_values[normalization].items()}
+
+
+def _count_value(sketch, key, value, count):
+    """Adds (count=1) or removes (count=-1) one value of the sketch of key to or from it."""
+    try:
+        sketch.add(value, count)
+    except ValueError:
+        logger.warning("footprintDistributions: %s of %s is not in the distribution, "
+                       "run rebuild_footprint_distributions", key[2], key[1])
+
+
+def load_distributions(production_types):
+    """Loads the sketches of some production types.
+
+    Args:
+        production_types: option values of the production types
+
+    Returns:
+        dictionary: (production_type, calculation_name, normalization) -> QuantileSketch
+    """
+
+    return {(production_type, calculation_name, normalization): QuantileSketch.from_json(sketch)
+            for production_type, calculation_name, normalization, sketch in FootprintDistributions.objects
+            .filter(production_type__in=production_types)
+            .values_list('production_type', 'calculation__calculation_name', 'normalization', 'sketch')}
+
+
+def lock_distributions(keys=None):
+    """Locks FootprintDistributions rows inside of a transaction, missing rows are created with empty sketches.
+
+    The rows are always locked before the data sets, so that the changes of the counted values of a data set are
+    serialized with the changes of the sketches.
+
+    Args:
+        keys: (production_type, calculation_name, normalization) of the rows, None locks all rows
+
+    Returns:
+        dictionary: (production_type, calculation_name, normalization) -> FootprintDistributions row, it can contain
+            additional rows
+    """
+
+    calculations = Calculations.objects.in_bulk(DISTRIBUTION_CALCULATIONS, field_name='calculation_name')
+    rows = FootprintDistributions.objects.all()
+    if keys is None:
+        keys = {(production_type, name, normalization) for production_type in PRODUCTION_TYPES
+                for name in calculations for normalization in NORMALIZATIONS}
+    else:
+        rows = rows.filter(production_type__in={key[0] for key in keys},
+                           calculation__calculation_name__in={key[1] for key in keys},
+                           normalization__in={key[2] for key in keys})
+    existing = set(rows.values_list('production_type', 'calculation__calculation_name', 'normalization'))
+    FootprintDistributions.objects.bulk_create(
+        [FootprintDistributions(production_type=production_type, calculation=calculations[name],
+                                normalization=normalization, sketch=QuantileSketch().to_json())
+         for production_type, name, normalization in keys
+         if name in calculations and (production_type, name, normalization) not in existing],
+        ignore_conflicts=True)
+    # only the distribution rows are locked, not the joined calculations
+    return {(row.production_type, row.calculation.calculation_name, row.normalization): row
+            for row in rows.select_for_update(of=('self',)).select_related('calculation').order_by('id')}
+
+
+def save_distributions(rows, sketches):
+    """Writes the sketches into the locked FootprintDistributions rows.
+
+    Args:
+        rows: dictionary of lock_distributions()
+        sketches: dictionary (production_type, calculation_name, normalization) -> QuantileSketch
+    """
+
+    for key, sketch in sketches.items():
+        rows[key].sketch = sketch.to_json()
+    FootprintDistributions.objects.bulk_update([rows[key] for key in sketches], ['sketch'], batch_size=500)
+
+
+def _change_distributions(rows, changes):
+    """Applies changes of the counted values of data sets to the locked sketches, only the changed sketches are written.
+
+    Args:
+        rows: dictionary of lock_distributions()
+        changes: list of (old distribution values or None, new distribution values or None)
+    """
+
+    sketches = dict()
+    for old_values, new_values in changes:
+        old_keys = distribution_keys(old_values)
+        new_keys = distribution_keys(new_values)
+        for key in old_keys.keys() | new_keys.keys():
+            if old_keys.get(key) == new_keys.get(key):
+                continue
+            if key not in sketches:
+                sketches[key] = QuantileSketch.from_json(rows[key].sketch)
+            if key in old_keys:
+                _count_value(sketches[key], key, old_keys[key], -1)
+            if key in new_keys:
+                _count_value(sketches[key], key, new_keys[key], 1)
+    save_distributions(rows, sketches)
+
+
+def _load_distribution_values(greenhouse_data_ids, lock=False):
+    """Loads the counted and the current distribution values of some data sets.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+        lock (boolean): true, if the data sets are locked
+
+    Returns:
+        dictionary: greenhouse_data_id -> (counted distribution values, current distribution values), only the data
+            sets whose counted values are not the current ones
+    """
+
+    datasets = GreenhouseData.objects.filter(id__in=greenhouse_data_ids)
+    if lock:
+        datasets = datasets.select_for_update()
+    counted_values = dict(datasets.values_list('id', 'distribution_values'))
+    production_types = load_production_types(greenhouse_data_ids)
+    result_values = load_result_values(greenhouse_data_ids)
+    values = {greenhouse_data_id: (counted_values[greenhouse_data_id],
+                                   build_distribution_values(production_types.get(greenhouse_data_id),
+                                                             result_values.get(greenhouse_data_id)))
+              for greenhouse_data_id in counted_values}
+    return {greenhouse_data_id: change for greenhouse_data_id, change in values.items() if change[0] != change[1]}
+
+
+def update_footprint_distributions(greenhouse_data_ids):
+    """Updates the distributions with the stored results and production types of some data sets.
+
+    It has to be called outside of a transaction that has locked the data sets, see
+    update_footprint_distributions_on_commit(). Only the sketches of the production types of the data sets are locked.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows, whose results or production type have changed
+    """
+
+    while True:
+        changes = _load_distribution_values(greenhouse_data_ids)
+        if not changes:
+            return
+        # every sketch the data sets are or will be counted in is locked, so a concurrent change of the data sets
+        # always waits for at least one of the locked rows
+        keys = {key for change in changes.values() for values in change for key in distribution_keys(values)}
+        with transaction.atomic():
+            rows = lock_distributions(keys)
+            # the values are read again after the rows have been locked, they may have changed in the meantime
+            changes = _load_distribution_values(greenhouse_data_ids, lock=True)
+            if any(key not in rows for change in changes.values() for values in change
+                   for key in distribution_keys(values)):
+                continue
+            _change_distributions(rows, changes.values())
+            GreenhouseData.objects.bulk_update(
+                [GreenhouseData(id=greenhouse_data_id, distribution_values=new_values)
+                 for greenhouse_data_id, (_, new_values) in changes.items()], ['distribution_values'], batch_size=500)
+            return
+
+
+def update_footprint_distributions_on_commit(greenhouse_data_ids):
+    """Updates the distributions with some data sets, when the current transaction commits.
+
+    The data sets have been locked by the current transaction, so the distributions can not be updated inside of it.
+    An error does not undo the committed data sets, it is logged and the distributions are corrected by
+    rebuild_footprint_distributions.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows, whose results or production type have changed
+    """
+
+    def update():
+        try:
+            update_footprint_distributions(greenhouse_data_ids)
+        except Exception as e:
+            logger.warning("footprintDistributions: update of %s failed, run rebuild_footprint_distributions: %r",
+                           greenhouse_data_ids, e)
+
+    transaction.on_commit(update)
+
+
+@receiver(pre_delete, sender=GreenhouseData)
+def remove_distribution_values_on_delete(sender, instance, **kwargs):
+    """Signal receiver that removes the counted values of a data set from the distributions, before it is deleted."""
+    if instance.distribution_values is None:
+        return
+    while True:
+        counted_values = GreenhouseData.objects.filter(id=instance.id) \
+            .values_list('distribution_values', flat=True).first()
+        if counted_values is None:
+            return
+        with transaction.atomic():
+            rows = lock_distributions(set(distribution_keys(counted_values)))
+            # the counted values may have changed since they have been read, a change locks the same rows
+            if GreenhouseData.objects.filter(id=instance.id) \
+                    .values_list('distribution_values', flat=True).first() != counted_values:
+                continue
+            _change_distributions(rows, [(counted_values, None)])
+            return
@@ -0,0 +1,1681 @@
+"""
+    This file contains the footprint calculation itself.
+
+    The module does not import Django or the models. Everything the calculation needs is passed in: a resolved record
+    of the greenhouse dataset and a FactorTable with the co2 and h2o equivalents. This way the calculation can run in
+    worker processes (records and factor tables are picklable) and can be reused by batch jobs.
+
+    A resolved record is the standardized dataset (see standardizeUnits.py), in which every option group is a list of
+    (option_value, value, unit_name[, value2]) tuples instead of database ids. An option group without a selection is
+    an empty list. Measurements stay (value, unit_id) tuples.
+
+"""
+import hashlib
+import logging
+import math
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .instrumentation import is_tracing, record_values, span
+from .utils import default_value
+
+logger = logging.getLogger(__name__)
+
+# footprint categories in the order of the results, every category exists with the suffix _co2 and _h2o
+CATEGORIES = (
+    "konstruktion", "energieschirm", "bodenabdeckung", "produktionssystem", "heizsystem", "zusaetzliches_heizsystem",
+    "bewaesserung", "energietraeger", "strom", "brunnenwasser", "regenwasser", "stadtwasser", "oberflaechenwasser",
+    "co2_zudosierung", "duengemittel", "psm", "pflanzenbehaelter", "substrat", "jungpflanzen_substrat",
+    "jungpflanzen_transport", "schnuere", "klipse", "rispenbuegel", "verpackung", "sonstige_verbrauchsmaterialien",
+)
+
+
+class FactorTable:
+    """This class holds a read-only set of co2 and h2o equivalents.
+
+    The set is compiled once into dense vectors: .names contains every factor name in sorted order, .index maps a name
+    to its position and .co2.values/.h2o.values contain the equivalents at these positions (NaN, if a factor only
+    exists for the other kind). The scalar calculation reads the factors by name through .co2 and .h2o, the batch
+    calculation uses the vectors directly (see footprintBatch.FactorMatrix).
+
+    The version identifies the set, e.g. in cache keys or in stored results. The fingerprint identifies the values of
+    the equivalents.
+    """
+
+    def __init__(self, co2, h2o, version="builtin"):
+        """Compiles the equivalents into vectors.
+
+        Args:
+            co2: mapping of factor name to co2 equivalent
+            h2o: mapping of factor name to h2o equivalent
+            version: name of the factor set
+        """
+        self.version = version
+        self.names = tuple(sorted(set(co2) | set(h2o)))
+        self.index = MappingProxyType({name: i for i, name in enumerate(self.names)})
+        self.co2 = FactorVector(self.index, [float(co2.get(name, math.nan)) for name in self.names])
+        self.h2o = FactorVector(self.index, [float(h2o.get(name, math.nan)) for name in self.names])
+        self.fingerprint = hashlib.sha256(repr((sorted(co2.items()), sorted(h2o.items()))).encode()).hexdigest()
+
+    def __getstate__(self):
+        # only the plain dictionaries are sent to other processes, they compile the vectors themselves
+        return {"version": self.version, "co2": dict(self.co2), "h2o": dict(self.h2o)}
+
+    def __setstate__(self, state):
+        self.__init__(state["co2"], state["h2o"], state["version"])
+
+    def __repr__(self):
+        return "FactorTable(version=%r)" % self.version
+
+
+class FactorVector(Mapping):
+    """This class is the read-only vector of the co2 or h2o equivalents of a FactorTable.
+
+    It can be read like a dictionary of factor name -> equivalent. Factors that only exist for the other kind raise a
+    KeyError, like a missing key of a dictionary.
+    """
+
+    __slots__ = ("_index", "values")
+
+    def __init__(self, index, values):
+        self._index = index
+        self.values = tuple(values)
+
+    def __getitem__(self, name):
+        value = self.values[self._index[name]]
+        if value != value:
+            raise KeyError(name)
+        return value
+
+    def __iter__(self):
+        return (name for name, i in self._index.items() if self.values[i] == self.values[i])
+
+    def __len__(self):
+        return sum(1 for value in self.values if value == value)
+
+
+class CalculationStep:
+    """This class describes one function of the footprint calculation and the data it depends on.
+
+    The dependencies are used to calculate only the steps again, whose input fields or helping values have been
+    changed (see recalc_footprints()). They have to be kept up to date when a calculation function is changed.
+    """
+
+    def __init__(self, function, stage, results, inputs, helping_values=()):
+        """Stores the declaration of the step.
+
+        Args:
+            function: calculation function, it gets the helping values as second argument if it reads any of them
+            stage: name of the span that measures the duration of the step, see instrumentation.py
+            results: names of the results in the order in which the function returns them
+            inputs: names of the input fields (measurements and option groups) that the function reads
+            helping_values: names of the helping values that the function reads
+        """
+        self.function = function
+        self.stage = stage
+        self.results = tuple(results)
+        self.inputs = frozenset(inputs)
+        self.helping_values = frozenset(helping_values)
+
+    def calculate(self, record, helping_values, factors):
+        if self.helping_values:
+            return self.function(record, helping_values, factors)
+        return self.function(record, factors)
+
+    def depends_on(self, changed_inputs, changed_helping_values):
+        """Returns True, if the step reads one of the changed input fields or helping values."""
+        return not (self.inputs.isdisjoint(changed_inputs) and self.helping_values.isdisjoint(changed_helping_values))
+
+    def __repr__(self):
+        return "CalculationStep(%s)" % self.function.__name__
+
+
+def _selected(record, option_group_name):
+    """Returns the option_value of the (first) selected option of an option group or None, if nothing is selected."""
+    selection = record[option_group_name]
+    return selection[0][0] if selection else None
+
+
+def calc_footprints(record, factors):
+    """Function that calculates the co2 and h2o footprints for a greenhouse dataset.
+
+    This function calls multiple functions that calculate the footprints for each specific category.
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: FactorTable with the co2 and h2o equivalents
+
+    Returns:
+        dictionary contains the calculated footprints for both co2 and h2o
+    """
+
+    try:
+        with span("helping_values"):
+            helping_values = calc_helping_values(record)
+        category_results = calc_categories(record, helping_values, factors, CALCULATION_STEPS)
+    except Exception as e:
+        logger.info("Footprint calculation error: %s", e)
+        raise e
+
+    return calc_totals(category_results, helping_values)
+
+
+def recalc_footprints(old_record, new_record, old_results, factors):
+    """Function that recalculates the co2 and h2o footprints after a greenhouse dataset has been changed.
+
+    Only the calculation steps that read a changed input field or a changed helping value are calculated again. The
+    categories of all other steps are taken from the previous results, which have to be calculated with the same
+    factors. A step is calculated again as well, if one of its previous results is missing.
+
+    Args:
+        old_record: resolved greenhouse dataset of the previous results
+        new_record: resolved greenhouse dataset after the change
+        old_results: mapping of result name -> previous result, only the categories are used
+        factors: FactorTable with the co2 and h2o equivalents
+
+    Returns:
+        results: dictionary contains the calculated footprints for both co2 and h2o, same as calc_footprints()
+        recalculated: names of the categories that have been calculated again
+    """
+
+    try:
+        with span("helping_values"):
+            helping_values = calc_helping_values(new_record)
+            old_helping_values = calc_helping_values(old_record)
+        changed_inputs = {name for name in old_record.keys() | new_record.keys()
+                          if old_record.get(name) != new_record.get(name)}
+        changed_helping_values = {name for name, value in helping_values.items()
+                                  if old_helping_values.get(name) != value}
+        steps = [step for step in CALCULATION_STEPS
+                 if step.depends_on(changed_inputs, changed_helping_values)
+                 or any(name not in old_results for name in step.results)]
+        category_results = {name: old_results[name] for step in CALCULATION_STEPS if step not in steps
+                            for name in step.results}
+        category_results.update(calc_categories(new_record, helping_values, factors, steps))
+    except Exception as e:
+        logger.info("Footprint calculation error: %s", e)
+        raise e
+
+    recalculated = [category for category in CATEGORIES
+                    if any(category + "_co2" in step.results for step in steps)]
+    record_values("recalculated", {"categories": recalculated})
+    return calc_totals(category_results, helping_values), recalculated
+
+
+def calc_categories(record, helping_values, factors, steps):
+    """Calculates the footprints of the categories of the given calculation steps.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: helping values of the dataset, see calc_helping_values()
+        factors: FactorTable with the co2 and h2o equivalents
+        steps: CalculationSteps that are calculated
+
+    Returns:
+        dictionary: result name -> unrounded footprint, e.g. "konstruktion_co2"
+    """
+
+    category_results = dict()
+    for step in steps:
+        with span(step.stage):
+            results = dict(zip(step.results, step.calculate(record, helping_values, factors)))
+        record_values(step.function.__name__, results)
+        category_results.update(results)
+    return category_results
+
+
+def calc_totals(category_results, helping_values):
+    """Rounds the footprints of the categories and adds the total and normalized footprints.
+
+    Args:
+        category_results: result name -> footprint of every category, e.g. "konstruktion_co2"
+        helping_values: helping values of the dataset, see calc_helping_values()
+
+    Returns:
+        dictionary contains the calculated footprints for both co2 and h2o
+    """
+
+    # round every result to 2 decimal places
+    rounded_co2_results = {category + "_co2": round(category_results[category + "_co2"], 2)
+                           for category in CATEGORIES}
+
+    co2_footprint = sum(rounded_co2_results.values())
+
+    rounded_co2_results["co2_footprint"] = co2_footprint
+    co2_footprint_norm_kg = round(co2_footprint / helping_values["total_harvest"], 2)
+    rounded_co2_results["co2_footprint_norm_kg"] = co2_footprint_norm_kg
+    rounded_co2_results["co2_footprint_norm_m2"] = round(co2_footprint / helping_values["gh_size"], 2)
+
+    # round every result to 2 decimal places
+    rounded_h2o_results = {category + "_h2o": round(category_results[category + "_h2o"], 2)
+                           for category in CATEGORIES}
+
+    h2o_footprint = sum(rounded_h2o_results.values())
+
+    rounded_h2o_results["h2o_footprint"] = h2o_footprint
+    rounded_h2o_results["h2o_footprint_norm_kg"] = round(h2o_footprint / helping_values["total_harvest"], 2)
+    rounded_h2o_results["h2o_footprint_norm_m2"] = round(h2o_footprint / helping_values["gh_size"], 2)
+    direct_h2o_footprint = rounded_h2o_results["regenwasser_h2o"] + \
+                           rounded_h2o_results["brunnenwasser_h2o"] + \
+                           rounded_h2o_results["stadtwasser_h2o"] + \
+                           rounded_h2o_results["oberflaechenwasser_h2o"]
+
+    rounded_h2o_results["direct_h2o_footprint"] = direct_h2o_footprint
+    rounded_h2o_results["direct_h2o_footprint_norm_kg"] = direct_h2o_footprint / helping_values["total_harvest"]
+    rounded_h2o_results["direct_h2o_footprint_norm_m2"] = direct_h2o_footprint / helping_values["gh_size"]
+
+    if is_tracing():
+        record_values("totals", {name: rounded_co2_results[name] for name in
+                                 ("co2_footprint", "co2_footprint_norm_kg", "co2_footprint_norm_m2")} |
+                      {name: rounded_h2o_results[name] for name in
+                       ("h2o_footprint", "h2o_footprint_norm_kg", "h2o_footprint_norm_m2", "direct_h2o_footprint",
+                        "direct_h2o_footprint_norm_kg", "direct_h2o_footprint_norm_m2")})
+    return rounded_co2_results | rounded_h2o_results
+
+
+def calc_helping_values(record):
+    """This function calculates various helping values needed for calculating the co2 and h2o footprints
+
+    Args:
+        record: resolved greenhouse dataset
+
+    Returns:
+        dictionary: contains the calculated variables
+    """
+
+    if record["KulturEnde"][0] > record["KulturBeginn"][0]:
+        culture_length = round(record["KulturEnde"][0]-record["KulturBeginn"][0], 0)
+    else:
+        culture_length = (52 - round(record["KulturBeginn"][0], 0)) + round(record["KulturEnde"][0], 0)
+    if record["NebenkulturEnde"][0] > record["NebenkulturBeginn"][0]:
+        side_culture_length = round(record["NebenkulturEnde"][0]-record["NebenkulturBeginn"][0], 0)
+    elif record["NebenkulturBeginn"][0] != 0:
+        side_culture_length = (52 - round(record["NebenkulturBeginn"][0], 0)) + round(record["NebenkulturEnde"][0], 0)
+    else:
+        side_culture_length = 0
+    culture_length_usage = culture_length/(culture_length+side_culture_length)
+    energyconsumption_lighting = calc_energyconsumption_lighting(record)
+    energyconsumption_company = 0
+    for option in record["Stromherkunft"]:
+        energyconsumption_company = energyconsumption_company + option[1]
+
+    energyconsumption_total = energyconsumption_company+energyconsumption_lighting
+    gh_size = calc_gh_size(record)
+    culture_size = calc_culture_size(record, gh_size)
+    hull_size = calc_hull_size(record)
+    row_count = record["SnackReihenanzahl"][0]+record["CocktailReihenanzahl"][0]+record["RispenReihenanzahl"][0]+record["FleischReihenanzahl"][0]
+    row_length = record["Laenge"][0]-record["Vorwegbreite"][0]
+    row_length_total = row_length*row_count
+    walk_length_total = (row_count-1)*row_length
+
+    # calculate the amount of fruits
+    snack_count = 0
+    cocktail_count = 0
+    rispen_count = 0
+    fleisch_count = 0
+
+    if _selected(record, "10-30Gramm(Snack)") == "ja":
+        snack_count = record["SnackReihenanzahl"][0] * row_length / record["SnackPflanzenabstandInDerReihe"][0]
+    if _selected(record, "30-100Gramm(Cocktail)") == "ja":
+        cocktail_count = record["CocktailReihenanzahl"][0] * row_length / record["CocktailPflanzenabstandInDerReihe"][0]
+    if _selected(record, "100-150Gramm(Rispen)") == "ja":
+        rispen_count = record["RispenReihenanzahl"][0] * row_length / record["RispenPflanzenabstandInDerReihe"][0]
+    if _selected(record, ">150Gramm(Fleisch)") == "ja":
+        fleisch_count = record["FleischReihenanzahl"][0]*row_length/record["FleischPflanzenabstandInDerReihe"][0]
+
+    plant_count_total = snack_count+cocktail_count+rispen_count+fleisch_count
+    snack_shoots_count = snack_count*record["SnackTriebzahl"][0]
+    cocktail_shoots_count = cocktail_count*record["CocktailTriebzahl"][0]
+    rispen_shoots_count = rispen_count*record["RispenTriebzahl"][0]
+    fleisch_shoots_count = fleisch_count*record["FleischTriebzahl"][0]
+    shoots_count_total = snack_shoots_count+cocktail_shoots_count+rispen_shoots_count+fleisch_shoots_count
+    cord_length_total = record["SchnuereRankhilfen:Laenge"][0]*shoots_count_total
+    clips_count_total = record["Klipse:AnzahlProTrieb"][0]*shoots_count_total
+    panicle_hanger_count_total = rispen_shoots_count*record["Rispenbuegel:AnzahlProTrieb"][0] + fleisch_shoots_count * record["Rispenbuegel:AnzahlProTrieb"][0]
+    total_harvest = record["SnackErtragJahr"][0] + record["CocktailErtragJahr"][0] + record["RispenErtragJahr"][0] + record["FleischErtragJahr"][0]
+
+    # check if bhkw is used or not
+    bhkw_usage = False
+    for option in record["Energietraeger"]:
+        if option[0] == "BHKW Erdgas" or option[0] == "BHKW Biomethan":
+            bhkw_usage = True
+
+    helping_values = {
+        "culture_length": culture_length,
+        "side_culture_length": side_culture_length,
+        "culture_length_usage": culture_length_usage,
+        "energyconsumption_lighting": energyconsumption_lighting,
+        "energyconsumption_company": energyconsumption_company,
+        "energyconsumption_total": energyconsumption_total,
+        "gh_size": gh_size,
+        "culture_size": culture_size,
+        "hull_size": hull_size,
+        "row_count": row_count,
+        "row_length": row_length,
+        "row_length_total": row_length_total,
+        "walk_length_total": walk_length_total,
+        "snack_count": snack_count,
+        "cocktail_count": cocktail_count,
+        "rispen_count": rispen_count,
+        "fleisch_count": fleisch_count,
+        "plant_count_total": plant_count_total,
+        "total_harvest": total_harvest,
+        "snack_shoots_count": snack_shoots_count,
+        "cocktail_shoots_count": cocktail_shoots_count,
+        "rispen_shoots_count": rispen_shoots_count,
+        "fleisch_shoots_count": fleisch_shoots_count,
+        "shoots_count_total": shoots_count_total,
+        "cord_length_total": cord_length_total,
+        "clips_count_total": clips_count_total,
+        "panicle_hanger_count_total": panicle_hanger_count_total,
+        "bhkw_usage": bhkw_usage
+    }
+    record_values("helping_values", helping_values)
+    return helping_values
+
+
+def calc_energyconsumption_lighting(record):
+    """Calculates the energyconsumption that belongs to lightning.
+
+    Will be 0, if lighting is already included in GWHStromverbrauch.
+
+    Args:
+        record: resolved greenhouse dataset
+
+    Returns:
+        energyconsumption for lighting
+    """
+
+    if _selected(record, "Zusatzbelichtung") == "ja" and _selected(record, "Belichtungsstrom") == "nein":
+        if(record["Belichtung:Stromverbrauch"][0]> 0): return record["Belichtung:Stromverbrauch"][0]
+        else:
+            return record["Belichtung:AnzahlLampen"][0]*record["Belichtung:AnschlussleistungProLampe"][0]*record["Belichtung:LaufzeitProJahr"][0]/1000
+    else:
+        return 0
+
+
+def calc_gh_size(record):
+    """Calculates the size of the greenhouse.
+
+    Args:
+        record: resolved greenhouse dataset
+
+    Returns:
+        greenhouse size
+    """
+
+    if (record["GWHFlaeche"][0] > 0): return record["GWHFlaeche"][0]
+    else:
+        return record["Laenge"][0]*record["Breite"][0]
+
+
+def calc_culture_size(record, gh_size):
+    """Calculates the size of the culture.
+
+    Args:
+        record: resolved greenhouse dataset
+
+    Returns:
+        size that the culture takes up
+    """
+
+    if (record["Nutzflaeche"][0] > 0): return record["Nutzflaeche"][0]
+    else:
+        return gh_size-(record["Vorwegbreite"][0]*record["Breite"][0])
+
+
+def calc_hull_size(record):
+    """Calculates the size of the greenhouse hull depending on which norm used.
+
+    Args:
+        record: resolved greenhouse dataset
+
+    Returns:
+        hull size of the greenhouse
+    """
+
+    norm_name = _selected(record, "GWHArt")
+    hull_size_wall = 0
+    hull_size_roof = 0
+    if(norm_name=="Venlo"):
+        hull_size_wall = (record["Laenge"][0]+record["Breite"][0])*2*record["Stehwandhoehe"][0]+((((math.sqrt(abs((record["Scheibenlaenge"][0]**2) - (record["Kappenbreite"][0]/2)**2)))*record["Kappenbreite"][0])/2)*(record["Breite"][0]/record["Kappenbreite"][0]))
+        hull_size_roof = record["Scheibenlaenge"][0]*record["Laenge"][0]*(record["Breite"][0]/record["Kappenbreite"][0]*2)
+        hull_size_total = hull_size_wall+hull_size_roof
+    elif(norm_name=="Deutsche Norm"):
+        hull_size_wall = record["Laenge"][0]*record["Breite"][0]*record["Stehwandhoehe"][0]
+        hull_size_roof = record["Scheibenlaenge"][0]*record["Laenge"][0]*2
+        hull_size_total = hull_size_wall + hull_size_roof
+    elif(norm_name=="Folientunnel"):
+        hull_size_total = record["Breite"][0]*math.pi/2*record["Laenge"][0]
+    else:
+        raise ValueError('No valid option for gwhArt has been selected')
+
+    hull_size = {
+        "wall": hull_size_wall,
+        "roof": hull_size_roof,
+        "total": hull_size_total
+    }
+    return hull_size
+
+
+def calc_greenhouse_construction(record, helping_values, factors):
+    """Calculates the size of the footprint for the greenhouse construction.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the categories of the greenhouse construction
+    """
+
+    # first check which kind of greenhouse is used
+    norm_name = _selected(record, "GWHArt")
+    stehwandmaterial= _selected(record, "Stehwandmaterial")
+    bedachungsmaterial = _selected(record, "Bedachungsmaterial")
+
+    beton_co2 = 0
+    stahl_co2 = 0
+    aluminium_co2 = 0
+    lpde_co2 = 0
+    stehwand_co2 = 0
+    bedachung_co2 = 0
+
+    beton_h2o = 0
+    stahl_h2o = 0
+    aluminium_h2o = 0
+    lpde_h2o = 0
+    stehwand_h2o = 0
+    bedachung_h2o = 0
+
+    # input field: GWHart
+    if norm_name == "Venlo" or norm_name == "Deutsche Norm":
+        # calculate material footprints
+        if record["GWHAlter"][0] <= 20:
+            if norm_name == "Venlo":
+                beton = helping_values["gh_size"] * 2.52032 * helping_values["culture_length_usage"]
+                beton_co2 = beton * factors.co2["beton"]
+                beton_h2o = beton * factors.h2o["beton"]
+
+                stahl = helping_values["gh_size"] * 0.55 * helping_values["culture_length_usage"]
+                stahl_co2 = stahl * factors.co2["stahl"]
+                stahl_h2o = stahl * factors.h2o["stahl"]
+
+                aluminium = helping_values["gh_size"] * 0.125 * helping_values["culture_length_usage"]
+                aluminium_co2 = aluminium * factors.co2["aluminium"]
+                aluminium_h2o = aluminium * factors.h2o["aluminium"]
+            elif norm_name == "Deutsche Norm":
+                beton = helping_values["gh_size"] * 2.52 * helping_values["culture_length_usage"]
+                beton_co2 = beton * factors.co2["beton"]
+                beton_h2o = beton * factors.h2o["beton"]
+
+                stahl = helping_values["gh_size"] * 0.55 * helping_values["culture_length_usage"]
+                stahl_co2 = stahl * factors.co2["stahl"]
+                stahl_h2o = stahl * factors.h2o["stahl"]
+
+                aluminium = helping_values["gh_size"] * 0.015 * helping_values["culture_length_usage"]
+                aluminium_co2 = aluminium * factors.co2["aluminium"]
+                aluminium_h2o = aluminium * factors.h2o["aluminium"]
+
+        # input field: Stehwand
+        if stehwandmaterial == "Einfachglas":
+            if record["AlterStehwandmaterial"][0] <= 15:
+                stehwand = helping_values["hull_size"]["wall"] * 0.664 * helping_values["culture_length_usage"]
+                stehwand_co2 = stehwand * factors.co2["stehwand_glas"]
+                stehwand_h2o = stehwand * factors.h2o["stehwand_glas"]
+        elif stehwandmaterial == "Doppelglas":
+            if record["AlterStehwandmaterial"][0] <= 15:
+                stehwand = helping_values["hull_size"]["wall"] * 1.328 * helping_values["culture_length_usage"]
+                stehwand_co2 = stehwand * factors.co2["stehwand_glas"]
+                stehwand_h2o = stehwand * factors.h2o["stehwand_glas"]
+        elif stehwandmaterial == "Doppelstegplatte":
+            if record["AlterStehwandmaterial"][0] <= 10:
+                stehwand = helping_values["hull_size"]["wall"] * 0.17 * helping_values["culture_length_usage"]
+                stehwand_co2 = stehwand * factors.co2["bedachung_stegplatte"]
+                stehwand_h2o = stehwand * factors.h2o["bedachung_stegplatte"]
+        elif stehwandmaterial == "Dreifachstegplatte":
+            if record["AlterStehwandmaterial"][0] <= 10:
+                stehwand = helping_values["hull_size"]["wall"] * 0.27 * helping_values["culture_length_usage"]
+                stehwand_co2 = stehwand * factors.co2["stehwand_stegplatte"]
+                stehwand_h2o = stehwand * factors.h2o["stehwand_stegplatte"]
+        elif stehwandmaterial == "Einfachfolie":
+            if record["AlterStehwandmaterial"][0] <= 5:
+                stehwand = helping_values["hull_size"]["wall"] * 0.0374 * helping_values["culture_length_usage"]
+                stehwand_co2 = stehwand * factors.co2["stehwand_folie"]
+                stehwand_h2o = stehwand * factors.h2o["stehwand_folie"]
+        elif stehwandmaterial == "Doppelfolie":
+            if record["AlterStehwandmaterial"][0] <= 5:
+                stehwand = helping_values["hull_size"]["wall"] * 0.0748 * helping_values["culture_length_usage"]
+                stehwand_co2 = stehwand * factors.co2["stehwand_folie"]
+                stehwand_h2o = stehwand * factors.h2o["stehwand_folie"]
+        else:
+            raise ValueError('No valid option for Stehwandmaterial has been selected')
+
+        # input field: Bedachung
+        if bedachungsmaterial == "Einfachglas":
+            if record["AlterBedachungsmaterial"][0] <= 15:
+                bedachung = helping_values["hull_size"]["wall"] * 0.664 * helping_values["culture_length_usage"]
+                bedachung_co2 = bedachung * factors.co2["bedachung_glas"]
+                bedachung_h2o = bedachung * factors.h2o["bedachung_glas"]
+        elif bedachungsmaterial == "Doppelglas":
+            if record["AlterBedachungsmaterial"][0] <= 15:
+                bedachung = helping_values["hull_size"]["wall"] * 1.328 * helping_values["culture_length_usage"]
+                bedachung_co2 = bedachung * factors.co2["bedachung_glas"]
+                bedachung_h2o = bedachung * factors.h2o["bedachung_glas"]
+        elif bedachungsmaterial == "Doppelstegplatte":
+            if record["AlterBedachungsmaterial"][0] <= 10:
+                bedachung = helping_values["hull_size"]["wall"] * 0.17 * helping_values["culture_length_usage"]
+                bedachung_co2 = bedachung * factors.co2["bedachung_stegplatte"]
+                bedachung_h2o = bedachung * factors.h2o["bedachung_stegplatte"]
+        elif bedachungsmaterial == "Dreifachstegplatte":
+            if record["AlterBedachungsmaterial"][0] <= 10:
+                bedachung = helping_values["hull_size"]["wall"] * 0.27 * helping_values["culture_length_usage"]
+                bedachung_co2 = bedachung * factors.co2["bedachung_stegplatte"]
+                bedachung_h2o = bedachung * factors.h2o["bedachung_stegplatte"]
+        elif bedachungsmaterial == "Einfachfolie":
+            if record["AlterBedachungsmaterial"][0] <= 5:
+                bedachung = helping_values["hull_size"]["wall"] * 0.0374 * helping_values["culture_length_usage"]
+                bedachung_co2 = bedachung * factors.co2["bedachung_folie"]
+                bedachung_h2o = bedachung * factors.h2o["bedachung_folie"]
+        elif bedachungsmaterial == "Doppelfolie":
+            if record["AlterBedachungsmaterial"][0] <= 5:
+                bedachung = helping_values["hull_size"]["wall"] * 0.0748 * helping_values["culture_length_usage"]
+                bedachung_co2 = bedachung * factors.co2["bedachung_folie"]
+                bedachung_h2o = bedachung * factors.h2o["bedachung_folie"]
+        else:
+            raise ValueError('No valid option for Bedachungsmaterial has been selected')
+
+    elif norm_name == "Folientunnel":
+        if(bedachungsmaterial == "Einfachfolie"):
+            if record["AlterBedachungsmaterial"][0] <= 5:
+                lpde = helping_values["hull_size"]["total"] * 0.06 * helping_values["culture_length_usage"]
+                lpde_co2 = lpde * factors.co2["lpde"]
+                lpde_h2o = lpde * factors.h2o["lpde"]
+            if record["GWHAlter"][0] <= 20:
+                stahl = helping_values["gh_size"] * 0.13 * helping_values["culture_length_usage"]
+                stahl_co2 = stahl * factors.co2["stahl"]
+                stahl_h2o = stahl * factors.h2o["stahl"]
+        else:
+            # assume option Doppelfolie has been selected.
+            # if something else has been selected this will be assumed to not cause unnecessary errors.
+            if record["AlterBedachungsmaterial"][0] <= 5:
+                lpde = helping_values["hull_size"]["total"] * 0.14 * helping_values["culture_length_usage"]
+                lpde_co2 = lpde * factors.co2["lpde_doppelfolie"]
+                lpde_h2o = lpde * factors.h2o["lpde_doppelfolie"]
+            if record["AlterBedachungsmaterial"][0] <= 5:
+                stahl = helping_values["gh_size"] * 0.195 * helping_values["culture_length_usage"]
+                stahl_co2 = stahl * factors.co2["stahl_doppelfolie"]
+                stahl_h2o = stahl * factors.h2o["stahl_doppelfolie"]
+    else:
+        raise ValueError('No valid option for GWHArt has been selected')
+
+    # input field: Energieschirm
+    energieschirm_co2 = 0
+    energieschirm_h2o = 0
+    energieschirmverwendung = _selected(record, "Energieschirm")
+
+    if record["AlterEnergieschirm"][0] <= 10 and energieschirmverwendung == "ja":
+        energieschirmmaterial = _selected(record, "EnergieschirmTyp")
+        if energieschirmmaterial == "einfach":
+            energieschirm = helping_values["gh_size"] * 0.05 * helping_values["culture_length_usage"]
+            energieschirm_co2 = energieschirm * factors.co2["energieschirm"]
+            energieschirm_h2o = energieschirm * factors.h2o["energieschirm"]
+        elif energieschirmmaterial == "doppelt":
+            energieschirm = helping_values["gh_size"] * 0.1 * helping_values["culture_length_usage"]
+            energieschirm_co2 = energieschirm * factors.co2["energieschirm"]
+            energieschirm_h2o = energieschirm * factors.h2o["energieschirm"]
+        elif energieschirmmaterial == "einfach, aluminisiert":
+            energieschirm = helping_values["gh_size"] * 0.05 * helping_values["culture_length_usage"]
+            energieschirm_co2 = energieschirm * factors.co2["energieschirm_aluminisiert"]
+            energieschirm_h2o = energieschirm * factors.h2o["energieschirm_aluminisiert"]
+        elif energieschirmmaterial == "doppelt, aluminisiert":
+            energieschirm = helping_values["gh_size"] * 0.1 * helping_values["culture_length_usage"]
+            energieschirm_co2 = energieschirm * factors.co2["energieschirm_aluminisiert"]
+            energieschirm_h2o = energieschirm * factors.h2o["energieschirm_aluminisiert"]
+        else:
+            raise ValueError('No valid option for Energieschirm has been selected')
+
+    # input field: Bodenabdeckung
+    bodenabdeckung_co2 = 0
+    bodenabdeckung_h2o = 0
+    if record["Bodenabdeckung"]:
+        for option in record["Bodenabdeckung"]:
+            bodenabdeckungmaterial = option[0]
+            nutzdauer = option[1]
+            if bodenabdeckungmaterial == "Bodenfolie":
+                if nutzdauer <= 10:
+                    bodenabdeckung = helping_values["culture_size"] * 0.01
+                    bodenabdeckung_co2 = bodenabdeckung_co2 + bodenabdeckung * factors.co2["bodenabdeckung_bodenfolie"]
+                    bodenabdeckung_h2o = bodenabdeckung_h2o + bodenabdeckung * factors.h2o["bodenabdeckung_bodenfolie"]
+            elif bodenabdeckungmaterial == "Bodengewebe":
+                if nutzdauer <= 10:
+                    bodenabdeckung = helping_values["culture_size"] * 0.02
+                    bodenabdeckung_co2 = bodenabdeckung_co2 + bodenabdeckung * factors.co2["bodenabdeckung_bodengewebe"]
+                    bodenabdeckung_h2o = bodenabdeckung_h2o + bodenabdeckung * factors.h2o["bodenabdeckung_bodengewebe"]
+            elif bodenabdeckungmaterial == "Beton":
+                if nutzdauer <= 20:
+                    bodenabdeckung = helping_values["culture_size"] * 2.52
+                    bodenabdeckung_co2 = bodenabdeckung_co2 + bodenabdeckung * factors.co2["bodenabdeckung_beton"]
+                    bodenabdeckung_h2o = bodenabdeckung_h2o + bodenabdeckung * factors.h2o["bodenabdeckung_beton"]
+            else:
+                raise ValueError('No valid option for Bodenabdeckung has been selected')
+
+    # input field: Produktionssystem
+    produktionssystemtyp = _selected(record, "Produktionssystem")
+    produktionstyp = _selected(record, "Produktionstyp")
+    produktionssystem_co2 = 0
+    produktionssystem_h2o = 0
+    if record["AlterProduktionssystem"][0] <= 15:
+        if produktionssystemtyp == "Boden" or produktionstyp == "Biologisch":  # Biologisch doesn't have Produktionssystem
+            pass
+        elif produktionssystemtyp == "Hydroponik offen":
+            produktionssystem = helping_values["row_length_total"] * 2 * 0.133333333
+            produktionssystem_co2 = produktionssystem * factors.co2["produktionssystem_hydroponik"]
+            produktionssystem_h2o = produktionssystem * factors.h2o["produktionssystem_hydroponik"]
+        elif produktionssystemtyp == "Hydroponik geschlossen":
+            produktionssystem = helping_values["row_length_total"] * 2 * 0.133333333
+            produktionssystem_co2 = produktionssystem * factors.co2["produktionssystem_hydroponik"]
+            produktionssystem_h2o = produktionssystem * factors.h2o["produktionssystem_hydroponik"]
+        else:
+            raise ValueError('No valid option for Produktionssystem has been selected')
+
+    # input field: Bewässerungsart
+    bewaesserungmaterial = _selected(record, "Bewaesserungsart")
+    bewaesserung_co2 = 0
+    bewaesserung_h2o = 0
+    if bewaesserungmaterial == "Tropfschlaeuche":
+        bewaesserung = ((helping_values["row_length_total"] + record["Breite"][0]) * 1.36 / 100) / 10
+        bewaesserung_co2 = bewaesserung * factors.co2["bewaesserung_tropfschlaeuche"]
+        bewaesserung_h2o = bewaesserung * factors.h2o["bewaesserung_tropfschlaeuche"]
+    elif bewaesserungmaterial == "Bodensprinkler":
+        bewaesserung = ((helping_values["row_length_total"]/3 + record["Breite"][0]) * 4 / 30) / 15
+        bewaesserung_co2 = bewaesserung * factors.co2["bewaesserung_bodensprinkler"]
+        bewaesserung_h2o = bewaesserung * factors.h2o["bewaesserung_bodensprinkler"]
+    elif bewaesserungmaterial == "Handschlauch":
+        bewaesserung = (math.sqrt(abs(helping_values["gh_size"]*2.5)) * 4 / 30) / 15
+        bewaesserung_co2 = bewaesserung * factors.co2["bewaesserung_handschlauch"]
+        bewaesserung_h2o = bewaesserung * factors.h2o["bewaesserung_handschlauch"]
+    else:
+        raise ValueError('No valid option for Bewaesserungsart has been selected')
+
+    # input field: Heizsystem
+    heizsystemtyp = _selected(record, "Heizsystem")
+    heizsystem_co2 = 0
+    heizsystem_h2o = 0
+
+    if record["AlterHeizsystem"][0] <= 20:
+        if heizsystemtyp == "Transportsystem":
+            heizsystem = helping_values["walk_length_total"] * 0.135 * 2.7 * helping_values["culture_length_usage"]
+            heizsystem_co2 = heizsystem * factors.co2["heizsystem"]
+            heizsystem_h2o = heizsystem * factors.h2o["heizsystem"]
+        elif heizsystemtyp == "Rohrheizung (hoch, niedrig, etc.)":
+            heizsystem = helping_values["walk_length_total"] * 0.135 * 2.7 * helping_values["culture_length_usage"]
+            heizsystem_co2 = heizsystem * factors.co2["heizsystem"]
+            heizsystem_h2o = heizsystem * factors.h2o["heizsystem"]
+        elif heizsystemtyp == "Konvektionsheizung":
+            heizsystem = record["Laenge"][0] * 0.8 * 2 * 7 * 0.466666667 * helping_values["culture_length_usage"]
+            heizsystem_co2 = heizsystem * factors.co2["heizsystem"]
+            heizsystem_h2o = heizsystem * factors.h2o["heizsystem"]
+        elif heizsystemtyp == "Deckenlufterhitzer":
+            pass
+        elif heizsystemtyp == "Keines":
+            pass
+        else:
+            raise ValueError('No valid option for Heizsystem has been selected')
+
+    # input field: Zusaetzliches Heizsystem
+    zusaetzliches_heizsystem_co2 = 0
+    zusaetzliches_heizsystem_h2o = 0
+    zusaetzliches_heizsystemverwendung = _selected(record, "ZusaetzlichesHeizsystem")
+    if zusaetzliches_heizsystemverwendung == "ja":
+        zusaetzliches_heizsystemtyp = _selected(record, "ZusaetzlichesHeizsystemTyp")
+        if zusaetzliches_heizsystemtyp == "Transportsystem":
+            if record["AlterZusaetzlichesHeizsystem"][0] <= 20:
+                zusaetzliches_heizsystem = helping_values["walk_length_total"] * 0.135 * 2.7 * helping_values["culture_length_usage"]
+                zusaetzliches_heizsystem_co2 = zusaetzliches_heizsystem * factors.co2["heizsystem"]
+                zusaetzliches_heizsystem_h2o = zusaetzliches_heizsystem * factors.h2o["heizsystem"]
+        elif zusaetzliches_heizsystemtyp == "Rohrheizung (hoch, niedrig, etc.)":
+            if record["AlterZusaetzlichesHeizsystem"][0] <= 20:
+                zusaetzliches_heizsystem = helping_values["walk_length_total"] * 0.135 * 2.7 * helping_values["culture_length_usage"]
+                zusaetzliches_heizsystem_co2 = zusaetzliches_heizsystem * factors.co2["heizsystem"]
+                zusaetzliches_heizsystem_h2o = zusaetzliches_heizsystem * factors.h2o["heizsystem"]
+        elif zusaetzliches_heizsystemtyp == "Konvektionsheizung":
+            if record["AlterZusaetzlichesHeizsystem"][0] <= 15:
+                zusaetzliches_heizsystem = record["Laenge"][0] * 0.8 * 2 * 7 * 0.466666667 * helping_values["culture_length_usage"]
+                zusaetzliches_heizsystem_co2 = zusaetzliches_heizsystem * factors.co2["heizsystem"]
+                zusaetzliches_heizsystem_h2o = zusaetzliches_heizsystem * factors.h2o["heizsystem"]
+        elif zusaetzliches_heizsystemtyp == "Vegetationsheizung":
+            if record["AlterZusaetzlichesHeizsystem"][0] <= 15:
+                zusaetzliches_heizsystem = helping_values["row_length_total"] * 2 * 0.133333333 * helping_values["culture_length_usage"]
+                zusaetzliches_heizsystem_co2 = zusaetzliches_heizsystem * factors.co2["heizsystem"]
+                zusaetzliches_heizsystem_h2o = zusaetzliches_heizsystem * factors.h2o["heizsystem"]
+        elif heizsystemtyp == "Deckenlufterhitzer":
+            pass
+        else:
+            raise ValueError('No valid option for ZusaetzlichesHeizsystem has been selected')
+
+    konstruktion_co2 = beton_co2 + stahl_co2 + aluminium_co2 + lpde_co2 + stehwand_co2 + bedachung_co2
+    konstruktion_h2o = beton_h2o + stahl_h2o + aluminium_h2o + lpde_h2o + stehwand_h2o + bedachung_h2o
+    if is_tracing():
+        record_values("konstruktion", {
+            "beton_co2": beton_co2, "stahl_co2": stahl_co2, "aluminium_co2": aluminium_co2, "lpde_co2": lpde_co2,
+            "stehwand_co2": stehwand_co2, "bedachung_co2": bedachung_co2,
+            "beton_h2o": beton_h2o, "stahl_h2o": stahl_h2o, "aluminium_h2o": aluminium_h2o, "lpde_h2o": lpde_h2o,
+            "stehwand_h2o": stehwand_h2o, "bedachung_h2o": bedachung_h2o,
+        })
+    return konstruktion_co2, energieschirm_co2, bodenabdeckung_co2, produktionssystem_co2, bewaesserung_co2, heizsystem_co2, zusaetzliches_heizsystem_co2, \
+           konstruktion_h2o, energieschirm_h2o, bodenabdeckung_h2o, produktionssystem_h2o, bewaesserung_h2o, heizsystem_h2o, zusaetzliches_heizsystem_h2o
+
+
+def calc_energy_source(record, factors):
+    """Calculates the co2 and h2o footprints for the heat energy consumption
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for heat energy consumption
+    """
+    # input field: Energietraeger
+    # they should always have the unit kWh already
+    energietraeger_co2 = 0
+    energietraeger_h2o = 0
+
+    geteilte_waermeversorgung = _selected(record, "Waermeversorgung")
+
+    for option in record["Energietraeger"]:
+        # check if the values have the correct unit
+        if option[2] != "kWh":
+            raise ValueError('Energietraeger value unit has not been converted to kWh!')
+        energietraegertyp = option[0]
+        menge = option[1]
+
+        if energietraegertyp == "Erdgas":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["erdgas"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["erdgas"]
+        elif energietraegertyp == "Biogas":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["biogas"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["biogas"]
+        elif energietraegertyp == "Heizoel":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["heizoel"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["heizoel"]
+        elif energietraegertyp == "Steinkohle":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["steinkohle"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["steinkohle"]
+        elif energietraegertyp == "Braunkohle":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["braunkohle"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["braunkohle"]
+        elif energietraegertyp == "Hackschnitzel":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["hackschnitzel"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["hackschnitzel"]
+        elif energietraegertyp == "Geothermie(oberflaechennah)":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["geothermie"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["geothermie"]
+        elif energietraegertyp == "Tiefengeothermie":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["tiefengeothermie"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["tiefengeothermie"]
+        elif energietraegertyp == "BHKW Erdgas":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["erdgas"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["erdgas"]
+        elif energietraegertyp == "BHKW Biomethan":
+            energietraeger_co2 = energietraeger_co2 + menge * factors.co2["biomethan"]
+            energietraeger_h2o = energietraeger_h2o + menge * factors.h2o["biomethan"]
+        else:
+            raise ValueError('No valid option for Energietraeger has been selected')
+
+    if geteilte_waermeversorgung == "ja":
+        energietraeger_co2 = energietraeger_co2 * (record["GWHFlaeche"][0]/record["WaermeteilungFlaeche"][0])
+        energietraeger_h2o = energietraeger_h2o * (record["GWHFlaeche"][0]/record["WaermeteilungFlaeche"][0])
+
+    return energietraeger_co2, energietraeger_h2o
+
+
+def calc_electric_power(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for electric power consumption.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the electric power consumption
+    """
+
+    # co2 usage
+    strom_gesamt_co2 = 0
+    deutscher_strommix_co2 = 0
+    oekostrom_co2 = 0
+    photovoltaik_co2 = 0
+    windenergie_land_co2 = 0
+    windenergie_see_co2 = 0
+    wasserkraft_co2 = 0
+    tiefengeothermie_co2 = 0
+    bhkwerdgas_co2 = 0
+    bhkwbiomethan_co2 = 0
+    diesel_co2 = 0
+
+    # h2o usage
+    deutscher_strommix_h2o = 0
+    oekostrom_h2o = 0
+    photovoltaik_h2o = 0
+    windenergie_land_h2o = 0
+    windenergie_see_h2o = 0
+    wasserkraft_h2o = 0
+    tiefengeothermie_h2o = 0
+    bhkwerdgas_h2o = 0
+    bhkwbiomethan_h2o = 0
+    diesel_h2o = 0
+
+    # part of total kWh
+    deutscher_strommix_anteil = 0
+    oekostrom_anteil = 0
+    photovoltaik_anteil = 0
+    windenergie_land_anteil = 0
+    windenergie_see_anteil = 0
+    wasserkraft_anteil = 0
+    tiefengeothermie_anteil = 0
+    bhkwerdgas_anteil = 0
+    bhkwbiomethan_anteil= 0
+    diesel_anteil = 0
+    for option in record["Stromherkunft"]:
+        # check if the values have the correct unit
+        if option[2] != "kWh":
+            raise ValueError('Stromherkunft value unit has not been converted to kWh!')
+        stromtyp = option[0]
+        menge = option[1]
+        netto_menge = menge * helping_values["culture_length_usage"]
+        if stromtyp == "Deutscher Strommix":
+            deutscher_strommix_co2 = netto_menge * factors.co2["deutscher_strommix"]
+            deutscher_strommix_h2o = netto_menge * factors.h2o["deutscher_strommix"]
+            deutscher_strommix_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Oekostrom (Durschnitt Deutschland)":
+            oekostrom_co2 = netto_menge * factors.co2["oekostrom"]
+            oekostrom_h2o = netto_menge * factors.h2o["oekostrom"]
+            oekostrom_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Photovoltaik":
+            photovoltaik_co2 = netto_menge * factors.co2["photovoltaik"]
+            photovoltaik_h2o = netto_menge * factors.h2o["photovoltaik"]
+            photovoltaik_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Windenergie (Land)":
+            windenergie_land_co2 = netto_menge * factors.co2["windenergie_land"]
+            windenergie_land_h2o = netto_menge * factors.h2o["windenergie_land"]
+            windenergie_land_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Windenergie (See)":
+            windenergie_see_co2 = netto_menge * factors.co2["windenergie_see"]
+            windenergie_see_h2o = netto_menge * factors.h2o["windenergie_see"]
+            windenergie_see_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Wasserkraft":
+            wasserkraft_co2 = netto_menge * factors.co2["wasserkraft"]
+            wasserkraft_h2o = netto_menge * factors.h2o["wasserkraft"]
+            wasserkraft_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Tiefengeothermie":
+            tiefengeothermie_co2 = netto_menge * factors.co2["tiefengeothermie"]
+            tiefengeothermie_h2o = netto_menge * factors.h2o["tiefengeothermie"]
+            tiefengeothermie_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "BHKW Biomethan":
+            bhkwbiomethan_co2 = netto_menge * factors.co2["biomethan"]
+            bhkwbiomethan_h2o = netto_menge * factors.h2o["biomethan"]
+            bhkwbiomethan_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "BHKW Erdgas":
+            bhkwerdgas_co2 = netto_menge * factors.co2["erdgas"]
+            bhkwerdgas_h2o = netto_menge * factors.h2o["erdgas"]
+            bhkwerdgas_anteil = menge / helping_values["energyconsumption_company"]
+        elif stromtyp == "Diesel":
+            diesel_co2 = netto_menge * factors.co2["diesel"]
+            diesel_h2o = netto_menge * factors.h2o["diesel"]
+            diesel_anteil = menge / helping_values["energyconsumption_company"]
+        else:
+            raise ValueError('No valid option for Stromherkunft has been selected')
+
+    # take field Belichtung into account if it isn't already included in the calculation
+    if _selected(record, "Zusatzbelichtung") == "ja" and _selected(record, "Belichtungsstrom") == "nein":
+        deutscher_strommix_co2 = deutscher_strommix_co2 + (helping_values["energyconsumption_lighting"] * deutscher_strommix_anteil * factors.co2["deutscher_strommix"])
+        deutscher_strommix_h2o = deutscher_strommix_h2o + (helping_values["energyconsumption_lighting"] * deutscher_strommix_anteil * factors.h2o["deutscher_strommix"])
+        oekostrom_co2 = oekostrom_co2 + (helping_values["energyconsumption_lighting"] * oekostrom_anteil * factors.co2["oekostrom"])
+        oekostrom_h2o = oekostrom_h2o + (helping_values["energyconsumption_lighting"] * oekostrom_anteil * factors.h2o["oekostrom"])
+        photovoltaik_co2 = photovoltaik_co2 + (helping_values["energyconsumption_lighting"] * photovoltaik_anteil * factors.co2["photovoltaik"])
+        photovoltaik_h2o = photovoltaik_h2o + (helping_values["energyconsumption_lighting"] * photovoltaik_anteil * factors.h2o["photovoltaik"])
+        windenergie_land_co2 = windenergie_land_co2 + (helping_values["energyconsumption_lighting"] * windenergie_land_anteil * factors.co2["windenergie_land"])
+        windenergie_land_h2o = windenergie_land_h2o + (helping_values["energyconsumption_lighting"] * windenergie_land_anteil * factors.h2o["windenergie_land"])
+        windenergie_see_co2 = windenergie_see_co2 + (helping_values["energyconsumption_lighting"] * windenergie_see_anteil * factors.co2["windenergie_see"])
+        windenergie_see_h2o = windenergie_see_h2o + (helping_values["energyconsumption_lighting"] * windenergie_see_anteil * factors.h2o["windenergie_see"])
+        wasserkraft_co2 = wasserkraft_co2 + (helping_values["energyconsumption_lighting"] * wasserkraft_anteil * factors.co2["wasserkraft"])
+        wasserkraft_h2o = wasserkraft_h2o + (helping_values["energyconsumption_lighting"] * wasserkraft_anteil * factors.h2o["wasserkraft"])
+        tiefengeothermie_co2 = tiefengeothermie_co2 + (helping_values["energyconsumption_lighting"] * tiefengeothermie_anteil * factors.co2["tiefengeothermie"])
+        tiefengeothermie_h2o = tiefengeothermie_h2o + (helping_values["energyconsumption_lighting"] * tiefengeothermie_anteil * factors.h2o["tiefengeothermie"])
+        bhkwbiomethan_co2 = bhkwbiomethan_co2 + (helping_values["energyconsumption_lighting"] * bhkwbiomethan_anteil * factors.co2["biomethan"])
+        bhkwbiomethan_h2o = bhkwbiomethan_h2o + (helping_values["energyconsumption_lighting"] * bhkwbiomethan_anteil * factors.h2o["biomethan"])
+        bhkwerdgas_co2 = bhkwerdgas_co2 + (helping_values["energyconsumption_lighting"] * bhkwerdgas_anteil * factors.co2["erdgas"])
+        bhkwerdgas_h2o = bhkwerdgas_h2o + (helping_values["energyconsumption_lighting"] * bhkwerdgas_anteil * factors.h2o["erdgas"])
+        diesel_co2 = diesel_co2 + (helping_values["energyconsumption_lighting"] * diesel_anteil * factors.co2["diesel"])
+        diesel_h2o = diesel_h2o + (helping_values["energyconsumption_lighting"] * diesel_anteil * factors.h2o["diesel"])
+
+    # input field: Tiefengeothermie: If option has already been selected for field Wärmeverbrauch, then value = 0
+    # input field: BHKW-Erdgas: If option has already been selected for field Wärmeverbrauch, then value = 0
+    # input field: BHKW-Biomethan: If option has already been selected for field Wärmeverbrauch, then value = 0
+    for option in record["Energietraeger"]:
+        if option[0] == "Tiefengeothermie":
+            tiefengeothermie_co2 = 0
+            tiefengeothermie_h2o = 0
+    if helping_values["bhkw_usage"]:
+        bhkwerdgas_co2 = 0
+        bhkwerdgas_h2o = 0
+        bhkwbiomethan_co2 = 0
+        bhkwbiomethan_h2o = 0
+
+    strom_gesamt_co2 = deutscher_strommix_co2 + oekostrom_co2 + photovoltaik_co2 + windenergie_land_co2 + windenergie_see_co2 + wasserkraft_co2 + tiefengeothermie_co2 + bhkwerdgas_co2 + bhkwbiomethan_co2 + diesel_co2
+    strom_gesamt_h2o = deutscher_strommix_h2o + oekostrom_h2o + photovoltaik_h2o + windenergie_land_h2o + windenergie_see_h2o + wasserkraft_h2o + tiefengeothermie_h2o + bhkwerdgas_h2o + bhkwbiomethan_h2o + diesel_h2o
+
+    return strom_gesamt_co2, strom_gesamt_h2o
+
+
+def calc_water_usage(record, factors):
+    """Calculates the size of the footprints for the direct water usage.
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the direct water usage split up into the water categories
+    """
+
+    brunnenwasser_co2 = 0
+    brunnenwasser_h2o = 0
+    regenwasser_co2 = 0
+    regenwasser_h2o = 0
+    stadtwasser_co2 = 0
+    stadtwasser_h2o = 0
+    oberflaechenwasser_co2 = 0
+    oberflaechenwasser_h2o = 0
+    wasser_daten = _selected(record, "WasserVerbrauch")
+    if wasser_daten == "ja":
+        if record["VorlaufmengeAnteile"]:
+            for option in record["VorlaufmengeAnteile"]:
+                # check if the values have the correct unit
+                if option[2] != "Liter":
+                    raise ValueError('VorlaufmengeAnteile value unit has not been converted to Liter!')
+
+                vorlaufmengetyp = option[0]
+                menge = option[1] - record["Restwasser"][0] * option[1]/record["VorlaufmengeGesamt"][0]
+                # menge cannot be lower than 0
+                if menge < 0:
+                    menge = 0
+                if vorlaufmengetyp == "Brunnenwasser":
+                    brunnenwasser_co2 = brunnenwasser_co2 + menge * factors.co2["brunnenwasser"]
+                    brunnenwasser_h2o = brunnenwasser_h2o + menge * factors.h2o["brunnenwasser"]
+                elif vorlaufmengetyp == "Regenwasser":
+                    regenwasser_co2 = regenwasser_co2 + menge * factors.co2["regenwasser"]
+                    regenwasser_h2o = regenwasser_h2o + menge * factors.h2o["regenwasser"]
+                elif vorlaufmengetyp == "Stadtwasser":
+                    stadtwasser_co2 = stadtwasser_co2 + menge * factors.co2["stadtwasser"]
+                    stadtwasser_h2o = stadtwasser_h2o + menge * factors.h2o["stadtwasser"]
+                elif vorlaufmengetyp == "Oberflaechenwasser":
+                    oberflaechenwasser_co2 = oberflaechenwasser_co2 + menge * factors.co2["oberflaechenwasser"]
+                    oberflaechenwasser_h2o = oberflaechenwasser_h2o + menge * factors.h2o["oberflaechenwasser"]
+                else:
+                    raise ValueError('No valid option for VorlaufmengeAnteile has been selected')
+
+    return brunnenwasser_co2, brunnenwasser_h2o, regenwasser_co2, regenwasser_h2o, stadtwasser_co2, stadtwasser_h2o, oberflaechenwasser_co2, oberflaechenwasser_h2o
+
+
+def calc_co2_added(record, factors):
+    """Calculates the size of the footprints for the added co2
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the added co2
+    """
+
+    # input field: CO2-Herkunft
+    co2_zudosierung_co2 = 0
+    co2_zudosierung_h2o = 0
+    # check if there is even co2 added
+    if record["CO2-Herkunft"]:
+        for option in record["CO2-Herkunft"]:
+            # check if the values have the correct unit
+            if option[2] != "kg":
+                raise ValueError('CO2-Herkunft value unit has not been converted to kg!')
+
+            co2_zudosierungtyp = option[0]
+            menge = option[1]
+            if co2_zudosierungtyp == "technisches CO2":
+                co2_zudosierung_co2 = co2_zudosierung_co2 + menge * factors.co2["technisches_co2"]
+                co2_zudosierung_h2o = co2_zudosierung_h2o + menge * factors.h2o["technisches_co2"]
+            elif co2_zudosierungtyp == "direkte Gasverbrennung":
+                co2_zudosierung_co2 = co2_zudosierung_co2 + menge * factors.co2["direkte_gasverbrennung"]
+                co2_zudosierung_h2o = co2_zudosierung_h2o + menge * factors.h2o["direkte_gasverbrennung"]
+            elif co2_zudosierungtyp == "eigenes BHKW":
+                # there is no need to check, if energietraeger uses bhkw since it has no impact anyway.
+                co2_zudosierung_co2 = co2_zudosierung_co2 + menge * factors.co2["eigenes_bhkw"]
+                co2_zudosierung_h2o = co2_zudosierung_h2o + menge * factors.h2o["eigenes_bhkw"]
+            else:
+                raise ValueError('No valid option for CO2-Herkunft has been selected')
+
+    return co2_zudosierung_co2, co2_zudosierung_h2o
+
+
+def calc_fertilizer(record, factors):
+    """Calculates the co2 and h2o footprints for fertilizer usage.
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the fertilizer usage.
+    """
+
+    # input field: CO2-Herkunft
+    duengemittel_einfach_co2 = 0
+    duengemittel_einfach_h2o = 0
+    if record["Duengemittel:VereinfachteAngabe"]:
+        for option in record["Duengemittel:VereinfachteAngabe"]:
+            duengemittel_einfachtyp = option[0]
+            menge = option[1]
+            if duengemittel_einfachtyp == "A/B Bag: Standardduengung":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["standardduengung"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["standardduengung"]
+            elif duengemittel_einfachtyp == "Vinasse":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["vinasse"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["vinasse"]
+            elif duengemittel_einfachtyp == "Pferdemist":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["pferdemist"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["pferdemist"]
+            elif duengemittel_einfachtyp == "Kompost":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["kompost"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["kompost"]
+            elif duengemittel_einfachtyp == "Hornmehl, -griess, -spaene":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["hornmehl"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["hornmehl"]
+            elif duengemittel_einfachtyp == "Blutmehl":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["blutmehl"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["blutmehl"]
+            elif duengemittel_einfachtyp == "Mist":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["mist"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["mist"]
+            elif duengemittel_einfachtyp == "Gruenduengung":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["gruenduengung"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["gruenduengung"]
+            elif duengemittel_einfachtyp == "Knochenmehl":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["knochenmehl"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["knochenmehl"]
+            elif duengemittel_einfachtyp == "Pflanzkali":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["pflanzkali"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["pflanzkali"]
+            elif duengemittel_einfachtyp == "org. Vollduenger":
+                duengemittel_einfach_co2 = duengemittel_einfach_co2 + menge * factors.co2["vollduenger"]
+                duengemittel_einfach_h2o = duengemittel_einfach_h2o + menge * factors.h2o["vollduenger"]
+            else:
+                raise ValueError('No valid option for Duengemittel:VereinfachteAngabe has been selected')
+
+    duengemittel_detailliert_co2 = 0
+    duengemittel_detailliert_h2o = 0
+    if record["Duengemittel:DetaillierteAngabe"]:
+        for option in record["Duengemittel:DetaillierteAngabe"]:
+            duengemittel_detaillierttyp = option[0]
+            menge = option[1]
+            if duengemittel_detaillierttyp == "Ammoniumnitrat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["ammoniumnitrat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["ammoniumnitrat"]
+            elif duengemittel_detaillierttyp == "Kaliumnitrat (Kalisalpeter)":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kaliumnitrat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kaliumnitrat"]
+            elif duengemittel_detaillierttyp == "Calciumnitrat fluessig (Kalksalpeter)":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["calciumnitrat_fluessing"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["calciumnitrat_fluessing"]
+            elif duengemittel_detaillierttyp == "Calciumnitrat fest":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["calciumnitrat_fest"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["calciumnitrat_fest"]
+            elif duengemittel_detaillierttyp == "Kaliumchlorid, KCL, muriate of potash":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kaliumchlorid"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kaliumchlorid"]
+            elif duengemittel_detaillierttyp == "Kaliumsulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kaliumsulfat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kaliumsulfat"]
+            elif duengemittel_detaillierttyp == "Monokaliumphosphat (Flory6)":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["monokaliumphosphat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["monokaliumphosphat"]
+            elif duengemittel_detaillierttyp == "Borax":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["borax"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["borax"]
+            elif duengemittel_detaillierttyp == "Eisen DDTPA 3%":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["eisen_ddtpa"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["eisen_ddtpa"]
+            elif duengemittel_detaillierttyp == "Eisen EDDHA 6 %":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["eisen_eddha"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["eisen_eddha"]
+            elif duengemittel_detaillierttyp == "25 % Cu Kupfersulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kupfersulfat_25"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kupfersulfat_25"]
+            elif duengemittel_detaillierttyp == "32 % Mn Mangansulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["mangansulfat_32"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["mangansulfat_32"]
+            elif duengemittel_detaillierttyp == "Natriummolybdat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["natriummolybdat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["natriummolybdat"]
+            elif duengemittel_detaillierttyp == "Zinksulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["zinksulfat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["zinksulfat"]
+            elif duengemittel_detaillierttyp == "Chlorbleichlauge":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["chlorbleichlauge"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["chlorbleichlauge"]
+            elif duengemittel_detaillierttyp == "Bittersalz":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["bittersalz"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["bittersalz"]
+            elif duengemittel_detaillierttyp == "Phosphorsaeure 75%":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["phosphorsaeure"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["phosphorsaeure"]
+            elif duengemittel_detaillierttyp == "Salpetersaeure 65%":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["salpetersaeure_65"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["salpetersaeure_65"]
+            elif duengemittel_detaillierttyp == "Salpetersaeure 38%":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["salpetersaeure_38"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["salpetersaeure_38"]
+            elif duengemittel_detaillierttyp == "Kalksalpeter":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kalksalpeter"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kalksalpeter"]
+            elif duengemittel_detaillierttyp == "Magnesiumnitrat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["magnesiumnitrat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["magnesiumnitrat"]
+            elif duengemittel_detaillierttyp == "Magnesiumsulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["magnesiumsulfat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["magnesiumsulfat"]
+            elif duengemittel_detaillierttyp == "Kalisilikat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kalisilikat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kalisilikat"]
+            elif duengemittel_detaillierttyp == "Mangansulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["mangansulfat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["mangansulfat"]
+            elif duengemittel_detaillierttyp == "Kupfersulfat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["kupfersulfat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["kupfersulfat"]
+            elif duengemittel_detaillierttyp == "Ammoniummolybdat":
+                duengemittel_detailliert_co2 = duengemittel_detailliert_co2 + menge * factors.co2["ammoniummolybdat"]
+                duengemittel_detailliert_h2o = duengemittel_detailliert_h2o + menge * factors.h2o["ammoniummolybdat"]
+            else:
+                raise ValueError('No valid option for Duengemittel:DetaillierteAngabe has been selected')
+
+    duengemittel_co2 = duengemittel_detailliert_co2+duengemittel_einfach_co2
+    duengemittel_h2o = duengemittel_detailliert_h2o+duengemittel_einfach_h2o
+    return duengemittel_co2, duengemittel_h2o
+
+
+def calc_psm(record, factors):
+    """Calculates the co2 and h2o footprints for crop protection product usage.
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for crop protection product usage
+    """
+
+    fungizide = (record["FungizideKg"][0] + record["FungizideLiter"][0])
+    insektizide = (record["InsektizideKg"][0] + record["InsektizideLiter"][0])
+    fungizide_co2 = fungizide * factors.co2["fungizide"]
+    fungizide_h2o = fungizide * factors.h2o["fungizide"]
+    insektizide_co2 = insektizide * factors.co2["insektizide"]
+    insektizide_h2o = insektizide * factors.h2o["insektizide"]
+
+    psm_co2 = fungizide_co2 + insektizide_co2
+    psm_h2o = fungizide_h2o + insektizide_h2o
+    return psm_co2, psm_h2o
+
+
+def calc_plantbags(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for plant bag usage.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for plant bag usage
+    """
+
+    # input fields: Growbags + Kuebel
+    growbagskuebelverwendung = _selected(record, "GrowbagsKuebel")
+    growbags_co2 = 0
+    growbags_h2o = 0
+    kuebel_co2 = 0
+    kuebel_h2o = 0
+    kuebel_nutzdauer = record["Kuebel:Alter"][0]
+    if kuebel_nutzdauer <= 0:
+        kuebel_nutzdauer = 1
+    if growbagskuebelverwendung == "Growbags":
+        growbags = ((helping_values["row_length_total"]*0.2*2+helping_values["row_length_total"]*0.11*2+helping_values["row_length_total"]/1*2*(0.15*0.11))*0.186)
+        growbags_co2 = growbags * factors.co2["growbags"]
+        growbags_h2o = growbags * factors.h2o["growbags"]
+    elif growbagskuebelverwendung == "Andere Kulturgefaesse (Topf, Kuebel)":
+        calc = (0.03 * record["Kuebel:VolumenProTopf"][0] - 0.0214)
+        if calc <= 0:
+            calc = 0.01
+        kuebel = (calc * helping_values["plant_count_total"]) / record["Kuebel:JungpflanzenProTopf"][0] / kuebel_nutzdauer
+        kuebel_co2 = kuebel * factors.co2["andere_kulturgefaesse"]
+        kuebel_h2o = kuebel * factors.h2o["andere_kulturgefaesse"]
+    elif growbagskuebelverwendung == "nichts":
+        pass
+    else:
+        raise ValueError('No valid option for GrowbagsKuebel has been selected')
+
+    pflanzenbehaelter_co2 = growbags_co2 + kuebel_co2
+    pflanzenbehaelter_h2o = growbags_h2o + kuebel_h2o
+
+    return pflanzenbehaelter_co2, pflanzenbehaelter_h2o
+
+
+def calc_substrate(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for substrate consumption.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the substrate power consumption
+    """
+
+    # input field: Substrat
+    substrat_co2 = 0
+    substrat_h2o = 0
+    volumen = 0
+    # assign the correct volume for the selected option Pflanzenbehaelter
+    growbagskuebelverwendung = _selected(record, "GrowbagsKuebel")
+    if growbagskuebelverwendung == "Growbags":
+        volumen = helping_values["row_length_total"] * 2 * 0.11
+    elif growbagskuebelverwendung == "Andere Kulturgefaesse (Topf, Kuebel)":
+        volumen = record["Kuebel:VolumenProTopf"][0]/record["Kuebel:JungpflanzenProTopf"][0] * helping_values["plant_count_total"]
+    elif growbagskuebelverwendung == "nichts":
+        return substrat_co2, substrat_h2o
+
+    for option in record["Substrat"]:
+        substratmaterial = option[0]
+        nutzdauer = option[1]
+
+        if substratmaterial == "Standardsubstrat":
+            substrat_co2 = substrat_co2 + (volumen * factors.co2["standardsubstrat"])/nutzdauer
+            substrat_h2o = substrat_h2o + (volumen * factors.h2o["standardsubstrat"])/nutzdauer
+        elif substratmaterial == "Kokos":
+            substrat_co2 = substrat_co2 + (volumen * factors.co2["kokos"])/nutzdauer
+            substrat_h2o = substrat_h2o + (volumen * factors.h2o["kokos"])/nutzdauer
+        elif substratmaterial == "Steinwolle":
+            substrat_co2 = substrat_co2 + (volumen * factors.co2["steinwolle"])/nutzdauer
+            substrat_h2o = substrat_h2o + (volumen * factors.h2o["steinwolle"])/nutzdauer
+        elif substratmaterial == "Perlite":
+            substrat_co2 = substrat_co2 + (volumen * factors.co2["perlite"]) / nutzdauer
+            substrat_h2o = substrat_h2o + (volumen * factors.h2o["perlite"]) / nutzdauer
+        elif substratmaterial == "Nachhaltiges Substrat":
+            substrat_co2 = substrat_co2 + (volumen * factors.co2["nachhaltiges_substrat"]) / nutzdauer
+            substrat_h2o = substrat_h2o + (volumen * factors.h2o["nachhaltiges_substrat"]) / nutzdauer
+        else:
+            raise ValueError('No valid option for Substrat has been selected')
+
+    return substrat_co2, substrat_h2o
+
+
+def calc_young_plants_substrate(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for young plants' substrate consumption.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the young plants' substrate consumption
+    """
+
+    jungpflanzen_substratmaterial = _selected(record, "Jungpflanzen:Substrat")
+
+    volumen = (0.1*0.1*0.1) * helping_values["plant_count_total"]
+    if jungpflanzen_substratmaterial == "Standardsubstrat":
+        junpflanzen_substrat_co2 = volumen * factors.co2["standardsubstrat"]
+        junpflanzen_substrat_h2o = volumen * factors.h2o["standardsubstrat"]
+    elif jungpflanzen_substratmaterial == "Kokos":
+        junpflanzen_substrat_co2 = volumen * factors.co2["kokos"]
+        junpflanzen_substrat_h2o = volumen * factors.h2o["kokos"]
+    elif jungpflanzen_substratmaterial == "Steinwolle":
+        junpflanzen_substrat_co2 = volumen * factors.co2["steinwolle"]
+        junpflanzen_substrat_h2o = volumen * factors.h2o["steinwolle"]
+    elif jungpflanzen_substratmaterial == "Perlite":
+        junpflanzen_substrat_co2 = volumen * factors.co2["perlite"]
+        junpflanzen_substrat_h2o = volumen * factors.h2o["perlite"]
+    elif jungpflanzen_substratmaterial == "Nachhaltiges Substrat":
+        junpflanzen_substrat_co2 = volumen * factors.co2["nachhaltiges_substrat"]
+        junpflanzen_substrat_h2o = volumen * factors.h2o["nachhaltiges_substrat"]
+    else:
+        raise ValueError('No valid option for Jungpflanzen:Substrat has been selected')
+
+    return junpflanzen_substrat_co2, junpflanzen_substrat_h2o
+
+
+def calc_young_plants_transport(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for young plants' transport.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the transport of the young plants
+    """
+
+    jungpflanzen_transport_co2 = 0
+    jungpflanzen_transport_h2o = 0
+
+    if record["Jungpflanzen:Distanz"] == default_value:
+        pass
+    else:
+        young_plants_transport = helping_values["plant_count_total"] / 1056 * 0.5 * record["Jungpflanzen:Distanz"][0]
+        jungpflanzen_transport_co2 = young_plants_transport * factors.co2["transport"]
+        jungpflanzen_transport_h2o = factors.h2o["transport"]  # for h2o it is a constant value
+
+    return jungpflanzen_transport_co2, jungpflanzen_transport_h2o
+
+
+def calc_cords(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for cords usage.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the consumptions of cords
+    """
+
+    schnurverwendung = _selected(record, "Schnur")
+    schnuerematerial = _selected(record, "SchnuereRankhilfen:Material")
+    schnuere_co2 = 0
+    schnuere_h2o = 0
+
+    if schnurverwendung == "nein":
+        pass
+    elif schnurverwendung == "ja":
+        if record["SchnuereRankhilfen:Wiederverwendung"] == default_value:
+            nutzdauer = 1
+        else:
+            nutzdauer = record["SchnuereRankhilfen:Wiederverwendung"][0]
+        if schnuerematerial == "Kunststoff":
+            schnuere = (helping_values["cord_length_total"] * 1/1000) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_kunststoff"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_kunststoff"]
+        elif schnuerematerial == "Jute":
+            schnuere = (helping_values["cord_length_total"] * 3 / 900) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_jute"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_jute"]
+        elif schnuerematerial == "Sisal":
+            schnuere = (helping_values["cord_length_total"] * 3 / 900) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_sisal"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_sisal"]
+        elif schnuerematerial == "Zellulose":
+            schnuere = (helping_values["cord_length_total"] * 3 / 900) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_zellulose"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_zellulose"]
+        elif schnuerematerial == "andere Nachhaltige/abbaubare Option":
+            schnuere = (helping_values["cord_length_total"] * 3 / 900) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_nachhaltige_option"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_nachhaltige_option"]
+        elif schnuerematerial == "Bambusstab":
+            schnuere = (helping_values["cord_length_total"] * 0.32) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_bambusstab"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_bambusstab"]
+        elif schnuerematerial == "Edelstahl":
+            schnuere = (helping_values["cord_length_total"] * 0.62) / nutzdauer
+            schnuere_co2 = schnuere * factors.co2["schnuere_edelstahl"]
+            schnuere_h2o = schnuere * factors.h2o["schnuere_edelstahl"]
+        else:
+            raise ValueError('No valid option for SchnuereRankhilfen:Material has been selected')
+    else:
+        raise ValueError('No valid option for Schnur has been selected')
+
+    return schnuere_co2, schnuere_h2o
+
+
+def calc_clips(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for clips usage.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the clips usage
+    """
+
+    klipseverwendung = _selected(record, "Klipse")
+    klipsematerial = _selected(record, "Klipse:Material")
+    klipse_co2 = 0
+    klipse_h2o = 0
+    if record["Klipse:Wiederverwendung"] == default_value:
+        nutzdauer = 1
+    else:
+        nutzdauer = record["Klipse:Wiederverwendung"][0]
+    if klipseverwendung == "nein":
+        pass
+    elif klipseverwendung == "ja":
+        if klipsematerial == "Kunststoff":
+            klipse = (helping_values["clips_count_total"] * 0.0005) / nutzdauer
+            klipse_co2 = klipse * factors.co2["klipse_kunststoff"]
+            klipse_h2o = klipse * factors.h2o["klipse_kunststoff"]
+        elif klipsematerial == "Metall":
+            klipse = (helping_values["clips_count_total"] * 0.0008) / nutzdauer
+            klipse_co2 = klipse * factors.co2["klipse_metall"]
+            klipse_h2o = klipse * factors.h2o["klipse_metall"]
+        elif klipsematerial == "Nachhaltige / kompostierbare Option":
+            klipse = (helping_values["clips_count_total"] * 0.0008) / nutzdauer
+            klipse_co2 = klipse * factors.co2["klipse_nachhaltige_option"]
+            klipse_h2o = klipse * factors.h2o["klipse_nachhaltige_option"]
+        else:
+            raise ValueError('No valid option for Klipse:Material has been selected')
+    else:
+        raise ValueError('No valid option for Klipse has been selected')
+
+    return klipse_co2, klipse_h2o
+
+
+def calc_panicle_hanger(record, helping_values, factors):
+    """Calculates the co2 and h2o footprints for the panicle hanger consumption.
+
+    Args:
+        record: resolved greenhouse dataset
+        helping_values: dictionary of values, that are necessary for the calculation
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for the panicle hanger consumption
+    """
+
+    rispenbuegelverwendung = _selected(record, "Rispenbuegel")
+    rispenbuegelmaterial = _selected(record, "Rispenbuegel:Material")
+    rispenbuegel_co2 = 0
+    rispenbuegel_h2o = 0
+    nutzdauer = record["Rispenbuegel:Wiederverwendung"][0]
+    if rispenbuegelverwendung == "nein":
+        pass
+    elif rispenbuegelverwendung == "ja":
+        if rispenbuegelmaterial == "Kunststoff":
+            rispenbuegel = (helping_values["panicle_hanger_count_total"] * 0.0008) / nutzdauer
+            rispenbuegel_co2 = rispenbuegel * factors.co2["rispenbuegel_kunststoff"]
+            rispenbuegel_h2o = rispenbuegel * factors.h2o["rispenbuegel_kunststoff"]
+        elif rispenbuegelmaterial == "Metall":
+            rispenbuegel = (helping_values["panicle_hanger_count_total"] * 0.001) / nutzdauer
+            rispenbuegel_co2 = rispenbuegel * factors.co2["rispenbuegel_metall"]
+            rispenbuegel_h2o = rispenbuegel * factors.h2o["rispenbuegel_metall"]
+        elif rispenbuegelmaterial == "Nachhaltige / kompostierbare Option":
+            rispenbuegel = (helping_values["panicle_hanger_count_total"] * 0.001) / nutzdauer
+            rispenbuegel_co2 = rispenbuegel * factors.co2["rispenbuegel_nachhaltige_option"]
+            rispenbuegel_h2o = rispenbuegel * factors.h2o["rispenbuegel_nachhaltige_option"]
+        else:
+            raise ValueError('No valid option for Rispenbuegel:Material has been selected')
+    else:
+        raise ValueError('No valid option for Rispenbuegel has been selected')
+
+    return rispenbuegel_co2, rispenbuegel_h2o
+
+
+def calc_packaging(record, factors):
+    """Calculates the co2 and h2o footprints for packaging consumption.
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for packaging consumption consumption
+    """
+
+    # input field: Verpackungsmaterial
+    verpackung_co2 = 0
+    verpackung_h2o = 0
+    if record["Verpackungsmaterial"]:
+        for option in record["Verpackungsmaterial"]:
+            verpackungmaterial = option[0]
+            menge = option[1]
+            if verpackungmaterial == "Karton":
+                verpackung_co2 = verpackung_co2 + menge * factors.co2["verpackung_karton"]
+                verpackung_h2o = verpackung_h2o + menge * factors.h2o["verpackung_karton"]
+            elif verpackungmaterial == "Plastik":
+                verpackung_co2 = verpackung_co2 + menge * factors.co2["verpackung_plastik"]
+                verpackung_h2o = verpackung_h2o + menge * factors.h2o["verpackung_plastik"]
+            else:
+                raise ValueError('No valid option for Verpackungsmaterial has been selected')
+
+    # input field: Mehrwegsteigen
+    if record["Verpackungsmaterial:AnzahlMehrwegsteigen"] != default_value:
+        verpackung_co2 = verpackung_co2 + (record["Verpackungsmaterial:AnzahlMehrwegsteigen"][0] / 50 * factors.co2["verpackung_mehrwegsteigen"])
+        verpackung_h2o = verpackung_h2o + (record["Verpackungsmaterial:AnzahlMehrwegsteigen"][0] / 50 * factors.h2o["verpackung_mehrwegsteigen"])
+
+    return verpackung_co2, verpackung_h2o
+
+
+def calc_other_consumables(record, factors):
+    """Calculates the co2 and h2o footprints for other consumables.
+
+    Args:
+        record: resolved greenhouse dataset
+        factors: emission factor table
+
+    Returns:
+        co2 and h2o footprints for other consumables
+    """
+
+    # input field: Sonstige Verbrauchsmaterialien
+    sonstige_verbrauchsmaterialien_co2 = 0
+    sonstige_verbrauchsmaterialien_h2o = 0
+    if record["SonstigeVerbrauchsmaterialien"]:
+        for option in record["SonstigeVerbrauchsmaterialien"]:
+            sonstige_verbrauchsmaterialienmaterial = option[0]
+            menge = option[1]
+            nutzdauer = option[3]
+            # shouldn't ever happen
+            if nutzdauer == 0:
+                nutzdauer = 1
+            if sonstige_verbrauchsmaterialienmaterial == "Folie":
+                sonstige_verbrauchsmaterialien_co2 = sonstige_verbrauchsmaterialien_co2 + menge * factors.co2["verbrauchsmaterialien_folie"] / nutzdauer
+                sonstige_verbrauchsmaterialien_h2o = sonstige_verbrauchsmaterialien_h2o + menge * factors.h2o["verbrauchsmaterialien_folie"] / nutzdauer
+            elif sonstige_verbrauchsmaterialienmaterial == "Eisen":
+                sonstige_verbrauchsmaterialien_co2 = sonstige_verbrauchsmaterialien_co2 + menge * factors.co2["verbrauchsmaterialien_eisen"] / nutzdauer
+                sonstige_verbrauchsmaterialien_h2o = sonstige_verbrauchsmaterialien_h2o + menge * factors.h2o["verbrauchsmaterialien_eisen"] / nutzdauer
+            elif sonstige_verbrauchsmaterialienmaterial == "Alluminium":
+                sonstige_verbrauchsmaterialien_co2 = sonstige_verbrauchsmaterialien_co2 + menge * factors.co2["verbrauchsmaterialien_alluminium"] / nutzdauer
+                sonstige_verbrauchsmaterialien_h2o = sonstige_verbrauchsmaterialien_h2o + menge * factors.h2o["verbrauchsmaterialien_alluminium"] / nutzdauer
+            elif sonstige_verbrauchsmaterialienmaterial == "Kunststoff":
+                sonstige_verbrauchsmaterialien_co2 = sonstige_verbrauchsmaterialien_co2 + menge * factors.co2["verbrauchsmaterialien_kunststoff"] / nutzdauer
+                sonstige_verbrauchsmaterialien_h2o = sonstige_verbrauchsmaterialien_h2o + menge * factors.h2o["verbrauchsmaterialien_kunststoff"] / nutzdauer
+            elif sonstige_verbrauchsmaterialienmaterial == "Holz":
+                sonstige_verbrauchsmaterialien_co2 = sonstige_verbrauchsmaterialien_co2 + menge * factors.co2["verbrauchsmaterialien_holz"] / nutzdauer
+                sonstige_verbrauchsmaterialien_h2o = sonstige_verbrauchsmaterialien_h2o + menge * factors.h2o["verbrauchsmaterialien_holz"] / nutzdauer
+            elif sonstige_verbrauchsmaterialienmaterial == "Pappe":
+                sonstige_verbrauchsmaterialien_co2 = sonstige_verbrauchsmaterialien_co2 + menge * factors.co2["verbrauchsmaterialien_pappe"] / nutzdauer
+                sonstige_verbrauchsmaterialien_h2o = sonstige_verbrauchsmaterialien_h2o + menge * factors.h2o["verbrauchsmaterialien_pappe"] / nutzdauer
+            else:
+                raise ValueError('No valid option for SonstigeVerbrauchsmaterialien has been selected')
+
+    return sonstige_verbrauchsmaterialien_co2, sonstige_verbrauchsmaterialien_h2o
+
+
+def _results(*categories):
+    """Returns the result names of the categories, first all co2 results and then all h2o results."""
+    return [category + "_co2" for category in categories] + [category + "_h2o" for category in categories]
+
+
+def _interleaved_results(*categories):
+    """Returns the result names of the categories, the co2 and h2o result of every category in turn."""
+    return [category + suffix for category in categories for suffix in ("_co2", "_h2o")]
+
+
+# all steps of the footprint calculation, together they calculate every category of CATEGORIES
+CALCULATION_STEPS = (
+    CalculationStep(
+        calc_greenhouse_construction, "construction",
+        _results("konstruktion", "energieschirm", "bodenabdeckung", "produktionssystem", "bewaesserung",
+                 "heizsystem", "zusaetzliches_heizsystem"),
+        ["AlterBedachungsmaterial", "AlterEnergieschirm", "AlterHeizsystem", "AlterProduktionssystem",
+         "AlterStehwandmaterial", "AlterZusaetzlichesHeizsystem", "Bedachungsmaterial", "Bewaesserungsart",
+         "Bodenabdeckung", "Breite", "Energieschirm", "EnergieschirmTyp", "GWHAlter", "GWHArt", "Heizsystem",
+         "Laenge", "Produktionssystem", "Produktionstyp", "Stehwandmaterial", "ZusaetzlichesHeizsystem",
+         "ZusaetzlichesHeizsystemTyp"],
+        ["culture_length_usage", "culture_size", "gh_size", "hull_size", "row_length_total", "walk_length_total"]),
+    CalculationStep(
+        calc_energy_source, "energy", _results("energietraeger"),
+        ["Energietraeger", "GWHFlaeche", "WaermeteilungFlaeche", "Waermeversorgung"]),
+    CalculationStep(
+        calc_electric_power, "energy", _results("strom"),
+        ["Belichtungsstrom", "Energietraeger", "Stromherkunft", "Zusatzbelichtung"],
+        ["bhkw_usage", "culture_length_usage", "energyconsumption_company", "energyconsumption_lighting"]),
+    CalculationStep(
+        calc_water_usage, "water",
+        _interleaved_results("brunnenwasser", "regenwasser", "stadtwasser", "oberflaechenwasser"),
+        ["Restwasser", "VorlaufmengeAnteile", "VorlaufmengeGesamt", "WasserVerbrauch"]),
+    CalculationStep(calc_co2_added, "fertilizer", _results("co2_zudosierung"), ["CO2-Herkunft"]),
+    CalculationStep(
+        calc_fertilizer, "fertilizer", _results("duengemittel"),
+        ["Duengemittel:DetaillierteAngabe", "Duengemittel:VereinfachteAngabe"]),
+    CalculationStep(
+        calc_psm, "fertilizer", _results("psm"),
+        ["FungizideKg", "FungizideLiter", "InsektizideKg", "InsektizideLiter"]),
+    CalculationStep(
+        calc_plantbags, "consumables", _results("pflanzenbehaelter"),
+        ["GrowbagsKuebel", "Kuebel:Alter", "Kuebel:JungpflanzenProTopf", "Kuebel:VolumenProTopf"],
+        ["plant_count_total", "row_length_total"]),
+    CalculationStep(
+        calc_substrate, "consumables", _results("substrat"),
+        ["GrowbagsKuebel", "Kuebel:JungpflanzenProTopf", "Kuebel:VolumenProTopf", "Substrat"],
+        ["plant_count_total", "row_length_total"]),
+    CalculationStep(
+        calc_young_plants_substrate, "consumables", _results("jungpflanzen_substrat"), ["Jungpflanzen:Substrat"],
+        ["plant_count_total"]),
+    CalculationStep(
+        calc_young_plants_transport, "consumables", _results("jungpflanzen_transport"), ["Jungpflanzen:Distanz"],
+        ["plant_count_total"]),
+    CalculationStep(
+        calc_cords, "consumables", _results("schnuere"),
+        ["SchnuereRankhilfen:Material", "SchnuereRankhilfen:Wiederverwendung", "Schnur"],
+        ["cord_length_total"]),
+    CalculationStep(
+        calc_clips, "consumables", _results("klipse"), ["Klipse", "Klipse:Material", "Klipse:Wiederverwendung"],
+        ["clips_count_total"]),
+    CalculationStep(
+        calc_panicle_hanger, "consumables", _results("rispenbuegel"),
+        ["Rispenbuegel", "Rispenbuegel:Material", "Rispenbuegel:Wiederverwendung"],
+        ["panicle_hanger_count_total"]),
+    CalculationStep(
+        calc_packaging, "consumables", _results("verpackung"),
+        ["Verpackungsmaterial", "Verpackungsmaterial:AnzahlMehrwegsteigen"]),
+    CalculationStep(
+        calc_other_consumables, "consumables", _results("sonstige_verbrauchsmaterialien"),
+        ["SonstigeVerbrauchsmaterialien"]),
+)
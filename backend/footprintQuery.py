@@ -0,0 +1,157 @@
+"""
+    This file contains the query layer of the footprint endpoints.
+
+    load_footprint_data() loads everything the footprint endpoints read for the greenhouses of a user with a fixed number
+    of queries, independent of the number of data sets:
+        - the data sets with their result values (see resultValues.py)
+        - the measures of the most recent data set of every greenhouse (see loadGreenhouseData.py)
+        - the production type and the water usage selection of the data sets
+        - the best and the worst performers (see performerRankings.py) with their result values
+    FootprintData holds the result values as a matrix with one row per data set and the columns of RESULT_LAYOUT for
+    every kind, from which the total, normalized, direct and fruit size views of a greenhouse are read.
+
+"""
+from decimal import Decimal
+
+from .loadGreenhouseData import load_measure_values
+from .models import GreenhouseData, Selections
+from .performerRankings import PRODUCTION_TYPE_GROUP, get_performers
+from .referenceCatalog import get_catalog
+from .resultValues import RESULT_LAYOUT_VERSION, load_result_values_from_results, result_dict
+
+BIOLOGIC = "Biologisch"
+CONVENTIONAL = "Konventionell"
+
+# a data set has a water footprint, if this option is selected
+WATER_USAGE_GROUP = "WasserVerbrauch"
+WATER_USAGE_OPTION = "ja"
+
+
+class FootprintData:
+    """The data sets of the greenhouses of a user with their results and the performers they are compared with."""
+
+    def __init__(self, greenhouses, datasets, result_values, measure_values, selected_options, performers,
+                 performer_datasets):
+        self.greenhouses = greenhouses
+        self._datasets = datasets
+        self._result_values = result_values
+        self._measure_values = measure_values
+        self._selected_options = selected_options
+        self._performers = performers
+        self._performer_datasets = performer_datasets
+
+    def datasets(self, greenhouse):
+        """Returns the data sets of a greenhouse in ascending id order."""
+        return self._datasets.get(greenhouse.id, [])
+
+    def recent_dataset(self, greenhouse):
+        """Returns the most recent data set of a greenhouse. Raises an IndexError, if the greenhouse has none."""
+        return self.datasets(greenhouse)[-1]
+
+    def production_type(self, dataset):
+        """Returns "Biologisch", if the production type biologic is selected in a data set, else "Konventionell"."""
+        option_id = _option_id(PRODUCTION_TYPE_GROUP, BIOLOGIC)
+        return BIOLOGIC if option_id in self._selected_options.get(dataset.id, ()) else CONVENTIONAL
+
+    def has_water_usage(self, dataset):
+        """Returns false, if a data set has no water footprint."""
+        option_id = _option_id(WATER_USAGE_GROUP, WATER_USAGE_OPTION)
+        return option_id is None or option_id in self._selected_options.get(dataset.id, ())
+
+    def results(self, dataset_id, kind, calculation_names):
+        """Returns results of one kind of a data set or a performer.
+
+        Args:
+            dataset_id: id of the data set
+            kind: "total", "normalizedkg" or "normalizedm2"
+            calculation_names: names of the results
+
+        Returns:
+            dictionary: calculation_name -> value
+        """
+        return result_dict(self._result_values[dataset_id], kind, calculation_names)
+
+    def measure(self, dataset, measurement_name):
+        """Returns the value of a measure of the most recent data set of a greenhouse as decimal.
+
+        Raises:
+            KeyError: if the data set has no such measure
+        """
+        measure_values = self._measure_values[dataset.id]
+        return Decimal(measure_values[str(get_catalog().measurement_id(measurement_name))][0])
+
+    def performer(self, production_type, calculation_name, is_best_performer):
+        """Returns the best or the worst performer of a production type.
+
+        Args:
+            production_type: "Biologisch" or "Konventionell"
+            calculation_name: name of the normalized footprint in the Calculations table
+            is_best_performer (boolean): true -> best performer; false -> worst performer
+
+        Returns:
+            GreenhouseData: data set of the performer or None, if there is none
+        """
+        best_id, worst_id = self._performers[(production_type, calculation_name)]
+        return self._performer_datasets.get(best_id if is_best_performer else worst_id)
+
+
+def _option_id(option_group_name, option_value):
+    """Returns the id of an option or None, if it does not exist."""
+    try:
+        return get_catalog().option_id(option_group_name, option_value)
+    except KeyError:
+        return None
+
+
+def load_footprint_data(greenhouses, performer_calculations):
+    """Loads the data sets of greenhouses with everything the footprint endpoints need.
+
+    Args:
+        greenhouses: greenhouses of a user
+        performer_calculations: names of the normalized footprints, whose performers are compared with the most recent
+            data sets, see performerRankings.RANKED_CALCULATIONS
+
+    Returns:
+        FootprintData: the loaded data
+    """
+
+    greenhouses = list(greenhouses)
+    dataset_list = list(GreenhouseData.objects.filter(greenhouse__in=greenhouses).order_by('greenhouse_id', 'id')
+                        .only('id', 'greenhouse_id', 'date', 'result_values'))
+    datasets = dict()
+    for dataset in dataset_list:
+        datasets.setdefault(dataset.greenhouse_id, []).append(dataset)
+    recent_datasets = [greenhouse_datasets[-1] for greenhouse_datasets in datasets.values()]
+
+    option_ids = [option_id for option_id in (_option_id(PRODUCTION_TYPE_GROUP, BIOLOGIC),
+                                              _option_id(WATER_USAGE_GROUP, WATER_USAGE_OPTION))
+                  if option_id is not None]
+    selected_options = dict()
+    for greenhouse_data_id, option_id in Selections.objects \
+            .filter(greenhouse_data_id__in=[dataset.id for dataset in recent_datasets], option_id__in=option_ids) \
+            .values_list('greenhouse_data_id', 'option_id'):
+        selected_options.setdefault(greenhouse_data_id, set()).add(option_id)
+
+    biologic_id = _option_id(PRODUCTION_TYPE_GROUP, BIOLOGIC)
+    production_types = sorted({BIOLOGIC if biologic_id in selected_options.get(dataset.id, ()) else CONVENTIONAL
+                               for dataset in recent_datasets})
+    performers = get_performers(production_types, performer_calculations) if production_types else dict()
+    performer_ids = {performer_id for performer_ids in performers.values() for performer_id in performer_ids
+                     if performer_id is not None}
+    performer_datasets = GreenhouseData.objects.only('id', 'date', 'result_values').in_bulk(performer_ids)
+
+    result_values = _result_values(dataset_list + list(performer_datasets.values()))
+    measure_values = load_measure_values([dataset.id for dataset in recent_datasets]) if recent_datasets else dict()
+    return FootprintData(greenhouses, datasets, result_values, measure_values, selected_options, performers,
+                         performer_datasets)
+
+
+def _result_values(datasets):
+    """Returns the result values of loaded data sets, data sets that have not been backfilled yet are built from the
+    Results and Measures tables, see resultValues.load_result_values()."""
+    result_values = {dataset.id: dataset.result_values for dataset in datasets}
+    missing = [dataset_id for dataset_id, values in result_values.items()
+               if values is None or values.get("layout") != RESULT_LAYOUT_VERSION]
+    if missing:
+        result_values.update(load_result_values_from_results(missing))
+    return result_values
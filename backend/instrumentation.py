@@ -0,0 +1,121 @@
+"""
+    This file contains the instrumentation of the footprint calculation.
+
+    The calculation does not print its intermediate values. Instead, it reports them as debug records and measures the
+    duration of its stages with spans. Both only do something while a trace is active in the current context (thread
+    or task), otherwise record_values() returns immediately and span() returns a shared no-op context manager. A trace
+    is started by tracing(), e.g. by backend.middleware.FootprintTraceMiddleware for a single request.
+
+    The debug records are sent to the logger "backend.trace" with the stage and the values as extra attributes. The
+    spans of a trace can be exported as Server-Timing header or as dictionary.
+
+    The module does not import Django, so that the calculation stays independent of it.
+
+"""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+trace_logger = logging.getLogger("backend.trace")
+
+_active_trace = contextvars.ContextVar("footprint_trace", default=None)
+_no_span = nullcontext()
+
+
+class Trace:
+    """This class collects the spans and the debug records of one trace."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (name, start offset in seconds, duration in seconds)
+        self.spans = []
+        # (stage, values)
+        self.records = []
+
+    def durations(self):
+        """Returns the total duration of every span name in seconds, in the order in which the names appeared first."""
+        durations = dict()
+        for name, _, duration in self.spans:
+            durations[name] = durations.get(name, 0.0) + duration
+        return durations
+
+    def server_timing(self):
+        """Returns the durations of the spans as value of a Server-Timing header (durations in milliseconds)."""
+        return ", ".join("%s;dur=%.3f" % (name, duration * 1000) for name, duration in self.durations().items())
+
+    def as_dict(self):
+        """Returns the spans of the trace as dictionary, e.g. for a profile in json format."""
+        return {
+            "total": time.perf_counter() - self.started,
+            "durations": self.durations(),
+            "spans": [{"name": name, "start": start, "duration": duration} for name, start, duration in self.spans],
+        }
+
+
+class _Span:
+    """Context manager that adds its duration to a trace."""
+
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        self.trace.spans.append((self.name, self.start - self.trace.started, end - self.start))
+        return False
+
+
+@contextmanager
+def tracing():
+    """Activates a new trace in the current context.
+
+    Yields:
+        Trace: the active trace, it can be exported after the with block
+    """
+    trace = Trace()
+    token = _active_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _active_trace.reset(token)
+
+
+def is_tracing():
+    """Returns True, if a trace is active. Callers check this before they collect expensive debug values."""
+    return _active_trace.get() is not None
+
+
+def span(name):
+    """Returns a context manager that measures the duration of a stage, if a trace is active.
+
+    Args:
+        name: name of the stage, spans with the same name are added up in the export
+
+    Returns:
+        context manager
+    """
+    trace = _active_trace.get()
+    if trace is None:
+        return _no_span
+    return _Span(trace, name)
+
+
+def record_values(stage, values):
+    """Adds a debug record with intermediate values to the active trace and logs it.
+
+    Args:
+        stage: name of the stage or category the values belong to, e.g. "helping_values"
+        values: dictionary of value name -> value
+    """
+    trace = _active_trace.get()
+    if trace is None:
+        return
+    trace.records.append((stage, values))
+    trace_logger.debug("%s: %s", stage, values, extra={"stage": stage, "values": values})
@@ -0,0 +1,135 @@
+"""
+    This file rebuilds the standardized data of stored greenhouse data sets from the Measures and Selections tables.
+
+    The Measures and Selections tables contain the data sets after standardize_units() has been applied, so the rebuilt
+    data can be passed to the footprint calculation directly. The measures of a data set are also stored in one row,
+    in GreenhouseData.measure_values, which is read instead of the Measures table whenever it is filled.
+
+"""
+from django.db.backends.utils import format_number
+
+from .models import GreenhouseData, Measures, Selections
+from .referenceCatalog import get_catalog
+from .utils import default_value, default_option
+
+
+def load_standardized_data(greenhouse_data_ids):
+    """Loads the standardized data of multiple greenhouse data sets with one query per table.
+
+    Measurements without a stored measure get the default value and option groups without a selection get the default
+    option, exactly like an empty input field. The selections keep the order in which they have been stored.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> standardized data
+    """
+
+    measure_values = load_measure_values(greenhouse_data_ids)
+    selections = {greenhouse_data_id: [] for greenhouse_data_id in greenhouse_data_ids}
+    for greenhouse_data_id, *selection in Selections.objects.filter(greenhouse_data_id__in=selections.keys()) \
+            .order_by('id') \
+            .values_list('greenhouse_data_id', 'option_id', 'selection_value', 'selection_unit_id', 'selection_value2'):
+        selections[greenhouse_data_id].append(selection)
+    return {greenhouse_data_id: build_standardized_data(measure_values.get(greenhouse_data_id, dict()),
+                                                        selections[greenhouse_data_id])
+            for greenhouse_data_id in selections}
+
+
+def build_standardized_data(measure_values, selections):
+    """Builds the standardized data of one data set from its stored measures and selections.
+
+    Args:
+        measure_values: measure values of the data set, see build_measure_values()
+        selections: (option_id, selection_value, selection_unit_id, selection_value2) of the stored selections in the
+            order in which they have been stored
+
+    Returns:
+        dictionary: standardized data
+    """
+
+    catalog = get_catalog()
+    data = {name: default_value for _, name in catalog.measurements()}
+    data.update({name: [] for _, name in catalog.option_groups()})
+
+    for measurement_id, (measure_value, measure_unit_id) in measure_values.items():
+        data[catalog.measurement_name(int(measurement_id))] = (float(measure_value), measure_unit_id)
+
+    for option_id, selection_value, selection_unit_id, selection_value2 in selections:
+        option_group_id = catalog.option_group_id_of_option(option_id)
+        if option_group_id is None:
+            # the default option does not belong to an option group
+            continue
+        if selection_value is not None and selection_unit_id is not None:
+            selection = (option_id, float(selection_value), selection_unit_id)
+            if selection_value2 is not None:
+                selection = selection + (float(selection_value2),)
+        else:
+            selection = (option_id,)
+        data[catalog.option_group_name(option_group_id)].append(selection)
+
+    for name, value in data.items():
+        if value == []:
+            data[name] = list(default_option)
+    return data
+
+
+def load_measure_values(greenhouse_data_ids):
+    """Loads the measures of multiple greenhouse data sets.
+
+    The measures are read from GreenhouseData.measure_values, only data sets without it are read from the Measures
+    table.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> measure values, see build_measure_values()
+    """
+
+    measure_values = dict(GreenhouseData.objects.filter(id__in=greenhouse_data_ids)
+                          .values_list('id', 'measure_values'))
+    missing = [greenhouse_data_id for greenhouse_data_id, values in measure_values.items() if values is None]
+    if missing:
+        measure_values.update(load_measure_values_from_measures(missing))
+    return measure_values
+
+
+def load_measure_values_from_measures(greenhouse_data_ids):
+    """Loads the measures of multiple greenhouse data sets from the Measures table with one query.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> measure values, see build_measure_values()
+    """
+
+    measure_values = {greenhouse_data_id: dict() for greenhouse_data_id in greenhouse_data_ids}
+    measures = Measures.objects.filter(greenhouse_data_id__in=greenhouse_data_ids) \
+        .values_list('greenhouse_data_id', 'measurement_id', 'measure_value', 'measure_unit_id')
+    for greenhouse_data_id, measurement_id, measure_value, measure_unit_id in measures:
+        measure_values[greenhouse_data_id][str(measurement_id)] = [str(measure_value), measure_unit_id]
+    return measure_values
+
+
+def build_measure_values(standardized_data, measurements):
+    """Builds the value of GreenhouseData.measure_values for a data set.
+
+    Args:
+        standardized_data: standardized data of the data set
+        measurements: dictionary measurement_name -> Measurements
+
+    Returns:
+        dictionary: "<measurement_id>" -> ["<measure_value>", <measure_unit_id>], the value is formatted exactly as
+            the Measures table stores it
+    """
+
+    field = Measures._meta.get_field('measure_value')
+    measure_values = dict()
+    for name, value in standardized_data.items():
+        if name in measurements:
+            measure_value = format_number(field.to_python(value[0]), field.max_digits, field.decimal_places)
+            measure_values[str(measurements[name].id)] = [measure_value, value[1]]
+    return measure_values
@@ -0,0 +1,39 @@
+"""
+    This file contains the management command activate_factor_set.
+
+    It selects the factor set that is used for all following footprint calculations. The builtin factor set of
+    backend/data/equivalents.py is activated with the version "builtin". The stored results are not changed, they are
+    recalculated with the command recalculate_footprints.
+
+    Usage:
+        python manage.py activate_factor_set VERSION
+
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.factorSets import builtin_factors
+from backend.models import FactorSets
+
+
+class Command(BaseCommand):
+    help = 'Activates a stored version of the emission factors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('version', help='version of the factor set or "builtin"')
+
+    def handle(self, *args, **options):
+        version = options['version']
+        if version in ('builtin', builtin_factors.version):
+            FactorSets.objects.filter(active=True).update(active=False)
+            self.stdout.write(self.style.SUCCESS(f"Activated the builtin factor set '{builtin_factors.version}'"))
+            return
+
+        with transaction.atomic():
+            factor_set = FactorSets.objects.filter(version=version).first()
+            if factor_set is None:
+                raise CommandError(f"There is no factor set '{version}'")
+            FactorSets.objects.filter(active=True).exclude(id=factor_set.id).update(active=False)
+            factor_set.active = True
+            factor_set.save()
+        self.stdout.write(self.style.SUCCESS(f"Activated the factor set '{version}'"))
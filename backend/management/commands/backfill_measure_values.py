@@ -0,0 +1,43 @@
+"""
+    This file contains the management command backfill_measure_values.
+
+    It fills GreenhouseData.measure_values of the data sets, that have been stored before the field has been added,
+    from the Measures table.
+
+    Usage:
+        python manage.py backfill_measure_values [--chunk-size N]
+
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.loadGreenhouseData import load_measure_values_from_measures
+from backend.models import GreenhouseData
+
+
+class Command(BaseCommand):
+    help = 'Fills the measure values of all greenhouse data sets without them from the Measures table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='number of data sets per chunk')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size has to be at least 1')
+
+        dataset_ids = list(GreenhouseData.objects.filter(measure_values__isnull=True).order_by('id')
+                           .values_list('id', flat=True))
+        self.stdout.write(f"Backfilling {len(dataset_ids)} data sets")
+        for start in range(0, len(dataset_ids), options['chunk_size']):
+            chunk = dataset_ids[start:start + options['chunk_size']]
+            measure_values = load_measure_values_from_measures(chunk)
+            with transaction.atomic():
+                # data sets that have been updated in the meantime already contain their measure values
+                pending = set(GreenhouseData.objects.select_for_update()
+                              .filter(id__in=chunk, measure_values__isnull=True).values_list('id', flat=True))
+                GreenhouseData.objects.bulk_update(
+                    [GreenhouseData(id=dataset_id, measure_values=values)
+                     for dataset_id, values in measure_values.items() if dataset_id in pending],
+                    ['measure_values'], batch_size=500)
+            self.stdout.write(f"Data sets up to id {chunk[-1]} backfilled")
+        self.stdout.write(self.style.SUCCESS(f"{len(dataset_ids)} data sets backfilled"))
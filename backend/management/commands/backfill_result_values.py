@@ -0,0 +1,43 @@
+"""
+    This file contains the management command backfill_result_values.
+
+    It fills GreenhouseData.result_values of the data sets, that have been stored before the field has been added,
+    from the Results and Measures tables.
+
+    Usage:
+        python manage.py backfill_result_values [--chunk-size N]
+
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.models import GreenhouseData
+from backend.resultValues import load_result_values_from_results
+
+
+class Command(BaseCommand):
+    help = 'Fills the result values of all greenhouse data sets without them from the Results and Measures tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='number of data sets per chunk')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size has to be at least 1')
+
+        dataset_ids = list(GreenhouseData.objects.filter(result_values__isnull=True).order_by('id')
+                           .values_list('id', flat=True))
+        self.stdout.write(f"Backfilling {len(dataset_ids)} data sets")
+        for start in range(0, len(dataset_ids), options['chunk_size']):
+            chunk = dataset_ids[start:start + options['chunk_size']]
+            result_values = load_result_values_from_results(chunk)
+            with transaction.atomic():
+                # data sets that have been updated in the meantime already contain their result values
+                pending = set(GreenhouseData.objects.select_for_update()
+                              .filter(id__in=chunk, result_values__isnull=True).values_list('id', flat=True))
+                GreenhouseData.objects.bulk_update(
+                    [GreenhouseData(id=dataset_id, result_values=values)
+                     for dataset_id, values in result_values.items() if dataset_id in pending],
+                    ['result_values'], batch_size=500)
+            self.stdout.write(f"Data sets up to id {chunk[-1]} backfilled")
+        self.stdout.write(self.style.SUCCESS(f"{len(dataset_ids)} data sets backfilled"))
@@ -0,0 +1,112 @@
+"""
+    This file contains the management command explain_lookups.
+
+    It shows the query plans and the average duration of the lookups on the hot paths of the footprint endpoints and of
+    the update of a data set:
+        measure: Measures by (greenhouse_data, measurement)
+        result: Results by (greenhouse_data, calculation)
+        ranking: Results of a calculation ordered by result_value, as in the search of the best performer
+        selection: Selections by (greenhouse_data, option)
+
+    The indexes of these lookups are declared in the Meta of the models. Like all tables of this repository they are
+    created by the migration that makemigrations generates (see docs/IntegrateDev.md), so on an existing database
+    makemigrations and migrate have to be run first, otherwise the plans show the old single column indexes.
+
+    With --seed N, N synthetic data sets are added first. They are copies of the first stored data set with random
+    result values and belong to the user explain_lookups, so --seed should only be used on a benchmark database.
+
+    Usage:
+        python manage.py explain_lookups [--seed N] [--repeat N]
+
+"""
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.models import GreenhouseData, Greenhouses, Measures, Results, Selections
+
+SEED_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Shows the query plans and durations of the lookups on Measures, Results and Selections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='add this many synthetic data sets first')
+        parser.add_argument('--repeat', type=int, default=200, help='number of timed executions per lookup')
+
+    def handle(self, *args, **options):
+        if options['seed'] < 0 or options['repeat'] < 1:
+            raise CommandError('--seed has to be at least 0 and --repeat at least 1')
+
+        template = GreenhouseData.objects.filter(measures__isnull=False).order_by('id').first()
+        if template is None:
+            raise CommandError('At least one data set with measures has to be stored')
+        if options['seed']:
+            self.seed(template, options['seed'])
+
+        rng = random.Random(0)
+        dataset_ids = list(GreenhouseData.objects.values_list('id', flat=True))
+        measurement_ids = [measure.measurement_id for measure in Measures.objects.filter(greenhouse_data=template)]
+        calculation_ids = [result.calculation_id for result in Results.objects.filter(greenhouse_data=template)]
+        option_ids = [selection.option_id for selection in Selections.objects.filter(greenhouse_data=template)]
+        self.stdout.write(f"{len(dataset_ids)} data sets, {Measures.objects.count()} measures, "
+                          f"{Results.objects.count()} results, {Selections.objects.count()} selections")
+
+        lookups = {
+            'measure': lambda: Measures.objects.filter(greenhouse_data_id=rng.choice(dataset_ids),
+                                                       measurement_id=rng.choice(measurement_ids)),
+            'result': lambda: Results.objects.filter(greenhouse_data_id=rng.choice(dataset_ids),
+                                                     calculation_id=rng.choice(calculation_ids)),
+            'ranking': lambda: Results.objects.filter(calculation_id=rng.choice(calculation_ids),
+                                                      result_value__gt=0).order_by('result_value')[:1],
+            'selection': lambda: Selections.objects.filter(greenhouse_data_id=rng.choice(dataset_ids),
+                                                           option_id=rng.choice(option_ids or [0])),
+        }
+        for name, lookup in lookups.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(lookup().explain())
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(lookup())
+            duration = (time.perf_counter() - started) / options['repeat']
+            self.stdout.write(f"{duration * 1000:.3f} ms per lookup")
+
+    def seed(self, template, count):
+        """Adds synthetic copies of a data set with random result values.
+
+        Args:
+            template: GreenhouseData that is copied
+            count: number of copies
+        """
+
+        rng = random.Random(0)
+        user, _ = User.objects.get_or_create(username='explain_lookups')
+        greenhouse, _ = Greenhouses.objects.get_or_create(user=user, greenhouse_name='explain_lookups')
+        measures = list(Measures.objects.filter(greenhouse_data=template))
+        results = list(Results.objects.filter(greenhouse_data=template))
+        selections = list(Selections.objects.filter(greenhouse_data=template))
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            with transaction.atomic():
+                datasets = GreenhouseData.objects.bulk_create(
+                    [GreenhouseData(greenhouse=greenhouse, date=template.date)
+                     for _ in range(min(SEED_CHUNK_SIZE, count - start))])
+                Measures.objects.bulk_create(
+                    [Measures(greenhouse_data=dataset, measurement_id=measure.measurement_id,
+                              measure_unit_id=measure.measure_unit_id, measure_value=measure.measure_value)
+                     for dataset in datasets for measure in measures], batch_size=5000)
+                Results.objects.bulk_create(
+                    [Results(greenhouse_data=dataset, calculation_id=result.calculation_id,
+                             result_value=round(result.result_value * rng.randint(50, 150) / 100, 3),
+                             factor_version=result.factor_version)
+                     for dataset in datasets for result in results], batch_size=5000)
+                Selections.objects.bulk_create(
+                    [Selections(greenhouse_data=dataset, option_id=selection.option_id,
+                                selection_value=selection.selection_value,
+                                selection_unit_id=selection.selection_unit_id,
+                                selection_value2=selection.selection_value2)
+                     for dataset in datasets for selection in selections], batch_size=5000)
+            self.stdout.write(f"{start + len(datasets)} of {count} data sets added")
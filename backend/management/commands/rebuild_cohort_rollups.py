@@ -0,0 +1,69 @@
+"""
+    This file contains the management command rebuild_cohort_rollups.
+
+    It builds the rows of the CohortRollups table from the selections and result values of all data sets and sets
+    GreenhouseData.cohort_values accordingly. It is used to count the data sets that have been stored before the
+    rollups have been added. The result values of data sets that have not been backfilled yet are built from the
+    Results and Measures tables.
+
+    The existing rows stay locked until the rebuild is finished. Data sets that are stored in the meantime are counted
+    afterwards.
+
+    Usage:
+        python manage.py rebuild_cohort_rollups [--chunk-size N]
+
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.cohortRollups import build_cohort_values, count_cohort_values, load_cohorts, lock_rollups, \
+    rollup_keys, save_rollups
+from backend.models import CohortRollups, GreenhouseData
+from backend.resultValues import load_result_values
+
+ROLLUP_FIELDS = ('count', 'sum', 'sum_of_squares', 'min_value', 'max_value', 'stale')
+
+
+class Command(BaseCommand):
+    help = 'Builds the cohort rollups from the selections and result values of all greenhouse data sets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='number of data sets per chunk')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size has to be at least 1')
+
+        with transaction.atomic():
+            rows = {(row.dimension, row.cohort, row.calculation.calculation_name, row.normalization): row
+                    for row in CohortRollups.objects.select_for_update().select_related('calculation').order_by('id')}
+            # the rollups are counted in unsaved rows first
+            counts = {key: CohortRollups(count=0, sum=Decimal(0), sum_of_squares=Decimal(0)) for key in rows}
+            dataset_ids = list(GreenhouseData.objects.order_by('id').values_list('id', flat=True))
+            counted = 0
+            for start in range(0, len(dataset_ids), options['chunk_size']):
+                chunk = dataset_ids[start:start + options['chunk_size']]
+                cohorts = load_cohorts(chunk)
+                result_values = load_result_values(chunk)
+                datasets = []
+                for dataset_id in chunk:
+                    values = build_cohort_values(cohorts.get(dataset_id), result_values.get(dataset_id))
+                    if values is not None:
+                        for key in rollup_keys(values):
+                            counts.setdefault(key, CohortRollups(count=0, sum=Decimal(0), sum_of_squares=Decimal(0)))
+                        count_cohort_values(counts, values, 1)
+                        counted += 1
+                    datasets.append(GreenhouseData(id=dataset_id, cohort_values=values))
+                GreenhouseData.objects.bulk_update(datasets, ['cohort_values'], batch_size=500)
+                self.stdout.write(f"Data sets up to id {chunk[-1]} counted")
+
+            new_keys = set(counts) - set(rows)
+            if new_keys:
+                rows.update(lock_rollups(new_keys))
+            for key, count in counts.items():
+                for field in ROLLUP_FIELDS:
+                    setattr(rows[key], field, getattr(count, field))
+            save_rollups([rows[key] for key in counts])
+        self.stdout.write(self.style.SUCCESS(f"{counted} of {len(dataset_ids)} data sets counted"))
@@ -0,0 +1,56 @@
+"""
+    This file contains the management command rebuild_footprint_distributions.
+
+    It builds the quantile sketches in the FootprintDistributions table from the result values of all data sets and
+    sets GreenhouseData.distribution_values accordingly. It is used to count the data sets that have been stored before
+    the distributions have been added. The result values of data sets that have not been backfilled yet are built from
+    the Results and Measures tables.
+
+    The sketches stay locked until the rebuild is finished. Data sets that are stored in the meantime are counted
+    afterwards.
+
+    Usage:
+        python manage.py rebuild_footprint_distributions [--chunk-size N]
+
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.footprintDistributions import build_distribution_values, count_distribution_values, \
+    lock_distributions, save_distributions
+from backend.models import GreenhouseData
+from backend.performerRankings import load_production_types
+from backend.quantileSketch import QuantileSketch
+from backend.resultValues import load_result_values
+
+
+class Command(BaseCommand):
+    help = 'Builds the distributions of the normalized footprints from the result values of all greenhouse data sets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='number of data sets per chunk')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size has to be at least 1')
+
+        with transaction.atomic():
+            rows = lock_distributions()
+            sketches = {key: QuantileSketch() for key in rows}
+            dataset_ids = list(GreenhouseData.objects.order_by('id').values_list('id', flat=True))
+            counted = 0
+            for start in range(0, len(dataset_ids), options['chunk_size']):
+                chunk = dataset_ids[start:start + options['chunk_size']]
+                production_types = load_production_types(chunk)
+                result_values = load_result_values(chunk)
+                datasets = []
+                for dataset_id in chunk:
+                    values = build_distribution_values(production_types.get(dataset_id), result_values.get(dataset_id))
+                    if values is not None:
+                        count_distribution_values(sketches, values, 1)
+                        counted += 1
+                    datasets.append(GreenhouseData(id=dataset_id, distribution_values=values))
+                GreenhouseData.objects.bulk_update(datasets, ['distribution_values'], batch_size=500)
+                self.stdout.write(f"Data sets up to id {chunk[-1]} counted")
+            save_distributions(rows, sketches)
+        self.stdout.write(self.style.SUCCESS(f"{counted} of {len(dataset_ids)} data sets counted"))
@@ -0,0 +1,231 @@
+"""
+    This file contains the management command recalculate_footprints.
+
+    It recalculates the footprints of stored greenhouse data sets from their Measures and Selections, e.g. after the
+    equivalents in backend/data/equivalents.py have been changed or another factor set has been activated, and updates
+    the Results table, the result values of the data sets (see resultValues.py) and the performer rankings (see
+    performerRankings.py). The results are calculated with the active factor set, unless --factor-version is given.
+
+    Usage:
+        python manage.py recalculate_footprints [--dataset-ids ID ...] [--user-id ID] [--greenhouse-id ID]
+                                                [--date-from YYYY-MM-DD] [--date-to YYYY-MM-DD]
+                                                [--factor-version VERSION]
+                                                [--chunk-size N] [--workers N] [--dry-run]
+                                                [--checkpoint FILE] [--resume]
+
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from backend.calcFootprints import resolve_record
+from backend.factorSets import get_active_factors, get_factors
+from backend.cohortRollups import update_cohort_rollups
+from backend.footprintBatch import evaluate_records
+from backend.footprintDistributions import update_footprint_distributions
+from backend.loadGreenhouseData import load_standardized_data, load_measure_values
+from backend.models import GreenhouseData, Calculations, Results, FactorSets
+from backend.performerRankings import update_performer_rankings
+from backend.referenceCatalog import get_catalog
+from backend.responseCache import invalidate_all_responses
+from backend.resultValues import build_result_values, to_stored_decimal
+
+
+class Command(BaseCommand):
+    help = 'Recalculates the footprints of stored greenhouse data sets and updates their results.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset-ids', nargs='+', type=int, help='only recalculate these greenhouse data sets')
+        parser.add_argument('--user-id', type=int, help='only recalculate the data sets of this user')
+        parser.add_argument('--greenhouse-id', type=int, help='only recalculate the data sets of this greenhouse')
+        parser.add_argument('--date-from', help='only recalculate data sets with a date on or after this date')
+        parser.add_argument('--date-to', help='only recalculate data sets with a date on or before this date')
+        parser.add_argument('--factor-version', help='calculate with this factor set instead of the active one')
+        parser.add_argument('--chunk-size', type=int, default=500, help='number of data sets per chunk')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='number of worker processes, 1 calculates in this process')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='only show the differences to the stored results, nothing is written')
+        parser.add_argument('--checkpoint', help='file that stores the progress after every chunk, without it no '
+                                                 'progress is stored')
+        parser.add_argument('--resume', action='store_true',
+                            help='continue after the last data set of the checkpoint file')
+
+    def handle(self, *args, **options):
+        filters = {name: options[name] for name in
+                   ('dataset_ids', 'user_id', 'greenhouse_id', 'date_from', 'date_to')}
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--chunk-size and --workers have to be at least 1')
+        if options['resume'] and not options['checkpoint']:
+            raise CommandError('--resume requires --checkpoint')
+        try:
+            self.factors = get_factors(options['factor_version']) if options['factor_version'] \
+                else get_active_factors()
+        except FactorSets.DoesNotExist:
+            raise CommandError(f"There is no factor set '{options['factor_version']}'")
+
+        queryset = GreenhouseData.objects.order_by('id')
+        if filters['dataset_ids']:
+            queryset = queryset.filter(id__in=filters['dataset_ids'])
+        if filters['user_id'] is not None:
+            queryset = queryset.filter(greenhouse__user_id=filters['user_id'])
+        if filters['greenhouse_id'] is not None:
+            queryset = queryset.filter(greenhouse_id=filters['greenhouse_id'])
+        if filters['date_from']:
+            queryset = queryset.filter(date__gte=filters['date_from'])
+        if filters['date_to']:
+            queryset = queryset.filter(date__lte=filters['date_to'])
+
+        if options['resume']:
+            checkpoint = self.read_checkpoint(options['checkpoint'])
+            if checkpoint['filters'] != filters:
+                raise CommandError('The checkpoint has been written with other filters: ' +
+                                   json.dumps(checkpoint['filters']))
+            if checkpoint.get('factor_version') != self.factors.version:
+                raise CommandError(f"The checkpoint has been written with factor set "
+                                   f"'{checkpoint.get('factor_version')}'")
+            queryset = queryset.filter(id__gt=checkpoint['last_id'])
+            self.stdout.write(f"Resuming after data set {checkpoint['last_id']}")
+
+        dataset_ids = list(queryset.values_list('id', flat=True))
+        chunks = [dataset_ids[i:i + options['chunk_size']] for i in range(0, len(dataset_ids), options['chunk_size'])]
+        self.stdout.write(f"Recalculating {len(dataset_ids)} data sets in {len(chunks)} chunks "
+                          f"with factor set '{self.factors.version}'")
+
+        self.calculations = Calculations.objects.in_bulk(field_name='calculation_name')
+        self.dry_run = options['dry_run']
+        self.totals = {'datasets': 0, 'errors': 0, 'changed_datasets': 0, 'changed_results': 0}
+
+        if options['workers'] == 1:
+            for chunk in chunks:
+                ids, records, errors = self.load_chunk(chunk)
+                self.finish_chunk(ids, errors, evaluate_records(records, self.factors), filters, options)
+        else:
+            # the workers do not use the database, the connections are closed so that they are not shared after fork
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    # keep every worker busy while the oldest chunk is written
+                    if len(pending) >= 2 * options['workers']:
+                        self.finish_chunk(*pending.popleft(), filters, options)
+                    ids, records, errors = self.load_chunk(chunk)
+                    pending.append((ids, errors, executor.submit(evaluate_records, records, self.factors)))
+                while pending:
+                    self.finish_chunk(*pending.popleft(), filters, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Dry run: ' if self.dry_run else ''}{self.totals['datasets']} data sets recalculated, "
+            f"{self.totals['changed_results']} results in {self.totals['changed_datasets']} data sets "
+            f"{'would change' if self.dry_run else 'changed'}, {self.totals['errors']} errors"))
+
+    def load_chunk(self, chunk):
+        """Loads and resolves the data sets of one chunk.
+
+        Args:
+            chunk: ids of the data sets
+
+        Returns:
+            ids: ids of the data sets
+            records: resolved records
+            errors: error message or None for every data set
+        """
+        catalog = get_catalog()
+        datasets = load_standardized_data(chunk)
+        records = []
+        errors = []
+        for dataset_id in chunk:
+            try:
+                records.append(resolve_record(datasets[dataset_id], catalog))
+                errors.append(None)
+            except KeyError as e:
+                records.append(dict())
+                errors.append('Unknown option or unit: ' + str(e))
+        return chunk, records, errors
+
+    def finish_chunk(self, ids, load_errors, evaluation, filters, options):
+        """Compares the new results of one chunk with the stored ones and writes the changed results.
+
+        Args:
+            ids: ids of the data sets
+            load_errors: errors that occurred while loading the data sets
+            evaluation: (results, errors) of evaluate_records() or a future for it
+            filters: filters of this run, they are stored in the checkpoint
+            options: command options
+        """
+        results, errors = evaluation.result() if hasattr(evaluation, 'result') else evaluation
+        stored = dict()
+        for result_id, dataset_id, calculation_id, result_value, factor_version in Results.objects \
+                .filter(greenhouse_data_id__in=ids) \
+                .values_list('id', 'greenhouse_data_id', 'calculation_id', 'result_value', 'factor_version'):
+            stored[(dataset_id, calculation_id)] = (result_id, result_value, factor_version)
+
+        updates = []
+        creates = []
+        changed_datasets = set()
+        new_results = dict()
+        columns = {name: values.tolist() for name, values in results.items() if name in self.calculations}
+        for i, dataset_id in enumerate(ids):
+            error = load_errors[i] or errors[i]
+            if error is not None:
+                self.totals['errors'] += 1
+                self.stderr.write(f"Data set {dataset_id}: {error}")
+                continue
+            new_results[dataset_id] = dict()
+            for name, values in columns.items():
+                calculation_id = self.calculations[name].id
+                new_value = to_stored_decimal(values[i])
+                new_results[dataset_id][name] = new_value
+                result_id, old_value, old_version = stored.get((dataset_id, calculation_id), (None, None, None))
+                if old_value == new_value and old_version == self.factors.version:
+                    continue
+                changed_datasets.add(dataset_id)
+                if self.dry_run or options['verbosity'] >= 2:
+                    self.stdout.write(f"Data set {dataset_id}, {name}: {old_value} -> {new_value}")
+                if result_id is None:
+                    creates.append(Results(greenhouse_data_id=dataset_id, calculation_id=calculation_id,
+                                           result_value=new_value, factor_version=self.factors.version))
+                else:
+                    updates.append(Results(id=result_id, result_value=new_value, factor_version=self.factors.version))
+
+        if not self.dry_run:
+            measure_values = load_measure_values(list(new_results))
+            datasets = [GreenhouseData(id=dataset_id, result_values=build_result_values(
+                results, measure_values[dataset_id], self.factors.version))
+                for dataset_id, results in new_results.items()]
+            with transaction.atomic():
+                Results.objects.bulk_update(updates, ['result_value', 'factor_version'], batch_size=1000)
+                # a result that has been created by an update of the data set in the meantime is kept
+                Results.objects.bulk_create(creates, batch_size=1000, ignore_conflicts=True)
+                GreenhouseData.objects.bulk_update(datasets, ['result_values'], batch_size=500)
+                update_performer_rankings(sorted(changed_datasets))
+                if changed_datasets:
+                    invalidate_all_responses()
+            # the distributions and rollups lock their rows before the data sets, so they are updated after the commit
+            update_footprint_distributions(sorted(changed_datasets))
+            update_cohort_rollups(sorted(changed_datasets))
+            if options['checkpoint']:
+                self.write_checkpoint(options['checkpoint'], ids[-1], filters, self.factors.version)
+
+        self.totals['datasets'] += len(ids)
+        self.totals['changed_datasets'] += len(changed_datasets)
+        self.totals['changed_results'] += len(updates) + len(creates)
+        self.stdout.write(f"Data sets up to id {ids[-1]}: {len(changed_datasets)} of {len(ids)} changed")
+
+    @staticmethod
+    def read_checkpoint(path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"The checkpoint file {path} can not be read: {e}")
+
+    @staticmethod
+    def write_checkpoint(path, last_id, filters, factor_version):
+        # write to a temporary file first, so that an interrupted run never leaves a broken checkpoint
+        with open(path + '.tmp', 'w') as file:
+            json.dump({'last_id': last_id, 'filters': filters, 'factor_version': factor_version}, file)
+        os.replace(path + '.tmp', path)
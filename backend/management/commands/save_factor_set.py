@@ -0,0 +1,58 @@
+"""
+    This file contains the management command save_factor_set.
+
+    It stores the equivalents of backend/data/equivalents.py or of a json file as a new version in the FactorSets table.
+    The json file contains an object with the keys "co2_equivalents" and "h2o_equivalents".
+
+    Usage:
+        python manage.py save_factor_set VERSION [--file FILE] [--activate]
+
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend.data.equivalents import co2_equivalents, h2o_equivalents
+from backend.factorSets import BUILTIN_VERSION_PREFIX
+from backend.footprintKernel import FactorTable
+from backend.models import FactorSets
+
+
+class Command(BaseCommand):
+    help = 'Stores the current equivalents as a new version of the emission factors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('version', help='name of the new version')
+        parser.add_argument('--file', help='json file with the equivalents instead of backend/data/equivalents.py')
+        parser.add_argument('--activate', action='store_true',
+                            help='use the new version for all following footprint calculations')
+
+    def handle(self, *args, **options):
+        version = options['version']
+        if version.startswith(BUILTIN_VERSION_PREFIX):
+            raise CommandError(f"Versions starting with '{BUILTIN_VERSION_PREFIX}' are reserved")
+        if FactorSets.objects.filter(version=version).exists():
+            raise CommandError(f"The factor set '{version}' already exists, a factor set is never changed")
+
+        co2, h2o = co2_equivalents, h2o_equivalents
+        if options['file']:
+            try:
+                with open(options['file']) as file:
+                    content = json.load(file)
+                co2, h2o = content['co2_equivalents'], content['h2o_equivalents']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"The file {options['file']} can not be read: {e!r}")
+        try:
+            # compiling the table checks that every equivalent is a number
+            FactorTable(co2, h2o, version)
+        except (TypeError, ValueError) as e:
+            raise CommandError(f"The equivalents are invalid: {e}")
+
+        with transaction.atomic():
+            if options['activate']:
+                FactorSets.objects.filter(active=True).update(active=False)
+            FactorSets.objects.create(version=version, co2_equivalents=co2, h2o_equivalents=h2o,
+                                      active=options['activate'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved factor set '{version}'{' and activated it' if options['activate'] else ''}"))
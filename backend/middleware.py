@@ -0,0 +1,42 @@
+"""
+    This file contains the middleware of the backend.
+
+"""
+import json
+
+from django.conf import settings
+
+from .instrumentation import trace_logger, tracing
+
+
+class FootprintTraceMiddleware:
+    """This middleware traces a request, if the setting FOOTPRINT_TRACE is True or the request has the header
+    X-Footprint-Trace, the setting FOOTPRINT_TRACE_HEADER is True and DEBUG is on.
+
+    During a traced request the footprint calculation logs its intermediate values to the logger "backend.trace" and
+    measures the duration of its stages. The durations are added to the response as Server-Timing header and logged to
+    "backend.trace" as json, so that they can be collected for profiling. A traced request writes every intermediate
+    value to the log, so the header is only accepted with DEBUG. The middleware runs before the views authenticate the
+    request, so it does not know the user and does not authenticate the request itself.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_traced(request):
+            return self.get_response(request)
+
+        with tracing() as trace:
+            response = self.get_response(request)
+        response['Server-Timing'] = trace.server_timing()
+        trace_logger.debug("Trace of %s %s: %s", request.method, request.path, json.dumps(trace.as_dict()))
+        return response
+
+    @staticmethod
+    def is_traced(request):
+        if getattr(settings, 'FOOTPRINT_TRACE', False):
+            return True
+        if not getattr(settings, 'FOOTPRINT_TRACE_HEADER', False) or 'X-Footprint-Trace' not in request.headers:
+            return False
+        return settings.DEBUG
@@ -8,6 +8,7 @@ documentation.
 
 Models:
   Calculations
+  FactorSets
   Results
   Measurements
   MeasurementUnits
@@ -53,6 +54,22 @@ class GreenhouseData(models.Model):
 
     date_of_input = models.DateTimeField(auto_now_add=True)
 
+    # all measures of the data set in one row: {"<measurement_id>": ["<measure_value>", <measure_unit_id>]}, kept in
+    # sync with the Measures table. It is None for data sets that have not been backfilled yet.
+    measure_values = models.JSONField(null=True)
+
+    # all results of the data set in one row as total, per kg harvest and per m2 greenhouse, written together with the
+    # Results table, see resultValues.py. It is None for data sets that have not been backfilled yet.
+    result_values = models.JSONField(null=True)
+
+    # the normalized results of the data set that are counted in FootprintDistributions, see footprintDistributions.py.
+    # It is None for data sets that are not counted.
+    distribution_values = models.JSONField(null=True)
+
+    # the cohorts of the data set and its normalized results that are counted in CohortRollups, see cohortRollups.py.
+    # It is None for data sets that are not counted.
+    cohort_values = models.JSONField(null=True)
+
 
 class Calculations(models.Model):
     """This class defines a django model to store the names of all
@@ -79,6 +96,127 @@ class Results(models.Model):
 
     result_value = models.DecimalField(max_digits=20, decimal_places=3)
 
+    # version of the factor set the result has been calculated with, see FactorSets
+    factor_version = models.CharField(max_length=50, null=True)
+
+    class Meta:
+        constraints = [
+            # one result per calculation and data set, the update of a data set relies on it to upsert results
+            models.UniqueConstraint(fields=['greenhouse_data', 'calculation'], name='unique_result_per_dataset'),
+        ]
+        indexes = [
+            # ranking of the data sets by a result, see find_performer_dataset()
+            models.Index(fields=['calculation', 'result_value'], name='result_ranking_idx'),
+        ]
+
+
+class PerformerRankings(models.Model):
+    """This class defines a django model to store the best and the worst
+    performer of a production type for a normalized footprint.
+
+    It is maintained whenever results are stored or a data set is deleted,
+    see performerRankings.py.
+    """
+
+    # option_value of the production type, e.g. "Biologisch"
+    production_type = models.CharField(max_length=100, null=False)
+    calculation = models.ForeignKey("backend.Calculations", null=False,
+                                    on_delete=models.CASCADE)
+
+    best_greenhouse_data = models.ForeignKey("backend.GreenhouseData", null=True,
+                                             on_delete=models.SET_NULL, related_name='+')
+    best_value = models.DecimalField(max_digits=20, decimal_places=3, null=True)
+    worst_greenhouse_data = models.ForeignKey("backend.GreenhouseData", null=True,
+                                              on_delete=models.SET_NULL, related_name='+')
+    worst_value = models.DecimalField(max_digits=20, decimal_places=3, null=True)
+
+    # the performers are searched again on the next read, e.g. after a performer has been deleted
+    stale = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['production_type', 'calculation'], name='unique_performer_ranking'),
+        ]
+
+
+class FootprintDistributions(models.Model):
+    """This class defines a django model to store the distribution of a
+    normalized result over all data sets of a production type as a quantile
+    sketch.
+
+    It is maintained whenever results are stored or a data set is deleted,
+    see footprintDistributions.py.
+    """
+
+    # option_value of the production type, e.g. "Biologisch"
+    production_type = models.CharField(max_length=100, null=False)
+    calculation = models.ForeignKey("backend.Calculations", null=False,
+                                    on_delete=models.CASCADE)
+    # "normalizedkg" or "normalizedm2"
+    normalization = models.CharField(max_length=20, null=False)
+
+    # QuantileSketch.to_json()
+    sketch = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['production_type', 'calculation', 'normalization'],
+                                    name='unique_footprint_distribution'),
+        ]
+
+
+class CohortRollups(models.Model):
+    """This class defines a django model to store count, sum, sum of squares,
+    minimum and maximum of a normalized result over all data sets of a cohort
+    (e.g. all data sets of the same Land).
+
+    It is maintained whenever results are stored or a data set is deleted,
+    see cohortRollups.py.
+    """
+
+    # e.g. "Land", see cohortRollups.COHORT_DIMENSIONS
+    dimension = models.CharField(max_length=20, null=False)
+    # option_value of the cohort within the dimension, e.g. "Germany"
+    cohort = models.CharField(max_length=100, null=False)
+    calculation = models.ForeignKey("backend.Calculations", null=False,
+                                    on_delete=models.CASCADE)
+    # "normalizedkg" or "normalizedm2"
+    normalization = models.CharField(max_length=20, null=False)
+
+    count = models.IntegerField(default=0)
+    sum = models.DecimalField(max_digits=30, decimal_places=4, default=0)
+    sum_of_squares = models.DecimalField(max_digits=30, decimal_places=4,
+                                         default=0)
+    min_value = models.DecimalField(max_digits=20, decimal_places=3,
+                                    null=True)
+    max_value = models.DecimalField(max_digits=20, decimal_places=3,
+                                    null=True)
+    # true, if the minimum or the maximum has been removed and has to be
+    # searched again
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'cohort', 'calculation', 'normalization'],
+                                    name='unique_cohort_rollup'),
+        ]
+
+
+class FactorSets(models.Model):
+    """This class defines a django model to store versioned sets of co2 and
+    h2o equivalents.
+
+    The active set is used for new footprint calculations. A set is never
+    changed after results have been calculated with it, instead a new version
+    is added.
+    """
+
+    version = models.CharField(max_length=50, unique=True, null=False)
+    co2_equivalents = models.JSONField()
+    h2o_equivalents = models.JSONField()
+    active = models.BooleanField(default=False)
+    date_created = models.DateTimeField(auto_now_add=True)
+
 
 class Measurements(models.Model):
     """This class defines a django model to store the names of all 
@@ -115,6 +253,12 @@ class Measures(models.Model):
 
     measure_value = models.DecimalField(max_digits=20, decimal_places=3)
 
+    class Meta:
+        constraints = [
+            # one measure per measurement and data set, the update of a data set relies on it to upsert measures
+            models.UniqueConstraint(fields=['greenhouse_data', 'measurement'], name='unique_measure_per_dataset'),
+        ]
+
 
 class OptionGroups(models.Model):
     """This class defines a django model to store groups for optional values.
@@ -168,5 +312,11 @@ class Selections(models.Model):
 
     selection_value2 = models.DecimalField(max_digits=20, decimal_places=3, null=True)
 
+    class Meta:
+        indexes = [
+            # not unique, because an option can be selected more than once in an option group
+            models.Index(fields=['greenhouse_data', 'option'], name='selection_lookup_idx'),
+        ]
+
 
 
@@ -0,0 +1,221 @@
+"""
+    This file maintains the best and the worst performer of every production type for the normalized footprints in the
+    PerformerRankings table.
+
+    The footprint endpoints compare the data sets of a user with the data set of the same production type, that has the
+    lowest (best performer) or the highest (worst performer) positive normalized footprint. Instead of searching them on
+    every request, there is one PerformerRankings row per production type and calculation in RANKED_CALCULATIONS:
+        update_performer_rankings() is called whenever results of data sets have been stored. A data set that is better
+            than a performer replaces it. Only if a performer itself got worse, the performer is searched again.
+        Before a data set is deleted, the rows in which it is a performer are marked as stale. Stale rows are searched
+            again on the next read.
+    A search is one query per performer, that uses the index on Results (calculation, result_value).
+
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import Calculations, GreenhouseData, PerformerRankings, Results, Selections
+from .referenceCatalog import get_catalog
+from .responseCache import invalidate_performer_responses
+
+PRODUCTION_TYPE_GROUP = "Produktionstyp"
+PRODUCTION_TYPES = ("Biologisch", "Konventionell")
+
+RANKED_CALCULATIONS = ("co2_footprint_norm_kg", "co2_footprint_norm_m2",
+                       "h2o_footprint_norm_kg", "h2o_footprint_norm_m2",
+                       "direct_h2o_footprint_norm_kg", "direct_h2o_footprint_norm_m2")
+
+
+def get_performer(production_type, calculation_name, is_best_performer):
+    """Returns the best or the worst performer of a production type.
+
+    Args:
+        production_type: option value of the production type, e.g. "Biologisch"
+        calculation_name: name of the normalized footprint in the Calculations table
+        is_best_performer (boolean): true -> best performer; false -> worst performer
+
+    Returns:
+        int: id of the GreenhouseData of the performer or None, if no data set of the production type has a positive
+            value of the footprint
+    """
+
+    ranking = PerformerRankings.objects \
+        .filter(production_type=production_type, calculation__calculation_name=calculation_name).first()
+    if ranking is None or ranking.stale:
+        with transaction.atomic():
+            _create_missing_rankings()
+            ranking = PerformerRankings.objects.select_for_update() \
+                .get(production_type=production_type, calculation__calculation_name=calculation_name)
+            if ranking.stale:
+                _search_performers(ranking)
+                ranking.save()
+    return ranking.best_greenhouse_data_id if is_best_performer else ranking.worst_greenhouse_data_id
+
+
+def get_performers(production_types, calculation_names):
+    """Returns the best and the worst performers of multiple production types and calculations with one query.
+
+    Only rankings that are missing or stale are searched one by one, see get_performer().
+
+    Args:
+        production_types: option values of the production types, e.g. ["Biologisch"]
+        calculation_names: names of the normalized footprints in the Calculations table
+
+    Returns:
+        dictionary: (production_type, calculation_name) -> (id of the best performer, id of the worst performer),
+            the ids are None, if no data set of the production type has a positive value of the footprint
+    """
+
+    performers = {(production_type, calculation_name): (best_id, worst_id)
+                  for production_type, calculation_name, best_id, worst_id in PerformerRankings.objects
+                  .filter(production_type__in=production_types, calculation__calculation_name__in=calculation_names,
+                          stale=False)
+                  .values_list('production_type', 'calculation__calculation_name', 'best_greenhouse_data_id',
+                               'worst_greenhouse_data_id')}
+    for production_type in production_types:
+        for calculation_name in calculation_names:
+            if (production_type, calculation_name) not in performers:
+                performers[(production_type, calculation_name)] = (
+                    get_performer(production_type, calculation_name, True),
+                    get_performer(production_type, calculation_name, False))
+    return performers
+
+
+def load_production_types(greenhouse_data_ids):
+    """Loads the production types of multiple greenhouse data sets with one query.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> option value of the production type, data sets without one are left out
+    """
+
+    catalog = get_catalog()
+    production_types = {catalog.option_id(PRODUCTION_TYPE_GROUP, production_type): production_type
+                        for production_type in PRODUCTION_TYPES}
+    return {greenhouse_data_id: production_types[option_id]
+            for greenhouse_data_id, option_id in Selections.objects
+            .filter(greenhouse_data_id__in=greenhouse_data_ids, option_id__in=production_types)
+            .values_list('greenhouse_data_id', 'option_id')}
+
+
+def update_performer_rankings(greenhouse_data_ids):
+    """Updates the performers with the stored results and production types of some data sets.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows, whose results or production type have changed
+    """
+
+    dataset_types = load_production_types(greenhouse_data_ids)
+    values = {(greenhouse_data_id, calculation_id): result_value
+              for greenhouse_data_id, calculation_id, result_value in Results.objects
+              .filter(greenhouse_data_id__in=greenhouse_data_ids, calculation__calculation_name__in=RANKED_CALCULATIONS)
+              .values_list('greenhouse_data_id', 'calculation_id', 'result_value')}
+
+    # only the rankings of the production types of the data sets and the rankings in which they are performers can
+    # change, other rankings are not locked
+    rankings = PerformerRankings.objects.filter(Q(production_type__in=set(dataset_types.values()))
+                                                | Q(best_greenhouse_data_id__in=greenhouse_data_ids)
+                                                | Q(worst_greenhouse_data_id__in=greenhouse_data_ids))
+    invalidate = False
+    with transaction.atomic():
+        _create_missing_rankings()
+        for ranking in rankings.select_for_update().order_by('id'):
+            if ranking.stale:
+                continue
+            # the responses show the results and the date of a performer, so they change with any change of it
+            performer_changed = bool({ranking.best_greenhouse_data_id, ranking.worst_greenhouse_data_id}
+                                     .intersection(greenhouse_data_ids))
+            changed = False
+            for greenhouse_data_id in greenhouse_data_ids:
+                value = values.get((greenhouse_data_id, ranking.calculation_id)) \
+                    if dataset_types.get(greenhouse_data_id) == ranking.production_type else None
+                if value is not None and value <= 0:
+                    value = None
+                changed = _rank(ranking, greenhouse_data_id, value, True) | changed
+                changed = _rank(ranking, greenhouse_data_id, value, False) | changed
+                if ranking.stale:
+                    # a performer got worse, the other data sets can not be compared with the unknown new performer
+                    _search_performers(ranking)
+                    break
+            if changed:
+                ranking.save()
+            invalidate = invalidate or changed or performer_changed
+    if invalidate:
+        invalidate_performer_responses()
+
+
+def is_performer(greenhouse_data_id):
+    """Returns true, if a data set is the best or the worst performer of a ranking."""
+    return PerformerRankings.objects \
+        .filter(Q(best_greenhouse_data_id=greenhouse_data_id) | Q(worst_greenhouse_data_id=greenhouse_data_id)) \
+        .exists()
+
+
+def _rank(ranking, greenhouse_data_id, value, is_best_performer):
+    """Compares the value of a data set with the best or the worst performer of a ranking.
+
+    Args:
+        ranking: PerformerRankings row
+        greenhouse_data_id: id of the data set
+        value: positive value of the data set or None, if the data set is not ranked
+        is_best_performer (boolean): true -> best performer; false -> worst performer
+
+    Returns:
+        boolean: true, if the ranking has been changed. If the performer itself got worse, the ranking is marked as
+            stale.
+    """
+
+    prefix = 'best' if is_best_performer else 'worst'
+    performer_id = getattr(ranking, prefix + '_greenhouse_data_id')
+    performer_value = getattr(ranking, prefix + '_value')
+
+    def better(a, b):
+        return a < b if is_best_performer else a > b
+
+    if performer_id == greenhouse_data_id:
+        if value is None or better(performer_value, value):
+            ranking.stale = True
+        elif value == performer_value:
+            return False
+    elif value is None or (performer_id is not None and not better(value, performer_value)):
+        return False
+    setattr(ranking, prefix + '_greenhouse_data_id', greenhouse_data_id)
+    setattr(ranking, prefix + '_value', value)
+    return True
+
+
+def _search_performers(ranking):
+    """Searches the best and the worst performer of a ranking in the Results table."""
+    option_id = get_catalog().option_id(PRODUCTION_TYPE_GROUP, ranking.production_type)
+    results = Results.objects.filter(calculation_id=ranking.calculation_id, result_value__gt=0,
+                                     greenhouse_data__selections__option_id=option_id) \
+        .values_list('greenhouse_data_id', 'result_value')
+    ranking.best_greenhouse_data_id, ranking.best_value = results.order_by('result_value', 'id').first() or (None, None)
+    ranking.worst_greenhouse_data_id, ranking.worst_value = \
+        results.order_by('-result_value', 'id').first() or (None, None)
+    ranking.stale = False
+
+
+def _create_missing_rankings():
+    """Creates the missing PerformerRankings rows as stale rows."""
+    calculations = Calculations.objects.in_bulk(RANKED_CALCULATIONS, field_name='calculation_name')
+    existing = set(PerformerRankings.objects.values_list('production_type', 'calculation_id'))
+    PerformerRankings.objects.bulk_create(
+        [PerformerRankings(production_type=production_type, calculation=calculation)
+         for production_type in PRODUCTION_TYPES for calculation in calculations.values()
+         if (production_type, calculation.id) not in existing],
+        ignore_conflicts=True)
+
+
+@receiver(pre_delete, sender=GreenhouseData)
+def mark_rankings_stale_on_delete(sender, instance, **kwargs):
+    """Signal receiver that marks the rankings of a data set as stale, before the data set is deleted."""
+    if PerformerRankings.objects \
+            .filter(Q(best_greenhouse_data_id=instance.id) | Q(worst_greenhouse_data_id=instance.id)) \
+            .update(stale=True):
+        invalidate_performer_responses()
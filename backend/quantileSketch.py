@@ -0,0 +1,134 @@
+"""
+    This file contains a mergeable quantile sketch with relative accuracy (DDSketch).
+
+    A value v > 0 is counted in the bucket i = ceil(log(v) / log(gamma)) with gamma = (1 + alpha) / (1 - alpha). Every
+    value of a bucket is represented by 2 * gamma^i / (gamma + 1), which differs from the value by at most the relative
+    accuracy alpha. Negative values are counted in buckets of their absolute value, 0 has its own counter.
+
+    The sketch only stores the counts of the buckets, so values can be removed again and two sketches with the same
+    accuracy are merged by adding their counts. Its size only depends on the range of the values, not on their number.
+
+"""
+import math
+
+# default relative accuracy of the quantiles
+RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Sketch of the distribution of a multiset of values."""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = dict()
+        self.negative = dict()
+        self.zero_count = 0
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _index(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        """Adds a value count times, a negative count removes it.
+
+        Raises:
+            ValueError: if more values would be removed than have been added
+        """
+        value = float(value)
+        if value == 0:
+            if self.zero_count + count < 0:
+                raise ValueError("The value has not been added to the sketch")
+            self.zero_count += count
+            return
+        store = self.positive if value > 0 else self.negative
+        index = self._index(abs(value))
+        new_count = store.get(index, 0) + count
+        if new_count < 0:
+            raise ValueError("The value has not been added to the sketch")
+        if new_count:
+            store[index] = new_count
+        else:
+            store.pop(index, None)
+
+    def remove(self, value):
+        """Removes a value that has been added before."""
+        self.add(value, -1)
+
+    def merge(self, other):
+        """Adds the values of another sketch with the same accuracy to this sketch."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+
+    def _buckets(self):
+        """Returns (representative value, count) of all buckets in ascending order of the values."""
+        buckets = [(-self._value(index), self.negative[index]) for index in sorted(self.negative, reverse=True)]
+        if self.zero_count:
+            buckets.append((0.0, self.zero_count))
+        buckets.extend((self._value(index), self.positive[index]) for index in sorted(self.positive))
+        return buckets
+
+    def quantile(self, q):
+        """Returns the q-quantile (0 <= q <= 1) of the values or None for an empty sketch."""
+        count = self.count
+        if count == 0:
+            return None
+        rank = q * (count - 1)
+        cumulative = 0
+        for value, bucket_count in self._buckets():
+            cumulative += bucket_count
+            if cumulative > rank:
+                return value
+        return value
+
+    def rank(self, value):
+        """Returns the share of the values that are lower than a value (0..1) or None for an empty sketch.
+
+        Values in the same bucket as the value count half.
+        """
+        count = self.count
+        if count == 0:
+            return None
+        value = float(value)
+        if value > 0:
+            lower = self.zero_count + sum(self.negative.values())
+            index = self._index(value)
+            lower += sum(bucket_count for bucket_index, bucket_count in self.positive.items() if bucket_index < index)
+            same = self.positive.get(index, 0)
+        elif value < 0:
+            index = self._index(-value)
+            lower = sum(bucket_count for bucket_index, bucket_count in self.negative.items() if bucket_index > index)
+            same = self.negative.get(index, 0)
+        else:
+            lower = sum(self.negative.values())
+            same = self.zero_count
+        return (lower + same / 2) / count
+
+    def to_json(self):
+        """Returns the sketch as a JSON serializable dictionary."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "positive": {str(index): count for index, count in self.positive.items()},
+            "negative": {str(index): count for index, count in self.negative.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """Returns the sketch of a dictionary of to_json()."""
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.positive = {int(index): count for index, count in data["positive"].items()}
+        sketch.negative = {int(index): count for index, count in data["negative"].items()}
+        return sketch
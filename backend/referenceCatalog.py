@@ -0,0 +1,197 @@
+"""
+    This file contains a process-wide, read-only catalog of the reference tables.
+
+    The reference tables (Options, OptionGroups, OptionUnits, Measurements and MeasurementUnits) only change when the
+    database is (re)filled. Instead of sending one SELECT per dropdown selection, the footprint calculation and the unit
+    standardization resolve ids and names through this catalog. It is loaded once per process with one query per table
+    and dropped again, as soon as one of the reference tables is changed through the ORM in the same process. The other
+    processes load it again after REFERENCE_CATALOG_TTL seconds.
+
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.models import Options, OptionGroups, OptionUnits, Measurements, MeasurementUnits
+
+
+class ReferenceCatalog:
+    """This class holds an in-memory copy of all reference tables.
+
+    Every table is indexed by id and by its natural key (e.g. (option_group_name, option_value) for options), so that
+    every lookup is a dictionary access. An instance is never modified after it has been created.
+    """
+
+    def __init__(self, options, option_groups, option_units, measurements, measurement_units, generation=0):
+        """Builds the indices of the catalog.
+
+        Args:
+            options: iterable of (id, option_value, option_group_id)
+            option_groups: iterable of (id, option_group_name)
+            option_units: iterable of (id, unit_name, option_id)
+            measurements: iterable of (id, measurement_name)
+            measurement_units: iterable of (id, unit_name, measurement_id)
+            generation: number that identifies the state of the reference tables this catalog was loaded from
+        """
+        self.generation = generation
+
+        self._option_groups = {group_id: name for group_id, name in option_groups}
+        self._option_group_ids = {name: group_id for group_id, name in self._option_groups.items()}
+
+        self._options = dict()
+        self._option_ids = dict()
+        self._group_options = dict()
+        for option_id, option_value, option_group_id in sorted(options):
+            self._options[option_id] = (option_value, option_group_id)
+            group_name = self._option_groups.get(option_group_id)
+            self._option_ids.setdefault((group_name, option_value), option_id)
+            self._group_options.setdefault(option_group_id, []).append(option_id)
+
+        self._option_units = dict()
+        self._option_unit_ids = dict()
+        for unit_id, unit_name, option_id in sorted(option_units):
+            self._option_units[unit_id] = (unit_name, option_id)
+            self._option_unit_ids.setdefault((option_id, unit_name), unit_id)
+
+        self._measurements = {measurement_id: name for measurement_id, name in sorted(measurements)}
+        self._measurement_ids = {name: measurement_id for measurement_id, name in self._measurements.items()}
+
+        self._measurement_units = dict()
+        self._measurement_unit_ids = dict()
+        for unit_id, unit_name, measurement_id in sorted(measurement_units):
+            self._measurement_units[unit_id] = (unit_name, measurement_id)
+            self._measurement_unit_ids.setdefault((measurement_id, unit_name), unit_id)
+
+        # identifies the content of the tables, unlike the generation it is the same in every process
+        self.fingerprint = hashlib.sha256(repr((
+            sorted(self._options.items()), sorted(self._option_groups.items()), sorted(self._option_units.items()),
+            sorted(self._measurements.items()), sorted(self._measurement_units.items()),
+        )).encode()).hexdigest()
+
+    @classmethod
+    def load(cls, generation=0):
+        """Loads the catalog from the database. This issues exactly one query per reference table.
+
+        Args:
+            generation: number that identifies the state of the reference tables
+
+        Returns:
+            ReferenceCatalog: the loaded catalog
+        """
+        return cls(
+            options=Options.objects.values_list('id', 'option_value', 'option_group_id'),
+            option_groups=OptionGroups.objects.values_list('id', 'option_group_name'),
+            option_units=OptionUnits.objects.values_list('id', 'unit_name', 'option_id'),
+            measurements=Measurements.objects.values_list('id', 'measurement_name'),
+            measurement_units=MeasurementUnits.objects.values_list('id', 'unit_name', 'measurement_id'),
+            generation=generation,
+        )
+
+    def option_value(self, option_id):
+        """Returns the option_value of an option. Raises a KeyError for unknown ids."""
+        return self._options[option_id][0]
+
+    def option_group_id_of_option(self, option_id):
+        """Returns the id of the option group an option belongs to."""
+        return self._options[option_id][1]
+
+    def option_id(self, option_group_name, option_value):
+        """Returns the id of the option with the given value inside the given option group."""
+        return self._option_ids[(option_group_name, option_value)]
+
+    def option_ids_of_group(self, option_group_id):
+        """Returns the ids of all options of an option group in ascending order."""
+        return self._group_options.get(option_group_id, [])
+
+    def option_group_id(self, option_group_name):
+        """Returns the id of an option group."""
+        return self._option_group_ids[option_group_name]
+
+    def option_group_name(self, option_group_id):
+        """Returns the name of an option group."""
+        return self._option_groups[option_group_id]
+
+    def option_groups(self):
+        """Returns (id, option_group_name) of all option groups in ascending id order."""
+        return sorted(self._option_groups.items())
+
+    def option_unit_name(self, option_unit_id):
+        """Returns the unit_name of an option unit."""
+        return self._option_units[option_unit_id][0]
+
+    def option_unit_id(self, option_id, unit_name):
+        """Returns the id of the option unit with the given name for an option."""
+        return self._option_unit_ids[(option_id, unit_name)]
+
+    def measurement_id(self, measurement_name):
+        """Returns the id of a measurement."""
+        return self._measurement_ids[measurement_name]
+
+    def measurement_name(self, measurement_id):
+        """Returns the name of a measurement."""
+        return self._measurements[measurement_id]
+
+    def measurements(self):
+        """Returns (id, measurement_name) of all measurements in ascending id order."""
+        return list(self._measurements.items())
+
+    def measurement_unit_name(self, measurement_unit_id):
+        """Returns the unit_name of a measurement unit."""
+        return self._measurement_units[measurement_unit_id][0]
+
+    def measurement_unit_id(self, measurement_id, unit_name):
+        """Returns the id of the measurement unit with the given name for a measurement."""
+        return self._measurement_unit_ids[(measurement_id, unit_name)]
+
+
+_catalog = None
+_catalog_loaded_at = 0.0
+_catalog_generation = 0
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Returns the catalog of the current process and loads it, if necessary.
+
+    The setting REFERENCE_CATALOG_TTL (seconds, default 60) limits the age of the catalog, so that the changes of the
+    reference tables in other processes or without the ORM (e.g. by fillPostgresDatabase.py) are seen after this time.
+    None keeps the catalog until it is changed through the ORM in this process.
+
+    Returns:
+        ReferenceCatalog: the current catalog
+    """
+    global _catalog, _catalog_loaded_at, _catalog_generation
+
+    catalog = _catalog
+    ttl = getattr(settings, 'REFERENCE_CATALOG_TTL', 60)
+    if catalog is not None and (ttl is None or time.monotonic() - _catalog_loaded_at < ttl):
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog is catalog:
+            _catalog_generation = _catalog_generation + 1
+            _catalog = ReferenceCatalog.load(generation=_catalog_generation)
+            _catalog_loaded_at = time.monotonic()
+        return _catalog
+
+
+def invalidate_catalog():
+    """Drops the catalog of the current process. The next call of get_catalog() reloads it."""
+    global _catalog
+
+    with _catalog_lock:
+        _catalog = None
+
+
+@receiver([post_save, post_delete], sender=Options)
+@receiver([post_save, post_delete], sender=OptionGroups)
+@receiver([post_save, post_delete], sender=OptionUnits)
+@receiver([post_save, post_delete], sender=Measurements)
+@receiver([post_save, post_delete], sender=MeasurementUnits)
+def invalidate_catalog_on_change(sender, **kwargs):
+    """Signal receiver that invalidates the catalog, whenever a reference table is changed through the ORM."""
+    invalidate_catalog()
@@ -0,0 +1,212 @@
+"""
+    This file contains a per user cache of the responses of the read endpoints (get-co2-footprint, get-h2o-footprint,
+    get-footprints, get-dataset-summary and get-datasets).
+
+    These endpoints are read far more often than the data of a user changes, so a successful response is stored and
+    returned again until it is invalidated. The key of a response contains generations, that are increased to invalidate
+    all responses that have been stored with the old value:
+        - the generation of the user, it is increased whenever a data set of the user is created, updated or deleted
+          (invalidate_user_responses())
+        - the performer generation, only for the responses that contain the best and worst performers. It is increased
+          whenever a performer ranking changes, no matter whose data set has changed it (invalidate_performer_responses())
+        - the global generation, it is increased if the results of many users change, e.g. by recalculate_footprints
+          (invalidate_all_responses())
+    The generations are increased when the transaction that changes the data commits, so a request never stores the old
+    data under the new generation.
+
+    Like the footprint cache (see footprintCache.py) there are two tiers:
+        - an LRU cache in the memory of every process, its size is set by RESPONSE_CACHE_SIZE (default 256, 0 stores the
+          responses only in the shared cache)
+        - optionally a cache that is shared by all processes, RESPONSE_CACHE_ALIAS names an entry of the CACHES setting
+          (e.g. a RedisCache)
+    Without RESPONSE_CACHE_ALIAS the generations are kept in the memory of the process, which is only correct if the
+    application runs in a single process: another process would neither see the invalidations of this process nor
+    invalidate its responses. Deployments with multiple processes have to set RESPONSE_CACHE_ALIAS, then the
+    generations are kept in the shared cache and an invalidation in one process is seen by all processes.
+    RESPONSE_CACHE_TIMEOUT sets the lifetime of the entries of both tiers in seconds (default 300).
+
+"""
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.response import Response
+
+from .footprintCache import FootprintCache
+from .models import GreenhouseData, Greenhouses
+from .referenceCatalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_GENERATION = 'responses:generation'
+PERFORMER_GENERATION = 'responses:generation:performers'
+
+local_cache = FootprintCache(getattr(settings, 'RESPONSE_CACHE_SIZE', 256))
+# generations of a single process deployment without a shared cache
+_local_generations = dict()
+_local_generations_lock = threading.Lock()
+
+
+def _shared_cache():
+    """Returns the shared cache or None, if RESPONSE_CACHE_ALIAS is not set."""
+    alias = getattr(settings, 'RESPONSE_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _user_generation(user_id):
+    return f'responses:generation:user:{user_id}'
+
+
+def _get_generations(keys):
+    """Returns the current values of generations, missing generations are created.
+
+    A generation starts with the current time in nanoseconds, so a generation that has been evicted from the shared
+    cache never gets a value again, under which responses have been stored.
+    """
+
+    shared_cache = _shared_cache()
+    if shared_cache is None:
+        with _local_generations_lock:
+            return [_local_generations.setdefault(key, time.time_ns()) for key in keys]
+    generations = shared_cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            shared_cache.add(key, time.time_ns(), None)
+            generations[key] = shared_cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def _increase_generation(key):
+    """Increases a generation, all responses that have been stored with its old value are no longer returned."""
+    shared_cache = _shared_cache()
+    if shared_cache is None:
+        with _local_generations_lock:
+            _local_generations[key] = _local_generations.get(key, time.time_ns()) + 1
+        return
+    try:
+        shared_cache.incr(key)
+    except ValueError:
+        # the generation does not exist (anymore), it is created with a new value on the next read
+        pass
+    except Exception as e:
+        logger.warning("ResponseCache: shared cache error: %r", e)
+
+
+def invalidate_user_responses(user_id):
+    """Invalidates the responses of a user, when the current transaction commits."""
+    transaction.on_commit(lambda: _increase_generation(_user_generation(user_id)))
+
+
+def invalidate_performer_responses():
+    """Invalidates the responses of all users that contain performers, when the current transaction commits."""
+    transaction.on_commit(lambda: _increase_generation(PERFORMER_GENERATION))
+
+
+def invalidate_all_responses():
+    """Invalidates the responses of all users, when the current transaction commits."""
+    transaction.on_commit(lambda: _increase_generation(GLOBAL_GENERATION))
+
+
+def response_key(user_id, endpoint, query_params, contains_performers):
+    """Calculates the cache key of a response.
+
+    Args:
+        user_id: id of the user
+        endpoint: name of the endpoint, e.g. "get-co2-footprint"
+        query_params: query parameters of the request
+        contains_performers (boolean): true, if the response contains the best and worst performers
+
+    Returns:
+        string: key of the response with the current generations
+    """
+
+    generation_keys = [GLOBAL_GENERATION, _user_generation(user_id)]
+    if contains_performers:
+        generation_keys.append(PERFORMER_GENERATION)
+    generations = _get_generations(generation_keys)
+    params = sorted((name, values) for name, values in query_params.lists())
+    content = repr([endpoint, user_id, generations, get_catalog().fingerprint, params])
+    return 'responses:' + hashlib.sha256(content.encode()).hexdigest()
+
+
+def _timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 5 * 60)
+
+
+def get_cached_response(key):
+    """Returns the data of a cached response or None, if the key is not cached."""
+    entry = local_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    shared_cache = _shared_cache()
+    if shared_cache is None:
+        return None
+    data = None
+    try:
+        data = shared_cache.get(key)
+    except Exception as e:
+        # the shared cache is only an optimization, the endpoints still work without it
+        logger.warning("ResponseCache: shared cache error: %r", e)
+    if data is not None:
+        local_cache.set(key, (time.monotonic() + _timeout(), data))
+    return data
+
+
+def set_cached_response(key, data):
+    """Stores the data of a response in both tiers. The data must not be changed afterwards."""
+    local_cache.set(key, (time.monotonic() + _timeout(), data))
+    shared_cache = _shared_cache()
+    if shared_cache is None:
+        return
+    try:
+        shared_cache.set(key, data, _timeout())
+    except Exception as e:
+        logger.warning("ResponseCache: shared cache error: %r", e)
+
+
+def cached_response(endpoint, contains_performers=False):
+    """Decorator for the get method of an endpoint, that caches its successful responses per user.
+
+    Args:
+        endpoint: name of the endpoint, e.g. "get-co2-footprint"
+        contains_performers (boolean): true, if the response contains the best and worst performers
+    """
+
+    def decorator(get):
+        @functools.wraps(get)
+        def wrapper(self, request, *args, **kwargs):
+            user_id = request.user.id
+            if user_id is None or (local_cache.max_size <= 0 and _shared_cache() is None):
+                return get(self, request, *args, **kwargs)
+            try:
+                key = response_key(user_id, endpoint, request.query_params, contains_performers)
+            except Exception as e:
+                logger.warning("ResponseCache: shared cache error: %r", e)
+                return get(self, request, *args, **kwargs)
+            data = get_cached_response(key)
+            if data is not None:
+                logger.debug("ResponseCache: %s cache hit", endpoint)
+                return Response(data, status=status.HTTP_200_OK)
+            response = get(self, request, *args, **kwargs)
+            # streamed responses and errors are not cached
+            if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                set_cached_response(key, response.data)
+            return response
+        return wrapper
+    return decorator
+
+
+@receiver(pre_delete, sender=GreenhouseData)
+def invalidate_responses_on_delete(sender, instance, **kwargs):
+    """Signal receiver that invalidates the responses of the owner of a data set, before the data set is deleted."""
+    user_id = Greenhouses.objects.filter(id=instance.greenhouse_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_user_responses(user_id)
@@ -0,0 +1,144 @@
+"""
+    This file contains the per data set storage of the footprint results in GreenhouseData.result_values.
+
+    The Results table contains one row per result of a data set. The footprint endpoints need every result of a data set
+    as total, per kg harvest and per m2 greenhouse, so these values are computed once, whenever the results of a data set
+    are stored, and written into one value:
+        {
+            "layout": <RESULT_LAYOUT_VERSION>,
+            "factor_version": <version of the factor set of the results>,
+            "total": [<result value as the Results table stores it>, ...],
+            "normalizedkg": [<result value per kg harvest, rounded to 2 decimal places>, ...],
+            "normalizedm2": [<result value per m2 greenhouse, rounded to 2 decimal places>, ...]
+        }
+    The lists contain the results in the order of RESULT_LAYOUT. A normalized value is None, if the data set has no
+    harvest or no greenhouse size. The normalization uses the decimal arithmetic of the stored Results and Measures, so
+    the values are exactly the ones the endpoints calculated from these tables.
+
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.backends.utils import format_number
+
+from .footprintBatch import RESULT_NAMES
+from .loadGreenhouseData import load_measure_values
+from .models import GreenhouseData, Results
+from .referenceCatalog import get_catalog
+
+# order of the results in the lists of GreenhouseData.result_values, it must not be changed without increasing
+# RESULT_LAYOUT_VERSION, stored values of another layout are not used
+RESULT_LAYOUT = RESULT_NAMES
+RESULT_LAYOUT_VERSION = 1
+
+RESULT_KINDS = ("total", "normalizedkg", "normalizedm2")
+
+HARVEST_MEASUREMENTS = ("SnackErtragJahr", "CocktailErtragJahr", "RispenErtragJahr", "FleischErtragJahr")
+GREENHOUSE_SIZE_MEASUREMENT = "GWHFlaeche"
+
+
+def to_stored_decimal(value):
+    """Returns a result value exactly as the Results table stores it."""
+    field = Results._meta.get_field('result_value')
+    return Decimal(format_number(field.to_python(value), field.max_digits, field.decimal_places))
+
+
+def build_result_values(results, measure_values, factor_version):
+    """Builds the value of GreenhouseData.result_values for a data set.
+
+    Args:
+        results: dictionary calculation_name -> result value, as it is written into the Results table
+        measure_values: measure values of the data set, see loadGreenhouseData.build_measure_values()
+        factor_version: version of the factor set of the results
+
+    Returns:
+        dictionary: the result values of the data set, see the description of this file
+    """
+
+    catalog = get_catalog()
+
+    def measure(name):
+        value = measure_values.get(str(catalog.measurement_id(name)))
+        return Decimal(value[0]) if value is not None else None
+
+    harvests = [measure(name) for name in HARVEST_MEASUREMENTS]
+    total_harvest = sum(harvests) if None not in harvests else None
+    gh_size = measure(GREENHOUSE_SIZE_MEASUREMENT)
+
+    result_values = {"layout": RESULT_LAYOUT_VERSION, "factor_version": factor_version}
+    result_values.update({kind: [] for kind in RESULT_KINDS})
+    for name in RESULT_LAYOUT:
+        value = to_stored_decimal(results[name]) if results.get(name) is not None else None
+        result_values["total"].append(float(value) if value is not None else None)
+        result_values["normalizedkg"].append(_normalized(value, total_harvest))
+        result_values["normalizedm2"].append(_normalized(value, gh_size))
+    return result_values
+
+
+def _normalized(value, divisor):
+    """Returns value / divisor rounded to 2 decimal places or None, if it is not defined."""
+    if value is None or not divisor:
+        return None
+    try:
+        return float(round(value / divisor, 2))
+    except InvalidOperation:
+        return None
+
+
+def load_result_values(greenhouse_data_ids):
+    """Loads the result values of multiple greenhouse data sets.
+
+    The result values are read from GreenhouseData.result_values, only data sets without it (or with another layout) are
+    built from the Results and Measures tables.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> result values, see the description of this file
+    """
+
+    result_values = dict(GreenhouseData.objects.filter(id__in=greenhouse_data_ids).values_list('id', 'result_values'))
+    missing = [greenhouse_data_id for greenhouse_data_id, values in result_values.items()
+               if values is None or values.get("layout") != RESULT_LAYOUT_VERSION]
+    if missing:
+        result_values.update(load_result_values_from_results(missing))
+    return result_values
+
+
+def load_result_values_from_results(greenhouse_data_ids):
+    """Builds the result values of multiple greenhouse data sets from the Results and Measures tables.
+
+    Args:
+        greenhouse_data_ids: ids of the GreenhouseData rows
+
+    Returns:
+        dictionary: greenhouse_data_id -> result values, see the description of this file
+    """
+
+    results = {greenhouse_data_id: dict() for greenhouse_data_id in greenhouse_data_ids}
+    factor_versions = dict()
+    for greenhouse_data_id, calculation_name, result_value, factor_version in Results.objects \
+            .filter(greenhouse_data_id__in=greenhouse_data_ids) \
+            .values_list('greenhouse_data_id', 'calculation__calculation_name', 'result_value', 'factor_version'):
+        results[greenhouse_data_id][calculation_name] = result_value
+        factor_versions[greenhouse_data_id] = factor_version
+    measure_values = load_measure_values(greenhouse_data_ids)
+    return {greenhouse_data_id: build_result_values(results[greenhouse_data_id], measure_values[greenhouse_data_id],
+                                                    factor_versions.get(greenhouse_data_id))
+            for greenhouse_data_id in greenhouse_data_ids}
+
+
+def result_dict(result_values, kind, calculation_names):
+    """Returns some results of one kind from the result values of a data set.
+
+    Args:
+        result_values: result values of the data set
+        kind: "total", "normalizedkg" or "normalizedm2"
+        calculation_names: names of the results
+
+    Returns:
+        dictionary: calculation_name -> value
+    """
+
+    values = dict(zip(RESULT_LAYOUT, result_values[kind]))
+    return {name: values[name] for name in calculation_names}
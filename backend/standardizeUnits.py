@@ -2,9 +2,13 @@
     This file contains a function that standardises the values/units to keep a clean database.
 
 """
-from backend.models import OptionUnits, MeasurementUnits, Options, Measurements
+import logging
+
+from backend.referenceCatalog import get_catalog
 from backend.utils import default_option, default_value
 
+logger = logging.getLogger(__name__)
+
 
 def standardize_units(data):
     """This function standardizes the units of the input data.
@@ -19,15 +23,12 @@ def standardize_units(data):
         data: the greenhouse data set object with the standardized units
     """
 
-    all_options = Options.objects.all()
-    all_optionunits = OptionUnits.objects.all()
-    all_measurements = Measurements.objects.all()
-    all_measurementunits = MeasurementUnits.objects.all()
+    catalog = get_catalog()
 
     for index, selected_option in enumerate(data["Energietraeger"]):
-        selected_option_value = all_options.filter(id=selected_option[0])[0].option_value
-        kwh_energietraeger_id = all_optionunits.filter(option_id=selected_option[0]).filter(unit_name="kWh")[0].id
-        selected_optionunit_name = all_optionunits.filter(id=selected_option[2])[0].unit_name
+        selected_option_value = catalog.option_value(selected_option[0])
+        kwh_energietraeger_id = catalog.option_unit_id(selected_option[0], "kWh")
+        selected_optionunit_name = catalog.option_unit_name(selected_option[2])
 
         # calculating the correct value in kWh
         if(selected_optionunit_name !="kWh"):
@@ -65,9 +66,9 @@ def standardize_units(data):
     # eigenes BHKW: m3*(0,00196*1000) = kg !!! BHKW verwendet wird, dann Wert=0!!!
     if data["CO2-Herkunft"] != default_option:
         for index, selected_option in enumerate(data["CO2-Herkunft"]):
-            selected_option_value = all_options.filter(id=selected_option[0])[0].option_value
-            kwh_co2herkunft_id = all_optionunits.filter(option_id=selected_option[0]).filter(unit_name="kg")[0].id
-            selected_optionunit_name = all_optionunits.filter(id=selected_option[2])[0].unit_name
+            selected_option_value = catalog.option_value(selected_option[0])
+            kwh_co2herkunft_id = catalog.option_unit_id(selected_option[0], "kg")
+            selected_optionunit_name = catalog.option_unit_name(selected_option[2])
 
             # calculating the correct value in kWh
             if selected_optionunit_name != "kg":
@@ -87,9 +88,9 @@ def standardize_units(data):
 
     # field VorlaufmengeGesamt should have the unit Liter
     if data["VorlaufmengeGesamt"] != default_value:
-        measurement_id = all_measurements.filter(measurement_name="VorlaufmengeGesamt")[0].id
-        selected_measurementunit_name = all_measurementunits.filter(id=data["VorlaufmengeGesamt"][1])[0].unit_name
-        liter_unit_id = all_measurementunits.filter(measurement_id=measurement_id).filter(unit_name="Liter")[0].id
+        measurement_id = catalog.measurement_id("VorlaufmengeGesamt")
+        selected_measurementunit_name = catalog.measurement_unit_name(data["VorlaufmengeGesamt"][1])
+        liter_unit_id = catalog.measurement_unit_id(measurement_id, "Liter")
         if (selected_measurementunit_name != "Liter"):
             if selected_measurementunit_name == "m3":
 
@@ -101,9 +102,9 @@ def standardize_units(data):
 
     # field Restwasser schould have the unit Liter
     if data["Restwasser"] != default_value:
-        measurement_id = all_measurements.filter(measurement_name="Restwasser")[0].id
-        selected_measurementunit_name = all_measurementunits.filter(id=data["Restwasser"][1])[0].unit_name
-        liter_unit_id = all_measurementunits.filter(measurement_id=measurement_id).filter(unit_name="Liter")[0].id
+        measurement_id = catalog.measurement_id("Restwasser")
+        selected_measurementunit_name = catalog.measurement_unit_name(data["Restwasser"][1])
+        liter_unit_id = catalog.measurement_unit_id(measurement_id, "Liter")
         if selected_measurementunit_name != "Liter":
             if selected_measurementunit_name == "m3":
                 new_value = data["Restwasser"][0] * 1000
@@ -114,9 +115,9 @@ def standardize_units(data):
     # field VorlaufmengeAnteile should have the unit Liter
     if data["VorlaufmengeAnteile"] != default_option:
         for index, selected_option in enumerate(data["VorlaufmengeAnteile"]):
-            selected_option_value = all_options.filter(id=selected_option[0])[0].option_value
-            liter_unit_id = all_optionunits.filter(option_id=selected_option[0]).filter(unit_name="Liter")[0].id
-            selected_optionunit_name = all_optionunits.filter(id=selected_option[2])[0].unit_name
+            selected_option_value = catalog.option_value(selected_option[0])
+            liter_unit_id = catalog.option_unit_id(selected_option[0], "Liter")
+            selected_optionunit_name = catalog.option_unit_name(selected_option[2])
 
             # calculating the correct value in kWh
             if selected_optionunit_name != "Liter":
@@ -134,6 +135,6 @@ def standardize_units(data):
                 values_list[1] = round(new_value, 2)
                 values_list[2] = liter_unit_id
                 data["VorlaufmengeAnteile"][index] = tuple(values_list)
-                print("VorlaufmengeAnteile", values_list)
+                logger.debug("VorlaufmengeAnteile %s", values_list)
     return data
 
@@ -0,0 +1,284 @@
+"""
+    This file provides the reference data and the input data of the backend tests.
+
+    The reference tables are filled from the csv files in backend/data. The input data are the data sets of the endpoint
+    test of the frontend (frontend/src/components/tests/EndpointTest.tsx), as they are posted to CreateGreenhouseData.
+
+"""
+import csv
+from pathlib import Path
+
+from ..models import Calculations, Measurements, MeasurementUnits, OptionGroups, Options, OptionUnits
+from ..referenceCatalog import invalidate_catalog
+from ..serializers import ListOfTuples, Tuple
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+ENDPOINT_TEST_DATA = {
+    'greenhouse_name': 'Haus1',
+    'date': '2019-09-29',
+    'GWHFlaeche': '(5000,3)',
+    'Nutzflaeche': '(4800,35)',
+    'WaermeteilungFlaeche': '(0,0)',
+    'GWHAlter': '(32,5)',
+    'AlterBedachungsmaterial': '(32,6)',
+    'AlterStehwandmaterial': '(12,7)',
+    'AlterEnergieschirm': '(12,8)',
+    'Stehwandhoehe': '(5,9)',
+    'Laenge': '(100,10)',
+    'Breite': '(50,11)',
+    'Kappenbreite': '(4,12)',
+    'Scheibenlaenge': '(2,13)',
+    'Reihenabstand(Rinnenabstand)': '(0.85,14)',
+    'Vorwegbreite': '(4,15)',
+    'AlterHeizsystem': '(32,16)',
+    'AlterProduktionssystem': '(12,17)',
+    'AlterZusaetzlichesHeizsystem': '(32,18)',
+    'SnackReihenanzahl': '(10,19)',
+    'SnackPflanzenabstandInDerReihe': '(0.5,20)',
+    'SnackTriebzahl': '(4,21)',
+    'SnackErtragJahr': '(8000,0)',
+    'CocktailReihenanzahl': '(0,0)',
+    'CocktailPflanzenabstandInDerReihe': '(0,0)',
+    'CocktailTriebzahl': '(0,0)',
+    'CocktailErtragJahr': '(0,0)',
+    'RispenReihenanzahl': '(112,27)',
+    'RispenPflanzenabstandInDerReihe': '(0.5,28)',
+    'RispenTriebzahl': '(2,29)',
+    'RispenErtragJahr': '(3000,30)',
+    'FleischReihenanzahl': '(0,0)',
+    'FleischPflanzenabstandInDerReihe': '(0,0)',
+    'FleischTriebzahl': '(0,0)',
+    'FleischErtragJahr': '(0,0)',
+    'KulturBeginn': '(2,36)',
+    'KulturEnde': '(48,37)',
+    'NebenkulturBeginn': '(30,0)',
+    'NebenkulturEnde': '(1,0)',
+    'Belichtung:Stromverbrauch': '(10,51)',
+    'Belichtung:AnzahlLampen': '(0,0)',
+    'Belichtung:AnschlussleistungProLampe': '(0,0)',
+    'Belichtung:LaufzeitProJahr': '(0,0)',
+    'VorlaufmengeGesamt': '(3000,76)',
+    'Restwasser': '(400,78)',
+    'FungizideKg': '(3,55)',
+    'FungizideLiter': '(8,44)',
+    'InsektizideKg': '(4,57)',
+    'InsektizideLiter': '(5,45)',
+    'Kuebel:VolumenProTopf': '(0,0)',
+    'Kuebel:JungpflanzenProTopf': '(0,0)',
+    'Kuebel:Alter': '(0,0)',
+    'SchnuereRankhilfen:Laenge': '(15,66)',
+    'SchnuereRankhilfen:Wiederverwendung': '(1,67)',
+    'Klipse:AnzahlProTrieb': '(15,68)',
+    'Klipse:Wiederverwendung': '(1,69)',
+    'Rispenbuegel:AnzahlProTrieb': '(10,70)',
+    'Rispenbuegel:Wiederverwendung': '(3,71)',
+    'Jungpflanzen:Distanz': '(88,73)',
+    'Verpackungsmaterial:AnzahlMehrwegsteigen': '(6000,74)',
+    'Waermeversorgung': '[(2)]',
+    'GWHArt': '[(3)]',
+    'Land': '[(238)]',
+    'Region': '[(352)]',
+    'Bedachungsmaterial': '[(6)]',
+    'Stehwandmaterial': '[(12)]',
+    'Energieschirm': '[(173)]',
+    'EnergieschirmTyp': '[(20)]',
+    'Heizsystem': '[(23)]',
+    'Produktionstyp': '[(25)]',
+    'Produktionssystem': '[(29)]',
+    'ZusaetzlichesHeizsystem': '[(171)]',
+    'ZusaetzlichesHeizsystemTyp': '[(30)]',
+    '10-30Gramm(Snack)': '[(32)]',
+    '30-100Gramm(Cocktail)': '[(35)]',
+    '100-150Gramm(Rispen)': '[(36)]',
+    '>150Gramm(Fleisch)': '[(39)]',
+    'Nebenkultur': '[(40)]',
+    'Energietraeger': '[(44,40000,45),(45,16000,48),(46,700,51)]',
+    'Stromherkunft': '[(54,20000,63),(55,2400,65),(56,13,67)]',
+    'Zusatzbelichtung': '[(64)]',
+    'Belichtungsstrom': '[(67)]',
+    'WasserVerbrauch': '[(367)]',
+    'VorlaufmengeAnteile': '[(347,200,211),(348,400,213),(349,60,218)]',
+    'CO2-Herkunft': '[(68,60,88),(70,50,94)]',
+    'Duengemittel:VereinfachteAngabe': ('[(71,10,96),(81,8,106),(79,3,104),(76,5,101),(74,4,99),(72,3,97),(77,2,102),'
+                                        '(73,1,98),(75,88,100),(80,21,105),(78,2145,103)]'),
+    'Duengemittel:DetaillierteAngabe': ('[(83,3,108),(93,5,118),(87,8,112),(86,4,111),(92,5,117),(94,8,119),'
+                                        '(85,5,110),(89,85,114),(90,5,115),(97,8,122),(101,44,126),(103,5,128),'
+                                        '(107,8,132),(88,8,113),(84,5,109),(104,54,129),(106,4,131),(105,55,130),'
+                                        '(95,8,120),(98,5,123),(99,4,124),(91,4,116),(100,5,125),(96,54,121),'
+                                        '(82,4,107)]'),
+    'GrowbagsKuebel': '[(117)]',
+    'Substrat': '[(124,5,149)]',
+    'Schnur': '[(175)]',
+    'SchnuereRankhilfen:Material': '[(129)]',
+    'Klipse': '[(163)]',
+    'Klipse:Material': '[(133)]',
+    'Rispenbuegel': '[(165)]',
+    'Rispenbuegel:Material': '[(136)]',
+    'Bewaesserungsart': '[(139)]',
+    'Bodenabdeckung': '[(167,12,192)]',
+    'Jungpflanzen:Zukauf': '[(144)]',
+    'Jungpflanzen:Substrat': '[(148)]',
+    'Verpackungsmaterial': '[(152,350,177),(151,150,176)]',
+    'SonstigeVerbrauchsmaterialien': ('[(157,200,182,20), (153,1000,178,10),(154,8000,179,15),(155,120,180,10),'
+                                      '(156,300,181,2),(158,100,183,2)]'),
+    'BelichtungsstromEinheit': '[(160)]'
+}
+
+# real company data
+ENDPOINT_TEST_DATA2 = {
+    '10-30Gramm(Snack)': '[(33)]',
+    '30-100Gramm(Cocktail)': '[(35)]',
+    '100-150Gramm(Rispen)': '[(36)]',
+    '>150Gramm(Fleisch)': '[(38)]',
+    'AlterBedachungsmaterial': '(8,6)',
+    'AlterEnergieschirm': '(8,8)',
+    'AlterHeizsystem': '(8,16)',
+    'AlterProduktionssystem': '(8,17)',
+    'AlterStehwandmaterial': '(8,7)',
+    'AlterZusaetzlichesHeizsystem': '(0,0)',
+    'Bedachungsmaterial': '[(6)]',
+    'Land': '[(238)]',
+    'Region': '[(352)]',
+    'Belichtung:AnschlussleistungProLampe': '(0,0)',
+    'Belichtung:AnzahlLampen': '(0,0)',
+    'Belichtung:LaufzeitProJahr': '(0,0)',
+    'Belichtung:Stromverbrauch': '(0,0)',
+    'Belichtungsstrom': '[(66)]',
+    'BelichtungsstromEinheit': '[(0,)]',
+    'Bewaesserungsart': '[(139)]',
+    'Bodenabdeckung': '[(168,5,193),(167,1,192)]',
+    'Breite': '(176,11)',
+    'CO2-Herkunft': '[(68,375926,87)]',
+    'CocktailErtragJahr': '(0,0)',
+    'CocktailPflanzenabstandInDerReihe': '(0,0)',
+    'CocktailReihenanzahl': '(0,0)',
+    'CocktailTriebzahl': '(0,0)',
+    'Duengemittel:DetaillierteAngabe': ('[(93,6265,118),(87,1566,112),(86,7832,111),(94,1566,119),(102,1566,127),'
+                                        '(85,31,110),(90,313,115),(97,13,122),(101,31,126),(103,19,128),'
+                                        '(84,3133,109),(106,1253,131)]'),
+    'Duengemittel:VereinfachteAngabe': '[(0,)]',
+    'Energieschirm': '[(173)]',
+    'EnergieschirmTyp': '[(22)]',
+    'Energietraeger': '[(44,3000000,44),(52,13000000,61)]',
+    'FleischErtragJahr': '(434555,34)',
+    'FleischPflanzenabstandInDerReihe': '(0.5,32)',
+    'FleischReihenanzahl': '(37,31)',
+    'FleischTriebzahl': '(3.33,33)',
+    'FungizideKg': '(15,55)',
+    'FungizideLiter': '(0,0)',
+    'GWHAlter': '(8,5)',
+    'GWHArt': '[(3)]',
+    'GWHFlaeche': '(24360,3)',
+    'GrowbagsKuebel': '[(117)]',
+    'Heizsystem': '[(23)]',
+    'InsektizideKg': '(19,57)',
+    'InsektizideLiter': '(0,0)',
+    'Jungpflanzen:Distanz': '(540,73)',
+    'Jungpflanzen:Substrat': '[(148)]',
+    'Jungpflanzen:Zukauf': '[(144)]',
+    'Kappenbreite': '(4,12)',
+    'Klipse': '[(163)]',
+    'Klipse:AnzahlProTrieb': '(40,68)',
+    'Klipse:Material': '[(134)]',
+    'Klipse:Wiederverwendung': '(1,69)',
+    'Kuebel:Alter': '(0,0)',
+    'Kuebel:JungpflanzenProTopf': '(0,0)',
+    'Kuebel:VolumenProTopf': '(0,0)',
+    'KulturBeginn': '(1,36)',
+    'KulturEnde': '(48,37)',
+    'Laenge': '(150,10)',
+    'Nebenkultur': '[(41)]',
+    'NebenkulturBeginn': '(0,0)',
+    'NebenkulturEnde': '(0,0)',
+    'Nutzflaeche': '(23656,35)',
+    'WasserVerbrauch': '[(367)]',
+    'Produktionssystem': '[(29)]',
+    'Produktionstyp': '[(25)]',
+    'Reihenabstand(Rinnenabstand)': '(1.6,14)',
+    'RispenErtragJahr': '(630200,30)',
+    'RispenPflanzenabstandInDerReihe': '(0.5,28)',
+    'RispenReihenanzahl': '(74,27)',
+    'RispenTriebzahl': '(3.75,29)',
+    'Rispenbuegel': '[(165)]',
+    'Rispenbuegel:AnzahlProTrieb': '(3,70)',
+    'Rispenbuegel:Material': '[(138)]',
+    'Rispenbuegel:Wiederverwendung': '(1,71)',
+    'Scheibenlaenge': '(2.5,13)',
+    'SchnuereRankhilfen:Laenge': '(14,66)',
+    'SchnuereRankhilfen:Material': '[(130)]',
+    'SchnuereRankhilfen:Wiederverwendung': '(1,67)',
+    'Schnur': '[(175)]',
+    'SnackErtragJahr': '(0,0)',
+    'SnackPflanzenabstandInDerReihe': '(0,0)',
+    'SnackReihenanzahl': '(0,0)',
+    'SnackTriebzahl': '(0,0)',
+    'SonstigeVerbrauchsmaterialien': '[(0,)]',
+    'Stehwandhoehe': '(5,9)',
+    'VorlaufmengeGesamt': '(3000,76)',
+    'Restwasser': '(4,78)',
+    'Stehwandmaterial': '[(15)]',
+    'Stromherkunft': '[(61,250000,77)]',
+    'VorlaufmengeAnteile': '[(347,20,211),(348,40000,213),(349,10,217),(350,30000,219)]',
+    'Substrat': '[(123,1,148)]',
+    'Verpackungsmaterial': '[(151,50123,176),(152,6265,177)]',
+    'Verpackungsmaterial:AnzahlMehrwegsteigen': '(0,0)',
+    'Vorwegbreite': '(4,15)',
+    'WaermeteilungFlaeche': '(38880,4)',
+    'Waermeversorgung': '[(1)]',
+    'ZusaetzlichesHeizsystem': '[(172)]',
+    'ZusaetzlichesHeizsystemTyp': '[(0,)]',
+    'Zusatzbelichtung': '[(64)]',
+    'date': '2021-01-01',
+    'greenhouse_name': 'Haus2'
+}
+
+
+def _read_csv(file_name):
+    """Reads the rows of a csv file in DATA_DIR, empty cells are None."""
+    with open(DATA_DIR / file_name, newline='', encoding='utf-8') as file:
+        return [[cell if cell != '' else None for cell in row] for row in csv.reader(file)]
+
+
+def _id(value):
+    """Turns the id of a csv cell into an int, an empty cell stays None."""
+    return None if value is None else int(value)
+
+
+def load_reference_data():
+    """Fills the reference tables with the csv files in DATA_DIR and drops the reference catalog of the process."""
+    Measurements.objects.bulk_create([Measurements(id=_id(row_id), measurement_name=name)
+                                      for row_id, name in _read_csv("measurements.csv")])
+    MeasurementUnits.objects.bulk_create([MeasurementUnits(id=_id(row_id), unit_name=name,
+                                                           measurement_id=_id(measurement))
+                                          for row_id, name, measurement in _read_csv("measurementunits.csv")])
+    OptionGroups.objects.bulk_create([OptionGroups(id=_id(row_id), option_group_name=name)
+                                      for row_id, name in _read_csv("optiongroups.csv")])
+    Options.objects.bulk_create([Options(id=_id(row_id), option_value=value, option_group_id=_id(option_group))
+                                 for row_id, value, option_group in _read_csv("options.csv")])
+    OptionUnits.objects.bulk_create([OptionUnits(id=_id(row_id), unit_name=name, option_id=_id(option))
+                                     for row_id, name, option in _read_csv("optionunits.csv")])
+    Calculations.objects.bulk_create([Calculations(id=_id(row_id), calculation_name=name, unit_name=unit)
+                                      for row_id, name, unit in _read_csv("calculations.csv")])
+    invalidate_catalog()
+
+
+def parse_input_data(input_data):
+    """Parses input data like InputDataSerializer does, without reading the reference tables.
+
+    Args:
+        input_data: dictionary of field name -> string, e.g. ENDPOINT_TEST_DATA
+
+    Returns:
+        dictionary: the fields as serializer.data contains them
+    """
+
+    data = dict()
+    for name, value in input_data.items():
+        if name in ('greenhouse_name', 'date'):
+            data[name] = value
+        elif value.strip().startswith('['):
+            data[name] = ListOfTuples().to_internal_value(value)
+        else:
+            data[name] = Tuple().to_internal_value(value)
+    return data
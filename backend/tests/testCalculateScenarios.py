@@ -0,0 +1,79 @@
+"""
+    Tests of the validation of the scenarios of CalculateScenarios.
+
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .fixtures import ENDPOINT_TEST_DATA, load_reference_data
+from ..api.calculateScenarios import CalculateScenarios
+from ..api.createGreenhouseData import CreateGreenhouseData
+from ..models import GreenhouseData
+
+VALID_OVERRIDES = {'GWHFlaeche': '(6000,3)'}
+# option unit 1 ("Auswahl") can not be converted into kg
+UNCONVERTIBLE_OVERRIDES = {'CO2-Herkunft': '[(68,60,1)]', 'GWHFlaeche': '(6000,3)'}
+
+
+class CalculateScenariosTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        load_reference_data()
+        cls.user = User.objects.create(username="scenarios")
+        request = APIRequestFactory().post('/backend/create-greenhouse-data', ENDPOINT_TEST_DATA, format='json')
+        force_authenticate(request, user=cls.user)
+        assert CreateGreenhouseData.as_view()(request).status_code == status.HTTP_201_CREATED
+        cls.dataset_id = GreenhouseData.objects.get(greenhouse__user=cls.user).id
+
+    def post(self, scenarios):
+        request = APIRequestFactory().post('/backend/calculate-scenarios',
+                                           {'datasetId': self.dataset_id, 'scenarios': scenarios}, format='json')
+        force_authenticate(request, user=self.user)
+        return CalculateScenarios.as_view()(request)
+
+    def test_invalid_scenarios_are_reported_per_scenario(self):
+        response = self.post([
+            {'label': 'valid', 'overrides': VALID_OVERRIDES},
+            {'label': 'unknown field', 'overrides': {'Unbekannt': '(1,1)'}},
+            {'label': 'invalid format', 'overrides': {'GWHFlaeche': 'abc'}},
+            {'label': 'no overrides'},
+            'no object',
+            {'overrides': VALID_OVERRIDES},
+        ])
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        scenarios = response.data['scenarios']
+        self.assertEqual(['valid', 'unknown field', 'invalid format', 'no overrides', '5', '6'],
+                         [scenario['label'] for scenario in scenarios])
+        self.assertIn('results', scenarios[0])
+        self.assertEqual(scenarios[0]['results'], scenarios[5]['results'])
+        self.assertEqual(['Unbekannt'], list(scenarios[1]['fields']))
+        self.assertEqual(['GWHFlaeche'], list(scenarios[2]['fields']))
+        self.assertEqual(['overrides'], list(scenarios[3]['fields']))
+        self.assertEqual(['overrides'], list(scenarios[4]['fields']))
+        for scenario in scenarios[1:5]:
+            self.assertEqual('Input error', scenario['error'])
+
+    def test_valid_scenarios_do_not_depend_on_invalid_ones(self):
+        alone = self.post([{'label': 'valid', 'overrides': VALID_OVERRIDES}])
+        mixed = self.post([{'label': 'invalid', 'overrides': {'GWHFlaeche': 'abc'}},
+                           {'label': 'valid', 'overrides': VALID_OVERRIDES}])
+        self.assertEqual(alone.data['base'], mixed.data['base'])
+        self.assertEqual(alone.data['scenarios'][0], mixed.data['scenarios'][1])
+
+    def test_unconvertible_unit_is_reported_for_its_field(self):
+        response = self.post([{'label': 'unit', 'overrides': UNCONVERTIBLE_OVERRIDES},
+                              {'label': 'valid', 'overrides': VALID_OVERRIDES}])
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        scenario = response.data['scenarios'][0]
+        self.assertEqual('Input error', scenario['error'])
+        self.assertEqual(['CO2-Herkunft'], list(scenario['fields']))
+        self.assertIn('results', response.data['scenarios'][1])
+
+    def test_all_scenarios_invalid(self):
+        response = self.post([{'overrides': {'GWHFlaeche': 'abc'}}])
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('Input error', response.data['scenarios'][0]['error'])
+        self.assertIn('co2_footprint', response.data['base'])
@@ -0,0 +1,114 @@
+"""
+    Tests of the batch footprint engine (footprintBatch.py) against the scalar calculation (footprintKernel.py).
+
+"""
+import math
+
+from django.test import TestCase
+
+from .fixtures import ENDPOINT_TEST_DATA, ENDPOINT_TEST_DATA2, load_reference_data, parse_input_data
+from .. import calcFootprints, footprintKernel
+from ..calcFootprints import resolve_record
+from ..factorSets import builtin_factors
+from ..footprintBatch import evaluate_records, result_rows, RESULT_NAMES
+from ..referenceCatalog import get_catalog
+from ..standardizeUnits import standardize_units
+
+NO_YIELD = {'SnackErtragJahr': '(0,0)', 'CocktailErtragJahr': '(0,0)', 'RispenErtragJahr': '(0,0)',
+            'FleischErtragJahr': '(0,0)'}
+
+# variations of the endpoint test data, the data sets without a yield can not be calculated
+VARIANTS = {
+    "endpoint test data": (ENDPOINT_TEST_DATA, {}),
+    "real company data": (ENDPOINT_TEST_DATA2, {}),
+    "without greenhouse area": (ENDPOINT_TEST_DATA, {'GWHFlaeche': '(0,0)'}),
+    "without usable area": (ENDPOINT_TEST_DATA, {'Nutzflaeche': '(0,0)'}),
+    "without length": (ENDPOINT_TEST_DATA2, {'Laenge': '(0,0)'}),
+    "culture over the turn of the year": (ENDPOINT_TEST_DATA, {'KulturBeginn': '(48,36)', 'KulturEnde': '(2,37)'}),
+    "other energy source": (ENDPOINT_TEST_DATA, {'Energietraeger': '[(44,40000,45)]'}),
+    "without yield": (ENDPOINT_TEST_DATA, NO_YIELD),
+    "real company data without yield": (ENDPOINT_TEST_DATA2, NO_YIELD),
+}
+
+
+def standardized_data(input_data, overrides):
+    """Returns the standardized data of input data with some fields replaced."""
+    return standardize_units(parse_input_data({**input_data, **overrides}))
+
+
+def scalar_results(record):
+    """Returns the results of the scalar calculation of a resolved record or None, if it raises an error."""
+    try:
+        return footprintKernel.calc_footprints(record, builtin_factors)
+    except Exception:
+        return None
+
+
+class EvaluateRecordsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        load_reference_data()
+
+    def setUp(self):
+        catalog = get_catalog()
+        self.names = list(VARIANTS)
+        self.records = [resolve_record(standardized_data(*VARIANTS[name]), catalog) for name in self.names]
+
+    def assertResultsEqual(self, expected, actual, msg=None):
+        self.assertEqual(set(expected), set(actual), msg)
+        for result_name, value in expected.items():
+            self.assertTrue(math.isclose(value, actual[result_name], rel_tol=1e-9, abs_tol=1e-9),
+                            "%s: %s %r != %r" % (msg, result_name, value, actual[result_name]))
+
+    def test_same_results_as_scalar_calculation(self):
+        results, errors = evaluate_records(self.records, builtin_factors)
+        for name, record, row in zip(self.names, self.records, result_rows(results, errors)):
+            expected = scalar_results(record)
+            if expected is None:
+                continue
+            self.assertIsNotNone(row, name)
+            self.assertResultsEqual(expected, row, name)
+
+    def test_error_rows(self):
+        results, errors = evaluate_records(self.records, builtin_factors)
+        failed = [name for name, record in zip(self.names, self.records) if scalar_results(record) is None]
+        self.assertEqual(["without yield", "real company data without yield"], failed)
+        for i, name in enumerate(self.names):
+            if name in failed:
+                self.assertIsNotNone(errors[i], name)
+                self.assertTrue(all(math.isnan(results[result_name][i]) for result_name in RESULT_NAMES), name)
+            else:
+                self.assertIsNone(errors[i], name)
+
+    def test_error_rows_do_not_change_other_rows(self):
+        results, errors = evaluate_records(self.records, builtin_factors)
+        valid = [i for i, error in enumerate(errors) if error is None]
+        valid_results, valid_errors = evaluate_records([self.records[i] for i in valid], builtin_factors)
+        rows = result_rows(results, errors)
+        for row, valid_row in zip([rows[i] for i in valid], result_rows(valid_results, valid_errors)):
+            self.assertEqual(row, valid_row)
+
+    def test_same_results_as_recalculation(self):
+        old_record = self.records[0]
+        old_results = scalar_results(old_record)
+        results, errors = evaluate_records(self.records, builtin_factors)
+        for name, record, row in zip(self.names, self.records, result_rows(results, errors)):
+            if row is None:
+                with self.assertRaises(Exception):
+                    footprintKernel.recalc_footprints(old_record, record, old_results, builtin_factors)
+                continue
+            recalculated, _ = footprintKernel.recalc_footprints(old_record, record, old_results, builtin_factors)
+            self.assertResultsEqual(recalculated, row, name)
+
+    def test_unknown_option_is_an_error_row(self):
+        datasets = [standardized_data(ENDPOINT_TEST_DATA, {}),
+                    standardized_data(ENDPOINT_TEST_DATA, {'Bedachungsmaterial': '[(9999)]'})]
+        with self.assertRaises(KeyError):
+            calcFootprints.calc_footprints(datasets[1], builtin_factors)
+        results, errors = calcFootprints.calc_footprints_batch(datasets, builtin_factors)
+        self.assertIsNone(errors[0])
+        self.assertIn("9999", errors[1])
+        self.assertResultsEqual(calcFootprints.calc_footprints(datasets[0], builtin_factors),
+                                result_rows(results, errors)[0])
+        self.assertTrue(math.isnan(results["co2_footprint"][1]))
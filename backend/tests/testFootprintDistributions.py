@@ -0,0 +1,89 @@
+"""
+    Tests of the maintenance of the distributions (footprintDistributions.py) and of GetPercentiles.
+
+"""
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .fixtures import load_reference_data
+from ..api.getPercentiles import GetPercentiles
+from ..footprintDistributions import _change_distributions, _count_value, count_distribution_values, \
+    distribution_keys, lock_distributions
+from ..models import FootprintDistributions, GreenhouseData, Greenhouses
+from ..quantileSketch import QuantileSketch
+
+KEY = ("Biologisch", "co2_footprint", "normalizedkg")
+
+DISTRIBUTION_VALUES = {"production_type": "Biologisch",
+                       "normalizedkg": {"co2_footprint": 1.5, "h2o_footprint": 20.0},
+                       "normalizedm2": {"co2_footprint": 30.0}}
+
+
+class CountValueTest(SimpleTestCase):
+
+    def test_insert_and_remove(self):
+        sketch = QuantileSketch()
+        _count_value(sketch, KEY, 1.5, 1)
+        _count_value(sketch, KEY, 1.5, 1)
+        _count_value(sketch, KEY, 3.0, 1)
+        self.assertEqual(3, sketch.count)
+        _count_value(sketch, KEY, 1.5, -1)
+        self.assertEqual(2, sketch.count)
+        self.assertEqual(0.75, sketch.rank(3.0))
+        _count_value(sketch, KEY, 1.5, -1)
+        _count_value(sketch, KEY, 3.0, -1)
+        self.assertEqual(QuantileSketch().to_json(), sketch.to_json())
+
+    def test_remove_missing_value_is_logged(self):
+        sketch = QuantileSketch()
+        _count_value(sketch, KEY, 1.5, 1)
+        with self.assertLogs('backend.footprintDistributions', level='WARNING') as logs:
+            _count_value(sketch, KEY, 100.0, -1)
+        self.assertIn("rebuild_footprint_distributions", logs.output[0])
+        self.assertEqual(1, sketch.count)
+
+    def test_count_distribution_values(self):
+        keys = distribution_keys(DISTRIBUTION_VALUES)
+        self.assertEqual({KEY: 1.5, ("Biologisch", "h2o_footprint", "normalizedkg"): 20.0,
+                          ("Biologisch", "co2_footprint", "normalizedm2"): 30.0}, keys)
+        sketches = {key: QuantileSketch() for key in keys}
+        count_distribution_values(sketches, DISTRIBUTION_VALUES, 1)
+        self.assertTrue(all(sketch.count == 1 for sketch in sketches.values()))
+        count_distribution_values(sketches, DISTRIBUTION_VALUES, -1)
+        self.assertTrue(all(sketch.count == 0 for sketch in sketches.values()))
+        self.assertEqual(dict(), distribution_keys(None))
+
+
+class GetPercentilesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        load_reference_data()
+        cls.user = User.objects.create(username="percentiles")
+        greenhouse = Greenhouses.objects.create(user=cls.user, greenhouse_name="Haus1")
+        cls.dataset = GreenhouseData.objects.create(greenhouse=greenhouse, date=datetime.date(2022, 1, 1),
+                                                    distribution_values=DISTRIBUTION_VALUES)
+
+    def get(self):
+        request = APIRequestFactory().get('/backend/get-percentiles')
+        force_authenticate(request, user=self.user)
+        response = GetPercentiles.as_view()(request)
+        self.assertEqual(200, response.status_code)
+        return response.data["greenhouses"][0]["greenhouse_datasets"][0]
+
+    def test_missing_distribution(self):
+        self.assertFalse(FootprintDistributions.objects.exists())
+        dataset = self.get()
+        self.assertEqual({"value": 1.5, "percentile": None}, dataset["normalizedkg"]["co2_footprint"])
+        self.assertEqual({"value": 30.0, "percentile": None}, dataset["normalizedm2"]["co2_footprint"])
+
+    def test_deleted_distribution(self):
+        rows = lock_distributions(set(distribution_keys(DISTRIBUTION_VALUES)))
+        _change_distributions(rows, [(None, DISTRIBUTION_VALUES)])
+        FootprintDistributions.objects.filter(normalization="normalizedm2").delete()
+        dataset = self.get()
+        self.assertEqual({"value": 1.5, "percentile": 50.0}, dataset["normalizedkg"]["co2_footprint"])
+        self.assertEqual({"value": 30.0, "percentile": None}, dataset["normalizedm2"]["co2_footprint"])
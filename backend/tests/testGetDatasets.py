@@ -0,0 +1,132 @@
+"""
+    Tests of the pagination and the streaming mode of GetDatasets.
+
+"""
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.test import override_settings, TestCase
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .fixtures import ENDPOINT_TEST_DATA, ENDPOINT_TEST_DATA2, load_reference_data
+from ..api.createGreenhouseData import CreateGreenhouseData
+from ..api.getDatasets import GetDatasets
+from ..models import GreenhouseData
+from ..responseCache import local_cache
+
+
+@override_settings(RESPONSE_CACHE_ALIAS=None)
+class GetDatasetsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        load_reference_data()
+        cls.user = User.objects.create(username="datasets")
+        cls.other_user = User.objects.create(username="other")
+        for i, greenhouse_name in enumerate(("Haus1", "Haus2", "Haus1", "Haus3", "Haus2", "Haus1", "Haus3")):
+            input_data = ENDPOINT_TEST_DATA if i % 2 else ENDPOINT_TEST_DATA2
+            cls.create(cls.user, {**input_data, 'greenhouse_name': greenhouse_name, 'date': f"2021-0{i + 1}-01"})
+        cls.create(cls.other_user, ENDPOINT_TEST_DATA)
+
+    @staticmethod
+    def create(user, input_data):
+        request = APIRequestFactory().post('/backend/create-greenhouse-data', input_data, format='json')
+        force_authenticate(request, user=user)
+        response = CreateGreenhouseData.as_view()(request)
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+
+    def setUp(self):
+        local_cache.clear()
+
+    def get(self, query=''):
+        request = APIRequestFactory().get('/backend/get-datasets' + query)
+        force_authenticate(request, user=self.user)
+        return GetDatasets.as_view()(request)
+
+    def get_json(self, query=''):
+        """Returns the json of a response, streamed or not."""
+        response = self.get(query)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        if response.streaming:
+            return json.loads(b"".join(response.streaming_content))
+        response.render()
+        return json.loads(response.content)
+
+    def pages(self, limit, query=''):
+        """Pages through the data sets until the cursor is exhausted and returns the pages."""
+        pages = [self.get_json(f"?limit={limit}{query}")]
+        while pages[-1]["next"] is not None:
+            pages.append(self.get_json(f"?limit={limit}&cursor={pages[-1]['next']}{query}"))
+        return pages
+
+    @staticmethod
+    def merge(pages):
+        """Joins the greenhouses of the pages, a greenhouse can be continued on the next page."""
+        greenhouses = []
+        for page in pages:
+            for greenhouse in page["results"]:
+                if greenhouses and greenhouses[-1]["greenhouse_specs"] == greenhouse["greenhouse_specs"]:
+                    greenhouses[-1]["greenhouse_datasets"].extend(greenhouse["greenhouse_datasets"])
+                else:
+                    greenhouses.append(greenhouse)
+        return greenhouses
+
+    def test_full_listing(self):
+        greenhouses = self.get_json()
+        self.assertEqual(3, len(greenhouses))
+        self.assertEqual(7, sum(len(greenhouse["greenhouse_datasets"]) for greenhouse in greenhouses))
+
+    def test_pages_equal_full_listing(self):
+        greenhouses = self.get_json()
+        for limit in (1, 2, 3, 6, 7, 500):
+            pages = self.pages(limit)
+            self.assertEqual(-(-7 // limit), len(pages), limit)
+            self.assertTrue(all(sum(len(greenhouse["greenhouse_datasets"]) for greenhouse in page["results"]) <= limit
+                                for page in pages), limit)
+            self.assertEqual(greenhouses, self.merge(pages), limit)
+
+    def test_pages_with_fields(self):
+        greenhouses = self.get_json("?fields=greenhouse_data_id,date,GWHFlaeche,Energietraeger")
+        self.assertEqual(greenhouses, self.merge(self.pages(3, "&fields=greenhouse_data_id,date,GWHFlaeche,"
+                                                               "Energietraeger")))
+        self.assertEqual({"greenhouse_data_id", "date", "GWHFlaeche", "Energietraeger"},
+                         set(greenhouses[0]["greenhouse_datasets"][0]))
+
+    def test_limit_without_cursor(self):
+        page = self.get_json("?limit=")
+        self.assertIsNone(page["next"])
+        self.assertEqual(self.get_json(), page["results"])
+
+    def test_invalid_limit(self):
+        for limit in ("0", "-1", "501", "abc", "1.5"):
+            response = self.get(f"?limit={limit}")
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code, limit)
+            self.assertIn("limit", response.data["Error"])
+
+    def test_invalid_cursor(self):
+        cursors = ["abc", "!!!", base64.urlsafe_b64encode(b"1").decode(), base64.urlsafe_b64encode(b"a,b").decode(),
+                   base64.urlsafe_b64encode(b"1,2,3").decode(), base64.urlsafe_b64encode(b"\xff\xfe").decode()]
+        for cursor in cursors:
+            response = self.get(f"?limit=2&cursor={cursor}")
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code, cursor)
+            self.assertIn("cursor", response.data["Error"])
+
+    def test_stream_with_pagination(self):
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, self.get("?stream=true&limit=2").status_code)
+
+    def test_stream_equals_full_listing(self):
+        self.assertEqual(self.get_json(), self.get_json("?stream=true"))
+        self.assertEqual(self.get_json("?fields=date,Land"), self.get_json("?stream=true&fields=date,Land"))
+
+    def test_stream_dataset(self):
+        dataset_id = GreenhouseData.objects.filter(greenhouse__user=self.user).order_by('-id').first().id
+        self.assertEqual(self.get_json(f"?datasetId={dataset_id}"),
+                         self.get_json(f"?stream=true&datasetId={dataset_id}"))
+
+    def test_stream_unknown_dataset(self):
+        other_dataset_id = GreenhouseData.objects.get(greenhouse__user=self.other_user).id
+        for dataset_id in (0, other_dataset_id):
+            self.assertEqual(status.HTTP_204_NO_CONTENT, self.get(f"?stream=true&datasetId={dataset_id}").status_code)
+            self.assertEqual(status.HTTP_204_NO_CONTENT, self.get(f"?datasetId={dataset_id}").status_code)
@@ -0,0 +1,42 @@
+"""
+    Tests of the tracing of requests (middleware.py).
+
+"""
+from django.http import HttpResponse
+from django.test import override_settings, RequestFactory, SimpleTestCase
+
+from ..instrumentation import is_tracing
+from ..middleware import FootprintTraceMiddleware
+
+
+def view(request):
+    return HttpResponse("traced" if is_tracing() else "not traced")
+
+
+class FootprintTraceMiddlewareTest(SimpleTestCase):
+
+    def get(self, **headers):
+        request = RequestFactory().get('/backend/get-co2-footprint', **headers)
+        return FootprintTraceMiddleware(view)(request)
+
+    @override_settings(FOOTPRINT_TRACE=False, FOOTPRINT_TRACE_HEADER=True, DEBUG=True)
+    def test_header_with_debug(self):
+        response = self.get(HTTP_X_FOOTPRINT_TRACE="1")
+        self.assertEqual(b"traced", response.content)
+        self.assertTrue(response.has_header('Server-Timing'))
+        self.assertEqual(b"not traced", self.get().content)
+
+    @override_settings(FOOTPRINT_TRACE=False, FOOTPRINT_TRACE_HEADER=True, DEBUG=False)
+    def test_header_without_debug(self):
+        # a token of a staff user does not enable the header, the middleware does not authenticate the request
+        response = self.get(HTTP_X_FOOTPRINT_TRACE="1", HTTP_AUTHORIZATION="Token invalid")
+        self.assertEqual(b"not traced", response.content)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(FOOTPRINT_TRACE=False, FOOTPRINT_TRACE_HEADER=False, DEBUG=True)
+    def test_header_disabled(self):
+        self.assertEqual(b"not traced", self.get(HTTP_X_FOOTPRINT_TRACE="1").content)
+
+    @override_settings(FOOTPRINT_TRACE=True, FOOTPRINT_TRACE_HEADER=False, DEBUG=False)
+    def test_trace_every_request(self):
+        self.assertEqual(b"traced", self.get().content)
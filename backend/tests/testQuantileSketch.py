@@ -0,0 +1,82 @@
+"""
+    Tests of the quantile sketch (quantileSketch.py).
+
+"""
+import math
+import random
+
+from django.test import SimpleTestCase
+
+from ..quantileSketch import QuantileSketch, RELATIVE_ACCURACY
+
+
+def sketch_of(values, relative_accuracy=RELATIVE_ACCURACY):
+    """Returns a sketch with the values added."""
+    sketch = QuantileSketch(relative_accuracy)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+class QuantileSketchTest(SimpleTestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.lognormvariate(5, 1.5) for _ in range(2000)] + \
+                      [-rng.lognormvariate(1, 1) for _ in range(100)] + [0.0] * 50
+
+    def test_quantile_accuracy(self):
+        sketch = sketch_of(self.values)
+        values = sorted(self.values)
+        for q in (0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1):
+            exact = values[math.floor(q * (len(values) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), RELATIVE_ACCURACY * abs(exact) + 1e-12, q)
+
+    def test_rank_accuracy(self):
+        sketch = sketch_of(self.values)
+        for value in self.values[::50] + [0.0, 1e-3, 1e9, -1e9]:
+            # the sketch can not tell apart the values of a bucket, they differ by a factor of less than gamma
+            margin = (sketch.gamma - 1) * abs(value)
+            lower = sum(1 for v in self.values if v < value - margin) / len(self.values)
+            upper = sum(1 for v in self.values if v <= value + margin) / len(self.values)
+            self.assertTrue(lower <= sketch.rank(value) <= upper, value)
+
+    def test_empty_sketch(self):
+        sketch = QuantileSketch()
+        self.assertEqual(0, sketch.count)
+        self.assertIsNone(sketch.quantile(0.5))
+        self.assertIsNone(sketch.rank(1))
+
+    def test_merge_equals_sketch_of_all_values(self):
+        first = sketch_of(self.values[::2])
+        first.merge(sketch_of(self.values[1::2]))
+        self.assertEqual(sketch_of(self.values).to_json(), first.to_json())
+
+    def test_merge_requires_same_accuracy(self):
+        with self.assertRaises(ValueError):
+            sketch_of([1.0]).merge(sketch_of([1.0], relative_accuracy=0.02))
+
+    def test_remove_restores_sketch(self):
+        sketch = sketch_of(self.values)
+        for value in self.values[1000:]:
+            sketch.remove(value)
+        self.assertEqual(sketch_of(self.values[:1000]).to_json(), sketch.to_json())
+        for value in self.values[:1000]:
+            sketch.remove(value)
+        self.assertEqual(QuantileSketch().to_json(), sketch.to_json())
+
+    def test_remove_missing_value(self):
+        sketch = sketch_of([1.0, 0.0])
+        for value in (1000.0, -1.0):
+            with self.assertRaises(ValueError):
+                sketch.remove(value)
+        sketch.remove(0.0)
+        with self.assertRaises(ValueError):
+            sketch.remove(0.0)
+        self.assertEqual(sketch_of([1.0]).to_json(), sketch.to_json())
+
+    def test_json_round_trip(self):
+        sketch = sketch_of(self.values)
+        copy = QuantileSketch.from_json(sketch.to_json())
+        self.assertEqual(sketch.to_json(), copy.to_json())
+        self.assertEqual(sketch.quantile(0.5), copy.quantile(0.5))
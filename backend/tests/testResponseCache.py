@@ -0,0 +1,157 @@
+"""
+    Tests of the invalidation of the cached responses (responseCache.py).
+
+"""
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings, TestCase
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from ..models import GreenhouseData, Greenhouses
+from ..responseCache import cached_response, invalidate_all_responses, invalidate_performer_responses, \
+    invalidate_user_responses, local_cache
+
+
+class CountingView(APIView):
+    """Endpoint that returns how often it has been called."""
+
+    calls = 0
+
+    def get(self, request, format=None):
+        CountingView.calls += 1
+        return Response({"calls": CountingView.calls}, status=status.HTTP_200_OK)
+
+
+class DatasetsView(CountingView):
+
+    @cached_response("test-datasets")
+    def get(self, request, format=None):
+        return super().get(request, format)
+
+
+class FootprintView(CountingView):
+
+    @cached_response("test-footprint", contains_performers=True)
+    def get(self, request, format=None):
+        return super().get(request, format)
+
+
+@override_settings(RESPONSE_CACHE_ALIAS=None)
+class ResponseCacheTest(TestCase):
+    """Tests the cache of a single process, the default without RESPONSE_CACHE_ALIAS."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="first")
+        cls.other_user = User.objects.create(username="second")
+
+    def setUp(self):
+        local_cache.clear()
+
+    def get(self, view, user, path='/'):
+        """Returns the number of calls of the endpoint, that the response contains."""
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=user)
+        response = view.as_view()(request)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        return response.data["calls"]
+
+    def assertNotCached(self, view, user, cached_calls):
+        self.assertNotEqual(cached_calls, self.get(view, user))
+
+    def cache_all(self):
+        """Caches the responses of both endpoints for both users."""
+        return {(view, user): self.get(view, user) for view in (DatasetsView, FootprintView)
+                for user in (self.user, self.other_user)}
+
+    def test_responses_are_cached(self):
+        responses = self.cache_all()
+        self.assertEqual(4, len(set(responses.values())))
+        self.assertEqual(responses, self.cache_all())
+        self.assertNotEqual(self.get(DatasetsView, self.user), self.get(DatasetsView, self.user, '/?fields=date'))
+
+    def test_user_invalidation(self):
+        responses = self.cache_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_user_responses(self.user.id)
+        self.assertNotCached(DatasetsView, self.user, responses[(DatasetsView, self.user)])
+        self.assertNotCached(FootprintView, self.user, responses[(FootprintView, self.user)])
+        self.assertEqual(responses[(DatasetsView, self.other_user)], self.get(DatasetsView, self.other_user))
+        self.assertEqual(responses[(FootprintView, self.other_user)], self.get(FootprintView, self.other_user))
+
+    def test_user_invalidation_after_commit(self):
+        responses = self.cache_all()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            invalidate_user_responses(self.user.id)
+        # the old data is still visible until the transaction commits
+        self.assertEqual(responses[(DatasetsView, self.user)], self.get(DatasetsView, self.user))
+        for callback in callbacks:
+            callback()
+        self.assertNotCached(DatasetsView, self.user, responses[(DatasetsView, self.user)])
+
+    def test_performer_invalidation(self):
+        responses = self.cache_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_performer_responses()
+        for user in (self.user, self.other_user):
+            self.assertNotCached(FootprintView, user, responses[(FootprintView, user)])
+            self.assertEqual(responses[(DatasetsView, user)], self.get(DatasetsView, user))
+
+    def test_global_invalidation(self):
+        responses = self.cache_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_all_responses()
+        for (view, user), calls in responses.items():
+            self.assertNotCached(view, user, calls)
+
+    def test_delete_invalidates_owner(self):
+        greenhouse = Greenhouses.objects.create(user=self.user, greenhouse_name="Haus1")
+        dataset = GreenhouseData.objects.create(greenhouse=greenhouse, date=datetime.date(2022, 1, 1))
+        responses = self.cache_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            dataset.delete()
+        self.assertNotCached(DatasetsView, self.user, responses[(DatasetsView, self.user)])
+        self.assertEqual(responses[(DatasetsView, self.other_user)], self.get(DatasetsView, self.other_user))
+
+    def test_errors_are_not_cached(self):
+        class ErrorView(APIView):
+            calls = 0
+
+            @cached_response("test-error")
+            def get(self, request, format=None):
+                ErrorView.calls += 1
+                return Response({'Error': 'Error', 'Message': 'Message'}, status=status.HTTP_400_BAD_REQUEST)
+
+        for _ in range(2):
+            request = APIRequestFactory().get('/')
+            force_authenticate(request, user=self.user)
+            ErrorView.as_view()(request)
+        self.assertEqual(2, ErrorView.calls)
+
+
+@override_settings(RESPONSE_CACHE_ALIAS='responses-test',
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                           'responses-test': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                              'LOCATION': 'responses-test'}})
+class SharedResponseCacheTest(ResponseCacheTest):
+    """Runs the same tests with the generations in a shared cache."""
+
+    def setUp(self):
+        super().setUp()
+        caches['responses-test'].clear()
+
+    def test_shared_tier(self):
+        responses = self.cache_all()
+        # another process has an empty local tier, but finds the responses in the shared cache
+        local_cache.clear()
+        self.assertEqual(responses, self.cache_all())
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_user_responses(self.user.id)
+        local_cache.clear()
+        self.assertNotCached(DatasetsView, self.user, responses[(DatasetsView, self.user)])
+        self.assertEqual(responses[(DatasetsView, self.other_user)], self.get(DatasetsView, self.other_user))
@@ -7,22 +7,32 @@
 
 
 from django.urls import path
+from .api.calculateScenarios import CalculateScenarios
 from .api.createGreenhouseData import CreateGreenhouseData
 from .api.getCalculatedCO2Footprint import GetCalculatedCO2Footprint
 from .api.getCalculatedH2OFootprint import GetCalculatedH2OFootprint
+from .api.getCohortBenchmarks import GetCohortBenchmarks
 from .api.getProfileSummary import GetDatasetSummary
+from .api.getSensitivities import GetSensitivities
 from .api.getDatasets import GetDatasets
+from .api.getFootprints import GetFootprints
 from .api.getOptionGroupValues import GetOptionGroupValues
+from .api.getPercentiles import GetPercentiles
 from .api.getUnitValues import GetUnitValues
 from .api.updateGreenhouseData import UpdateGreenhouseData
 
 urlpatterns = [
     path('get-co2-footprint', GetCalculatedCO2Footprint.as_view()),
     path('get-h2o-footprint', GetCalculatedH2OFootprint.as_view()),
+    path('get-footprints', GetFootprints.as_view()),
     path('create-dataset', CreateGreenhouseData.as_view()),
     path('update-dataset', UpdateGreenhouseData.as_view()),
     path('get-lookup-values', GetOptionGroupValues.as_view()),
     path('get-unit-values', GetUnitValues.as_view()),
     path('get-datasets', GetDatasets.as_view()),
-    path('get-dataset-summary', GetDatasetSummary.as_view())
+    path('get-dataset-summary', GetDatasetSummary.as_view()),
+    path('calculate-scenarios', CalculateScenarios.as_view()),
+    path('get-sensitivities', GetSensitivities.as_view()),
+    path('get-percentiles', GetPercentiles.as_view()),
+    path('get-cohort-benchmarks', GetCohortBenchmarks.as_view())
 ]
@@ -65,6 +65,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'backend.middleware.FootprintTraceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -148,6 +149,64 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Logging
+# https://docs.djangoproject.com/en/4.0/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'backend': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        # debug records and timings of the footprint calculation, they are only emitted for traced requests
+        'backend.trace': {
+            'handlers': ['console'],
+            'level': 'DEBUG',
+            'propagate': False,
+        },
+    },
+}
+
+
+# Footprint calculation
+
+# Trace every request, see backend/middleware.py
+FOOTPRINT_TRACE = False
+# Trace the requests with the header X-Footprint-Trace, the header is only accepted with DEBUG
+FOOTPRINT_TRACE_HEADER = False
+
+# Seconds after which the reference tables (options, units, measurements) are loaded again (None: only on changes in
+# this process), see backend/referenceCatalog.py
+REFERENCE_CATALOG_TTL = 60
+
+# Seconds after which the active factor set is looked up again (None: only on changes in this process), see
+# backend/factorSets.py
+FACTOR_SET_TTL = 60
+
+# Monte Carlo uncertainty bands of the footprint endpoints (query parameter uncertainty=true), see
+# backend/footprintAnalysis.py: default and maximal number of draws, seconds the simulation of a request may take
+# and relative standard deviations of the co2/h2o equivalents and of the numeric inputs
+FOOTPRINT_UNCERTAINTY_DRAWS = 2000
+FOOTPRINT_UNCERTAINTY_MAX_DRAWS = 10000
+FOOTPRINT_UNCERTAINTY_TIME_BUDGET = 1.0
+FOOTPRINT_FACTOR_DEVIATION = 0.1
+FOOTPRINT_INPUT_DEVIATION = 0.05
+
+# Per user cache of the responses of the read endpoints, see backend/responseCache.py: number of responses per process
+# (0: only in the shared cache), alias of an entry of CACHES that is shared by all processes and holds the invalidations
+# (None: only the cache of the process, which requires a single process deployment) and seconds a response is kept
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_ALIAS = None
+RESPONSE_CACHE_TIMEOUT = 300
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.0/howto/static-files/
 